@@ -0,0 +1,2 @@
+# backtest/__init__.py
+# boleh kosong
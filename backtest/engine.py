@@ -0,0 +1,672 @@
+# backtest/engine.py
+# Backtest vectorized untuk SMC Aggressive Scalping.
+#
+# Semua detector di smc_logic dihitung sebagai series full-history (numpy),
+# bukan analyse_symbol per bar. Hasil per bar t = apa yang dilihat live
+# kalau analyse_symbol dipanggil tepat setelah candle 5m ke-t close:
+# - 5m  : 220 candle terakhir, candle t paling akhir
+# - 15m : 219 candle 15m yang sudah close + candle 15m berjalan (close = close 5m t)
+# - 1H  : idem dengan candle 1H
+# EMA dihitung "windowed" (reset di awal window 220 bar) persis seperti live.
+
+import argparse
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from smc.smc_logic import (
+    analyse_frames,
+    detect_bias_generic,
+    detect_micro_choch,
+    detect_micro_fvg,
+    detect_momentum,
+    detect_not_choppy,
+    detect_not_overextended,
+)
+from smc.smc_params import (
+    DEFAULT_SCORE_PARAMS,
+    DEFAULT_SMC_PARAMS,
+    ScoreParams,
+    SmcParams,
+)
+from smc.smc_scoring import (
+    COND_KEYS,
+    TIERS,
+    TIER_RANK,
+    evaluate_smc_signal,
+    pack_condition_arrays,
+    score_masks,
+)
+
+BAR_MS = 5 * 60 * 1000
+WINDOW = 220          # sama dengan limit get_klines di analyse_symbol
+HTF_BARS = {"15m": 3, "1h": 12}
+
+TIER_ORDER = TIER_RANK
+TP_RR = {"tp1": 1.2, "tp2": 2.0, "tp3": 3.0}
+
+CONDITION_KEYS = list(COND_KEYS)
+
+
+# ================== EMA WINDOWED ==================
+
+def _alpha(period: int) -> float:
+    return 2.0 / (period + 1.0)
+
+
+def _full_ema(x: np.ndarray, period: int) -> np.ndarray:
+    """EMA full-history, rumus sama dengan smc_logic.ema (adjust=False)."""
+    return pd.Series(x).ewm(span=period, adjust=False).mean().values
+
+
+def _window_ema(full: np.ndarray, x: np.ndarray, period: int,
+                at: np.ndarray, start: np.ndarray) -> np.ndarray:
+    """
+    EMA di index `at` kalau rekursi EMA dimulai ulang di index `start`
+    (seperti ema() di DataFrame 220 bar). Rekursinya linear, jadi:
+        e_start(at) = full(at) - q^(at-start) * (full(start) - x(start))
+    """
+    q = 1.0 - _alpha(period)
+    return full[at] - np.power(q, at - start) * (full[start] - x[start])
+
+
+# ================== ROLLING HELPERS (pandas, sama dengan live) ==================
+
+def _rsi_series(close: np.ndarray, period: int = 14) -> np.ndarray:
+    s = pd.Series(close)
+    delta = s.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rs = gain / (loss + 1e-9)
+    return (100 - (100 / (1 + rs))).values
+
+
+def _atr_series(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    h = pd.Series(high)
+    lo = pd.Series(low)
+    prev_close = pd.Series(close).shift(1)
+    tr = pd.concat([h - lo, (h - prev_close).abs(), (lo - prev_close).abs()], axis=1).max(axis=1)
+    return tr.rolling(window=period, min_periods=1).mean().values
+
+
+def _shift(x: np.ndarray, k: int, fill=np.nan) -> np.ndarray:
+    """x[t-k] di posisi t."""
+    out = np.full_like(x, fill, dtype=np.result_type(x, type(fill)))
+    out[k:] = x[:-k]
+    return out
+
+
+def _trailing(x: np.ndarray, length: int, fn, fill=np.nan) -> np.ndarray:
+    """fn atas x[t-length+1 .. t] untuk tiap t (hasil sejajar dengan x)."""
+    out = np.full(len(x), fill, dtype=float)
+    if len(x) >= length:
+        out[length - 1:] = fn(sliding_window_view(x, length), axis=1)
+    return out
+
+
+# ================== BIAS ==================
+
+def _bias_from_ema(last_close, e20, e50, e20_prev, e50_prev) -> np.ndarray:
+    """Rule detect_bias_generic dalam bentuk array."""
+    bias_stack = (last_close > e20) & (e20 > e50)
+    slope20 = (e20 - e20_prev) / np.maximum(np.abs(e20_prev), 1e-9)
+    slope50 = (e50 - e50_prev) / np.maximum(np.abs(e50_prev), 1e-9)
+    return bias_stack & (slope20 > 0.001) & (slope50 > 0.0005)
+
+
+def _htf_bias(open_time: np.ndarray, close: np.ndarray, minutes_bars: int):
+    """
+    Bias HTF per bar 5m: window = 219 candle HTF closed + 1 candle berjalan.
+    Return (bias, valid, group_index).
+    """
+    n = len(close)
+    group = open_time // (minutes_bars * BAR_MS)
+    # index grup (0..G-1) untuk tiap bar 5m
+    new_group = np.r_[True, group[1:] != group[:-1]]
+    gidx = np.cumsum(new_group) - 1
+    # close candle HTF (bar 5m terakhir di grup)
+    last_in_group = np.r_[new_group[1:], True]
+    htf_close = close[last_in_group]
+
+    # grup 0 bisa tidak lengkap (data mulai di tengah candle) → window harus mulai >= 1
+    valid = gidx >= WINDOW
+    if not valid.any():
+        return valid, valid, gidx
+    jj = np.where(valid, gidx, WINDOW)
+    start = jj - (WINDOW - 1)
+
+    out = {}
+    for period in (20, 50):
+        full = _full_ema(htf_close, period)
+        a = _alpha(period)
+        # rekursi EMA window sampai candle closed terakhir, lalu 1 langkah candle berjalan
+        e_before_last = _window_ema(full, htf_close, period, jj - 1, start)
+        e_last = a * close + (1.0 - a) * e_before_last
+        e_prev5 = _window_ema(full, htf_close, period, jj - 4, start)
+        out[period] = (e_last, e_prev5)
+
+    bias = _bias_from_ema(close, out[20][0], out[50][0], out[20][1], out[50][1])
+    return bias & valid, valid, gidx
+
+
+# ================== FEATURES ==================
+
+def compute_base_features(df_5m: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Bagian yang TIDAK bergantung SmcParams: EMA/bias, RSI, ATR, body, wick,
+    range, FVG, swing low. Cukup dihitung sekali per simbol (dipakai ulang sweep).
+    df_5m: kolom open_time, open, high, low, close, volume (urut waktu, tanpa duplikat);
+    boleh DataFrame atau dict array (view KlineArchive.read, tanpa copy).
+    """
+    open_time = np.asarray(df_5m["open_time"], dtype=np.int64)
+    o = np.asarray(df_5m["open"], dtype=float)
+    h = np.asarray(df_5m["high"], dtype=float)
+    lo = np.asarray(df_5m["low"], dtype=float)
+    c = np.asarray(df_5m["close"], dtype=float)
+    n = len(c)
+    if n < WINDOW:
+        raise ValueError(f"History 5m minimal {WINDOW} bar, dapat {n}.")
+    t = np.arange(n)
+
+    valid = t >= WINDOW - 1
+    tt = np.where(valid, t, WINDOW - 1)
+    start = tt - (WINDOW - 1)
+
+    # --- bias 5m (EMA windowed) ---
+    ema = {}
+    for period in (20, 50):
+        full = _full_ema(c, period)
+        ema[period] = (
+            _window_ema(full, c, period, tt, start),
+            _window_ema(full, c, period, tt - 4, start),
+        )
+    bias_5m = _bias_from_ema(c, ema[20][0], ema[50][0], ema[20][1], ema[50][1])
+
+    bias_15m, valid_15m, _ = _htf_bias(open_time, c, HTF_BARS["15m"])
+    bias_1h, valid_1h, _ = _htf_bias(open_time, c, HTF_BARS["1h"])
+
+    # --- micro CHoCH (bagian tanpa threshold) ---
+    micro_choch = (h > _shift(h, 2)) & (lo > _shift(lo, 2))
+    bodies = np.abs(c - o)
+    avg_body = _shift(_trailing(bodies, 8, np.mean), 1)
+    total_range = h - lo
+    upper_wick = h - np.maximum(c, o)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wick_ratio = np.where(total_range > 0, upper_wick / total_range, np.inf)
+    choch_base = micro_choch & (c > o) & (total_range > 0) & (avg_body > 0)
+
+    # --- micro FVG: gap antara bar i dan i+1, i = t-11 .. t-1, pilih mid terdekat ---
+    gap = np.zeros(n, dtype=bool)
+    gap[:-1] = lo[1:] > h[:-1]
+    mid = np.zeros(n)
+    mid[:-1] = (h[:-1] + lo[1:]) / 2.0
+    micro_fvg = np.zeros(n, dtype=bool)
+    fvg_low = np.zeros(n)
+    fvg_high = np.zeros(n)
+    if n > 11:
+        g = sliding_window_view(gap, 11)[: n - 11]     # baris r → i = r..r+10, t = r+11
+        m = sliding_window_view(mid, 11)[: n - 11]
+        diff = np.where(g, np.abs(c[11:, None] - m), np.inf)
+        best = np.argmin(diff, axis=1)
+        has = g.any(axis=1)
+        i_best = np.arange(n - 11) + best
+        micro_fvg[11:] = has
+        fvg_low[11:] = np.where(has, h[i_best], 0.0)
+        fvg_high[11:] = np.where(has, lo[np.minimum(i_best + 1, n - 1)], 0.0)
+
+    # --- not choppy (bagian tanpa threshold) ---
+    ranges = h - lo
+    avg_range = _trailing(ranges, 20, np.mean)
+    full_range = _trailing(h, 20, np.max) - _trailing(lo, 20, np.min)
+    atr_val = _atr_series(h, lo, c, 14)
+    atr_val = np.where(np.isnan(atr_val), 0.0, atr_val)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        atr_pct = np.where(c > 0, atr_val / c, 0.0)
+
+    # --- jarak ke EMA20 ---
+    e20_last = ema[20][0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dist_pct = (c - e20_last) / e20_last
+
+    # --- entry (tanpa SL) ---
+    use_fvg = (fvg_low != 0) & (fvg_high != 0) & (fvg_high > fvg_low)
+    raw_entry = np.where(use_fvg, (fvg_low + fvg_high) / 2.0, c)
+    entry = np.minimum(raw_entry, c)
+
+    return {
+        "open_time": open_time,
+        "open": o,
+        "high": h,
+        "low": lo,
+        "close": c,
+        "valid": valid & valid_15m & valid_1h,
+        "bias_ok": bias_5m,
+        "htf_15m_trend_ok": bias_15m,
+        "htf_1h_trend_ok": bias_1h,
+        "micro_choch": micro_choch,
+        "choch_base": choch_base,
+        "bodies": bodies,
+        "avg_body": avg_body,
+        "wick_ratio": wick_ratio,
+        "micro_fvg": micro_fvg,
+        "fvg_low": fvg_low,
+        "fvg_high": fvg_high,
+        "rsi": _rsi_series(c, 14),
+        "trendy": (avg_range > 0) & (full_range > avg_range * 1.6),
+        "atr": atr_val,
+        "atr_pct": atr_pct,
+        "e20": e20_last,
+        "dist_pct": dist_pct,
+        "entry": entry,
+        "recent_low": _trailing(lo, 5, np.min),
+        "total_range": total_range,
+    }
+
+
+def apply_params(base: Dict[str, np.ndarray],
+                 params: SmcParams = DEFAULT_SMC_PARAMS,
+                 cache: Optional[dict] = None) -> Dict[str, np.ndarray]:
+    """
+    Terapkan threshold SmcParams ke base features.
+    `cache` (opsional, per simbol): tiap komponen di-memo berdasarkan field
+    params yang benar-benar dipakainya, jadi sweep yang cuma mengubah RSI
+    tidak menghitung ulang CHoCH/ATR/SL.
+    """
+    if cache is None:
+        cache = {}
+
+    def part(name, key, fn):
+        k = (name,) + key
+        if k not in cache:
+            cache[k] = fn()
+        return cache[k]
+
+    p = params
+    momentum_ok, momentum_premium = part(
+        "momentum", (p.rsi_ok_min, p.rsi_ok_max, p.rsi_premium_min, p.rsi_premium_max),
+        lambda: (
+            (base["rsi"] >= p.rsi_ok_min) & (base["rsi"] < p.rsi_ok_max),
+            (base["rsi"] >= p.rsi_premium_min) & (base["rsi"] <= p.rsi_premium_max),
+        ),
+    )
+    micro_choch_premium = part(
+        "choch", (p.body_mult, p.max_upper_wick),
+        lambda: (
+            base["choch_base"]
+            & (base["bodies"] >= base["avg_body"] * p.body_mult)
+            & (base["wick_ratio"] <= p.max_upper_wick)
+        ),
+    )
+    not_choppy = part(
+        "choppy", (p.min_atr_pct,),
+        lambda: base["trendy"] & (base["atr_pct"] >= p.min_atr_pct),
+    )
+    not_overextended = part(
+        "overext", (p.max_ema_distance_pct,),
+        lambda: (base["e20"] <= 0) | ~(base["dist_pct"] > p.max_ema_distance_pct),
+    )
+
+    def _levels():
+        c = base["close"]
+        atr_val = base["atr"]
+        entry = base["entry"]
+        buffer = np.where(atr_val > 0, atr_val * p.sl_atr_buffer, np.abs(c) * 0.002)
+        sl = base["recent_low"] - buffer
+        risk = np.abs(entry - sl)
+        risk = np.where(risk <= 0, np.maximum(np.abs(entry) * 0.003, 1e-8), risk)
+        return sl, risk
+
+    sl, risk = part("levels", (p.sl_atr_buffer,), _levels)
+    entry = base["entry"]
+
+    core_ok = (
+        base["bias_ok"] & base["htf_15m_trend_ok"] & base["htf_1h_trend_ok"]
+        & momentum_ok & base["micro_choch"] & not_overextended
+    )
+    anti_top = (base["total_range"] > 0) & ((base["high"] - entry) < 0.25 * base["total_range"])
+    setup_score = (
+        micro_choch_premium.astype(int) + base["micro_fvg"].astype(int) + momentum_premium.astype(int)
+    )
+
+    out = dict(base)
+    out.update({
+        "micro_choch_premium": micro_choch_premium,
+        "momentum_ok": momentum_ok,
+        "momentum_premium": momentum_premium,
+        "not_choppy": not_choppy,
+        "not_overextended": not_overextended,
+        "setup_score": setup_score,
+        "sl": sl,
+        "tp1": entry + risk * TP_RR["tp1"],
+        "tp2": entry + risk * TP_RR["tp2"],
+        "tp3": entry + risk * TP_RR["tp3"],
+        "risk_per_unit": risk,
+        "signal": base["valid"] & core_ok & ~anti_top,
+    })
+    return out
+
+
+def compute_features(df_5m: pd.DataFrame,
+                     params: SmcParams = DEFAULT_SMC_PARAMS) -> Dict[str, np.ndarray]:
+    """Semua detector + level entry/SL/TP untuk seluruh history 5m."""
+    return apply_params(compute_base_features(df_5m), params)
+
+
+# ================== SIGNALS ==================
+
+TIER_NAMES = list(TIERS)
+
+
+def score_arrays(features: Dict[str, np.ndarray],
+                 idx: np.ndarray,
+                 weights: ScoreParams = DEFAULT_SCORE_PARAMS,
+                 cache: bool = True):
+    """
+    Skor & tier untuk bar `idx`: kondisi di-pack jadi bitmask lalu lookup ke
+    LUT yang sama dengan live (smc_scoring.score_masks).
+    Return (score, tier_rank) dengan tier_rank 0=NONE, 1=B, 2=A, 3=A+.
+    cache=False: bobot sekali pakai, LUT tidak disimpan (sweep).
+    """
+    flags = {k: features[k][idx] for k in COND_KEYS}
+    masks = pack_condition_arrays(flags, features["setup_score"][idx])
+    score, tier_rank = score_masks(masks, weights, cache)
+    return score.astype(np.int64), tier_rank.astype(np.int64)
+
+
+def select_signals(features: Dict[str, np.ndarray],
+                   min_tier: str = "A",
+                   cooldown_seconds: int = 1800,
+                   weights: ScoreParams = DEFAULT_SCORE_PARAMS,
+                   cache: bool = True):
+    """
+    Bar yang benar-benar "dikirim": core_ok, tier >= min_tier,
+    lalu cooldown per pair seperti run_bot. Return (idx, score, tier_rank).
+    """
+    idx = np.flatnonzero(features["signal"])
+    score, tier_rank = score_arrays(features, idx, weights, cache)
+    keep = tier_rank >= TIER_ORDER.get(min_tier, 2)
+    idx, score, tier_rank = idx[keep], score[keep], tier_rank[keep]
+
+    cooldown_ms = int(cooldown_seconds) * 1000
+    if cooldown_ms > 0 and idx.size > 1:
+        close_ms = features["open_time"][idx] + BAR_MS
+        sent = np.zeros(idx.size, dtype=bool)
+        last = None
+        for k in range(idx.size):
+            if last is None or close_ms[k] - last >= cooldown_ms:
+                sent[k] = True
+                last = close_ms[k]
+        idx, score, tier_rank = idx[sent], score[sent], tier_rank[sent]
+    return idx, score, tier_rank
+
+
+def generate_signals(features: Dict[str, np.ndarray],
+                     symbol: str = "",
+                     min_tier: str = "A",
+                     cooldown_seconds: int = 1800,
+                     weights: ScoreParams = DEFAULT_SCORE_PARAMS) -> pd.DataFrame:
+    """Sinyal terkirim sebagai DataFrame (kondisi, skor, tier, level)."""
+    idx, score, tier_rank = select_signals(features, min_tier, cooldown_seconds, weights)
+    data = {
+        "symbol": symbol,
+        "bar": idx,
+        "close_time": features["open_time"][idx] + BAR_MS,
+    }
+    for k in CONDITION_KEYS:
+        data[k] = features[k][idx].astype(bool)
+    data["setup_score"] = features["setup_score"][idx]
+    data["score"] = score
+    data["tier"] = np.array(TIER_NAMES, dtype=object)[tier_rank] if idx.size else []
+    for k in ("entry", "sl", "tp1", "tp2", "tp3", "risk_per_unit"):
+        data[k] = features[k][idx]
+    return pd.DataFrame(data)
+
+
+# ================== SIMULASI FIRST-HIT ==================
+
+def _first_true(mask: np.ndarray) -> np.ndarray:
+    """Index kolom True pertama per baris, -1 kalau tidak ada."""
+    first = np.argmax(mask, axis=1)
+    return np.where(mask.any(axis=1), first, -1)
+
+
+def simulate_levels(features: Dict[str, np.ndarray],
+                    t: np.ndarray,
+                    entry_bars: int = 6,
+                    horizon_bars: int = 288) -> Dict[str, np.ndarray]:
+    """
+    Simulasi first-hit vectorized (matriks sinyal × bar ke depan) untuk bar `t`.
+    - Entry limit di `entry`, harus terisi dalam entry_bars candle; batal kalau
+      harga lebih dulu tembus batas atas validasi (entry + 0.30 × risk).
+    - Setelah fill: cari bar pertama low <= SL dan high >= TP1/TP2/TP3.
+      SL & TP di candle yang sama → dianggap SL dulu (konservatif).
+    - Belum kena apa-apa sampai horizon → mark-to-market di close terakhir.
+    """
+    h = features["high"]
+    lo = features["low"]
+    c = features["close"]
+    n = len(c)
+
+    entry = features["entry"][t]
+    sl = features["sl"][t]
+    risk = features["risk_per_unit"][t]
+    tol_up = entry + 0.30 * risk
+
+    # --- fill ---
+    k = np.arange(1, entry_bars + 1)
+    fidx = t[:, None] + k[None, :]
+    inside = fidx < n
+    fidx = np.minimum(fidx, n - 1)
+    touch = (lo[fidx] <= entry[:, None]) & inside
+    runaway = (h[fidx] > tol_up[:, None]) & inside
+    first_touch = _first_true(touch)
+    first_run = _first_true(runaway)
+    filled = (first_touch >= 0) & ((first_run < 0) | (first_touch <= first_run))
+    fill_bar = np.where(filled, t + 1 + np.maximum(first_touch, 0), -1)
+
+    # --- first hit setelah fill ---
+    base_bar = np.where(filled, fill_bar, t)
+    hidx = base_bar[:, None] + np.arange(horizon_bars)[None, :]
+    inside = hidx < n
+    hidx = np.minimum(hidx, n - 1)
+    hh = h[hidx]
+    ll = lo[hidx]
+
+    sl_first = _first_true((ll <= sl[:, None]) & inside)
+    last_bar = np.minimum(base_bar + horizon_bars - 1, n - 1)
+    mtm_r = (c[last_bar] - entry) / risk
+    sl_r = (sl - entry) / risk
+
+    out = {"filled": filled, "fill_bar": fill_bar, "sl_hit": filled & (sl_first >= 0)}
+    for name, rr in TP_RR.items():
+        tp = features[name][t]
+        tp_first = _first_true((hh >= tp[:, None]) & inside)
+        win = filled & (tp_first >= 0) & ((sl_first < 0) | (tp_first < sl_first))
+        loss = filled & ~win & (sl_first >= 0)
+        r = np.where(win, rr, np.where(loss, sl_r, mtm_r))
+        out[f"{name}_hit"] = win
+        out[f"r_{name}"] = np.where(filled, r, 0.0)
+    return out
+
+
+def simulate_trades(features: Dict[str, np.ndarray],
+                    signals: pd.DataFrame,
+                    entry_bars: int = 6,
+                    horizon_bars: int = 288) -> pd.DataFrame:
+    """simulate_levels untuk DataFrame hasil generate_signals."""
+    t = signals["bar"].values.astype(np.int64) if not signals.empty else np.zeros(0, dtype=np.int64)
+    res = simulate_levels(features, t, entry_bars, horizon_bars)
+    return signals.assign(**res)
+
+
+def summarize_by_tier(trades: pd.DataFrame) -> pd.DataFrame:
+    """Win rate TP1/TP2/TP3 (kena sebelum SL) + expectancy (R) per tier."""
+    cols = ["tier", "signals", "filled", "fill_rate", "sl_rate"]
+    for name in TP_RR:
+        cols += [f"win_{name}", f"exp_{name}"]
+    if trades.empty:
+        return pd.DataFrame(columns=cols)
+
+    def _row(tier, g):
+        f = g[g["filled"]]
+        row = {
+            "tier": tier,
+            "signals": len(g),
+            "filled": len(f),
+            "fill_rate": len(f) / len(g) if len(g) else 0.0,
+            "sl_rate": f["sl_hit"].mean() if len(f) else 0.0,
+        }
+        for name in TP_RR:
+            row[f"win_{name}"] = f[f"{name}_hit"].mean() if len(f) else 0.0
+            row[f"exp_{name}"] = f[f"r_{name}"].mean() if len(f) else 0.0
+        return row
+
+    rows = []
+    for tier in sorted(trades["tier"].unique(), key=lambda x: -TIER_ORDER.get(x, 0)):
+        rows.append(_row(tier, trades[trades["tier"] == tier]))
+    rows.append(_row("ALL", trades))
+    return pd.DataFrame(rows, columns=cols)
+
+
+def run_backtest(df_5m: pd.DataFrame,
+                 symbol: str = "",
+                 min_tier: str = "B",
+                 cooldown_seconds: int = 1800,
+                 entry_bars: int = 6,
+                 horizon_bars: int = 288,
+                 params: SmcParams = DEFAULT_SMC_PARAMS,
+                 weights: ScoreParams = DEFAULT_SCORE_PARAMS):
+    """Return (trades, summary_per_tier)."""
+    features = compute_features(df_5m, params)
+    signals = generate_signals(features, symbol, min_tier, cooldown_seconds, weights)
+    trades = simulate_trades(features, signals, entry_bars, horizon_bars)
+    return trades, summarize_by_tier(trades)
+
+
+# ================== VERIFIKASI vs LIVE ==================
+
+def _htf_frame(df_5m: pd.DataFrame, t: int, minutes_bars: int) -> pd.DataFrame:
+    """DataFrame HTF seperti hasil get_klines(…, 220) tepat setelah bar 5m t close."""
+    ot = df_5m["open_time"].values.astype(np.int64)
+    group = ot // (minutes_bars * BAR_MS)
+    g_t = group[t]
+    upto = df_5m.iloc[: t + 1]
+    agg = upto.groupby(group[: t + 1], sort=True).agg(
+        open_time=("open_time", "first"),
+        open=("open", "first"),
+        high=("high", "max"),
+        low=("low", "min"),
+        close=("close", "last"),
+        volume=("volume", "sum"),
+    )
+    agg = agg[agg.index <= g_t].tail(WINDOW)
+    return agg.reset_index(drop=True)
+
+
+def live_frames(df_5m: pd.DataFrame, t: int):
+    """(df_5m, df_15m, df_1h) persis seperti yang dilihat analyse_symbol di bar t."""
+    w5 = df_5m.iloc[t - WINDOW + 1: t + 1].reset_index(drop=True)
+    return w5, _htf_frame(df_5m, t, HTF_BARS["15m"]), _htf_frame(df_5m, t, HTF_BARS["1h"])
+
+
+def verify_against_live(df_5m: pd.DataFrame,
+                        features: Optional[Dict[str, np.ndarray]] = None,
+                        sample: int = 40,
+                        seed: int = 0,
+                        params: SmcParams = DEFAULT_SMC_PARAMS,
+                        weights: ScoreParams = DEFAULT_SCORE_PARAMS) -> List[dict]:
+    """
+    Bandingkan hasil vectorized dengan detector live (smc_logic) di bar sampel.
+    Separuh sampel diambil dari bar sinyal supaya cabang core_ok ikut teruji.
+    Return list mismatch (kosong = identik).
+    """
+    if features is None:
+        features = compute_features(df_5m, params)
+    rng = np.random.default_rng(seed)
+    valid_idx = np.flatnonzero(features["valid"])
+    sig_idx = np.flatnonzero(features["signal"])
+    if valid_idx.size == 0:
+        return []
+    picks = set(rng.choice(valid_idx, size=min(sample // 2 or 1, valid_idx.size), replace=False).tolist())
+    if sig_idx.size:
+        picks |= set(rng.choice(sig_idx, size=min(sample - len(picks), sig_idx.size), replace=False).tolist())
+
+    mismatches = []
+    for t in sorted(picks):
+        w5, w15, w1h = live_frames(df_5m, t)
+        choch, choch_p = detect_micro_choch(w5, params)
+        fvg, fl, fh = detect_micro_fvg(w5)
+        mom, mom_p = detect_momentum(w5, params)
+        live = {
+            "bias_ok": detect_bias_generic(w5),
+            "htf_15m_trend_ok": detect_bias_generic(w15),
+            "htf_1h_trend_ok": detect_bias_generic(w1h),
+            "micro_choch": choch,
+            "micro_choch_premium": choch_p,
+            "micro_fvg": fvg,
+            "momentum_ok": mom,
+            "momentum_premium": mom_p,
+            "not_choppy": detect_not_choppy(w5, params=params),
+            "not_overextended": detect_not_overextended(w5, max_distance_pct=params.max_ema_distance_pct),
+        }
+        for k, v in live.items():
+            if bool(v) != bool(features[k][t]):
+                mismatches.append({"bar": t, "field": k, "live": bool(v), "vector": bool(features[k][t])})
+        if fvg and not (np.isclose(fl, features["fvg_low"][t]) and np.isclose(fh, features["fvg_high"][t])):
+            mismatches.append({"bar": t, "field": "fvg_range", "live": (fl, fh),
+                               "vector": (features["fvg_low"][t], features["fvg_high"][t])})
+
+        conditions, levels = analyse_frames("VERIFY", w5, w15, w1h, params)
+        vec_signal = bool(features["signal"][t])
+        if (conditions is not None) != vec_signal:
+            mismatches.append({"bar": t, "field": "signal", "live": conditions is not None, "vector": vec_signal})
+            continue
+        if conditions is not None:
+            if conditions.setup_score != int(features["setup_score"][t]):
+                mismatches.append({"bar": t, "field": "setup_score", "live": conditions.setup_score,
+                                   "vector": int(features["setup_score"][t])})
+            live_eval = evaluate_smc_signal(conditions, weights=weights)
+            vec_score, vec_tier = score_arrays(features, np.array([t]), weights)
+            if live_eval.score != int(vec_score[0]) or live_eval.tier != TIER_NAMES[vec_tier[0]]:
+                mismatches.append({"bar": t, "field": "score", "live": (live_eval.score, live_eval.tier),
+                                   "vector": (int(vec_score[0]), TIER_NAMES[vec_tier[0]])})
+            for k, v in levels.items():
+                if not np.isclose(v, features[k][t], rtol=1e-9, atol=0.0):
+                    mismatches.append({"bar": t, "field": k, "live": v, "vector": float(features[k][t])})
+    return mismatches
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Backtest vectorized SMC Aggressive Scalping.")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--csv", help="history 5m (kolom open_time, open, high, low, close, volume)")
+    src.add_argument("--archive", help="root KlineArchive (butuh --symbol)")
+    ap.add_argument("--symbol", default="")
+    ap.add_argument("--min-tier", default="B")
+    ap.add_argument("--cooldown", type=int, default=1800)
+    ap.add_argument("--entry-bars", type=int, default=6)
+    ap.add_argument("--horizon-bars", type=int, default=288)
+    ap.add_argument("--verify", type=int, default=0, help="jumlah bar sampel untuk cek vs live")
+    args = ap.parse_args()
+
+    if args.archive:
+        from backtest.kline_archive import KlineArchive
+        df = pd.DataFrame(KlineArchive(args.archive).read(args.symbol, "5m"))
+    else:
+        df = pd.read_csv(args.csv)
+    trades, summary = run_backtest(
+        df, args.symbol, args.min_tier, args.cooldown, args.entry_bars, args.horizon_bars
+    )
+    print(summary.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+
+    if args.verify:
+        mism = verify_against_live(df, sample=args.verify)
+        print(f"\nVerifikasi {args.verify} bar vs live: {len(mism)} mismatch")
+        for m in mism[:20]:
+            print(" ", m)
+
+
+if __name__ == "__main__":
+    main()
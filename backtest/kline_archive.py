@@ -0,0 +1,165 @@
+# backtest/kline_archive.py
+# Arsip kline lokal format kolom (satu file biner per kolom).
+#
+# Layout:
+#   <root>/<SYMBOL>/<interval>/open_time.i8   int64 (ms)
+#                              open.f8 high.f8 low.f8 close.f8   float64
+#                              volume.f4 quote_volume.f4         float32
+#
+# - append-only: file dibuka "ab", baris baru harus open_time > baris terakhir
+# - panjang valid = kolom terpendek; sisa write yang terpotong (crash) dipangkas
+#   otomatis saat arsip dibuka lagi
+# - read(): np.memmap + searchsorted → slice view, tanpa copy
+
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+COLUMNS = [
+    ("open_time", np.dtype("<i8")),
+    ("open", np.dtype("<f8")),
+    ("high", np.dtype("<f8")),
+    ("low", np.dtype("<f8")),
+    ("close", np.dtype("<f8")),
+    ("volume", np.dtype("<f4")),
+    ("quote_volume", np.dtype("<f4")),
+]
+
+INTERVAL_MS = {
+    "1m": 60_000,
+    "3m": 180_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "30m": 1_800_000,
+    "1h": 3_600_000,
+    "2h": 7_200_000,
+    "4h": 14_400_000,
+    "1d": 86_400_000,
+}
+
+
+def _suffix(dtype: np.dtype) -> str:
+    return f"{dtype.kind}{dtype.itemsize}"
+
+
+class KlineArchive:
+    def __init__(self, root: str):
+        self.root = root
+        self._maps: Dict[tuple, tuple] = {}   # (symbol, interval) → (length, {col: memmap})
+        self._repaired: set = set()
+
+    # ---------- path & panjang ----------
+
+    def _dir(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, symbol.upper(), interval)
+
+    def _file(self, symbol: str, interval: str, col: str, dtype: np.dtype) -> str:
+        return os.path.join(self._dir(symbol, interval), f"{col}.{_suffix(dtype)}")
+
+    def _lengths(self, symbol: str, interval: str) -> List[int]:
+        out = []
+        for col, dtype in COLUMNS:
+            path = self._file(symbol, interval, col, dtype)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            out.append(size // dtype.itemsize)
+        return out
+
+    def _repair(self, symbol: str, interval: str):
+        """Pangkas semua kolom ke panjang terpendek (sisa append yang terputus)."""
+        key = (symbol.upper(), interval)
+        if key in self._repaired:
+            return
+        lengths = self._lengths(symbol, interval)
+        n = min(lengths)
+        if any(length != n for length in lengths):
+            for (col, dtype), length in zip(COLUMNS, lengths):
+                if length != n:
+                    with open(self._file(symbol, interval, col, dtype), "r+b") as f:
+                        f.truncate(n * dtype.itemsize)
+            print(f"[archive] {symbol} {interval}: dipangkas ke {n} bar (write terputus).")
+        self._repaired.add(key)
+
+    def length(self, symbol: str, interval: str) -> int:
+        self._repair(symbol, interval)
+        return min(self._lengths(symbol, interval))
+
+    def last_open_time(self, symbol: str, interval: str) -> Optional[int]:
+        n = self.length(symbol, interval)
+        if n == 0:
+            return None
+        path = self._file(symbol, interval, "open_time", COLUMNS[0][1])
+        with open(path, "rb") as f:
+            f.seek((n - 1) * 8)
+            return int(np.frombuffer(f.read(8), dtype="<i8")[0])
+
+    def symbols(self, interval: Optional[str] = None) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        out = []
+        for name in sorted(os.listdir(self.root)):
+            if interval is None or os.path.isdir(os.path.join(self.root, name, interval)):
+                out.append(name)
+        return out
+
+    # ---------- tulis ----------
+
+    def append(self, symbol: str, interval: str, data: Dict[str, np.ndarray]) -> int:
+        """
+        Tambah baris (dict kolom → array). Baris dengan open_time <= baris
+        terakhir di arsip dibuang (aman untuk resume / halaman yang overlap).
+        Return jumlah baris yang benar-benar ditulis.
+        """
+        open_time = np.asarray(data["open_time"], dtype="<i8")
+        if open_time.size == 0:
+            return 0
+        last = self.last_open_time(symbol, interval)
+        keep = open_time > last if last is not None else np.ones(open_time.size, dtype=bool)
+        if not keep.any():
+            return 0
+
+        os.makedirs(self._dir(symbol, interval), exist_ok=True)
+        n_new = int(keep.sum())
+        for col, dtype in COLUMNS:
+            arr = np.ascontiguousarray(np.asarray(data[col])[keep], dtype=dtype)
+            with open(self._file(symbol, interval, col, dtype), "ab") as f:
+                f.write(arr.tobytes())
+        self._maps.pop((symbol.upper(), interval), None)
+        return n_new
+
+    # ---------- baca ----------
+
+    def _columns(self, symbol: str, interval: str):
+        key = (symbol.upper(), interval)
+        n = self.length(symbol, interval)
+        cached = self._maps.get(key)
+        if cached is not None and cached[0] == n:
+            return cached[1]
+        cols = {}
+        for col, dtype in COLUMNS:
+            if n == 0:
+                cols[col] = np.zeros(0, dtype=dtype)
+            else:
+                cols[col] = np.memmap(
+                    self._file(symbol, interval, col, dtype), dtype=dtype, mode="r", shape=(n,)
+                )
+        self._maps[key] = (n, cols)
+        return cols
+
+    def read(self, symbol: str, interval: str,
+             start_ms: Optional[int] = None,
+             end_ms: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Range [start_ms, end_ms] (berdasarkan open_time) sebagai dict view
+        memmap read-only — tidak ada copy.
+        """
+        cols = self._columns(symbol, interval)
+        ot = cols["open_time"]
+        i0 = 0 if start_ms is None else int(np.searchsorted(ot, start_ms, side="left"))
+        i1 = len(ot) if end_ms is None else int(np.searchsorted(ot, end_ms, side="right"))
+        return {col: arr[i0:i1] for col, arr in cols.items()}
+
+    def tail(self, symbol: str, interval: str, n: int) -> Dict[str, np.ndarray]:
+        """n bar terakhir (view) — untuk warm start."""
+        cols = self._columns(symbol, interval)
+        return {col: arr[max(0, len(arr) - n):] for col, arr in cols.items()}
@@ -0,0 +1,172 @@
+# backtest/kline_downloader.py
+# Download history kline Binance Futures (paging startTime/endTime) ke KlineArchive.
+#
+# - resumable: mulai dari open_time terakhir di arsip + 1 interval
+# - menjaga weight: baca X-MBX-USED-WEIGHT-1M, tidur sampai menit berikutnya
+#   kalau sudah lewat weight_budget; 429/418 → tunggu Retry-After lalu ulangi
+# - candle yang belum close (ujung live) tidak disimpan: baris dengan close_time >=
+#   jam server (/fapi/v1/time) dibuang, berapa pun panjang halamannya
+#
+# Contoh:
+#   python -m backtest.kline_downloader --root data/klines --symbols BTCUSDT ETHUSDT \
+#       --intervals 5m 15m 1h --days 90
+#   python -m backtest.kline_downloader --root data/klines --top 200 --days 30
+#
+# Untuk test lokal: BINANCE_REST_URL=http://127.0.0.1:18080 (tools/fake_binance.py).
+
+import argparse
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+import requests
+
+from backtest.kline_archive import INTERVAL_MS, KlineArchive
+from config import BINANCE_REST_URL
+from core.http_transport import WEIGHT_HEADER, klines_weight
+
+
+def rows_to_columns(rows: list) -> dict:
+    """Baris /fapi/v1/klines → dict kolom sesuai KlineArchive.COLUMNS."""
+    return {
+        "open_time": np.array([r[0] for r in rows], dtype=np.int64),
+        "open": np.array([r[1] for r in rows], dtype=np.float64),
+        "high": np.array([r[2] for r in rows], dtype=np.float64),
+        "low": np.array([r[3] for r in rows], dtype=np.float64),
+        "close": np.array([r[4] for r in rows], dtype=np.float64),
+        "volume": np.array([r[5] for r in rows], dtype=np.float32),
+        "quote_volume": np.array([r[7] for r in rows], dtype=np.float32),
+    }
+
+
+class KlineDownloader:
+    def __init__(self,
+                 archive: KlineArchive,
+                 base_url: str = BINANCE_REST_URL,
+                 limit: int = 1000,
+                 weight_budget: int = 1200,
+                 session: Optional[requests.Session] = None):
+        self.archive = archive
+        self.base_url = base_url
+        self.limit = limit
+        self.weight_budget = weight_budget
+        self.session = session or requests.Session()
+        self.used_weight = 0
+        self.requests_made = 0
+        self.rate_limited = 0
+
+    def _wait_budget(self):
+        """Kalau weight menit ini sudah lewat budget, tunggu menit berikutnya."""
+        if self.used_weight + klines_weight(self.limit) <= self.weight_budget:
+            return
+        sleep_for = 60.0 - (time.time() % 60.0) + 0.5
+        print(f"[download] weight {self.used_weight}/{self.weight_budget}, tunggu {sleep_for:.1f}s")
+        time.sleep(sleep_for)
+        self.used_weight = 0
+
+    def _get(self, params: dict, path: str = "/fapi/v1/klines"):
+        url = f"{self.base_url}{path}"
+        while True:
+            self._wait_budget()
+            r = self.session.get(url, params=params, timeout=15)
+            self.requests_made += 1
+            used = r.headers.get(WEIGHT_HEADER)
+            if used is not None:
+                self.used_weight = int(used)
+            else:
+                self.used_weight += klines_weight(self.limit)
+
+            if r.status_code in (429, 418):
+                self.rate_limited += 1
+                retry_after = float(r.headers.get("Retry-After", "60"))
+                print(f"[download] HTTP {r.status_code}, retry dalam {retry_after:.0f}s")
+                time.sleep(retry_after)
+                self.used_weight = 0
+                continue
+            r.raise_for_status()
+            return r.json()
+
+    def server_time(self) -> int:
+        return int(self._get({}, "/fapi/v1/time")["serverTime"])
+
+    def download(self, symbol: str, interval: str,
+                 start_ms: int, end_ms: Optional[int] = None) -> int:
+        """Download [start_ms, end_ms] (end None = sampai candle closed terakhir)."""
+        step = INTERVAL_MS[interval]
+        last = self.archive.last_open_time(symbol, interval)
+        cursor = max(start_ms, last + step) if last is not None else start_ms
+        total = 0
+        # append-only: candle berjalan yang sempat tersimpan tidak pernah dikoreksi
+        now_ms = self.server_time()
+
+        while end_ms is None or cursor <= end_ms:
+            params = {
+                "symbol": symbol.upper(),
+                "interval": interval,
+                "startTime": cursor,
+                "limit": self.limit,
+            }
+            if end_ms is not None:
+                params["endTime"] = end_ms
+            rows = self._get(params)
+            if not rows:
+                break
+
+            short_page = len(rows) < self.limit
+            closed = [r for r in rows if int(r[6]) < now_ms]
+            if closed:
+                total += self.archive.append(symbol, interval, rows_to_columns(closed))
+                cursor = int(closed[-1][0]) + step
+            if short_page or len(closed) < len(rows):
+                break
+
+        return total
+
+    def download_many(self, symbols: Iterable[str], intervals: Iterable[str],
+                      start_ms: int, end_ms: Optional[int] = None):
+        intervals = list(intervals)
+        for symbol in symbols:
+            for interval in intervals:
+                t0 = time.time()
+                try:
+                    n = self.download(symbol, interval, start_ms, end_ms)
+                except Exception as e:
+                    print(f"[download] {symbol} {interval} gagal: {e}")
+                    continue
+                print(
+                    f"[download] {symbol.upper()} {interval}: +{n} bar "
+                    f"(total {self.archive.length(symbol, interval)}) {time.time() - t0:.1f}s"
+                )
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Download history kline ke arsip kolom lokal.")
+    ap.add_argument("--root", required=True)
+    ap.add_argument("--symbols", nargs="*")
+    ap.add_argument("--top", type=int, default=0, help="ambil N pair USDT teratas (volume)")
+    ap.add_argument("--min-volume", type=float, default=0.0)
+    ap.add_argument("--intervals", nargs="+", default=["5m"])
+    ap.add_argument("--days", type=float, default=30.0)
+    ap.add_argument("--limit", type=int, default=1000)
+    ap.add_argument("--weight-budget", type=int, default=1200)
+    args = ap.parse_args()
+
+    symbols = [s.upper() for s in (args.symbols or [])]
+    if args.top:
+        from binance.binance_pairs import get_usdt_pairs
+        symbols += [s.upper() for s in get_usdt_pairs(args.top, args.min_volume)]
+    if not symbols:
+        raise SystemExit("Tidak ada simbol. Pakai --symbols atau --top.")
+
+    start_ms = int((time.time() - args.days * 86400) * 1000)
+    dl = KlineDownloader(KlineArchive(args.root), limit=args.limit, weight_budget=args.weight_budget)
+    t0 = time.time()
+    dl.download_many(symbols, args.intervals, start_ms)
+    print(
+        f"[download] selesai {time.time() - t0:.1f}s, {dl.requests_made} request, "
+        f"{dl.rate_limited}x rate limited"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+# backtest/sweep.py
+# Parameter sweep paralel atas threshold strategi (SmcParams) & scoring (ScoreParams).
+#
+# - Grid parameter di-expand jadi kombinasi, dikirim SEKALI ke tiap worker (initializer).
+# - Satu task = satu simbol: history dibaca & base features dihitung sekali,
+#   lalu semua kombinasi dievaluasi di atasnya. Komponen yang bergantung params
+#   di-memo per field yang dipakai (lihat engine.apply_params), hasil simulasi
+#   di-memo per (buffer SL, bar sinyal). Kombinasi dievaluasi berkelompok per
+#   SmcParams: hanya satu set feature penuh yang hidup di worker (~3.6 MB per
+#   simbol-tahun 5m), berapa pun jumlah kombinasinya. Skor dihitung tanpa cache
+#   LUT (score_masks(cache=False)), jadi bobot grid tidak menumpuk tabel di worker.
+# - Hasil per simbol = array metrik (kombinasi × metrik), dijumlah di parent
+#   lalu jadi tabel ringkas (satu baris per kombinasi).
+#
+# Contoh:
+#   python -m backtest.sweep --archive data/klines \
+#       --grid rsi_ok_min=45,48,50 body_mult=1.1,1.3,1.5 tier_aplus=120,125 \
+#       --workers 8 --out sweep.csv
+
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from backtest.engine import (
+    TP_RR,
+    apply_params,
+    compute_base_features,
+    select_signals,
+    simulate_levels,
+)
+from backtest.kline_archive import KlineArchive
+from smc.smc_params import DEFAULT_SCORE_PARAMS, DEFAULT_SMC_PARAMS, SCORE_FIELDS, SMC_FIELDS
+
+RUN_FIELDS = {"min_tier": str, "cooldown_seconds": int}
+
+METRICS = [
+    "bars",
+    "signals",
+    "aplus",
+    "filled",
+    "sl_hits",
+    "tp1_hits",
+    "tp2_hits",
+    "tp3_hits",
+    "r_tp1",
+    "r_tp2",
+    "r_tp3",
+]
+_M = {name: i for i, name in enumerate(METRICS)}
+
+
+def expand_grid(grid: Dict[str, Sequence]) -> List[dict]:
+    """{'rsi_ok_min': [45, 48], 'tier_a': [95, 100]} → list kombinasi (dict)."""
+    for name in grid:
+        if name not in SMC_FIELDS and name not in SCORE_FIELDS and name not in RUN_FIELDS:
+            raise ValueError(f"Parameter tidak dikenal: {name}")
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def _split_combo(combo: dict, settings: dict):
+    smc = replace(DEFAULT_SMC_PARAMS, **{k: v for k, v in combo.items() if k in SMC_FIELDS})
+    score = replace(DEFAULT_SCORE_PARAMS, **{k: v for k, v in combo.items() if k in SCORE_FIELDS})
+    min_tier = combo.get("min_tier", settings["min_tier"])
+    cooldown = combo.get("cooldown_seconds", settings["cooldown_seconds"])
+    return smc, score, min_tier, cooldown
+
+
+def load_csv_history(history_dir: str, symbol: str) -> pd.DataFrame:
+    """History lokal format CSV: <history_dir>/<SYMBOL>_5m.csv."""
+    path = os.path.join(history_dir, f"{symbol.upper()}_5m.csv")
+    return pd.read_csv(path, usecols=["open_time", "open", "high", "low", "close", "volume"])
+
+
+def list_csv_symbols(history_dir: str) -> List[str]:
+    return sorted(
+        name[: -len("_5m.csv")]
+        for name in os.listdir(history_dir)
+        if name.endswith("_5m.csv")
+    )
+
+
+def load_history(settings: dict, symbol: str):
+    """KlineArchive (memmap, tanpa copy) kalau ada, selain itu CSV."""
+    if settings.get("archive_root"):
+        return _archive(settings["archive_root"]).read(symbol, "5m")
+    return load_csv_history(settings["history_dir"], symbol)
+
+
+def _archive(root: str) -> KlineArchive:
+    arc = _WORKER.get("archive")
+    if arc is None or arc.root != root:
+        arc = KlineArchive(root)
+        _WORKER["archive"] = arc
+    return arc
+
+
+# ================== WORKER ==================
+
+_WORKER: dict = {}
+
+
+def _init_worker(combos: List[dict], settings: dict):
+    _WORKER["combos"] = combos
+    _WORKER["settings"] = settings
+
+
+def _sweep_symbol(symbol: str):
+    combos = _WORKER["combos"]
+    settings = _WORKER["settings"]
+    out = np.zeros((len(combos), len(METRICS)), dtype=np.float64)
+
+    try:
+        df = load_history(settings, symbol)
+        base = compute_base_features(df)
+    except Exception as e:
+        return symbol, None, f"{type(e).__name__}: {e}"
+
+    part_cache: dict = {}
+    sim_cache: dict = {}
+    n_bars = float(base["valid"].sum())
+
+    # urutkan per SmcParams (urutan kemunculan pertama); baris hasil tetap di index asal
+    split = [_split_combo(combo, settings) for combo in combos]
+    group: dict = {}
+    for smc, *_ in split:
+        group.setdefault(smc, len(group))
+    order = sorted(range(len(combos)), key=lambda i: group[split[i][0]])
+
+    cur_smc, feats = None, None
+    for i in order:
+        smc, score_p, min_tier, cooldown = split[i]
+
+        if smc != cur_smc:
+            feats = None   # set lama dilepas dulu sebelum yang baru dihitung
+            feats = apply_params(base, smc, part_cache)
+            cur_smc = smc
+
+        # ribuan kombinasi bobot: skor dihitung langsung, LUT live tidak ikut menumpuk
+        idx, _score, tier_rank = select_signals(feats, min_tier, cooldown, score_p, cache=False)
+        row = out[i]
+        row[_M["bars"]] = n_bars
+        if idx.size == 0:
+            continue
+
+        key = (smc.sl_atr_buffer, idx.tobytes())
+        sim = sim_cache.get(key)
+        if sim is None:
+            sim = simulate_levels(feats, idx, settings["entry_bars"], settings["horizon_bars"])
+            sim_cache[key] = sim
+
+        row[_M["signals"]] = idx.size
+        row[_M["aplus"]] = int((tier_rank == 3).sum())
+        row[_M["filled"]] = int(sim["filled"].sum())
+        row[_M["sl_hits"]] = int(sim["sl_hit"].sum())
+        for name in TP_RR:
+            row[_M[f"{name}_hits"]] = int(sim[f"{name}_hit"].sum())
+            row[_M[f"r_{name}"]] = float(sim[f"r_{name}"].sum())
+
+    return symbol, out, None
+
+
+# ================== PARENT ==================
+
+def run_sweep(history_dir: Optional[str],
+              grid: Dict[str, Sequence],
+              symbols: Optional[List[str]] = None,
+              workers: Optional[int] = None,
+              min_tier: str = "A",
+              cooldown_seconds: int = 1800,
+              entry_bars: int = 6,
+              horizon_bars: int = 288,
+              archive_root: Optional[str] = None) -> pd.DataFrame:
+    """
+    Jalankan sweep & return tabel ringkas (satu baris per kombinasi).
+    Sumber history: archive_root (KlineArchive) atau history_dir (CSV).
+    """
+    combos = expand_grid(grid)
+    if symbols is None:
+        if archive_root:
+            symbols = KlineArchive(archive_root).symbols("5m")
+        else:
+            symbols = list_csv_symbols(history_dir)
+    settings = {
+        "history_dir": history_dir,
+        "archive_root": archive_root,
+        "min_tier": min_tier,
+        "cooldown_seconds": cooldown_seconds,
+        "entry_bars": entry_bars,
+        "horizon_bars": horizon_bars,
+    }
+
+    total = np.zeros((len(combos), len(METRICS)), dtype=np.float64)
+    errors = {}
+    t0 = time.time()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(combos, settings)) as pool:
+        for k, (symbol, arr, err) in enumerate(pool.map(_sweep_symbol, symbols), 1):
+            if err:
+                errors[symbol] = err
+            else:
+                total += arr
+            if k % 25 == 0 or k == len(symbols):
+                print(f"[sweep] {k}/{len(symbols)} simbol, {time.time() - t0:.1f}s", flush=True)
+
+    for symbol, err in errors.items():
+        print(f"[sweep] {symbol} dilewati: {err}")
+
+    table = pd.DataFrame(combos)
+    m = {name: total[:, i] for i, name in enumerate(METRICS)}
+    filled = np.where(m["filled"] > 0, m["filled"], np.nan)
+    days = m["bars"] / 288.0
+    table["signals"] = m["signals"].astype(np.int32)
+    table["signals_per_day"] = (m["signals"] / np.where(days > 0, days, np.nan)).astype(np.float32)
+    table["aplus"] = m["aplus"].astype(np.int32)
+    table["fill_rate"] = (m["filled"] / np.where(m["signals"] > 0, m["signals"], np.nan)).astype(np.float32)
+    table["sl_rate"] = (m["sl_hits"] / filled).astype(np.float32)
+    for name in TP_RR:
+        table[f"win_{name}"] = (m[f"{name}_hits"] / filled).astype(np.float32)
+        table[f"exp_{name}"] = (m[f"r_{name}"] / filled).astype(np.float32)
+    return table
+
+
+def _parse_grid(items: List[str]) -> Dict[str, list]:
+    grid = {}
+    for item in items:
+        name, _, values = item.partition("=")
+        typ = SMC_FIELDS.get(name) or SCORE_FIELDS.get(name) or RUN_FIELDS.get(name)
+        if typ is None:
+            raise SystemExit(f"Parameter tidak dikenal: {name}")
+        if isinstance(typ, str):  # anotasi bisa berupa string
+            typ = {"float": float, "int": int, "str": str}[typ]
+        grid[name] = [typ(v) for v in values.split(",") if v != ""]
+    return grid
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Parameter sweep paralel SMC Aggressive Scalping.")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--history-dir", help="folder CSV <SYMBOL>_5m.csv")
+    src.add_argument("--archive", help="root KlineArchive (backtest/kline_downloader.py)")
+    ap.add_argument("--grid", nargs="+", required=True, help="nama=v1,v2,... (SmcParams/ScoreParams)")
+    ap.add_argument("--symbols", nargs="*")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--min-tier", default="A")
+    ap.add_argument("--cooldown", type=int, default=1800)
+    ap.add_argument("--entry-bars", type=int, default=6)
+    ap.add_argument("--horizon-bars", type=int, default=288)
+    ap.add_argument("--sort", default="exp_tp1")
+    ap.add_argument("--top", type=int, default=20)
+    ap.add_argument("--out", help="simpan tabel lengkap ke CSV")
+    args = ap.parse_args()
+
+    grid = _parse_grid(args.grid)
+    n_combos = int(np.prod([len(v) for v in grid.values()]))
+    print(f"[sweep] {n_combos} kombinasi")
+
+    t0 = time.time()
+    table = run_sweep(
+        args.history_dir, grid, args.symbols, args.workers,
+        args.min_tier, args.cooldown, args.entry_bars, args.horizon_bars,
+        archive_root=args.archive,
+    )
+    print(f"[sweep] selesai dalam {time.time() - t0:.1f}s\n")
+
+    if args.out:
+        table.to_csv(args.out, index=False)
+    top = table.sort_values(args.sort, ascending=False).head(args.top)
+    print(top.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# binance/binance_cluster.py
+# Mode multi-node: beberapa instance bot (mesin/container berbeda) berbagi
+# daftar pair lewat core/cluster.py.
+#
+# Tiap node:
+#   - run_bot(cluster): scan hanya pair di slot milik node ini
+#   - _cluster_loop: heartbeat lease + sinkron config / outbox (background task)
+# Leader (satu node, lease "leader"):
+#   - satu-satunya yang polling Telegram & mengirim sinyal ke subscriber
+#   - publish config scan (/startscan, /settier, ...) ke node lain
+#   - ranking top-K kandidat semua node (outbox + lokal) per close, lalu kirim
+# Hasil sinyal (core/outcome_tracker.py) dilacak node pemilik pair (yang menerima
+# frame WS-nya): leader → push_track ke node itu, event hasil → push_outcome ke leader.
+
+import asyncio
+import threading
+import time
+
+from core.bot_state import state, load_subscribers, load_vip_users, load_user_filters, clear_cooldowns
+from core.cluster import Cluster
+from core.hot_config import start_hot_reload
+from core.outcome_tracker import tracker
+from core.staleness import guard
+from binance.binance_scan import handle_outcome, make_ranker, run_bot
+from binance.close_ranker import CloseRanker
+from smc.smc_params import strategy_from_overrides
+from smc.smc_scoring import warm_lut
+from telegram.telegram_common import send_telegram
+from telegram.telegram_core import telegram_command_loop
+
+CONFIG_KEYS = ("scanning", "min_tier", "cooldown_seconds", "min_volume_usdt", "max_pairs", "debug")
+TICK_SECONDS = 1.0
+
+
+def _current_config(epoch: int) -> dict:
+    cfg = {k: getattr(state, k) for k in CONFIG_KEYS}
+    cfg["cooldown_epoch"] = epoch
+    # strategi (hot reload di leader) dikirim sebagai override JSON + versinya
+    cfg["strategy"] = state.strategy.overrides()
+    cfg["strategy_version"] = state.strategy.version
+    return cfg
+
+
+def _apply_config(cfg: dict, epoch: int) -> int:
+    """Terapkan config dari leader ke state lokal. Return cooldown_epoch terbaru."""
+    if (cfg.get("min_volume_usdt"), cfg.get("max_pairs")) != (state.min_volume_usdt, state.max_pairs):
+        state.force_pairs_refresh = True
+    for k in CONFIG_KEYS:
+        if k in cfg:
+            setattr(state, k, cfg[k])
+    if "strategy" in cfg and cfg["strategy"] != state.strategy.overrides():
+        try:
+            strategy = strategy_from_overrides(cfg["strategy"], int(cfg.get("strategy_version", 0)))
+            warm_lut(strategy.score)
+            state.strategy = strategy
+        except ValueError as e:
+            print("[cluster] Strategi dari leader ditolak:", e)
+    new_epoch = int(cfg.get("cooldown_epoch", epoch))
+    if new_epoch != epoch:
+        clear_cooldowns()
+    return new_epoch
+
+
+async def _cluster_loop(cluster: Cluster, ranker: CloseRanker, heartbeat_seconds: float):
+    last_hb = 0.0
+    was_leader = False
+    published = None
+    epoch = 0
+    had_cooldowns = False
+    cmd_thread = None
+
+    while state.running:
+        try:
+            now = time.time()
+            if now - last_hb >= heartbeat_seconds:
+                await asyncio.to_thread(cluster.heartbeat)
+                last_hb = now
+                if cluster.is_leader != was_leader:
+                    print(f"[cluster] {cluster.node_id}: leader = {cluster.is_leader} "
+                          f"(node hidup: {', '.join(cluster.live_nodes)})")
+
+            # sinyal (dari leader) yang hasilnya dilacak di node ini — pair di slot kita
+            for cand in await asyncio.to_thread(cluster.pop_tracks):
+                tracker.add(cand)
+
+            if cluster.is_leader:
+                if not was_leader:
+                    # ambil alih: subscriber/VIP terbaru dari file bersama
+                    state.subscribers = load_subscribers()
+                    state.vip_users = load_vip_users()
+                    state.filters = load_user_filters()
+                    if cmd_thread is None:
+                        cmd_thread = threading.Thread(
+                            target=telegram_command_loop,
+                            kwargs={"is_active": lambda: cluster.is_leader},
+                            daemon=True,
+                        )
+                        cmd_thread.start()
+
+                # /resetcooldown di leader → hapus cooldown cluster-wide
+                if had_cooldowns and not state.last_signal_time:
+                    await asyncio.to_thread(cluster.clear_cooldowns)
+                    epoch += 1
+                had_cooldowns = bool(state.last_signal_time)
+
+                cfg = _current_config(epoch)
+                if cfg != published:
+                    await asyncio.to_thread(cluster.publish_config, cfg)
+                    published = cfg
+
+                for cand in await asyncio.to_thread(cluster.pop_signals):
+                    if guard.check("queue", cand["close_time"], cand["offset"], label=cand["symbol"]):
+                        ranker.add(cand)
+                ranker.flush_due()
+                for ev in await asyncio.to_thread(cluster.pop_outcomes):
+                    handle_outcome(ev)
+            else:
+                published = None
+                cfg = await asyncio.to_thread(cluster.read_config)
+                if cfg:
+                    epoch = _apply_config(cfg, epoch)
+                had_cooldowns = bool(state.last_signal_time)
+
+            was_leader = cluster.is_leader
+        except Exception as e:
+            print("Error di cluster loop:", e)
+
+        await asyncio.sleep(TICK_SECONDS)
+
+
+async def run_cluster_node(cluster: Cluster, heartbeat_seconds: float = 5.0):
+    # lease awal sebelum run_bot memilih pair
+    await asyncio.to_thread(cluster.heartbeat)
+    print(f"[cluster] {cluster.node_id}: {len(cluster.owned)}/{cluster.n_slots} slot, "
+          f"leader = {cluster.is_leader}")
+
+    # hot reload .env / STRATEGY_FILE hanya dibaca leader, node lain ikut config leader
+    start_hot_reload(notify=send_telegram, is_active=lambda: cluster.is_leader)
+
+    # satu ranker untuk kandidat lokal & outbox (dipakai saat node ini leader)
+    ranker = make_ranker(cluster)
+    loop_task = asyncio.create_task(_cluster_loop(cluster, ranker, heartbeat_seconds))
+    try:
+        await run_bot(cluster, ranker)
+    finally:
+        loop_task.cancel()
+        try:
+            await asyncio.to_thread(cluster.leave)
+        except Exception as e:
+            print("Gagal lepas lease cluster:", e)
+        cluster.backend.close()
@@ -1,11 +1,21 @@
 # binance/binance_pairs.py
-# Fungsi ambil & filter pair USDT berdasarkan volume.
+# Fungsi ambil & filter pair USDT berdasarkan volume, plus ganti daftar pair di
+# koneksi WS yang sedang jalan (SUBSCRIBE / UNSUBSCRIBE selisihnya, tanpa reconnect).
 
-from typing import List, Dict
-
-import requests
+import asyncio
+import itertools
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Sequence, Tuple
 
 from config import BINANCE_REST_URL
+from core.http_transport import transport
+
+# Binance: maks 10 pesan masuk / detik per koneksi → params dipecah & diberi jeda
+SUBSCRIBE_CHUNK = 100
+SUBSCRIBE_INTERVAL_SECONDS = 0.15
+_msg_id = itertools.count(1)
+_pool = ThreadPoolExecutor(2, thread_name_prefix="pairs")
 
 
 def get_usdt_pairs(max_pairs: int, min_volume_usdt: float) -> List[str]:
@@ -13,8 +23,11 @@ def get_usdt_pairs(max_pairs: int, min_volume_usdt: float) -> List[str]:
     Ambil semua pair USDT yang statusnya TRADING,
     lalu filter hanya yang 24h quote volume >= min_volume_usdt USDT.
     """
+    # exchangeInfo & ticker tidak saling bergantung → diambil paralel (satu RTT, bukan dua)
+    ticker_url = f"{BINANCE_REST_URL}/fapi/v1/ticker/24hr"
+    ticker_job = _pool.submit(transport.get, ticker_url, "binance:ticker24hr", timeout=10, weight=40)
     info_url = f"{BINANCE_REST_URL}/fapi/v1/exchangeInfo"
-    r = requests.get(info_url, timeout=10)
+    r = transport.get(info_url, "binance:exchangeInfo", timeout=10, weight=1)
     r.raise_for_status()
     info = r.json()
 
@@ -27,8 +40,7 @@ def get_usdt_pairs(max_pairs: int, min_volume_usdt: float) -> List[str]:
         ):
             usdt_symbols.append(s["symbol"])
 
-    ticker_url = f"{BINANCE_REST_URL}/fapi/v1/ticker/24hr"
-    r2 = requests.get(ticker_url, timeout=10)
+    r2 = ticker_job.result()
     r2.raise_for_status()
     tickers = r2.json()
 
@@ -54,3 +66,20 @@ def get_usdt_pairs(max_pairs: int, min_volume_usdt: float) -> List[str]:
 
     print(f"Filter volume >= {min_vol:,.0f} USDT → {len(symbols_lower)} pair.")
     return symbols_lower
+
+
+async def resubscribe(ws, current: Sequence[str], target: Sequence[str]) -> Tuple[List[str], List[str]]:
+    """
+    Samakan stream kline_5m di ws dari `current` ke `target`: hanya selisihnya yang
+    di-SUBSCRIBE / UNSUBSCRIBE. Pair yang tetap ada tidak pernah putus (tanpa gap).
+    Return (ditambah, dibuang).
+    """
+    cur, tgt = set(current), set(target)
+    added = [s for s in target if s not in cur]
+    removed = [s for s in current if s not in tgt]
+    for method, syms in (("SUBSCRIBE", added), ("UNSUBSCRIBE", removed)):
+        for i in range(0, len(syms), SUBSCRIBE_CHUNK):
+            params = [f"{s}@kline_5m" for s in syms[i:i + SUBSCRIBE_CHUNK]]
+            await ws.send(json.dumps({"method": method, "params": params, "id": next(_msg_id)}))
+            await asyncio.sleep(SUBSCRIBE_INTERVAL_SECONDS)
+    return added, removed
@@ -1,54 +1,318 @@
 # binance/binance_scan.py
 # Fokus ke WebSocket Binance: listen 5m close, analyse_symbol, kirim sinyal.
+# Close 5m masuk antrian prioritas (close_scheduler) → pair paling menjanjikan dianalisa dulu.
+# Sinyal terkirim dilacak hasilnya (core/outcome_tracker.py) dari frame WS yang sama.
+# Cold start: smc_logic (pandas) di-import lazy & paralel dengan fetch pair / connect WS,
+# tahap siap dicatat core/startup.py.
 
 import asyncio
-import json
 import time
-from typing import List
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
 import websockets
 
-from config import BINANCE_STREAM_URL, REFRESH_PAIR_INTERVAL_HOURS
+from config import (
+    BINANCE_STREAM_URL,
+    REFRESH_PAIR_INTERVAL_HOURS,
+    DIGEST_MODE,
+    OUTCOME_TRACKING,
+    OUTCOME_REPLY,
+)
 from core.bot_state import (
     state,
     load_subscribers,
     load_vip_users,
+    load_daily_counts,
+    load_user_filters,
     cleanup_expired_vip,
     load_bot_state,
+    reserve_signal,
+    release_signal,
+)
+from binance.binance_pairs import get_usdt_pairs, resubscribe
+from binance.close_ranker import CloseRanker, signal_candidate
+from binance.close_scheduler import CloseScheduler, feed_closes, format_burst
+from core import signal_journal
+from core.outcome_tracker import OutcomeTracker, tracker
+from core.single_flight import SingleFlight
+from core.staleness import guard, stale_banner
+from core.startup import startup
+from core.strategy_costs import costs
+from smc.smc_scoring import TIER_RANK, evaluate_smc_signal
+from smc.smc_types import SmcConditions, SmcLevels
+from telegram.telegram_broadcast import (
+    build_signal_message,
+    build_rest_summary,
+    build_outcome_message,
+    broadcast_signal,
 )
-from binance.binance_pairs import get_usdt_pairs
-from smc.smc_logic import analyse_symbol
-from smc.smc_scoring import evaluate_smc_signal
-from telegram.telegram_broadcast import build_signal_message, broadcast_signal
+from telegram.telegram_common import send_telegram
+from telegram.telegram_digest import broadcast_digest
 
+# (symbol, close_time) → {chat_id: message_id} pesan sinyal, untuk reply hasil TP/SL
+SENT_MESSAGES_MAX = 2048
+_sent_messages: "OrderedDict[Tuple[str, int], Dict[int, int]]" = OrderedDict()
+REPLY_LEVELS = ("TP1", "TP2", "TP3", "SL")
 
-async def run_bot():
-    # load data persistent
+
+def analyse_symbol(symbol: str, strategy=None, hints: Optional[dict] = None):
+    """
+    Semua strategi terdaftar (smc_strategies) di atas satu fetch → list StrategySignal.
+    Modul analisa (pandas) baru di-import saat dipakai.
+    """
+    from smc import smc_strategies
+
+    return smc_strategies.analyse_symbol(symbol, strategy or state.strategy, hints)
+
+
+def warm_analysis(symbol: Optional[str] = None):
+    """
+    Import modul analisa; dengan symbol: satu analisa penuh (koneksi REST, FeatureFrame,
+    LUT scoring) supaya close pertama tidak membayar biaya pemanggilan pertama.
+    """
+    from smc import smc_strategies
+
+    if symbol:
+        smc_strategies.analyse_symbol(symbol, state.strategy)
+
+
+def load_persistent_state():
+    """Load subscribers, VIP, kuota harian & bot_state dari DB (dipakai run_bot & mode shard)."""
     state.subscribers = load_subscribers()
     state.vip_users = load_vip_users()
     state.daily_date = time.strftime("%Y-%m-%d")
+    state.daily_counts = load_daily_counts(state.daily_date)
+    state.filters = load_user_filters()
     cleanup_expired_vip()
     load_bot_state()
+    startup.mark("state")
+
+    print(f"Loaded {len(state.subscribers)} subscribers, {len(state.vip_users)} VIP users, "
+          f"{len(state.filters)} filter user.")
+
+
+def report_burst(burst: dict):
+    print(format_burst(burst))
+
+
+def send_checked(text: str, close_time: int, offset=None, label: str = "",
+                 sent_ids: Optional[Dict[int, int]] = None,
+                 symbol: Optional[str] = None, tier: Optional[str] = None) -> Optional[int]:
+    """
+    Stage send (core.staleness): cek umur sinyal, beri banner kalau mode mark, lalu broadcast.
+    Return jumlah penerima, None kalau basi (tidak dikirim).
+    """
+    if not guard.check("send", close_time, offset, label):
+        return None
+    if guard.is_stale("send", close_time, offset):
+        text = stale_banner(guard.age(close_time, offset)) + text
+    return broadcast_signal(text, sent_ids=sent_ids, symbol=symbol, tier=tier)
+
+
+def _release(symbol: str, close_time: int, reserved_at: float, cluster=None):
+    """Sinyal tidak jadi dikirim: batalkan reservasi lokal + dedup/cooldown cluster."""
+    release_signal(symbol, reserved_at)
+    if cluster is not None:
+        cluster.release_signal(symbol, close_time)
+
+
+def emit_signal(cand: dict, cluster=None, send: bool = True) -> bool:
+    """
+    Kirim satu kandidat sinyal (dipilih CloseRanker): reservasi cooldown atomik,
+    dedup cluster, build pesan, cek umur (stage send) lalu broadcast.
+    send=False (mode digest): hanya reservasi & cek umur; pesan dikirim digest.
+    """
+    symbol, close_time, offset = cand["symbol"], cand["close_time"], cand.get("offset")
+    reserved_at = time.time()
+    if not reserve_signal(symbol, close_time, reserved_at):
+        if state.debug:
+            print(f"[{symbol}] Sinyal close ini sudah diterima / masih cooldown, skip.")
+        return False
+
+    if cluster is not None and not cluster.accept_signal(symbol, close_time, state.cooldown_seconds):
+        release_signal(symbol, reserved_at)
+        if state.debug:
+            print(f"[{symbol}] Sudah diambil node lain / cooldown cluster, skip.")
+        return False
+
+    if not send:
+        if not guard.check("send", close_time, offset, label=symbol):
+            _release(symbol, close_time, reserved_at, cluster)
+            return False
+        if guard.is_stale("send", close_time, offset):
+            cand["late"] = guard.age(close_time, offset)
+        return True
+
+    conditions = SmcConditions(symbol, cand["mask"])
+    levels = SmcLevels(*cand["levels"])
+    text = build_signal_message(symbol, levels, conditions, cand["score"], cand["tier"],
+                                side=cand.get("side", "long"), strategy=cand.get("strategy"))
+    sent_ids: Optional[Dict[int, int]] = {} if OUTCOME_REPLY else None
+    recipients = send_checked(text, close_time, offset, label=symbol, sent_ids=sent_ids,
+                              symbol=symbol, tier=cand["tier"])
+    if recipients is None:
+        _release(symbol, close_time, reserved_at, cluster)
+        return False
+    cand["recipients"] = recipients
+    if sent_ids:
+        _sent_messages[(symbol, int(close_time))] = sent_ids
+        while len(_sent_messages) > SENT_MESSAGES_MAX:
+            _sent_messages.popitem(last=False)
+
+    print(f"[{symbol}] Sinyal dikirim ({cand.get('strategy', 'smc_long')}): "
+          f"Score {cand['score']}, Tier {cand['tier']}")
+    return True
+
+
+def summarize_rest(close_time: int, cands: list):
+    broadcast_signal(build_rest_summary(close_time, cands), vip_only=True)
+
+
+def track_signal(cand: dict, cluster=None):
+    """
+    Mulai lacak hasil sinyal terkirim di node yang menerima frame simbolnya:
+    kandidat titipan node lain (cand["node"]) dikirim balik ke node itu.
+    """
+    if not OUTCOME_TRACKING:
+        return
+    node = cand.get("node")
+    if cluster is not None and node and node != cluster.node_id:
+        cluster.push_track(node, cand)
+    else:
+        tracker.add(cand)
+
+
+def exchange_now_ms() -> int:
+    """Jam exchange (jam lokal dikoreksi clock_offset) — deadline tracker hasil."""
+    return int((time.time() - guard.clock_offset) * 1000)
 
-    print(f"Loaded {len(state.subscribers)} subscribers, {len(state.vip_users)} VIP users.")
 
+def drain_outcomes(cluster=None, trk: OutcomeTracker = tracker):
+    """Deadline tracker + ambil event hasil: leader / single node → handle_outcome."""
+    if not OUTCOME_TRACKING:
+        return
+    trk.expire(exchange_now_ms())
+    for ev in trk.drain():
+        if cluster is not None and not cluster.is_leader:
+            cluster.push_outcome(ev)
+        else:
+            handle_outcome(ev)
+
+
+def handle_outcome(ev: dict):
+    """Satu event hasil (FILL/TP/SL/NOFILL/EXPIRED): jurnal, log, reply opsional."""
+    signal_journal.record_outcome(ev)
+    print(f"[{ev['symbol']}] Hasil sinyal: {ev['level']} @ {ev['price']:.6f} ({ev['r']:+.2f}R)")
+    key = (ev["symbol"], int(ev["close_time"]))
+    if OUTCOME_REPLY and ev["level"] in REPLY_LEVELS:
+        text = build_outcome_message(ev)
+        for chat_id, message_id in _sent_messages.get(key, {}).items():
+            send_telegram(text, chat_id=chat_id, reply_to=message_id)
+    if ev.get("final"):
+        _sent_messages.pop(key, None)
+
+
+def make_ranker(cluster=None, emit=None) -> CloseRanker:
+    """
+    emit(cand, send=True) default emit_signal + track_signal; DIGEST_MODE → kirim
+    lewat broadcast_digest. emit custom (mode shard) mengurus tracking sendiri.
+    """
+    if emit is None:
+        def emit(cand, send=True):
+            if not emit_signal(cand, cluster, send):
+                return False
+            track_signal(cand, cluster)
+            return True
+    if DIGEST_MODE:
+        return CloseRanker(emit=lambda cand: emit(cand, send=False), digest=broadcast_digest,
+                           record=signal_journal.record)
+    return CloseRanker(emit=emit, summarize=summarize_rest, record=signal_journal.record)
+
+
+def accept_close(symbol: str) -> bool:
+    """Filter close 5m sebelum masuk antrian analisa: scan aktif & tidak cooldown."""
+    if not state.scanning:
+        return False
+    if state.cooldown_seconds > 0:
+        last_ts = state.last_signal_time.get(symbol)
+        now = time.time()
+        if last_ts and now - last_ts < state.cooldown_seconds:
+            if state.debug:
+                print(
+                    f"[{symbol}] Skip cooldown "
+                    f"({int(now - last_ts)}s/{state.cooldown_seconds}s)"
+                )
+            return False
+    return True
+
+
+async def run_bot(cluster=None, ranker: Optional[CloseRanker] = None):
+    """
+    cluster (core.cluster.Cluster, opsional): mode multi-node — hanya pair di slot
+    milik node ini yang di-scan, node non-leader menitipkan kandidat sinyal ke
+    outbox; leader meranking kandidat semua node (ranker) & mengirim top-K.
+    """
+    # import analisa (pandas) di thread, paralel dengan load state & fetch pair
+    warming = [asyncio.create_task(asyncio.to_thread(warm_analysis))]
+
+    # load data persistent
+    load_persistent_state()
+
+    sched = CloseScheduler(report=report_burst)
+    flight = SingleFlight()
+    if ranker is None:
+        ranker = make_ranker(cluster)
     symbols: List[str] = []
+    all_pairs: List[str] = []
     last_pairs_refresh: float = 0.0
     refresh_interval = REFRESH_PAIR_INTERVAL_HOURS * 3600
 
+    def pairs_due() -> bool:
+        return (
+            not all_pairs
+            or (time.time() - last_pairs_refresh) > refresh_interval
+            or state.force_pairs_refresh
+        )
+
+    async def refresh_pairs():
+        nonlocal all_pairs, last_pairs_refresh
+        print("Refresh daftar pair USDT berdasarkan volume...")
+        state.force_pairs_refresh = False
+        try:
+            all_pairs = await asyncio.to_thread(get_usdt_pairs, state.max_pairs, state.min_volume_usdt)
+        except Exception:
+            if not all_pairs:
+                raise
+            # WS tetap jalan dengan daftar lama, coba lagi semenit lagi
+            last_pairs_refresh = time.time() - refresh_interval + 60
+            raise
+        last_pairs_refresh = time.time()
+
+    def target_symbols() -> List[str]:
+        if cluster is None:
+            return all_pairs
+        cluster.ownership_changed = False
+        mine = cluster.my_symbols(all_pairs)
+        print(f"[cluster] {cluster.node_id}: {len(mine)}/{len(all_pairs)} pair di slot node ini.")
+        dropped = tracker.drop_symbols({s.upper() for s in mine})
+        if dropped:
+            print(f"[cluster] {dropped} sinyal terbuka di pair yang pindah slot berhenti dilacak.")
+        return mine
+
     while state.running:
         try:
-            now = time.time()
-            if (
-                not symbols
-                or (now - last_pairs_refresh) > refresh_interval
-                or state.force_pairs_refresh
-            ):
-                print("Refresh daftar pair USDT berdasarkan volume...")
-                symbols = get_usdt_pairs(state.max_pairs, state.min_volume_usdt)
-                last_pairs_refresh = now
-                state.force_pairs_refresh = False
-                print(f"Scan {len(symbols)} pair:", ", ".join(s.upper() for s in symbols))
+            if pairs_due():
+                await refresh_pairs()
+                print(f"Scan {len(all_pairs)} pair:", ", ".join(s.upper() for s in all_pairs))
+                if startup.mark("pairs", f"{len(all_pairs)} pair") and all_pairs:
+                    # warm-up analisa pair teratas, paralel dengan connect WS
+                    warming.append(asyncio.create_task(asyncio.to_thread(warm_analysis, all_pairs[0])))
+
+            symbols = target_symbols()
+            if not symbols:
+                await asyncio.sleep(2)
+                continue
 
             streams = "/".join([f"{s}@kline_5m" for s in symbols])
             ws_url = f"{BINANCE_STREAM_URL}?streams={streams}"
@@ -61,64 +325,108 @@ async def run_bot():
                 else:
                     print("Bot dalam mode STANDBY. Gunakan /startscan untuk mulai scan.\n")
 
-                while state.running:
-                    if state.request_soft_restart:
-                        print("Soft restart diminta → memutus WS & refresh engine...")
-                        state.request_soft_restart = False
-                        break
-
-                    if time.time() - last_pairs_refresh > refresh_interval:
-                        print("Interval refresh pair tercapai → refresh daftar pair & reconnect WebSocket...")
-                        break
-
-                    msg = await ws.recv()
-                    data = json.loads(msg)
-
-                    kline = data.get("data", {}).get("k", {})
-                    if not kline:
-                        continue
-
-                    is_closed = kline.get("x", False)
-                    symbol = kline.get("s", "").upper()
-
-                    if not is_closed or not symbol:
-                        continue
+                on_frame = tracker.on_kline if OUTCOME_TRACKING else None
+                reader = asyncio.create_task(feed_closes(ws, sched, accept_close, on_frame))
+                startup.mark("ws", f"{len(symbols)} pair")
+                if warming:
+                    # close yang masuk selama warm-up tetap diantrikan reader
+                    for res in await asyncio.gather(*warming, return_exceptions=True):
+                        if isinstance(res, Exception):
+                            print("Warm-up analisa gagal:", res)
+                    warming = []
+                    startup.mark("analysis")
+                    startup.mark("scan_ready")
+                try:
+                    while state.running:
+                        if state.request_soft_restart:
+                            print("Soft restart diminta → memutus WS & refresh engine...")
+                            state.request_soft_restart = False
+                            break
 
-                    if not state.scanning:
-                        continue
-
-                    now = time.time()
-                    if state.cooldown_seconds > 0:
-                        last_ts = state.last_signal_time.get(symbol)
-                        if last_ts and now - last_ts < state.cooldown_seconds:
-                            if state.debug:
-                                print(
-                                    f"[{symbol}] Skip cooldown "
-                                    f"({int(now - last_ts)}s/{state.cooldown_seconds}s)"
-                                )
+                        # daftar pair berubah (/minvol, /maxpairs, hot reload, interval refresh,
+                        # slot cluster) → subscribe / unsubscribe selisihnya di WS yang sama
+                        if pairs_due() or (cluster is not None and cluster.ownership_changed):
+                            if pairs_due():
+                                try:
+                                    await refresh_pairs()
+                                except Exception as e:
+                                    print("Gagal refresh pair, lanjut dengan daftar lama:", e)
+                            target = target_symbols()
+                            if not target:
+                                break
+                            added, removed = await resubscribe(ws, symbols, target)
+                            symbols = target
+                            if added or removed:
+                                print(f"Daftar pair diperbarui tanpa reconnect: +{len(added)} "
+                                      f"-{len(removed)} → {len(symbols)} pair.")
                             continue
 
-                    if state.debug:
-                        print(f"[{time.strftime('%H:%M:%S')}] 5m close: {symbol}")
+                        if reader.done():
+                            reader.result()   # raise ConnectionClosed kalau WS putus
+                            break
 
-                    conditions, levels = analyse_symbol(symbol)
-                    if not conditions or not levels:
-                        continue
-
-                    eval_res = evaluate_smc_signal(conditions, min_tier=state.min_tier)
-                    score = eval_res["score"]
-                    tier = eval_res["tier"]
+                        ranker.flush_due()
+                        drain_outcomes(cluster)
+                        job = sched.pop()
+                        if job is None:
+                            # antrian analisa habis → kandidat close ini sudah lengkap
+                            # (cluster: tunggu jendela penuh, kandidat node lain masih masuk)
+                            ranker.flush_due(idle=cluster is None)
+                            await sched.wait()
+                            continue
+                        symbol, kline, prio = job
+                        close_time = int(kline.get("T", 0))
+                        if not guard.check("analyse", close_time, label=symbol):
+                            sched.drop()
+                            continue
 
-                    if not eval_res["should_send"]:
                         if state.debug:
-                            print(f"[{symbol}] Tier {tier} < {state.min_tier}, skip.")
-                        continue
+                            print(f"[{time.strftime('%H:%M:%S')}] 5m close: {symbol} (prio {prio:.2f})")
 
-                    text = build_signal_message(symbol, levels, conditions, score, tier)
-                    broadcast_signal(text)
+                        # single-flight (symbol, close_time): frame close dobel (reconnect /
+                        # stream duplikat) memakai hasil analisa pertama, tidak dihitung ulang
+                        hints = {}
+                        strategy = state.strategy   # satu versi untuk analisa + scoring close ini
+                        signals, duplicate = await flight.run(
+                            (symbol, close_time), analyse_symbol, symbol, strategy, hints=hints
+                        )
+                        if duplicate:
+                            if state.debug:
+                                print(f"[{symbol}] Close {close_time} duplikat → pakai hasil analisa sebelumnya.")
+                            sched.drop()
+                            continue
+                        sched.update_hint(symbol, hints)
+                        scored = []
+                        if signals and guard.check("score", close_time, label=symbol):
+                            for sig in signals:
+                                scored.append((sig, evaluate_smc_signal(
+                                    sig.conditions, min_tier=state.min_tier, weights=sig.weights)))
+                        best = max(scored, key=lambda se: (TIER_RANK.get(se[1].tier, 0), se[1].score),
+                                   default=None)
+                        sched.done(symbol, best[1].tier if best else None)
+                        # beri giliran reader WS sebelum analisa berikutnya
+                        await asyncio.sleep(0)
 
-                    state.last_signal_time[symbol] = now
-                    print(f"[{symbol}] Sinyal dikirim: Score {score}, Tier {tier}")
+                        # tiap strategi = kandidat sendiri; ranker / cooldown per simbol
+                        # memastikan paling banyak satu sinyal per simbol per close
+                        for sig, eval_res in scored:
+                            if not eval_res.should_send:
+                                if state.debug:
+                                    print(f"[{symbol}] {sig.strategy}: Tier {eval_res.tier} "
+                                          f"< {state.min_tier}, skip.")
+                                continue
+                            costs.signal(sig.strategy)
+                            cand = signal_candidate(
+                                symbol, close_time, sig.conditions, sig.levels, eval_res,
+                                guard.clock_offset, strategy=sig.strategy, side=sig.side,
+                            )
+                            if cluster is not None and not cluster.is_leader:
+                                cand["node"] = cluster.node_id   # tracking hasil di node ini
+                                cluster.push_signal(cand)
+                            else:
+                                ranker.add(cand)
+                finally:
+                    reader.cancel()
 
         except websockets.ConnectionClosed:
             print("WebSocket terputus. Reconnect dalam 5 detik...")
@@ -0,0 +1,601 @@
+# binance/binance_shards.py
+# Mode multi-proses (config.SCAN_WORKERS > 1):
+# - N proses worker: tiap worker pegang shard pair sendiri (WS combined stream
+#   sendiri, analisa sendiri → tidak rebutan GIL).
+# - proses utama = broadcaster: pegang BotState, cooldown, Telegram.
+#   Command admin (/startscan, /mode, /minvol, /maxpairs, ...) tetap mengubah
+#   `state` di proses utama; perubahan diteruskan ke semua worker.
+#
+# Pesan broadcaster → worker (satu control queue per worker):
+#   {"type": "config", "scanning", "min_tier", "debug", "cooldown_seconds", "strategy"}
+#   {"type": "shard", "symbols": [...], "shm"}   → worker subscribe / unsubscribe selisih
+#                                                  pair di WS yang sama; KlineShm baru →
+#                                                  ring pair miliknya disalin dari blok lama
+#   {"type": "cooldown", "symbol", "ts"}        → hint: skip analisa simbol ini
+#   {"type": "cooldown_reset"}                  → /stopscan, soft restart
+#   {"type": "track", "cand"}                   → lacak hasil sinyal terkirim (outcome_tracker)
+#   {"type": "restart"} / {"type": "stop"}
+#
+# Pesan worker → broadcaster (satu result queue bersama):
+#   {"type": "signal", "worker", "symbol", "close_time", "offset", "mask", "levels", "score", "tier",
+#    "strategy", "side"}                                                 (smc_strategies)
+#   {"type": "burst", "worker", "close_time", "queued", "analysed", "dropped",
+#    "start", "end", "first_aplus", "first_aplus_symbol", "stale", "costs"}   (close_scheduler,
+#    costs = snapshot core/strategy_costs.py worker)
+#   {"type": "outcome", "worker", "symbol", "close_time", "level", "price", "at", "r", ...}
+#   {"type": "ready", "worker", "stage": "ws" | "warm", "pairs" / "seeded"}   (cold start)
+#
+# close_time (k.T) + offset (clock_offset worker) dibawa sampai kirim: broadcaster
+# cek umur di stage queue & send (core/staleness.py).
+#
+# Cooldown di worker hanya hint supaya tidak analisa sia-sia; keputusan kirim
+# tetap di broadcaster: sinyal masuk CloseRanker (top-K per close), yang terpilih
+# dikirim lewat binance_scan.emit_signal (reservasi cooldown atomik).
+#
+# Kline: broadcaster membuat satu KlineShm (binance/kline_shm.py) untuk semua pair.
+# Worker = satu-satunya writer untuk simbol shard-nya: bar closed dari WS ditulis
+# ke ring, analisa membaca view NumPy langsung dari shared memory. REST hanya
+# dipakai untuk seed (close pertama per simbol, atau kalau ada gap).
+# Cold start: worker mulai seed ring semua pair-nya (REST, paralel) sebelum connect WS;
+# close yang masuk selama seed diantrikan reader dan diproses setelahnya.
+# Daftar pair berubah (/minvol, /maxpairs, hot reload, interval refresh): pair yang
+# tetap ada tidak pindah worker, pair baru ke shard terkecil → ring & WS tetap hangat.
+
+import asyncio
+import multiprocessing as mp
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+import websockets
+
+from config import (
+    BINANCE_STREAM_URL,
+    REFRESH_PAIR_INTERVAL_HOURS,
+    OUTCOME_TRACKING,
+    STARTUP_WARMUP,
+    STARTUP_WARMUP_THREADS,
+)
+from core.bot_state import state
+from binance.binance_pairs import get_usdt_pairs, resubscribe
+from binance.close_scheduler import CloseScheduler, feed_closes, format_burst
+from core.http_transport import CircuitOpen, WeightBudgetExceeded
+from core.outcome_tracker import OutcomeTracker
+from core.single_flight import SingleFlight
+from core.staleness import guard
+from core.startup import startup
+from core.strategy_costs import costs
+from binance.kline_shm import BASE_MS, KlineShm, klines_to_rows
+from smc.smc_params import Strategy
+from smc.smc_scoring import warm_lut
+
+
+def partition_symbols(symbols: List[str], n: int) -> List[List[str]]:
+    """
+    Bagi pair ke n shard secara round-robin. Input sudah urut volume,
+    jadi pair besar (lebih sering aktif) tersebar rata.
+    """
+    return [symbols[i::n] for i in range(n)]
+
+
+# ============================================================
+#                          WORKER
+# ============================================================
+
+class _WorkerConfig:
+    """Setting lokal worker; ditulis thread control, dibaca loop asyncio."""
+
+    def __init__(self):
+        self.running = True
+        self.scanning = False
+        self.min_tier = "A"
+        self.debug = False
+        self.cooldown_seconds = 0
+        self.strategy = Strategy()
+        self.symbols: List[str] = []
+        self.shm_name: Optional[str] = None
+        self.last_signal_time = {}
+        self.reconnect = False
+        self.reshard = False
+        self.tracks = deque()   # sinyal terkirim yang harus dilacak hasilnya
+
+
+def _control_reader(cfg: _WorkerConfig, control_q):
+    while cfg.running:
+        try:
+            msg = control_q.get()
+        except (EOFError, OSError):
+            cfg.running = False
+            return
+        kind = msg.get("type")
+        if kind == "config":
+            cfg.scanning = msg["scanning"]
+            cfg.min_tier = msg["min_tier"]
+            cfg.debug = msg["debug"]
+            cfg.cooldown_seconds = msg["cooldown_seconds"]
+            strategy = msg.get("strategy")
+            if strategy is not None and strategy != cfg.strategy:
+                warm_lut(strategy.score)   # LUT siap sebelum loop analisa memakainya
+                cfg.strategy = strategy
+        elif kind == "shard":
+            cfg.symbols = list(msg["symbols"])
+            cfg.shm_name = msg.get("shm")
+            cfg.reshard = True
+        elif kind == "cooldown":
+            cfg.last_signal_time[msg["symbol"]] = msg["ts"]
+        elif kind == "cooldown_reset":
+            cfg.last_signal_time.clear()
+        elif kind == "track":
+            cfg.tracks.append(msg["cand"])
+        elif kind == "restart":
+            cfg.reconnect = True
+        elif kind == "stop":
+            cfg.running = False
+
+
+def _worker_main(worker_id: int, control_q, result_q):
+    """Entry point proses worker."""
+    try:
+        asyncio.run(_worker_loop(worker_id, control_q, result_q))
+    except KeyboardInterrupt:
+        pass
+
+
+def _switch_store(store: Optional[KlineShm], name: Optional[str], symbols: List[str]) -> Optional[KlineShm]:
+    """Attach KlineShm baru (kalau berganti) dan salin ring pair milik worker ini dari blok lama."""
+    if not name or (store is not None and store.name == name):
+        return store
+    new = KlineShm.attach(name)
+    if store is not None:
+        new.copy_from(store, symbols)
+        store.close()
+    return new
+
+
+def _seed_store(store: Optional[KlineShm], symbols: List[str], tag: str) -> int:
+    """
+    Cold start worker: import modul analisa, lalu (STARTUP_WARMUP) isi ring semua
+    simbol yang belum punya data s/d candle 5m terakhir yang sudah close. Berhenti
+    kalau budget weight habis / circuit open — sisanya di-seed saat close pertama.
+    Return jumlah simbol ter-seed.
+    """
+    from smc import smc_logic
+
+    if store is None or not STARTUP_WARMUP:
+        return 0
+    now_ms = int((time.time() - guard.clock_offset) * 1000)
+    last_closed = now_ms - now_ms % BASE_MS - BASE_MS
+    todo = [s for s in symbols if store.index(s) is not None and store.last_open_time(s) is None]
+    stop = threading.Event()
+
+    def seed(symbol: str) -> bool:
+        if stop.is_set():
+            return False
+        try:
+            rows = {
+                iv: klines_to_rows(smc_logic.get_klines(symbol, iv, 220))
+                for iv in store.intervals
+            }
+        except (WeightBudgetExceeded, CircuitOpen) as e:
+            stop.set()
+            print(f"{tag} Warm-up dihentikan: {e}")
+            return False
+        except Exception as e:
+            print(f"{tag} [{symbol}] Warm-up gagal:", e)
+            return False
+        # satu writer per simbol: close dari WS baru ditulis setelah warm-up selesai
+        store.seed(symbol, rows, last_closed)
+        return True
+
+    with ThreadPoolExecutor(max(1, STARTUP_WARMUP_THREADS), thread_name_prefix="warmup") as ex:
+        return sum(ex.map(seed, todo))
+
+
+def _analyse_from_store(store: KlineShm, symbol: str, bar: tuple, hints: Optional[dict] = None,
+                        strategy=None):
+    """Tulis bar closed ke ring (seed via REST kalau perlu), lalu semua strategi dari view."""
+    from smc import smc_logic
+    from smc.smc_strategies import engine
+
+    t = int(bar[0])
+    last = store.last_open_time(symbol)
+    if last is None or last < t - BASE_MS:
+        try:
+            rows = {
+                iv: klines_to_rows(smc_logic.get_klines(symbol, iv, 220))
+                for iv in store.intervals
+            }
+        except Exception as e:
+            print(f"[{symbol}] ERROR fetching data:", e)
+            return []
+        store.seed(symbol, rows, t)
+        last = store.last_open_time(symbol)
+        if last is None:
+            return []
+    if last < t:
+        store.publish_closed(symbol, bar)
+
+    return store.snapshot(
+        symbol, lambda f5, f15, f1h: engine.analyse(
+            symbol, f5, f15, f1h, strategy or Strategy(), hints
+        )
+    )
+
+
+async def _worker_loop(worker_id: int, control_q, result_q):
+    from smc.smc_scoring import TIER_RANK, evaluate_smc_signal
+
+    cfg = _WorkerConfig()
+    store: Optional[KlineShm] = None
+    threading.Thread(target=_control_reader, args=(cfg, control_q), daemon=True).start()
+    tag = f"[worker {worker_id}]"
+
+    def report(burst: dict):
+        stale = {k: dict(v) for k, v in guard.counters.items()}
+        result_q.put({"type": "burst", "worker": worker_id, "stale": stale,
+                      "costs": costs.snapshot(), **burst})
+
+    def accept(symbol: str) -> bool:
+        if not cfg.scanning:
+            return False
+        if cfg.cooldown_seconds > 0:
+            last_ts = cfg.last_signal_time.get(symbol)
+            if last_ts and time.time() - last_ts < cfg.cooldown_seconds:
+                return False
+        return True
+
+    sched = CloseScheduler(report=report)
+    flight = SingleFlight()
+    tracker = OutcomeTracker()
+
+    def drain_outcomes():
+        while cfg.tracks:
+            tracker.add(cfg.tracks.popleft())
+        tracker.expire(int((time.time() - guard.clock_offset) * 1000))
+        for ev in tracker.drain():
+            result_q.put({"type": "outcome", "worker": worker_id, **ev})
+
+    warming: Optional[asyncio.Task] = None   # seed awal, sekali per proses worker
+    warm_reported = False
+
+    while cfg.running:
+        if not cfg.symbols:
+            await asyncio.sleep(0.2)
+            continue
+
+        cfg.reconnect = False
+        cfg.reshard = False
+        symbols = list(cfg.symbols)
+        # re-shard: sinyal terbuka di pair yang pindah worker tidak dilacak lagi
+        dropped = tracker.drop_symbols({s.upper() for s in symbols})
+        if dropped:
+            print(f"{tag} {dropped} sinyal terbuka di pair yang pindah shard berhenti dilacak.")
+        if warming is not None and not warming.done():
+            await asyncio.wait({warming})   # thread seed masih menulis ke blok sekarang
+        store = _switch_store(store, cfg.shm_name, symbols)
+        if warming is None:
+            # modul analisa (pandas) + seed ring berjalan di thread, paralel dengan connect WS
+            warming = asyncio.create_task(asyncio.to_thread(_seed_store, store, symbols, tag))
+        streams = "/".join(f"{s}@kline_5m" for s in symbols)
+        ws_url = f"{BINANCE_STREAM_URL}?streams={streams}"
+        try:
+            async with websockets.connect(ws_url) as ws:
+                print(f"{tag} WebSocket terhubung ({len(symbols)} pair).")
+                result_q.put({"type": "ready", "worker": worker_id, "stage": "ws", "pairs": len(symbols)})
+                on_frame = tracker.on_kline if OUTCOME_TRACKING else None
+                reader = asyncio.create_task(feed_closes(ws, sched, accept, on_frame))
+                try:
+                    if not warm_reported:
+                        # close yang masuk selama warm-up tetap diantrikan reader
+                        warm_reported = True
+                        try:
+                            seeded = await warming
+                        except Exception as e:
+                            print(f"{tag} Warm-up gagal:", e)
+                            seeded = 0
+                        print(f"{tag} Warm-up selesai: {seeded}/{len(symbols)} pair ter-seed.")
+                        result_q.put({"type": "ready", "worker": worker_id, "stage": "warm",
+                                      "seeded": seeded})
+                    while cfg.running and not cfg.reconnect:
+                        if reader.done():
+                            reader.result()
+                            break
+                        if cfg.reshard:
+                            # shard berubah: ganti blok (ring disalin) & selisih stream, WS tetap
+                            cfg.reshard = False
+                            target = list(cfg.symbols)
+                            if not target:
+                                break
+                            store = _switch_store(store, cfg.shm_name, target)
+                            tracker.drop_symbols({s.upper() for s in target})
+                            added, removed = await resubscribe(ws, symbols, target)
+                            symbols = target
+                            print(f"{tag} Shard diperbarui tanpa reconnect: +{len(added)} -{len(removed)} "
+                                  f"→ {len(symbols)} pair.")
+                            continue
+                        drain_outcomes()
+                        job = sched.pop()
+                        if job is None:
+                            await sched.wait()
+                            continue
+                        symbol, kline, _ = job
+                        close_time = int(kline.get("T", 0))
+                        if not guard.check("analyse", close_time, label=symbol):
+                            sched.drop()
+                            continue
+
+                        hints = {}
+                        strategy = cfg.strategy   # satu versi untuk analisa + scoring close ini
+                        if store is not None and store.index(symbol) is not None:
+                            bar = (
+                                float(kline["t"]), float(kline["o"]), float(kline["h"]),
+                                float(kline["l"]), float(kline["c"]), float(kline["v"]),
+                            )
+                            fn, args = _analyse_from_store, (store, symbol, bar, hints, strategy)
+                        else:
+                            from smc.smc_strategies import analyse_symbol
+                            fn, args = analyse_symbol, (symbol, strategy, hints)
+                        signals, duplicate = await flight.run((symbol, close_time), fn, *args)
+                        if duplicate:
+                            sched.drop()
+                            continue
+                        sched.update_hint(symbol, hints)
+                        scored = []
+                        if signals and guard.check("score", close_time, label=symbol):
+                            for sig in signals:
+                                scored.append((sig, evaluate_smc_signal(
+                                    sig.conditions, min_tier=cfg.min_tier, weights=sig.weights)))
+                        best = max(scored, key=lambda se: (TIER_RANK.get(se[1].tier, 0), se[1].score),
+                                   default=None)
+                        sched.done(symbol, best[1].tier if best else None)
+                        await asyncio.sleep(0)
+
+                        for sig, res in scored:
+                            if not res.should_send:
+                                if cfg.debug:
+                                    print(f"{tag} [{symbol}] {sig.strategy}: Tier {res.tier} "
+                                          f"< {cfg.min_tier}, skip.")
+                                continue
+                            costs.signal(sig.strategy)
+                            result_q.put({
+                                "type": "signal", "worker": worker_id, "symbol": symbol,
+                                "close_time": close_time, "offset": guard.clock_offset,
+                                "mask": sig.conditions.mask, "levels": sig.levels.as_tuple(),
+                                "score": res.score, "tier": res.tier,
+                                "strategy": sig.strategy, "side": sig.side,
+                            })
+                finally:
+                    reader.cancel()
+        except websockets.ConnectionClosed:
+            print(f"{tag} WebSocket terputus. Reconnect dalam 5 detik...")
+            await asyncio.sleep(5)
+        except Exception as e:
+            print(f"{tag} Error:", e)
+            await asyncio.sleep(5)
+
+    sched.flush()
+    if store is not None:
+        store.close()
+    print(f"{tag} selesai.")
+
+
+# ============================================================
+#                        BROADCASTER
+# ============================================================
+
+class _Worker:
+    def __init__(self, ctx, worker_id: int, result_q):
+        self.id = worker_id
+        self.control_q = ctx.Queue()
+        self.proc = ctx.Process(
+            target=_worker_main, args=(worker_id, self.control_q, result_q),
+            name=f"scan-worker-{worker_id}", daemon=True,
+        )
+        self.symbols: List[str] = []
+
+    def send(self, msg: dict):
+        self.control_q.put(msg)
+
+
+def _config_msg() -> dict:
+    return {
+        "type": "config",
+        "scanning": state.scanning,
+        "min_tier": state.min_tier,
+        "debug": state.debug,
+        "cooldown_seconds": state.cooldown_seconds,
+        "strategy": state.strategy,
+    }
+
+
+async def run_sharded(n_workers: int,
+                      on_message: Optional[Callable[[dict], None]] = None):
+    """
+    Broadcaster: spawn n_workers proses scan, bagi pair, terima sinyal,
+    terapkan cooldown & kirim Telegram. on_message dipanggil untuk setiap
+    pesan dari worker (monitoring / load test).
+    """
+    # late import: lewat modul supaya patch (load test) tetap berlaku
+    from binance import binance_scan as scan
+
+    scan.load_persistent_state()
+
+    ctx = mp.get_context("spawn")
+    result_q = ctx.Queue()
+    workers = [_Worker(ctx, i, result_q) for i in range(n_workers)]
+    for w in workers:
+        w.proc.start()
+    owner = {}   # symbol → worker id
+    store: Optional[KlineShm] = None
+    print(f"Mode shard: {n_workers} worker scan dijalankan.")
+
+    def assign(symbols: List[str]):
+        """
+        Bagi pair ke worker. Pair yang tetap ada tidak pindah worker, pair baru masuk
+        shard terkecil; hanya worker yang shard-nya berubah yang diberi pesan. KlineShm
+        baru hanya kalau ada pair yang belum punya slot di blok sekarang.
+        """
+        nonlocal store
+        old = store
+        if store is None or any(store.index(s) is None for s in symbols):
+            store = KlineShm.create(symbols)
+            print(f"KlineShm {store.name}: {len(symbols)} pair, {store.nbytes() / 1e6:.1f} MB")
+        if not any(w.symbols for w in workers):
+            shards = partition_symbols(symbols, n_workers)
+        else:
+            wanted = set(symbols)
+            shards = [[s for s in w.symbols if s in wanted] for w in workers]
+            placed = {s for shard in shards for s in shard}
+            for s in symbols:
+                if s not in placed:
+                    min(shards, key=len).append(s)
+        owner.clear()
+        for w, shard in zip(workers, shards):
+            for s in shard:
+                owner[s.upper()] = w.id
+            if shard != w.symbols or store is not old:
+                w.symbols = shard
+                w.send(_config_msg())
+                w.send({"type": "shard", "symbols": shard, "shm": store.name})
+        if old is not None and old is not store:
+            # worker yang masih memakai blok lama tetap aman sampai mereka close
+            # (mapping tetap hidup setelah unlink; ring disalin worker saat ganti blok)
+            old.close()
+            old.unlink()
+
+    symbols: List[str] = []
+    last_pairs_refresh = 0.0
+    refresh_interval = REFRESH_PAIR_INTERVAL_HOURS * 3600
+    last_config = None
+    cooldown_hints = 0
+    bursts_seen = {}   # close_time → jumlah worker yang sudah lapor burst
+    ready = {"ws": set(), "warm": set()}   # cold start: worker yang sudah lapor per tahap
+
+    def emit(cand: dict, send: bool = True) -> bool:
+        """
+        Kirim kandidat top-K (scan.emit_signal), lalu hint cooldown ke worker pemilik
+        (+ lacak hasilnya di worker itu: frame WS simbolnya hanya ada di sana).
+        """
+        nonlocal cooldown_hints
+        if not scan.emit_signal(cand, send=send):
+            return False
+        wid = owner.get(cand["symbol"])
+        if wid is not None:
+            workers[wid].send({"type": "cooldown", "symbol": cand["symbol"], "ts": time.time()})
+            cooldown_hints += 1
+            if OUTCOME_TRACKING:
+                workers[wid].send({"type": "track", "cand": {
+                    k: cand[k] for k in ("symbol", "close_time", "levels", "score", "tier",
+                                         "strategy", "side") if k in cand}})
+        return True
+
+    # satu sinyal per (symbol, close_time) walau dua worker sempat memegang simbol
+    # yang sama (re-shard): reserve_signal di scan.emit_signal
+    ranker = scan.make_ranker(emit=emit)
+
+    try:
+        while state.running:
+            now = time.time()
+
+            # ---- pair list & shard ----
+            if (
+                not symbols
+                or (now - last_pairs_refresh) > refresh_interval
+                or state.force_pairs_refresh
+            ):
+                print("Refresh daftar pair USDT berdasarkan volume...")
+                try:
+                    symbols = await asyncio.to_thread(
+                        get_usdt_pairs, state.max_pairs, state.min_volume_usdt
+                    )
+                except Exception as e:
+                    print("Gagal refresh pair:", e)
+                    await asyncio.sleep(5)
+                    continue
+                last_pairs_refresh = now
+                state.force_pairs_refresh = False
+                startup.mark("pairs", f"{len(symbols)} pair")
+                assign(symbols)
+                print(f"Scan {len(symbols)} pair di {n_workers} worker.")
+
+            # ---- propagasi command admin ----
+            cfg = _config_msg()
+            if cfg != last_config:
+                for w in workers:
+                    w.send(cfg)
+                last_config = cfg
+            if state.request_soft_restart:
+                print("Soft restart diminta → reconnect semua worker...")
+                state.request_soft_restart = False
+                for w in workers:
+                    w.send({"type": "restart"})
+            if cooldown_hints and not state.last_signal_time:
+                for w in workers:
+                    w.send({"type": "cooldown_reset"})
+                cooldown_hints = 0
+
+            # ---- worker mati → spawn ulang dengan shard yang sama ----
+            for i, w in enumerate(workers):
+                if not w.proc.is_alive():
+                    print(f"Worker {w.id} mati (exit {w.proc.exitcode}), dijalankan ulang.")
+                    nw = _Worker(ctx, w.id, result_q)
+                    nw.proc.start()
+                    nw.symbols = w.symbols
+                    nw.send(_config_msg())
+                    nw.send({"type": "shard", "symbols": nw.symbols, "shm": store and store.name})
+                    workers[i] = nw
+
+            # ---- hasil worker ----
+            try:
+                ranker.flush_due()
+                msg = await asyncio.to_thread(result_q.get, True, 0.5)
+            except queue.Empty:
+                continue
+            if on_message is not None:
+                on_message(msg)
+
+            if msg.get("type") == "burst":
+                guard.merge_remote(f"worker {msg['worker']}", msg["stale"])
+                costs.merge_remote(f"worker {msg['worker']}", msg["costs"])
+                print(f"[worker {msg['worker']}] {format_burst(msg)}")
+                # semua worker selesai dengan close ini → kandidatnya sudah lengkap
+                ct = msg["close_time"]
+                bursts_seen[ct] = bursts_seen.get(ct, 0) + 1
+                if bursts_seen[ct] >= len(workers):
+                    ranker.flush(ct)
+                    bursts_seen = {k: v for k, v in bursts_seen.items() if k > ct}
+                continue
+            if msg.get("type") == "outcome":
+                scan.handle_outcome(msg)
+                continue
+            if msg.get("type") == "ready":
+                ready[msg["stage"]].add(msg["worker"])
+                if len(ready["ws"]) >= len(workers):
+                    startup.mark("ws", f"{len(workers)} worker")
+                if len(ready["warm"]) >= len(workers):
+                    seeded = msg.get("seeded", 0)
+                    if startup.mark("analysis", f"seed terakhir worker {msg['worker']}: {seeded} pair"):
+                        startup.mark("scan_ready")
+                continue
+            if msg.get("type") != "signal":
+                continue
+
+            if guard.check("queue", msg["close_time"], msg["offset"], label=msg["symbol"]):
+                ranker.add(msg)
+    finally:
+        for w in workers:
+            try:
+                w.send({"type": "stop"})
+            except Exception:
+                pass
+        for w in workers:
+            w.proc.join(timeout=3)
+            if w.proc.is_alive():
+                w.proc.terminate()
+        if store is not None:
+            store.close()
+            store.unlink()
+        print("run_sharded selesai karena state.running = False")
@@ -0,0 +1,127 @@
+# binance/close_ranker.py
+# Ranking cross-sectional per close 5m: saat market rally puluhan pair bisa lolos
+# core_ok di close yang sama. Semua kandidat sinyal satu close dikumpulkan dulu
+# (jendela TOPK_WINDOW_SECONDS sejak kandidat pertama, atau lebih cepat kalau
+# antrian analisa sudah habis), diurutkan (tier, score), lalu hanya top-K yang
+# dikirim. Sisanya di-drop atau diringkas jadi satu pesan (TOPK_REST=summary).
+#
+# Kandidat = dict (format sama dengan pesan "signal" worker shard):
+#   {"symbol", "close_time", "offset", "mask", "levels", "score", "tier", "strategy", "side"}
+# Beberapa strategi bisa lolos di simbol & close yang sama: semuanya ikut ranking,
+# reservasi cooldown per simbol (emit) meloloskan yang peringkatnya paling atas.
+# Kandidat yang datang setelah close-nya di-flush tetap bisa dikirim selama
+# kuota K close tsb belum habis.
+#
+# Mode digest (callback `digest`): emit hanya reservasi (tanpa kirim), lalu semua
+# kandidat terpilih + sisa satu flush dikirim sekali lewat digest(close, terpilih, sisa).
+# K=0 di mode ini tetap dikumpulkan per close (semua kandidat terpilih).
+#
+# record(cand, status) (opsional, jurnal sinyal): dipanggil untuk SEMUA kandidat
+# setelah dikirim — "sent", "rest" (di luar top-K) atau "skip" (emit False).
+
+import time
+from typing import Callable, Dict, List, Optional
+
+from config import TOPK_PER_CLOSE, TOPK_WINDOW_SECONDS, TOPK_REST
+from smc.smc_scoring import TIER_RANK
+
+KEEP_CLOSES = 16   # jumlah close terakhir yang diingat kuota K-nya
+
+
+def signal_candidate(symbol: str, close_time: int, conditions, levels, eval_res,
+                     offset: Optional[float] = None, strategy: str = "smc_long",
+                     side: str = "long") -> dict:
+    return {
+        "symbol": symbol, "close_time": close_time, "offset": offset,
+        "mask": conditions.mask, "levels": levels.as_tuple(),
+        "score": eval_res.score, "tier": eval_res.tier,
+        "strategy": strategy, "side": side,
+    }
+
+
+def rank_key(cand: dict):
+    return (-TIER_RANK.get(cand["tier"], 0), -cand["score"], cand["symbol"])
+
+
+class CloseRanker:
+    def __init__(self, emit: Callable[[dict], bool],
+                 summarize: Optional[Callable[[int, List[dict]], None]] = None,
+                 digest: Optional[Callable[[int, List[dict], List[dict]], object]] = None,
+                 record: Optional[Callable[[dict, str], None]] = None,
+                 k: int = TOPK_PER_CLOSE, window_seconds: float = TOPK_WINDOW_SECONDS,
+                 rest: str = TOPK_REST):
+        self.emit = emit
+        self.summarize = summarize
+        self.digest = digest
+        self.record = record
+        self.k = k
+        self.window_seconds = window_seconds
+        self.rest = rest
+        self._pending: Dict[int, List[dict]] = {}
+        self._first: Dict[int, float] = {}
+        self._sent: Dict[int, int] = {}
+        self.stats = {"candidates": 0, "emitted": 0, "rest": 0}
+
+    def add(self, cand: dict):
+        self.stats["candidates"] += 1
+        if self.k <= 0 and self.digest is None:
+            # top-K nonaktif: kirim langsung seperti sebelumnya
+            ok = self.emit(cand)
+            if ok:
+                self.stats["emitted"] += 1
+            if self.record is not None:
+                self.record(cand, "sent" if ok else "skip")
+            return
+        ct = cand["close_time"]
+        if ct not in self._pending:
+            self._pending[ct] = []
+            self._first[ct] = time.time()
+        self._pending[ct].append(cand)
+
+    def pending(self) -> int:
+        return sum(len(v) for v in self._pending.values())
+
+    def flush_due(self, idle: bool = False):
+        """Flush close yang jendelanya habis; idle=True → flush semua (antrian analisa kosong)."""
+        now = time.time()
+        for ct in sorted(self._pending):
+            if idle or now - self._first[ct] >= self.window_seconds:
+                self.flush(ct)
+
+    def flush(self, close_time: int):
+        cands = self._pending.pop(close_time, None)
+        self._first.pop(close_time, None)
+        if not cands:
+            return
+        sent = self._sent.get(close_time, 0)
+        limit = self.k if self.k > 0 else len(cands) + sent
+        emitted, rest, skipped = [], [], []
+        for cand in sorted(cands, key=rank_key):
+            if sent >= limit:
+                rest.append(cand)
+            elif self.emit(cand):
+                sent += 1
+                emitted.append(cand)
+            else:
+                # cooldown / duplikat / basi → bukan "sisa", tidak diringkas
+                skipped.append(cand)
+        self._sent[close_time] = sent
+        while len(self._sent) > KEEP_CLOSES:
+            del self._sent[min(self._sent)]
+
+        self.stats["emitted"] += len(emitted)
+        self.stats["rest"] += len(rest)
+        close_at = time.strftime("%H:%M", time.localtime((close_time + 1) / 1000))
+        print(
+            f"[top-K {close_at}] {len(cands)} kandidat → {len(emitted)} dikirim "
+            f"(kuota {sent}/{self.k or '∞'}), {len(rest)} {'diringkas' if self.rest == 'summary' else 'di-drop'}"
+        )
+        if self.digest is not None:
+            self.digest(close_time, emitted, rest if self.rest == "summary" else [])
+        elif rest and self.rest == "summary" and self.summarize is not None:
+            self.summarize(close_time, rest)
+
+        if self.record is not None:
+            for status, group in (("sent", emitted), ("rest", rest), ("skip", skipped)):
+                for cand in group:
+                    self.record(cand, status)
@@ -0,0 +1,220 @@
+# binance/close_scheduler.py
+# Penjadwal analisa dalam satu close burst (semua pair close 5m hampir bersamaan).
+#
+# Frame close tidak dianalisa urut kedatangan, tapi masuk antrian prioritas.
+# Prioritas = skor murah (0–1) dari:
+#   - hint analisa sebelumnya: bias 15m / 1H / 5m, RSI 5m di band momentum —
+#     disimpan per side (long / short); prioritas = side dengan skor tertinggi,
+#     jadi tidak bergantung pada strategi mana yang terakhir jalan
+#   - volume quote bar ini relatif terhadap rata-rata (EMA) volume simbol tsb
+# Pair tanpa hint (belum pernah dianalisa) dapat prioritas menengah.
+#
+# Alur per burst:
+#   - frame close pertama membuka burst; selama GATHER_SECONDS frame dikumpulkan
+#     dulu supaya ada yang bisa diranking
+#   - analisa diambil dari prioritas tertinggi; frame yang datang belakangan
+#     tetap masuk antrian & ikut diranking
+#   - lewat deadline (detik sejak frame pertama), pair dengan prioritas < drop_below
+#     dibuang; pair prioritas tinggi tetap dianalisa
+#   - ringkasan burst (analisa, drop, durasi, waktu sampai A+ pertama) dikirim ke report()
+
+import asyncio
+import heapq
+import json
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from config import CLOSE_DEADLINE_SECONDS, CLOSE_DROP_PRIORITY
+from core.staleness import guard
+from smc.smc_params import DEFAULT_SMC_PARAMS
+
+GATHER_SECONDS = 0.3        # jeda kumpulkan frame setelah close pertama
+BURST_IDLE_SECONDS = 2.0    # burst selesai kalau antrian kosong & tidak ada close baru
+UNKNOWN_PRIORITY = 0.5      # pair tanpa hint
+VOL_EMA_ALPHA = 2.0 / (20 + 1)
+
+
+class _Hint:
+    __slots__ = ("sides", "vol_avg")
+
+    def __init__(self):
+        self.sides: Dict[str, dict] = {}   # side → bias_5m / bias_15m / bias_1h / rsi
+        self.vol_avg = 0.0
+
+
+def _rsi_score(rsi: Optional[float], params=DEFAULT_SMC_PARAMS) -> float:
+    if rsi is None:
+        return 0.0
+    score = 0.0
+    if params.rsi_ok_min <= rsi < params.rsi_ok_max:
+        score += 0.15
+    if params.rsi_premium_min <= rsi <= params.rsi_premium_max:
+        score += 0.10
+    return score
+
+
+class CloseScheduler:
+    def __init__(self, report: Optional[Callable[[dict], None]] = None,
+                 deadline_seconds: float = CLOSE_DEADLINE_SECONDS,
+                 drop_below: float = CLOSE_DROP_PRIORITY):
+        self.report = report
+        self.deadline_seconds = deadline_seconds
+        self.drop_below = drop_below
+        self.hints: Dict[str, _Hint] = {}
+        self._heap = []
+        self._seq = 0
+        self._wakeup = asyncio.Event()
+        self.burst: Optional[dict] = None
+        self._queued = set()
+
+    # ---------- prioritas ----------
+
+    def priority(self, symbol: str, quote_volume: float) -> float:
+        h = self.hints.get(symbol)
+        if h is None:
+            return UNKNOWN_PRIORITY
+        vol = 0.0
+        if h.vol_avg > 0:
+            vol = min(quote_volume / h.vol_avg, 3.0) / 3.0
+        sides = [s for s in h.sides.values() if s.get("bias_1h") is not None]
+        if not sides:
+            return UNKNOWN_PRIORITY + 0.15 * vol
+        return max(
+            0.25 * s["bias_15m"]
+            + 0.25 * s["bias_1h"]
+            + 0.10 * s["bias_5m"]
+            + _rsi_score(s.get("rsi"))
+            for s in sides
+        ) + 0.15 * vol
+
+    def update_hint(self, symbol: str, hints: dict):
+        """Simpan bias/RSI per side dari analisa terakhir (StrategyEngine.analyse(hints=...))."""
+        if not hints:
+            return
+        h = self.hints.setdefault(symbol, _Hint())
+        for side, values in hints.items():
+            h.sides.setdefault(side, {}).update(values)
+
+    # ---------- antrian ----------
+
+    def push(self, symbol: str, kline: dict):
+        now = time.time()
+        close_time = int(kline.get("T", 0))
+        if self.burst is None or close_time > self.burst["close_time"]:
+            self._start_burst(close_time, now)
+        if symbol in self._queued:
+            return
+
+        quote_volume = float(kline.get("q", 0.0) or 0.0)
+        prio = self.priority(symbol, quote_volume)
+        h = self.hints.setdefault(symbol, _Hint())
+        h.vol_avg = quote_volume if h.vol_avg <= 0 else h.vol_avg + VOL_EMA_ALPHA * (quote_volume - h.vol_avg)
+
+        self._seq += 1
+        heapq.heappush(self._heap, (-prio, self._seq, symbol, kline))
+        self._queued.add(symbol)
+        self.burst["queued"] += 1
+        self._wakeup.set()
+
+    def pop(self) -> Optional[Tuple[str, dict, float]]:
+        """(symbol, kline, prioritas) berikutnya, atau None (kosong / masih gather)."""
+        b = self.burst
+        if not self._heap or b is None:
+            return None
+        now = time.time()
+        if now < b["start"] + GATHER_SECONDS:
+            return None
+        late = now > b["start"] + self.deadline_seconds
+        while self._heap:
+            neg_prio, _, symbol, kline = heapq.heappop(self._heap)
+            if late and -neg_prio < self.drop_below:
+                b["dropped"] += 1
+                continue
+            return symbol, kline, -neg_prio
+        return None
+
+    def drop(self):
+        """Item yang sudah di-pop tapi tidak dianalisa (mis. basi)."""
+        if self.burst is not None:
+            self.burst["dropped"] += 1
+
+    def done(self, symbol: str, tier: Optional[str]):
+        b = self.burst
+        if b is None:
+            return
+        now = time.time()
+        b["analysed"] += 1
+        b["end"] = now
+        if tier == "A+" and b["first_aplus"] is None:
+            b["first_aplus"] = now - b["start"]
+            b["first_aplus_symbol"] = symbol
+
+    async def wait(self, timeout: float = 1.0):
+        """Tunggu frame baru / akhir jeda gather; sekalian tutup burst yang idle."""
+        b = self.burst
+        if self._heap and b is not None:
+            await asyncio.sleep(max(0.0, b["start"] + GATHER_SECONDS - time.time()))
+            return
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        b = self.burst
+        if b is not None and not self._heap and time.time() - b["end"] > BURST_IDLE_SECONDS:
+            self.flush()
+
+    # ---------- burst ----------
+
+    def _start_burst(self, close_time: int, now: float):
+        self.flush()
+        self.burst = {
+            "close_time": close_time, "start": now, "end": now,
+            "queued": 0, "analysed": 0, "dropped": 0,
+            "first_aplus": None, "first_aplus_symbol": None,
+        }
+
+    def flush(self):
+        """Tutup burst aktif; sisa antrian (close lama) dihitung drop."""
+        b = self.burst
+        if b is None:
+            return
+        b["dropped"] += len(self._heap)
+        self._heap.clear()
+        self._queued.clear()
+        self.burst = None
+        if self.report is not None and b["queued"]:
+            self.report(b)
+
+
+def format_burst(b: dict) -> str:
+    close_at = time.strftime("%H:%M", time.localtime((b["close_time"] + 1) / 1000))
+    aplus = (
+        f"A+ pertama {b['first_aplus']:.2f}s ({b['first_aplus_symbol']})"
+        if b["first_aplus"] is not None else "tanpa A+"
+    )
+    return (
+        f"[burst {close_at}] {b['analysed']}/{b['queued']} dianalisa, {b['dropped']} di-drop, "
+        f"selesai {b['end'] - b['start']:.2f}s, {aplus}"
+    )
+
+
+async def feed_closes(ws, sched: CloseScheduler, accept: Callable[[str], bool],
+                      on_frame: Optional[Callable[[dict], None]] = None):
+    """
+    Baca frame WS terus-menerus; close 5m yang lolos accept(symbol) masuk antrian.
+    on_frame(kline) dipanggil untuk setiap frame (termasuk bar berjalan) —
+    dipakai tracker hasil sinyal (core/outcome_tracker.py).
+    """
+    async for msg in ws:
+        kline = json.loads(msg).get("data", {}).get("k", {})
+        if not kline:
+            continue
+        if on_frame is not None:
+            on_frame(kline)
+        if not kline.get("x", False):
+            continue
+        guard.observe(int(kline.get("T", 0)))
+        symbol = kline.get("s", "").upper()
+        if symbol and accept(symbol):
+            sched.push(symbol, kline)
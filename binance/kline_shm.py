@@ -0,0 +1,298 @@
+# binance/kline_shm.py
+# Ring buffer kline di multiprocessing.shared_memory (satu blok untuk semua pair).
+#
+# Layout blok (little endian, offset kelipatan 8):
+#   header   int64[8]   MAGIC, VERSION, n_symbols, n_intervals, capacity, n_fields, SYM_WIDTH, 0
+#   interval S8[n_intervals]            ("5m", "15m", "1h")
+#   symbol   S24[n_symbols]             index simbol (posisi = id)
+#   seq      uint64[n_symbols]          seqlock per simbol (ganjil = sedang ditulis)
+#   count    int64[n_symbols, n_intervals]      jumlah bar yang pernah ditulis
+#   data     float64[n_symbols, n_intervals, 2*capacity, n_fields]
+#
+# Ring "mirrored": bar ke-k ditulis di slot k % capacity DAN k % capacity + capacity,
+# jadi n bar terakhir (n < capacity) selalu berupa slice kontigu → view NumPy tanpa copy.
+#
+# Protokol:
+# - SATU writer per simbol (proses yang memegang WS shard simbol tsb):
+#   seq += 1 (ganjil) → tulis bar → count → seq += 1 (genap).
+# - reader: baca seq (harus genap), pakai view, lalu cek seq belum berubah;
+#   kalau berubah → ulangi (snapshot()). Tanpa lock, tanpa copy.
+# - Append bar baru tidak menyentuh slot yang sedang dilihat reader (n < capacity);
+#   yang bisa berubah hanya candle HTF terakhir (running candle di-update tiap close 5m).
+#
+# Candle HTF terakhir = candle yang memuat bar 5m terakhir (bisa belum selesai),
+# diagregasi dari ring 5m — sama dengan yang dilihat backtest (engine.live_frames).
+
+import time
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from backtest.kline_archive import INTERVAL_MS
+
+MAGIC = 0x534D434B4C494E45   # "SMCKLINE"
+VERSION = 1
+SYM_WIDTH = 24
+INTERVALS = ("5m", "15m", "1h")
+FIELDS = ("open_time", "open", "high", "low", "close", "volume")
+BASE_MS = INTERVAL_MS["5m"]
+
+
+class SeqlockRetry(RuntimeError):
+    """Snapshot gagal konsisten setelah beberapa kali coba (writer terlalu sering)."""
+
+
+def _layout(n_symbols: int, n_intervals: int, capacity: int):
+    off = 8 * 8
+    iv_off = off
+    off += 8 * n_intervals
+    sym_off = off
+    off += SYM_WIDTH * n_symbols
+    off = (off + 7) // 8 * 8
+    seq_off = off
+    off += 8 * n_symbols
+    cnt_off = off
+    off += 8 * n_symbols * n_intervals
+    data_off = off
+    off += 8 * n_symbols * n_intervals * 2 * capacity * len(FIELDS)
+    return iv_off, sym_off, seq_off, cnt_off, data_off, off
+
+
+class KlineShm:
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        buf = shm.buf
+        header = np.ndarray((8,), dtype="<i8", buffer=buf)
+        if int(header[0]) != MAGIC or int(header[1]) != VERSION:
+            raise ValueError(f"Blok shared memory {shm.name} bukan KlineShm v{VERSION}")
+        n_sym, n_iv, cap = int(header[2]), int(header[3]), int(header[4])
+        iv_off, sym_off, seq_off, cnt_off, data_off, _ = _layout(n_sym, n_iv, cap)
+
+        self.capacity = cap
+        self.intervals = [
+            x.decode() for x in np.ndarray((n_iv,), dtype="S8", buffer=buf, offset=iv_off)
+        ]
+        self.symbols = [
+            x.decode() for x in np.ndarray((n_sym,), dtype=f"S{SYM_WIDTH}", buffer=buf, offset=sym_off)
+        ]
+        self._index = {s: i for i, s in enumerate(self.symbols)}
+        self._iv = {iv: j for j, iv in enumerate(self.intervals)}
+        self.seq = np.ndarray((n_sym,), dtype="<u8", buffer=buf, offset=seq_off)
+        self.count = np.ndarray((n_sym, n_iv), dtype="<i8", buffer=buf, offset=cnt_off)
+        self.data = np.ndarray((n_sym, n_iv, 2 * cap, len(FIELDS)), dtype="<f8",
+                               buffer=buf, offset=data_off)
+
+    # ---------- lifecycle ----------
+
+    @classmethod
+    def create(cls, symbols: Sequence[str], intervals: Sequence[str] = INTERVALS,
+               capacity: int = 256, name: Optional[str] = None) -> "KlineShm":
+        symbols = [s.upper() for s in symbols]
+        iv_off, sym_off, _, _, _, size = _layout(len(symbols), len(intervals), capacity)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=max(size, 1))
+        buf = shm.buf
+        buf[:size] = b"\x00" * size
+        np.ndarray((8,), dtype="<i8", buffer=buf)[:] = [
+            MAGIC, VERSION, len(symbols), len(intervals), capacity, len(FIELDS), SYM_WIDTH, 0,
+        ]
+        np.ndarray((len(intervals),), dtype="S8", buffer=buf, offset=iv_off)[:] = [
+            iv.encode() for iv in intervals
+        ]
+        np.ndarray((len(symbols),), dtype=f"S{SYM_WIDTH}", buffer=buf, offset=sym_off)[:] = [
+            s.encode() for s in symbols
+        ]
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "KlineShm":
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self):
+        # view NumPy harus dilepas dulu sebelum buffer ditutup
+        self.seq = self.count = self.data = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+    def nbytes(self) -> int:
+        return self.shm.size
+
+    def index(self, symbol: str) -> Optional[int]:
+        return self._index.get(symbol.upper())
+
+    # ---------- writer ----------
+
+    def _put(self, i: int, j: int, row) -> bool:
+        """Append bar, atau update bar terakhir kalau open_time sama."""
+        cap = self.capacity
+        c = int(self.count[i, j])
+        ring = self.data[i, j]
+        if c > 0:
+            last_ot = ring[(c - 1) % cap, 0]
+            if row[0] == last_ot:
+                s = (c - 1) % cap
+                ring[s] = row
+                ring[s + cap] = row
+                return True
+            if row[0] < last_ot:
+                return False
+        s = c % cap
+        ring[s] = row
+        ring[s + cap] = row
+        self.count[i, j] = c + 1
+        return True
+
+    def _update_htf(self, i: int, open_time: int):
+        """Candle HTF yang memuat bar 5m `open_time` diagregasi dari ring 5m."""
+        j5 = self._iv["5m"]
+        for j, iv in enumerate(self.intervals):
+            if j == j5:
+                continue
+            period = INTERVAL_MS[iv]
+            h_open = open_time - open_time % period
+            n_bars = (open_time - h_open) // BASE_MS + 1
+            bars = self._view(i, j5, n_bars)
+            bars = bars[bars[:, 0] >= h_open]
+            if bars.shape[0] == 0:
+                continue
+            self._put(i, j, (
+                float(h_open),
+                bars[0, 1],
+                bars[:, 2].max(),
+                bars[:, 3].min(),
+                bars[-1, 4],
+                bars[:, 5].sum(),
+            ))
+
+    def publish_closed(self, symbol: str, bar: Sequence[float]) -> bool:
+        """
+        Tulis satu bar 5m closed (open_time, open, high, low, close, volume)
+        dan update candle HTF yang memuatnya. Return False kalau bar lebih lama.
+        """
+        i = self._index[symbol.upper()]
+        self.seq[i] += 1
+        try:
+            ok = self._put(i, self._iv["5m"], bar)
+            if ok:
+                self._update_htf(i, int(bar[0]))
+        finally:
+            self.seq[i] += 1
+        return ok
+
+    def seed(self, symbol: str, rows: Dict[str, np.ndarray], last_open_time: int):
+        """
+        Isi ulang history satu simbol (mis. dari REST saat close pertama / ada gap).
+        rows[interval] = array [n, FIELDS]. Bar 5m dipakai s/d last_open_time;
+        HTF hanya candle yang sudah selesai, candle berjalan dibentuk dari 5m.
+        """
+        i = self._index[symbol.upper()]
+        self.seq[i] += 1
+        try:
+            self.count[i, :] = 0
+            h_open = {}
+            for j, iv in enumerate(self.intervals):
+                arr = np.asarray(rows.get(iv, np.zeros((0, len(FIELDS)))), dtype=np.float64)
+                if iv == "5m":
+                    arr = arr[arr[:, 0] <= last_open_time]
+                else:
+                    period = INTERVAL_MS[iv]
+                    h_open[iv] = last_open_time - last_open_time % period
+                    arr = arr[arr[:, 0] < h_open[iv]]
+                for row in arr[-(self.capacity - 1):]:
+                    self._put(i, j, row)
+            if self.count[i, self._iv["5m"]] > 0:
+                self._update_htf(i, int(self._view(i, self._iv["5m"], 1)[-1, 0]))
+        finally:
+            self.seq[i] += 1
+
+    def copy_from(self, other: "KlineShm", symbols: Iterable[str], retries: int = 100) -> int:
+        """
+        Salin ring simbol dari blok lama (re-shard: KlineShm baru untuk daftar pair baru).
+        Dipanggil writer simbol-simbol itu (worker pemiliknya), jadi hanya pembaca
+        blok baru yang perlu dijaga seqlock. Simbol yang gagal disalin tetap kosong →
+        seed REST seperti biasa. Return jumlah simbol yang tersalin.
+        """
+        if other.capacity != self.capacity or other.intervals != self.intervals:
+            return 0
+        n = 0
+        for sym in symbols:
+            i, k = self.index(sym), other.index(sym)
+            if i is None or k is None:
+                continue
+            for _ in range(retries):
+                s1 = int(other.seq[k])
+                if s1 & 1:
+                    time.sleep(0.0005)
+                    continue
+                self.seq[i] += 1
+                self.count[i] = other.count[k]
+                self.data[i] = other.data[k]
+                self.seq[i] += 1
+                if int(other.seq[k]) == s1:
+                    n += 1
+                    break
+            else:
+                self.seq[i] += 1
+                self.count[i] = 0
+                self.seq[i] += 1
+        return n
+
+    # ---------- reader ----------
+
+    def _view(self, i: int, j: int, n: int) -> np.ndarray:
+        c = int(self.count[i, j])
+        m = max(0, min(n, c, self.capacity - 1))
+        s = (c - m) % self.capacity
+        return self.data[i, j, s:s + m]
+
+    def view(self, symbol: str, interval: str, n: int) -> np.ndarray:
+        """n bar terakhir (view [m, FIELDS], tanpa copy). Pakai snapshot() untuk konsistensi."""
+        return self._view(self._index[symbol.upper()], self._iv[interval], n)
+
+    def last_open_time(self, symbol: str, interval: str = "5m") -> Optional[int]:
+        i = self._index.get(symbol.upper())
+        if i is None:
+            return None
+        v = self._view(i, self._iv[interval], 1)
+        return int(v[0, 0]) if v.shape[0] else None
+
+    def frames(self, symbol: str, n: int = 220) -> List[dict]:
+        """Per interval: dict kolom → pd.Series view (tanpa copy) untuk analyse_frames."""
+        import pandas as pd   # lazy: broadcaster (tanpa analisa) tidak ikut memuat pandas
+        i = self._index[symbol.upper()]
+        out = []
+        for j in range(len(self.intervals)):
+            v = self._view(i, j, n)
+            out.append({
+                name: pd.Series(v[:, k], copy=False) for k, name in enumerate(FIELDS)
+            })
+        return out
+
+    def snapshot(self, symbol: str, fn, n: int = 220, retries: int = 100):
+        """
+        fn(*frames) dengan jaminan data tidak berubah selama fn berjalan
+        (seqlock). Hasil fn harus sudah lepas dari view (mis. conditions/levels).
+        """
+        i = self._index[symbol.upper()]
+        for _ in range(retries):
+            s1 = int(self.seq[i])
+            if s1 & 1:
+                time.sleep(0.0005)   # writer sedang menulis
+                continue
+            result = fn(*self.frames(symbol, n))
+            if int(self.seq[i]) == s1:
+                return result
+        raise SeqlockRetry(f"{symbol}: snapshot tidak konsisten setelah {retries}x")
+
+
+def klines_to_rows(df) -> np.ndarray:
+    """DataFrame get_klines → array [n, FIELDS] untuk KlineShm.seed."""
+    return np.column_stack([df[name].to_numpy(dtype=np.float64) for name in FIELDS])
+
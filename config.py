@@ -1,5 +1,7 @@
 # config.py
 import os
+import re
+from urllib.parse import urlparse
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,22 +12,124 @@ TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN", "")
 TELEGRAM_ADMIN_ID = os.getenv("TELEGRAM_ADMIN_ID", "")
 # username admin utama
 TELEGRAM_ADMIN_USERNAME = os.getenv("TELEGRAM_ADMIN_USERNAME", "")
+# Thread handler command Telegram (telegram/telegram_dispatch.py): update dari chat
+# berbeda diproses paralel, update satu chat tetap berurutan.
+TELEGRAM_HANDLER_WORKERS = int(os.getenv("TELEGRAM_HANDLER_WORKERS", "8"))
+# Bisa diarahkan ke server lokal (tools/bench_startup.py).
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
 
 # === BINANCE ===
-BINANCE_REST_URL = "https://fapi.binance.com"
-BINANCE_STREAM_URL = "wss://fstream.binance.com/stream"
+# Bisa diarahkan ke server lokal (tools/fake_binance.py) untuk load test.
+# .env.example versi lama berisi URL spot (api.binance.com / stream.binance.com) yang dulu
+# diabaikan kode; bot ini memanggil /fapi & stream futures, jadi host spot diganti default.
+def _futures_url(key: str, default: str, spot_host: str) -> str:
+    url = os.getenv(key, default)
+    if re.fullmatch(spot_host, urlparse(url).hostname or ""):
+        print(f"[config] {key}={url} adalah endpoint SPOT, bot ini butuh futures "
+              f"→ pakai {default}. Perbarui .env kamu.")
+        return default
+    return url
+
+
+BINANCE_REST_URL = _futures_url("BINANCE_REST_URL", "https://fapi.binance.com", r"api\d*\.binance\.com")
+BINANCE_STREAM_URL = _futures_url("BINANCE_STREAM_URL", "wss://fstream.binance.com/stream",
+                                  r"(data-)?stream\.binance\.(com|vision)")
+
+# === HTTP TRANSPORT (core/http_transport.py) ===
+# Pool koneksi keep-alive per host (thread scan + handler Telegram berbagi session).
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))
+# Retry GET (error koneksi / timeout / 5xx) dengan backoff eksponensial + jitter.
+# POST (sendMessage) hanya diulang kalau koneksi belum terbentuk.
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF_SECONDS = float(os.getenv("HTTP_BACKOFF_SECONDS", "0.5"))
+# Circuit breaker per host: N gagal beruntun → call ke host itu ditolak selama cooldown.
+HTTP_BREAKER_FAILURES = int(os.getenv("HTTP_BREAKER_FAILURES", "5"))
+HTTP_BREAKER_COOLDOWN_SECONDS = float(os.getenv("HTTP_BREAKER_COOLDOWN_SECONDS", "30"))
+# Batas weight REST Binance per menit yang boleh dipakai bot (limit futures 2400/menit/IP);
+# di atas ini call ber-weight ditolak sebelum dikirim. 0 = tanpa batas.
+BINANCE_WEIGHT_BUDGET = int(os.getenv("BINANCE_WEIGHT_BUDGET", "2000"))
 
 # Filtering volume minimum (dalam USDT)
-MIN_VOLUME_USDT = 1_000_000.0
+MIN_VOLUME_USDT = float(os.getenv("MIN_VOLUME_USDT", "1_000_000.0"))
 
 # Berapa banyak pair USDT yang discan
-MAX_USDT_PAIRS = 1000
+MAX_USDT_PAIRS = int(os.getenv("MAX_USDT_PAIRS", "1000"))
 
 # Tier minimum sinyal yang dikirim: "A+", "A", "B"
-MIN_TIER_TO_SEND = "A"  # balanced default
+MIN_TIER_TO_SEND = os.getenv("MIN_TIER_TO_SEND", "A")  # balanced default
 
 # Cooldown default antar sinyal per pair (detik)
-SIGNAL_COOLDOWN_SECONDS = 1800  # 30 menit
+SIGNAL_COOLDOWN_SECONDS = int(os.getenv("SIGNAL_COOLDOWN_SECONDS", "1800"))  # 30 menit
+
+# Strategi yang dievaluasi per close di atas satu pass data (smc/smc_strategies.py):
+# "jenis" atau "nama=jenis" + override ":field=nilai", dipisah koma. Jenis: smc_long, smc_short.
+#   STRATEGIES=smc_long,smc_short,ketat=smc_long:rsi_ok_min=55:tier_a=105
+STRATEGIES = os.getenv("STRATEGIES", "smc_long")
+
+# Hot reload (core/hot_config.py): HOT_RELOAD_ENV_FILE & STRATEGY_FILE dicek tiap
+# HOT_RELOAD_SECONDS (0 = mati). Perubahan MIN_VOLUME_USDT / MAX_USDT_PAIRS /
+# MIN_TIER_TO_SEND / SIGNAL_COOLDOWN_SECONDS diterapkan live (seperti command admin);
+# STRATEGY_FILE = JSON override SmcParams / ScoreParams (nama field sama dengan --grid sweep).
+HOT_RELOAD_SECONDS = float(os.getenv("HOT_RELOAD_SECONDS", "2"))
+HOT_RELOAD_ENV_FILE = os.getenv("HOT_RELOAD_ENV_FILE", ".env")
+STRATEGY_FILE = os.getenv("STRATEGY_FILE", "strategy.json")
+
+# Database SQLite (WAL) untuk subscribers, VIP, kuota harian, cooldown & setting bot
+# (core/storage.py). File JSON lama dimigrasi otomatis saat pertama jalan.
+BOT_DB_FILE = os.getenv("BOT_DB_FILE", "bot_data.db")
+# Perubahan state ditulis di background: flush setelah PERSIST_FLUSH_SECONDS tanpa perubahan
+# baru, paling lambat PERSIST_MAX_DELAY_SECONDS sejak perubahan pertama (0 = tulis langsung).
+PERSIST_FLUSH_SECONDS = float(os.getenv("PERSIST_FLUSH_SECONDS", "1"))
+PERSIST_MAX_DELAY_SECONDS = float(os.getenv("PERSIST_MAX_DELAY_SECONDS", "5"))
 
 # Refresh interval untuk daftar pair (jam)
 REFRESH_PAIR_INTERVAL_HOURS = 24  # satuan jam
+
+# Jumlah proses worker scan (1 = mode lama, satu proses).
+# > 1 → binance/binance_shards.py: pair dibagi ke N worker, 1 broadcaster.
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "1"))
+# Cold start mode shard: worker mengisi ring KlineShm semua pair-nya via REST
+# (STARTUP_WARMUP_THREADS paralel) bersamaan dengan connect WS, jadi close pertama
+# langsung dianalisa dari shared memory. 0 = seed per simbol saat close pertama.
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "1") == "1"
+STARTUP_WARMUP_THREADS = int(os.getenv("STARTUP_WARMUP_THREADS", "8"))
+
+# Penjadwalan analisa per close 5m (binance/close_scheduler.py):
+# lewat deadline (detik sejak close pertama), pair dengan prioritas < CLOSE_DROP_PRIORITY
+# tidak dianalisa lagi di close tsb.
+CLOSE_DEADLINE_SECONDS = float(os.getenv("CLOSE_DEADLINE_SECONDS", "60"))
+CLOSE_DROP_PRIORITY = float(os.getenv("CLOSE_DROP_PRIORITY", "0.5"))
+
+# Top-K per close 5m (binance/close_ranker.py): kandidat satu close dikumpulkan
+# TOPK_WINDOW_SECONDS, hanya TOPK_PER_CLOSE terbaik (tier, score) yang dikirim (0 = kirim semua).
+# TOPK_REST: "drop" atau "summary" (sisanya jadi satu pesan ringkas untuk admin & VIP).
+TOPK_PER_CLOSE = int(os.getenv("TOPK_PER_CLOSE", "3"))
+TOPK_WINDOW_SECONDS = float(os.getenv("TOPK_WINDOW_SECONDS", "5"))
+TOPK_REST = os.getenv("TOPK_REST", "summary")
+
+# Mode digest (telegram/telegram_digest.py): semua sinyal top-K satu close digabung jadi
+# satu pesan ringkas per penerima (kuota FREE tetap per sinyal). 0 = satu pesan per sinyal.
+DIGEST_MODE = os.getenv("DIGEST_MODE", "0") == "1"
+
+# Tracker hasil sinyal live (core/outcome_tracker.py), aturan sama dengan backtest:
+# entry harus terisi dalam OUTCOME_ENTRY_BARS candle 5m, sinyal kedaluwarsa setelah
+# OUTCOME_HORIZON_BARS. OUTCOME_REPLY=1 → tiap TP/SL dibalas ke pesan sinyal aslinya.
+OUTCOME_TRACKING = os.getenv("OUTCOME_TRACKING", "1") == "1"
+OUTCOME_ENTRY_BARS = int(os.getenv("OUTCOME_ENTRY_BARS", "6"))
+OUTCOME_HORIZON_BARS = int(os.getenv("OUTCOME_HORIZON_BARS", "288"))
+OUTCOME_REPLY = os.getenv("OUTCOME_REPLY", "0") == "1"
+
+# Budget umur sinyal per stage (detik sejak close kline, 0 = tidak dicek), core/staleness.py.
+# STALE_MODE: "drop" = kerja basi dibuang, "mark" = tetap dikirim dengan banner terlambat.
+STALE_MODE = os.getenv("STALE_MODE", "drop")
+STALE_ANALYSE_SECONDS = float(os.getenv("STALE_ANALYSE_SECONDS", "30"))
+STALE_SCORE_SECONDS = float(os.getenv("STALE_SCORE_SECONDS", "35"))
+STALE_QUEUE_SECONDS = float(os.getenv("STALE_QUEUE_SECONDS", "40"))
+STALE_SEND_SECONDS = float(os.getenv("STALE_SEND_SECONDS", "45"))
+
+# Mode multi-node (kosong = nonaktif). Contoh:
+#   sqlite:///data/cluster.db  (node di satu mesin / volume bersama)
+#   redis://host:6379/0        (node di mesin berbeda)
+CLUSTER_BACKEND = os.getenv("CLUSTER_BACKEND", "")
+NODE_ID = os.getenv("NODE_ID", "")               # default: hostname-pid
+CLUSTER_LEASE_SECONDS = float(os.getenv("CLUSTER_LEASE_SECONDS", "15"))
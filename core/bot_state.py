@@ -1,13 +1,15 @@
 # core/bot_state.py
 # Menangani state global, VIP, subscribers, dan load/save konfigurasi bot.
 
-import json
-import os
+import threading
 import time
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Set
+from typing import Optional, Dict, Iterable, Set
 
 from config import (
+    BOT_DB_FILE,
+    PERSIST_FLUSH_SECONDS,
+    PERSIST_MAX_DELAY_SECONDS,
     TELEGRAM_ADMIN_ID,
     MIN_VOLUME_USDT,
     MAX_USDT_PAIRS,
@@ -15,7 +17,13 @@ from config import (
     SIGNAL_COOLDOWN_SECONDS,
 )
 
+from core.storage import Storage
+from core.user_filters import FilterIndex, UserFilter
+from smc.smc_params import Strategy
+
 # ===== FILE DATA PERSISTENT =====
+# Data disimpan di BOT_DB_FILE (core/storage.py); file JSON di bawah hanya
+# dibaca sekali untuk migrasi.
 SUBSCRIBERS_FILE = "subscribers.json"
 VIP_FILE = "vip_users.json"
 STATE_FILE = "bot_state.json"
@@ -28,6 +36,7 @@ class BotState:
     last_update_id: Optional[int] = None
 
     last_signal_time: Dict[str, float] = field(default_factory=dict)
+    last_signal_close: Dict[str, int] = field(default_factory=dict)   # close time sinyal terakhir
     min_tier: str = MIN_TIER_TO_SEND
     cooldown_seconds: int = SIGNAL_COOLDOWN_SECONDS
     debug: bool = False
@@ -37,6 +46,7 @@ class BotState:
     vip_users: Dict[int, float] = field(default_factory=dict)
     daily_counts: Dict[int, int] = field(default_factory=dict)
     daily_date: str = ""
+    filters: FilterIndex = field(default_factory=FilterIndex)   # /filter per user
 
     # restart & pairs filter
     request_soft_restart: bool = False
@@ -46,8 +56,14 @@ class BotState:
     min_volume_usdt: float = MIN_VOLUME_USDT   # filter volume minimum
     max_pairs: int = MAX_USDT_PAIRS            # jumlah pair yang discan
 
+    # parameter strategi live (SmcParams + ScoreParams), di-swap utuh oleh hot reload
+    strategy: Strategy = Strategy()
+
 
 state = BotState()
+_signal_lock = threading.Lock()
+_filter_lock = threading.Lock()   # handler Telegram jalan paralel (telegram_dispatch)
+_storage: Optional[Storage] = None
 
 
 # ================== UTIL & STORAGE ==================
@@ -56,44 +72,108 @@ def is_admin(chat_id: int) -> bool:
     return TELEGRAM_ADMIN_ID and str(chat_id) == str(TELEGRAM_ADMIN_ID)
 
 
+def storage() -> Storage:
+    """Buka DB sekali per proses (lazy: worker shard tidak pernah membukanya)."""
+    global _storage
+    if _storage is None:
+        _storage = Storage(BOT_DB_FILE)
+        _storage.migrate_json(SUBSCRIBERS_FILE, VIP_FILE, STATE_FILE)
+        if PERSIST_FLUSH_SECONDS > 0:
+            _storage.start_flusher(PERSIST_FLUSH_SECONDS, PERSIST_MAX_DELAY_SECONDS)
+    return _storage
+
+
+def flush_storage():
+    """Flush perubahan pending sekarang (sebelum exec/exit; atexit juga flush)."""
+    if _storage is not None:
+        _storage.stop()
+
+
+def _persist(what: str, method: str, *args) -> bool:
+    """
+    Panggil storage().<method>(*args): hanya mencatat perubahan (write-behind),
+    ditulis thread flusher. Error DB dicetak, tidak menghentikan bot.
+    """
+    try:
+        getattr(storage(), method)(*args)
+        return True
+    except Exception as e:
+        print(f"Gagal simpan {what}:", e)
+        return False
+
+
 def load_subscribers() -> Set[int]:
-    if not os.path.exists(SUBSCRIBERS_FILE):
-        return set()
     try:
-        with open(SUBSCRIBERS_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return set(int(x) for x in data)
+        return storage().load_subscribers()
     except Exception as e:
         print("Gagal load subscribers:", e)
         return set()
 
 
-def save_subscribers():
-    try:
-        with open(SUBSCRIBERS_FILE, "w", encoding="utf-8") as f:
-            json.dump(list(state.subscribers), f)
-    except Exception as e:
-        print("Gagal simpan subscribers:", e)
+def add_subscriber(chat_id: int):
+    state.subscribers.add(chat_id)
+    _persist("subscriber", "add_subscriber", chat_id)
+
+
+def remove_subscriber(chat_id: int):
+    state.subscribers.discard(chat_id)
+    _persist("subscriber", "remove_subscriber", chat_id)
 
 
 def load_vip_users() -> Dict[int, float]:
-    if not os.path.exists(VIP_FILE):
-        return {}
     try:
-        with open(VIP_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return {int(k): float(v) for k, v in data.items()}
+        return storage().load_vip_users()
     except Exception as e:
         print("Gagal load VIP:", e)
         return {}
 
 
-def save_vip_users():
+def set_vip(user_id: int, expires: float):
+    state.vip_users[user_id] = expires
+    _persist("VIP", "set_vip", user_id, expires)
+
+
+def remove_vip(user_id: int):
+    state.vip_users.pop(user_id, None)
+    _persist("VIP", "remove_vips", [user_id])
+
+
+def load_daily_counts(day: str) -> Dict[int, int]:
     try:
-        with open(VIP_FILE, "w", encoding="utf-8") as f:
-            json.dump({str(k): v for k, v in state.vip_users.items()}, f)
+        return storage().load_daily_counts(day)
     except Exception as e:
-        print("Gagal simpan VIP:", e)
+        print("Gagal load kuota harian:", e)
+        return {}
+
+
+def save_daily_counts(chat_ids: Iterable[int]):
+    """Simpan kuota harian chat_id yang berubah (satu transaksi)."""
+    rows = [(cid, state.daily_counts[cid]) for cid in chat_ids if cid in state.daily_counts]
+    if rows:
+        _persist("kuota harian", "save_daily_counts", state.daily_date, rows)
+
+
+def prune_daily_counts():
+    _persist("kuota harian", "prune_daily_counts", state.daily_date)
+
+
+def load_user_filters() -> FilterIndex:
+    index = FilterIndex()
+    try:
+        index.load((row[0], UserFilter.from_row(*row[1:])) for row in storage().load_user_filters())
+    except Exception as e:
+        print("Gagal load filter user:", e)
+    return index
+
+
+def set_user_filter(chat_id: int, f: UserFilter):
+    """Update index filter + DB; filter kosong = hapus (terima semua sinyal)."""
+    with _filter_lock:
+        state.filters.set(chat_id, f)
+    if f.is_empty():
+        _persist("filter user", "remove_user_filter", chat_id)
+    else:
+        _persist("filter user", "set_user_filter", f.to_row(chat_id))
 
 
 def is_vip(user_id: int) -> bool:
@@ -106,50 +186,83 @@ def is_vip(user_id: int) -> bool:
 
 
 def cleanup_expired_vip():
-    """Hapus VIP yang sudah kedaluwarsa dari memori + file."""
+    """Hapus VIP yang sudah kedaluwarsa dari memori + DB."""
     now = time.time()
     expired_ids = [uid for uid, exp in state.vip_users.items() if exp <= now]
     if not expired_ids:
         return
     for uid in expired_ids:
         del state.vip_users[uid]
-    save_vip_users()
+    _persist("VIP", "remove_vips", expired_ids)
     print("VIP expired dihapus otomatis:", expired_ids)
 
 
 def load_bot_state():
-    """Load scanning/min_tier/cooldown dari file (jika ada)."""
-    if not os.path.exists(STATE_FILE):
-        return
+    """Load scanning/min_tier/cooldown dari DB (jika ada) + cooldown per pair yang masih berlaku."""
     try:
-        with open(STATE_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = storage().load_settings()
         state.scanning = bool(data.get("scanning", False))
         state.min_tier = data.get("min_tier", state.min_tier)
         state.cooldown_seconds = int(data.get("cooldown_seconds", state.cooldown_seconds))
         state.min_volume_usdt = float(data.get("min_volume_usdt", state.min_volume_usdt))
         state.max_pairs = int(data.get("max_pairs", state.max_pairs))
 
+        since = time.time() - max(state.cooldown_seconds, 0)
+        for symbol, (ts, close_time) in storage().load_cooldowns(since).items():
+            state.last_signal_time[symbol] = ts
+            state.last_signal_close[symbol] = close_time
+
         print(
             f"Bot state loaded: scanning={state.scanning}, "
             f"min_tier={state.min_tier}, cooldown={state.cooldown_seconds}, "
-            f"min_volume_usdt={state.min_volume_usdt}, max_pairs={state.max_pairs}"
+            f"min_volume_usdt={state.min_volume_usdt}, max_pairs={state.max_pairs}, "
+            f"cooldown aktif={len(state.last_signal_time)} pair"
         )
     except Exception as e:
         print("Gagal load bot_state:", e)
 
 
+def reserve_signal(symbol: str, close_time: int = 0, now: Optional[float] = None) -> bool:
+    """
+    Atomik (lock): terima sinyal hanya kalau (symbol, close_time) belum pernah
+    diterima DAN cooldown simbol sudah lewat; cooldown langsung direservasi di sini
+    (bukan setelah broadcast) supaya dua pemicu duplikat tidak sama-sama lolos.
+    """
+    now = time.time() if now is None else now
+    with _signal_lock:
+        if close_time and state.last_signal_close.get(symbol, 0) >= close_time:
+            return False
+        last_ts = state.last_signal_time.get(symbol)
+        if state.cooldown_seconds > 0 and last_ts and now - last_ts < state.cooldown_seconds:
+            return False
+        state.last_signal_time[symbol] = now
+        if close_time:
+            state.last_signal_close[symbol] = close_time
+        _persist("cooldown", "set_cooldown", symbol, now, close_time)
+        return True
+
+
+def release_signal(symbol: str, reserved_at: float):
+    """Batalkan reservasi cooldown kalau sinyal akhirnya tidak terkirim (mis. basi)."""
+    with _signal_lock:
+        if state.last_signal_time.get(symbol) == reserved_at:
+            del state.last_signal_time[symbol]
+            _persist("cooldown", "remove_cooldown", symbol, reserved_at)
+
+
+def clear_cooldowns():
+    """Hapus semua cooldown pair (memori + DB), mis. /stopscan & soft restart."""
+    with _signal_lock:
+        state.last_signal_time.clear()
+        _persist("cooldown", "clear_cooldowns")
+
+
 def save_bot_state():
-    """Simpan scanning/min_tier/cooldown ke file."""
-    try:
-        data = {
-            "scanning": state.scanning,
-            "min_tier": state.min_tier,
-            "cooldown_seconds": state.cooldown_seconds,
-            "min_volume_usdt": state.min_volume_usdt,
-            "max_pairs": state.max_pairs,
-        }
-        with open(STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f)
-    except Exception as e:
-        print("Gagal simpan bot_state:", e)
+    """Simpan scanning/min_tier/cooldown ke DB."""
+    _persist("bot_state", "save_settings", {
+        "scanning": state.scanning,
+        "min_tier": state.min_tier,
+        "cooldown_seconds": state.cooldown_seconds,
+        "min_volume_usdt": state.min_volume_usdt,
+        "max_pairs": state.max_pairs,
+    })
@@ -0,0 +1,454 @@
+# core/cluster.py
+# Koordinasi multi-node: beberapa node scanner berbagi pair lewat backend bersama.
+#
+# - Pair dipetakan ke SLOT (crc32(symbol) % n_slots). Node meng-klaim slot dengan
+#   lease (key ber-TTL) dan memperpanjangnya tiap heartbeat. Node mati → lease
+#   kedaluwarsa → slot diambil node lain pada heartbeat berikutnya.
+# - Jumlah slot per node = ceil(n_slots / node_hidup); kelebihan dilepas supaya
+#   node baru kebagian.
+# - Sinyal: dedup per (symbol, close_time) + cooldown cluster-wide, keduanya
+#   SET NX dengan TTL → hanya satu node yang lolos per sinyal. Sinyal yang batal
+#   dikirim (basi) dilepas lagi (release_signal), cooldown tidak ikut terpasang.
+# - Satu node jadi leader (lease "leader"): jalankan command Telegram, pegang
+#   subscriber/VIP, publish config scan, dan kirim semua sinyal (node lain
+#   push teks sinyal ke antrian backend).
+#
+# Backend (cukup operasi KV dasar, semuanya atomik per perintah):
+#   SqliteBackend  — file SQLite lokal (satu mesin / testing)
+#   RedisBackend   — protokol RESP (Redis, atau tools/fake_redis.py)
+#
+# Renew lease = GET lalu PEXPIRE (bukan satu operasi atomik): di celah itu
+# slot bisa sempat dipegang dua node sampai heartbeat berikutnya. Aman karena
+# dedup/cooldown sinyal tetap atomik.
+
+import json
+import math
+import os
+import socket
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Set
+from urllib.parse import urlparse
+
+PREFIX = "smc:"
+
+
+# ================== BACKEND ==================
+
+class ClusterBackend:
+    """Operasi minimal yang dipakai Cluster. ttl dalam milidetik."""
+
+    def set_nx(self, key: str, value: str, ttl_ms: int) -> bool:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, ttl_ms: Optional[int] = None):
+        raise NotImplementedError
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def pexpire(self, key: str, ttl_ms: int) -> bool:
+        raise NotImplementedError
+
+    def delete(self, *keys: str) -> int:
+        raise NotImplementedError
+
+    def keys(self, prefix: str) -> List[str]:
+        raise NotImplementedError
+
+    def rpush(self, key: str, value: str):
+        raise NotImplementedError
+
+    def lpop(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SqliteBackend(ClusterBackend):
+    """File SQLite bersama (WAL). Tiap operasi = satu transaksi IMMEDIATE."""
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS kv (k TEXT PRIMARY KEY, v TEXT, exp REAL)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS q (id INTEGER PRIMARY KEY AUTOINCREMENT, k TEXT, v TEXT)"
+        )
+
+    def _tx(self, fn):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                out = fn(self._db, time.time())
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return out
+
+    @staticmethod
+    def _exp(now: float, ttl_ms: Optional[int]):
+        return None if ttl_ms is None else now + ttl_ms / 1000.0
+
+    def set_nx(self, key, value, ttl_ms):
+        def fn(db, now):
+            db.execute("DELETE FROM kv WHERE k = ? AND exp IS NOT NULL AND exp <= ?", (key, now))
+            cur = db.execute("INSERT OR IGNORE INTO kv (k, v, exp) VALUES (?, ?, ?)",
+                             (key, value, self._exp(now, ttl_ms)))
+            return cur.rowcount == 1
+        return self._tx(fn)
+
+    def set(self, key, value, ttl_ms=None):
+        self._tx(lambda db, now: db.execute(
+            "INSERT OR REPLACE INTO kv (k, v, exp) VALUES (?, ?, ?)", (key, value, self._exp(now, ttl_ms))
+        ))
+
+    def get(self, key):
+        def fn(db, now):
+            row = db.execute(
+                "SELECT v FROM kv WHERE k = ? AND (exp IS NULL OR exp > ?)", (key, now)
+            ).fetchone()
+            return row[0] if row else None
+        return self._tx(fn)
+
+    def pexpire(self, key, ttl_ms):
+        def fn(db, now):
+            cur = db.execute(
+                "UPDATE kv SET exp = ? WHERE k = ? AND (exp IS NULL OR exp > ?)",
+                (now + ttl_ms / 1000.0, key, now),
+            )
+            return cur.rowcount == 1
+        return self._tx(fn)
+
+    def delete(self, *keys):
+        if not keys:
+            return 0
+        marks = ",".join("?" * len(keys))
+        return self._tx(lambda db, now: db.execute(f"DELETE FROM kv WHERE k IN ({marks})", keys).rowcount)
+
+    def keys(self, prefix):
+        def fn(db, now):
+            rows = db.execute(
+                "SELECT k FROM kv WHERE k >= ? AND k < ? AND (exp IS NULL OR exp > ?)",
+                (prefix, prefix + "\uffff", now),
+            ).fetchall()
+            return [r[0] for r in rows]
+        return self._tx(fn)
+
+    def rpush(self, key, value):
+        self._tx(lambda db, now: db.execute("INSERT INTO q (k, v) VALUES (?, ?)", (key, value)))
+
+    def lpop(self, key):
+        def fn(db, now):
+            row = db.execute("SELECT id, v FROM q WHERE k = ? ORDER BY id LIMIT 1", (key,)).fetchone()
+            if row is None:
+                return None
+            db.execute("DELETE FROM q WHERE id = ?", (row[0],))
+            return row[1]
+        return self._tx(fn)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class RedisBackend(ClusterBackend):
+    """Client RESP2 minimal (tanpa dependency). Cukup untuk Redis atau stand-in lokal."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, db: int = 0,
+                 password: Optional[str] = None, timeout: float = 5.0):
+        self.addr = (host, port)
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sock = None
+        self._file = None
+
+    def _connect(self):
+        self._sock = socket.create_connection(self.addr, timeout=self.timeout)
+        self._file = self._sock.makefile("rb")
+        if self.password:
+            self._call("AUTH", self.password)
+        if self.db:
+            self._call("SELECT", str(self.db))
+
+    def _read(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Koneksi backend Redis tertutup")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RuntimeError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            n = int(rest)
+            if n < 0:
+                return None
+            data = self._file.read(n + 2)
+            return data[:-2].decode()
+        if kind == b"*":
+            n = int(rest)
+            return None if n < 0 else [self._read() for _ in range(n)]
+        raise RuntimeError(f"Balasan RESP tidak dikenal: {line!r}")
+
+    def _call(self, *args):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for a in args:
+            b = a if isinstance(a, bytes) else str(a).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(b), b))
+        self._sock.sendall(b"".join(parts))
+        return self._read()
+
+    def call(self, *args):
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._call(*args)
+                except (OSError, ConnectionError):
+                    self._reset()
+                    if attempt:
+                        raise
+
+    def _reset(self):
+        try:
+            if self._sock is not None:
+                self._sock.close()
+        except OSError:
+            pass
+        self._sock = self._file = None
+
+    def set_nx(self, key, value, ttl_ms):
+        return self.call("SET", key, value, "NX", "PX", int(ttl_ms)) == "OK"
+
+    def set(self, key, value, ttl_ms=None):
+        if ttl_ms is None:
+            self.call("SET", key, value)
+        else:
+            self.call("SET", key, value, "PX", int(ttl_ms))
+
+    def get(self, key):
+        return self.call("GET", key)
+
+    def pexpire(self, key, ttl_ms):
+        return self.call("PEXPIRE", key, int(ttl_ms)) == 1
+
+    def delete(self, *keys):
+        return self.call("DEL", *keys) if keys else 0
+
+    def keys(self, prefix):
+        return self.call("KEYS", prefix + "*") or []
+
+    def rpush(self, key, value):
+        self.call("RPUSH", key, value)
+
+    def lpop(self, key):
+        return self.call("LPOP", key)
+
+    def close(self):
+        with self._lock:
+            self._reset()
+
+
+def backend_from_url(url: str) -> ClusterBackend:
+    """
+    sqlite:///data/cluster.db (relatif) | sqlite:////abs/cluster.db (absolut)
+    redis://[:pass@]host:port/db
+    """
+    u = urlparse(url)
+    if u.scheme == "sqlite":
+        return SqliteBackend(u.netloc + u.path[1:] if not u.netloc else u.netloc + u.path)
+    if u.scheme == "redis":
+        db = int(u.path.lstrip("/") or 0)
+        return RedisBackend(u.hostname or "127.0.0.1", u.port or 6379, db, u.password)
+    raise ValueError(f"Backend cluster tidak dikenal: {url}")
+
+
+# ================== CLUSTER ==================
+
+def slot_of(symbol: str, n_slots: int) -> int:
+    """Slot stabil lintas proses/mesin (hash() Python di-random per proses)."""
+    return zlib.crc32(symbol.upper().encode()) % n_slots
+
+
+class Cluster:
+    def __init__(self, backend: ClusterBackend, node_id: Optional[str] = None,
+                 n_slots: int = 64, lease_ttl: float = 15.0):
+        self.backend = backend
+        self.node_id = node_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.n_slots = n_slots
+        self.lease_ttl_ms = int(lease_ttl * 1000)
+        self.owned: Set[int] = set()
+        self.is_leader = False
+        self.live_nodes: List[str] = []
+        self.ownership_changed = False
+
+    # ---------- key ----------
+
+    @staticmethod
+    def _k(*parts) -> str:
+        return PREFIX + ":".join(str(p) for p in parts)
+
+    # ---------- heartbeat & lease ----------
+
+    def heartbeat(self) -> Set[int]:
+        """Perpanjang lease, lepas kelebihan, klaim slot kosong. Return slot milik node ini."""
+        b = self.backend
+        before = set(self.owned)
+        b.set(self._k("node", self.node_id), str(time.time()), self.lease_ttl_ms)
+        prefix = self._k("node", "")
+        self.live_nodes = sorted(k[len(prefix):] for k in b.keys(prefix))
+        fair = math.ceil(self.n_slots / max(1, len(self.live_nodes)))
+
+        for slot in sorted(self.owned):
+            key = self._k("lease", slot)
+            if b.get(key) == self.node_id and b.pexpire(key, self.lease_ttl_ms):
+                continue
+            self.owned.discard(slot)
+
+        while len(self.owned) > fair:
+            slot = max(self.owned)
+            self.owned.discard(slot)
+            key = self._k("lease", slot)
+            if b.get(key) == self.node_id:
+                b.delete(key)
+
+        if len(self.owned) < fair:
+            start = zlib.crc32(self.node_id.encode()) % self.n_slots
+            for n in range(self.n_slots):
+                if len(self.owned) >= fair:
+                    break
+                slot = (start + n) % self.n_slots
+                if slot not in self.owned and b.set_nx(self._k("lease", slot), self.node_id, self.lease_ttl_ms):
+                    self.owned.add(slot)
+
+        leader_key = self._k("leader")
+        if b.set_nx(leader_key, self.node_id, self.lease_ttl_ms):
+            self.is_leader = True
+        else:
+            self.is_leader = b.get(leader_key) == self.node_id and b.pexpire(leader_key, self.lease_ttl_ms)
+
+        if self.owned != before:
+            self.ownership_changed = True
+        return set(self.owned)
+
+    def leave(self):
+        """Lepas semua lease (shutdown bersih) supaya node lain langsung ambil alih."""
+        b = self.backend
+        keys = [self._k("lease", s) for s in self.owned]
+        if self.is_leader:
+            keys.append(self._k("leader"))
+        mine = [k for k in keys if b.get(k) == self.node_id]
+        b.delete(self._k("node", self.node_id), *mine)
+        self.owned.clear()
+        self.is_leader = False
+
+    def owns(self, symbol: str) -> bool:
+        return slot_of(symbol, self.n_slots) in self.owned
+
+    def my_symbols(self, symbols: Iterable[str]) -> List[str]:
+        return [s for s in symbols if self.owns(s)]
+
+    # ---------- sinyal ----------
+
+    def accept_signal(self, symbol: str, close_time: int, cooldown_seconds: int) -> bool:
+        """
+        True hanya untuk SATU node per (symbol, close_time), dan hanya kalau
+        cooldown cluster-wide simbol ini sudah lewat (reservasi atomik).
+        """
+        b = self.backend
+        sym = symbol.upper()
+        dedup_ttl = max(cooldown_seconds, 600) * 1000
+        sig_key = self._k("sig", sym, close_time)
+        if not b.set_nx(sig_key, self.node_id, dedup_ttl):
+            return False
+        if cooldown_seconds > 0:
+            # value memuat pemilik + close supaya release_signal hanya menghapus milik sendiri
+            owner = f"{self.node_id} {int(close_time)} {time.time()}"
+            if not b.set_nx(self._k("cd", sym), owner, cooldown_seconds * 1000):
+                b.delete(sig_key)   # close ini tidak diambil siapa pun
+                return False
+        return True
+
+    def release_signal(self, symbol: str, close_time: int):
+        """
+        Batalkan accept_signal node ini (sinyal tidak jadi dikirim, mis. basi):
+        hapus dedup close & cooldown cluster yang dipasang node ini untuk close tsb.
+        """
+        b = self.backend
+        sym = symbol.upper()
+        sig_key = self._k("sig", sym, close_time)
+        if b.get(sig_key) == self.node_id:
+            b.delete(sig_key)
+        cd_key = self._k("cd", sym)
+        cd = b.get(cd_key)
+        if cd is not None and cd.startswith(f"{self.node_id} {int(close_time)} "):
+            b.delete(cd_key)
+
+    def clear_cooldowns(self):
+        keys = self.backend.keys(self._k("cd", ""))
+        if keys:
+            self.backend.delete(*keys)
+
+    def push_signal(self, cand: Dict):
+        """
+        Titip kandidat sinyal ke leader (dict JSON: symbol, close_time, offset, mask,
+        levels, score, tier, strategy, side) — leader yang meranking top-K & mengirim.
+        """
+        self.backend.rpush(self._k("outbox"), json.dumps(cand))
+
+    def pop_signals(self, limit: int = 100) -> List[Dict]:
+        out = []
+        for _ in range(limit):
+            raw = self.backend.lpop(self._k("outbox"))
+            if raw is None:
+                break
+            out.append(json.loads(raw))
+        return out
+
+    # ---------- hasil sinyal (core/outcome_tracker.py) ----------
+
+    def push_track(self, node: str, cand: Dict):
+        """Leader → node pemilik simbol: mulai lacak hasil sinyal yang sudah terkirim."""
+        self.backend.rpush(self._k(f"track:{node}"), json.dumps(cand))
+
+    def pop_tracks(self, limit: int = 100) -> List[Dict]:
+        return self._pop_json(self._k(f"track:{self.node_id}"), limit)
+
+    def push_outcome(self, ev: Dict):
+        """Node → leader: event hasil (FILL/TP/SL/...) untuk jurnal & reply."""
+        self.backend.rpush(self._k("outcomes"), json.dumps(ev))
+
+    def pop_outcomes(self, limit: int = 100) -> List[Dict]:
+        return self._pop_json(self._k("outcomes"), limit)
+
+    def _pop_json(self, key: str, limit: int) -> List[Dict]:
+        out = []
+        for _ in range(limit):
+            raw = self.backend.lpop(key)
+            if raw is None:
+                break
+            out.append(json.loads(raw))
+        return out
+
+    # ---------- config scan (leader → node lain) ----------
+
+    def publish_config(self, cfg: Dict):
+        self.backend.set(self._k("config"), json.dumps(cfg, sort_keys=True))
+
+    def read_config(self) -> Optional[Dict]:
+        raw = self.backend.get(self._k("config"))
+        return json.loads(raw) if raw else None
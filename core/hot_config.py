@@ -0,0 +1,216 @@
+# core/hot_config.py
+# Hot reload config tanpa hard restart & tanpa reconnect WS:
+#   - HOT_RELOAD_ENV_FILE (.env): key di HOT_KEYS diterapkan live, dan hanya kalau
+#     nilainya di file BERUBAH sejak dibaca terakhir — setting yang diubah admin lewat
+#     command (tersimpan di DB) tidak ditimpa nilai .env yang tidak disentuh.
+#     Key lain yang berubah hanya dicetak "butuh restart".
+#   - STRATEGY_FILE (JSON override SmcParams / ScoreParams): Strategy baru divalidasi,
+#     LUT scoring-nya dibangun dulu, baru referensi state.strategy diganti (atomik).
+#
+# Tiap subsistem hanya menerima diff yang menyangkut dirinya:
+#   min_volume_usdt / max_pairs → force_pairs_refresh → scan loop subscribe /
+#       unsubscribe selisih pair di koneksi WS yang sama (binance_pairs.resubscribe)
+#   min_tier / cooldown_seconds → state (worker shard / node cluster lewat propagasi config)
+#   strategy → state.strategy (worker shard: pesan config, node cluster: config leader)
+# Perubahan disimpan ke DB (save_bot_state) sama seperti command admin.
+
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from dotenv import dotenv_values
+
+from config import HOT_RELOAD_SECONDS, HOT_RELOAD_ENV_FILE, STRATEGY_FILE
+from core.bot_state import state, save_bot_state
+from core.user_filters import parse_tier
+from smc.smc_params import SMC_FIELDS, Strategy, strategy_from_overrides
+from smc.smc_scoring import warm_lut
+
+
+def _volume(v: str) -> float:
+    x = float(v)
+    if x < 0:
+        raise ValueError(v)
+    return x
+
+
+def _pairs(v: str) -> int:
+    x = int(v)
+    if x < 1:
+        raise ValueError(v)
+    return x
+
+
+def _tier(v: str) -> str:
+    t = parse_tier(v)
+    if t is None:
+        raise ValueError(v)
+    return t
+
+
+def _cooldown(v: str) -> int:
+    x = int(v)
+    if x < 0:
+        raise ValueError(v)
+    return x
+
+
+# key .env → (atribut state, parser)
+HOT_KEYS = {
+    "MIN_VOLUME_USDT": ("min_volume_usdt", _volume),
+    "MAX_USDT_PAIRS": ("max_pairs", _pairs),
+    "MIN_TIER_TO_SEND": ("min_tier", _tier),
+    "SIGNAL_COOLDOWN_SECONDS": ("cooldown_seconds", _cooldown),
+}
+UNIVERSE_ATTRS = {"min_volume_usdt", "max_pairs"}
+
+
+def _stamp(path: str):
+    """(mtime_ns, size) — None kalau file tidak ada."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _param(s: Strategy, name: str):
+    return getattr(s.smc if name in SMC_FIELDS else s.score, name)
+
+
+class HotConfig:
+    def __init__(self, env_file: str = HOT_RELOAD_ENV_FILE, strategy_file: str = STRATEGY_FILE,
+                 notify: Optional[Callable[[str], None]] = None):
+        self.env_file = env_file
+        self.strategy_file = strategy_file
+        self.notify = notify
+        # baseline = isi .env yang dibaca config.py saat start
+        self._env: Dict[str, Optional[str]] = self._read_env()
+        self._stamps = {env_file: _stamp(env_file), strategy_file: "belum dibaca"}
+        self.reloads = 0
+
+    def _read_env(self) -> Dict[str, Optional[str]]:
+        if not os.path.exists(self.env_file):
+            return {}
+        return dict(dotenv_values(self.env_file))
+
+    # ---------- reload ----------
+
+    def poll(self, notify: bool = True) -> List[str]:
+        """Cek kedua file; terapkan yang berubah. Return daftar perubahan."""
+        changes: List[str] = []
+        for path, reload in ((self.env_file, self._reload_env), (self.strategy_file, self._reload_strategy)):
+            stamp = _stamp(path)
+            if stamp != self._stamps.get(path):
+                self._stamps[path] = stamp
+                changes += reload()
+        if changes:
+            self.reloads += 1
+            print("[hot-config] Diterapkan live: " + "; ".join(changes))
+            if notify and self.notify is not None:
+                # key .env & nama field penuh "_" → dibungkus backtick (parse_mode Markdown)
+                self.notify("♻️ *Config reload*\n\n" + "\n".join(f"• {c}" for c in changes))
+        return changes
+
+    def _reload_env(self) -> List[str]:
+        old, new = self._env, self._read_env()
+        self._env = dict(new)
+        out, restart = [], []
+        for key in sorted(set(old) | set(new)):
+            if old.get(key) == new.get(key):
+                continue
+            spec = HOT_KEYS.get(key)
+            if spec is None:
+                restart.append(key)
+                continue
+            if key not in new:
+                continue   # dihapus dari file → nilai live dibiarkan
+            attr, parse = spec
+            try:
+                value = parse(new[key] or "")
+            except ValueError:
+                print(f"[hot-config] {key}={new[key]!r} tidak valid, diabaikan.")
+                self._env[key] = old.get(key)   # perbaikan berikutnya tetap terhitung berubah
+                continue
+            before = getattr(state, attr)
+            if value == before:
+                continue
+            setattr(state, attr, value)
+            out.append(f"`{key}`: {before} → {value}")
+            if attr in UNIVERSE_ATTRS:
+                # scan loop: subscribe / unsubscribe selisih pair, tanpa reconnect
+                state.force_pairs_refresh = True
+        if restart:
+            print(f"[hot-config] Berubah di {self.env_file} tapi butuh restart: {', '.join(restart)}")
+        if out:
+            save_bot_state()
+        return out
+
+    def _reload_strategy(self) -> List[str]:
+        cur = state.strategy
+        overrides = {}
+        if os.path.exists(self.strategy_file):
+            try:
+                with open(self.strategy_file, "r", encoding="utf-8") as f:
+                    overrides = json.load(f)
+                if not isinstance(overrides, dict):
+                    raise ValueError("isi harus object JSON {nama: nilai}")
+                new = strategy_from_overrides(overrides, cur.version + 1)
+            except (OSError, ValueError, TypeError) as e:
+                print(f"[hot-config] {self.strategy_file} ditolak, strategi tetap v{cur.version}: {e}")
+                return []
+        else:
+            new = strategy_from_overrides({}, cur.version + 1)
+        if (new.smc, new.score) == (cur.smc, cur.score):
+            return []
+
+        warm_lut(new.score)    # LUT bobot baru siap sebelum close berikutnya memakainya
+        state.strategy = new   # satu assignment: analisa berikutnya pakai versi baru utuh
+        names = sorted(set(cur.overrides()) | set(new.overrides()))
+        diff = [f"`{n}` {_param(cur, n)}→{_param(new, n)}" for n in names if _param(cur, n) != _param(new, n)]
+        return [f"Strategi v{new.version}: " + ", ".join(diff)]
+
+    # ---------- loop ----------
+
+    def run(self, interval: float, is_active: Optional[Callable[[], bool]] = None):
+        """is_active (opsional): mode cluster — hanya leader yang membaca file."""
+        while state.running:
+            time.sleep(interval)
+            if is_active is not None and not is_active():
+                continue
+            try:
+                self.poll()
+            except Exception as e:
+                print("Error hot reload config:", e)
+
+    def summary(self) -> str:
+        s = state.strategy
+        out = f"v{s.version}, {len(s.overrides())} override"
+        if HOT_RELOAD_SECONDS > 0:
+            out += f", reload {self.reloads}×"
+        else:
+            out += ", hot reload OFF"
+        return out
+
+
+hot_config: Optional[HotConfig] = None
+
+
+def start_hot_reload(notify: Optional[Callable[[str], None]] = None,
+                     is_active: Optional[Callable[[], bool]] = None) -> HotConfig:
+    """Baca STRATEGY_FILE sekali (sebelum scan), lalu watcher di thread daemon (HOT_RELOAD_SECONDS > 0)."""
+    global hot_config
+    hot_config = HotConfig(notify=notify)
+    hot_config.poll(notify=False)
+    if HOT_RELOAD_SECONDS > 0:
+        threading.Thread(target=hot_config.run, args=(HOT_RELOAD_SECONDS, is_active),
+                         name="hot-config", daemon=True).start()
+        print(f"Hot reload aktif: {hot_config.env_file}, {hot_config.strategy_file} "
+              f"(cek tiap {HOT_RELOAD_SECONDS:g}s)")
+    return hot_config
+
+
+def summary() -> str:
+    return hot_config.summary() if hot_config is not None else f"v{state.strategy.version}"
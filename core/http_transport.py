@@ -0,0 +1,312 @@
+# core/http_transport.py
+# Satu transport HTTP untuk semua call REST (Binance klines / exchangeInfo /
+# ticker, Telegram sendMessage / getUpdates / answerCallbackQuery):
+#   - requests.Session bersama: pool koneksi per host + keep-alive
+#     (tidak ada TCP+TLS handshake baru per call)
+#   - retry dengan backoff eksponensial + jitter penuh; GET diulang untuk error
+#     koneksi / timeout / 5xx, POST hanya kalau koneksi belum terbentuk
+#     (sendMessage tidak boleh terkirim dua kali)
+#   - circuit breaker per host: HTTP_BREAKER_FAILURES kegagalan beruntun → host
+#     "open" selama HTTP_BREAKER_COOLDOWN_SECONDS, call langsung ditolak
+#     (CircuitOpen) tanpa menunggu timeout; lalu satu call percobaan (half-open)
+#   - weight Binance: header X-MBX-USED-WEIGHT-1M dicatat per host; request ber-
+#     weight ditolak (WeightBudgetExceeded) kalau weight menit ini + weight-nya
+#     melewati BINANCE_WEIGHT_BUDGET. 429/418 → host open sampai Retry-After
+#     (kecuali hold_host=False: 429 Telegram berlaku per chat, bukan per host).
+#   - metrik per endpoint (label, bukan URL — URL Telegram memuat token):
+#     jumlah, error, latency avg/p50/p95/max → /http & /status
+# Satu instance per proses (module-level `transport`); worker shard punya sendiri,
+# header weight tetap mencerminkan weight IP bersama.
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    HTTP_POOL_SIZE,
+    HTTP_RETRIES,
+    HTTP_BACKOFF_SECONDS,
+    HTTP_BREAKER_FAILURES,
+    HTTP_BREAKER_COOLDOWN_SECONDS,
+    BINANCE_WEIGHT_BUDGET,
+)
+
+WEIGHT_HEADER = "X-MBX-USED-WEIGHT-1M"
+BACKOFF_CAP_SECONDS = 8.0
+LATENCY_SAMPLES = 512
+
+
+def klines_weight(limit: int) -> int:
+    """Weight /fapi/v1/klines menurut limit (tabel dokumentasi Binance Futures)."""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+class CircuitOpen(requests.RequestException):
+    """Host sedang dianggap gagal (breaker open) → call tidak dikirim."""
+
+
+class WeightBudgetExceeded(requests.RequestException):
+    """Weight Binance menit ini sudah di batas budget → call tidak dikirim."""
+
+
+class Breaker:
+    """closed → (N gagal beruntun) → open (cooldown) → half-open (1 percobaan) → closed / open."""
+
+    def __init__(self, failures: int, cooldown: float):
+        self.failures = max(1, failures)
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.fail_count = 0
+        self.open_until = 0.0
+        self.opened = 0
+        self._probe = False
+
+    def allow(self, now: float) -> bool:
+        if self.state == "closed":
+            return True
+        if now < self.open_until:
+            return False
+        # half-open: satu call percobaan sekaligus
+        if self._probe:
+            return False
+        self.state = "half-open"
+        self._probe = True
+        return True
+
+    def success(self):
+        self.state = "closed"
+        self.fail_count = 0
+        self._probe = False
+
+    def failure(self, now: float, hold: float = 0.0):
+        """hold > 0: buka paksa selama hold detik (429/418 Retry-After)."""
+        self.fail_count += 1
+        self._probe = False
+        if hold > 0 or self.state == "half-open" or self.fail_count >= self.failures:
+            if self.state != "open":
+                self.opened += 1
+            self.state = "open"
+            self.open_until = now + max(hold, self.cooldown)
+
+
+class _Endpoint:
+    __slots__ = ("n", "errors", "total", "max", "samples", "last_error")
+
+    def __init__(self):
+        self.n = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.last_error = ""
+
+
+class Transport:
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE, retries: int = HTTP_RETRIES,
+                 backoff: float = HTTP_BACKOFF_SECONDS, breaker_failures: int = HTTP_BREAKER_FAILURES,
+                 breaker_cooldown: float = HTTP_BREAKER_COOLDOWN_SECONDS,
+                 weight_budget: int = BINANCE_WEIGHT_BUDGET):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self.weight_budget = weight_budget
+        self._lock = threading.Lock()
+        self.breakers: Dict[str, Breaker] = {}
+        self.weight: Dict[str, tuple] = {}   # host → (used weight, menit)
+        self.endpoints: Dict[str, _Endpoint] = {}
+        self.stats = {"requests": 0, "retries": 0, "shed": 0}
+
+    # ---------- API ----------
+
+    def get(self, url: str, endpoint: str, **kw) -> requests.Response:
+        return self.request("GET", url, endpoint, **kw)
+
+    def post(self, url: str, endpoint: str, **kw) -> requests.Response:
+        return self.request("POST", url, endpoint, **kw)
+
+    def request(self, method: str, url: str, endpoint: str, *, weight: int = 0,
+                timeout: float = 10, retries: Optional[int] = None, hold_host: bool = True,
+                **kw) -> requests.Response:
+        """
+        Kirim request lewat session bersama. weight = weight Binance request ini
+        (0 = tidak dicek budget). hold_host=False: 429/418 hanya dikembalikan,
+        breaker host tidak dibuka (limit per chat Telegram). Raise CircuitOpen /
+        WeightBudgetExceeded / exception requests; response 4xx/5xx dikembalikan apa adanya.
+        """
+        host = urlsplit(url).netloc
+        retries = self.retries if retries is None else retries
+        attempt = 0
+        while True:
+            self._admit(host, endpoint, weight)
+            t0 = time.perf_counter()
+            try:
+                r = self.session.request(method, url, timeout=timeout, **kw)
+            except requests.RequestException as e:
+                self._record(endpoint, time.perf_counter() - t0, type(e).__name__)
+                self._failure(host)
+                safe = method == "GET" or isinstance(e, requests.ConnectTimeout)
+                if safe and attempt < retries:
+                    attempt += 1
+                    self._sleep_backoff(attempt)
+                    continue
+                raise
+            dt = time.perf_counter() - t0
+            self._track_weight(host, r)
+
+            if r.status_code in (429, 418):
+                hold = _retry_after(r)
+                self._record(endpoint, dt, f"HTTP {r.status_code}")
+                if not hold_host:
+                    print(f"[http] {endpoint}: HTTP {r.status_code}, retry after {hold:.0f}s")
+                    return r
+                self._failure(host, hold)
+                print(f"[http] {endpoint}: HTTP {r.status_code}, host {host} ditahan {hold:.0f}s")
+                return r
+            if r.status_code >= 500:
+                self._record(endpoint, dt, f"HTTP {r.status_code}")
+                self._failure(host)
+                if method == "GET" and attempt < retries:
+                    attempt += 1
+                    self._sleep_backoff(attempt)
+                    continue
+                return r
+
+            # 2xx-4xx: upstream sehat (4xx = salah request / user blokir bot)
+            self._record(endpoint, dt, "" if r.ok else f"HTTP {r.status_code}")
+            self._success(host)
+            return r
+
+    def used_weight(self, host: str) -> int:
+        used, minute = self.weight.get(host, (0, 0))
+        return used if minute == int(time.time() // 60) else 0
+
+    # ---------- internal ----------
+
+    def _breaker(self, host: str) -> Breaker:
+        b = self.breakers.get(host)
+        if b is None:
+            b = self.breakers.setdefault(host, Breaker(self.breaker_failures, self.breaker_cooldown))
+        return b
+
+    def _admit(self, host: str, endpoint: str, weight: int):
+        now = time.time()
+        with self._lock:
+            self.stats["requests"] += 1
+            # budget dicek sebelum breaker: allow() di half-open memakai jatah probe,
+            # probe yang ditolak budget tidak pernah melapor success/failure
+            used = self.used_weight(host) if weight and self.weight_budget else 0
+            if weight and self.weight_budget and used + weight > self.weight_budget:
+                self.stats["shed"] += 1
+                raise WeightBudgetExceeded(f"{endpoint}: weight {used}+{weight} > {self.weight_budget}")
+            if not self._breaker(host).allow(now):
+                self.stats["shed"] += 1
+                raise CircuitOpen(f"{endpoint}: circuit open ({host})")
+            if weight and self.weight_budget:
+                # estimasi lokal sampai header response berikutnya (call paralel)
+                self.weight[host] = (used + weight, int(now // 60))
+
+    def _success(self, host: str):
+        with self._lock:
+            self._breaker(host).success()
+
+    def _failure(self, host: str, hold: float = 0.0):
+        with self._lock:
+            b = self._breaker(host)
+            was = b.state
+            b.failure(time.time(), hold)
+            if b.state == "open" and was != "open":
+                print(f"[http] Circuit {host} OPEN ({b.fail_count} gagal), "
+                      f"call ditolak {b.open_until - time.time():.0f}s")
+
+    def _track_weight(self, host: str, r: requests.Response):
+        used = r.headers.get(WEIGHT_HEADER)
+        if used is None:
+            return
+        try:
+            self.weight[host] = (int(used), int(time.time() // 60))
+        except ValueError:
+            pass
+
+    def _record(self, endpoint: str, dt: float, error: str):
+        with self._lock:
+            e = self.endpoints.get(endpoint)
+            if e is None:
+                e = self.endpoints[endpoint] = _Endpoint()
+            e.n += 1
+            e.total += dt
+            e.max = max(e.max, dt)
+            e.samples.append(dt)
+            if error:
+                e.errors += 1
+                e.last_error = error
+
+    def _sleep_backoff(self, attempt: int):
+        with self._lock:
+            self.stats["retries"] += 1
+        # full jitter: acak 0..min(cap, base × 2^attempt)
+        time.sleep(random.uniform(0, min(BACKOFF_CAP_SECONDS, self.backoff * 2 ** attempt)))
+
+    # ---------- laporan ----------
+
+    def summary(self) -> str:
+        with self._lock:
+            n = sum(e.n for e in self.endpoints.values())
+            err = sum(e.errors for e in self.endpoints.values())
+            open_hosts = [h for h, b in self.breakers.items() if b.state != "closed"]
+        if not n:
+            return "belum ada"
+        out = f"{n} call, {err} error, {self.stats['retries']} retry, {self.stats['shed']} ditolak"
+        if open_hosts:
+            out += f", circuit open: {', '.join(open_hosts)}"
+        return out
+
+    def format_stats(self) -> str:
+        with self._lock:
+            rows = sorted(self.endpoints.items(), key=lambda kv: kv[1].total, reverse=True)
+            snap = [(name, e.n, e.errors, e.total, e.max, sorted(e.samples), e.last_error) for name, e in rows]
+            breakers = [(h, b.state, b.opened) for h, b in self.breakers.items()]
+        if not snap:
+            return "Belum ada call HTTP."
+        lines = ["🌐 *HTTP TRANSPORT*", "", "`endpoint             n   err  avg   p50   p95   max ms`"]
+        for name, n, errors, total, mx, s, last in snap:
+            p50 = s[len(s) // 2] if s else 0.0
+            p95 = s[min(len(s) - 1, int(len(s) * 0.95))] if s else 0.0
+            lines.append(f"`{name[:18]:<18} {n:>6} {errors:>4} {total / n * 1000:>5.0f} "
+                         f"{p50 * 1000:>5.0f} {p95 * 1000:>5.0f} {mx * 1000:>6.0f}`"
+                         + (f" ({last})" if errors else ""))
+        lines.append("")
+        for host, st, opened in breakers:
+            w = self.used_weight(host)
+            lines.append(f"{host}: circuit {st} (open {opened}×)" + (f", weight 1m {w}" if w else ""))
+        lines.append(f"retry {self.stats['retries']}, ditolak {self.stats['shed']}")
+        return "\n".join(lines)
+
+
+def _retry_after(r: requests.Response) -> float:
+    """Retry-After (Binance: header; Telegram: header / parameters.retry_after)."""
+    try:
+        if "Retry-After" in r.headers:
+            return float(r.headers["Retry-After"])
+        return float(r.json().get("parameters", {}).get("retry_after", 5))
+    except (ValueError, AttributeError):
+        return 5.0
+
+
+transport = Transport()
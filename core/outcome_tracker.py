@@ -0,0 +1,274 @@
+# core/outcome_tracker.py
+# Tracker hasil sinyal live dari frame kline WS yang sudah diterima bot
+# (k.h / k.l = high/low bar berjalan). Aturan sama dengan backtest/engine.py
+# simulate_levels:
+#   - entry limit harus terisi (low <= entry) dalam OUTCOME_ENTRY_BARS candle;
+#     batal (NOFILL) kalau harga lebih dulu tembus entry + 0.30 × risk
+#   - setelah terisi: first hit SL / TP1 / TP2 / TP3; SL & TP di update yang
+#     sama → SL dulu (konservatif); TP3 atau SL menutup sinyal
+#   - belum selesai sampai OUTCOME_HORIZON_BARS → EXPIRED (mark-to-market)
+#   - sinyal short (cand["side"], smc_strategies) = cermin: entry terisi saat
+#     high >= entry, batal di entry − 0.30 × risk, SL di atas, TP di bawah
+#
+# Index level harga per simbol: dua list terurut (bisect).
+#   up   : level yang kena saat harga naik (TP, batas runaway), key = harga
+#   down : level yang kena saat harga turun (entry, SL), key = -harga
+# Level yang tersentuh selalu prefix list → tiap frame cukup bisect O(log n)
+# per sisi; simbol tanpa sinyal terbuka = satu lookup dict.
+#
+# Tracker tidak melakukan I/O: event hasil dikumpulkan, diambil lewat drain().
+
+import heapq
+import itertools
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Tuple
+
+from config import OUTCOME_ENTRY_BARS, OUTCOME_HORIZON_BARS
+
+BAR_MS = 300_000
+TP_NAMES = ("TP1", "TP2", "TP3")
+
+
+class _Side:
+    """List level terurut per key; prefix key <= bound = level yang tersentuh."""
+    __slots__ = ("keys", "vals")
+
+    def __init__(self):
+        self.keys: List[float] = []
+        self.vals: List[Tuple[int, str]] = []
+
+    def add(self, key: float, val: Tuple[int, str]):
+        i = bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.vals.insert(i, val)
+
+    def pop_upto(self, bound: float) -> List[Tuple[int, str]]:
+        i = bisect_right(self.keys, bound)
+        if not i:
+            return []
+        out = self.vals[:i]
+        del self.keys[:i]
+        del self.vals[:i]
+        return out
+
+    def remove(self, key: float, val: Tuple[int, str]):
+        i = bisect_left(self.keys, key)
+        while i < len(self.keys) and self.keys[i] == key:
+            if self.vals[i] == val:
+                del self.keys[i]
+                del self.vals[i]
+                return
+            i += 1
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class _Signal:
+    __slots__ = ("id", "symbol", "close_time", "tier", "score", "entry", "sl", "tps", "risk",
+                 "phase", "levels", "short", "strategy")
+
+    def __init__(self, sid: int, cand: dict):
+        entry, sl, tp1, tp2, tp3, risk = cand["levels"][:6]
+        self.id = sid
+        self.symbol = cand["symbol"]
+        self.close_time = int(cand["close_time"])
+        self.tier = cand["tier"]
+        self.score = cand["score"]
+        self.entry, self.sl, self.tps = entry, sl, (tp1, tp2, tp3)
+        self.risk = risk or abs(entry - sl) or 1e-12
+        self.phase = "fill"      # fill → open → done
+        self.short = cand.get("side") == "short"
+        self.strategy = cand.get("strategy", "smc_long")
+        self.levels: List[Tuple[str, str, float]] = []   # (side, nama, key) yang masih aktif
+
+    @property
+    def adverse(self) -> str:
+        """Sisi buku untuk level rugi (entry limit, SL); TP & batas runaway di sisi lain."""
+        return "up" if self.short else "down"
+
+    @property
+    def favourable(self) -> str:
+        return "down" if self.short else "up"
+
+    @property
+    def nofill_price(self) -> float:
+        return self.entry - 0.30 * self.risk if self.short else self.entry + 0.30 * self.risk
+
+
+class OutcomeTracker:
+    def __init__(self, entry_bars: int = OUTCOME_ENTRY_BARS, horizon_bars: int = OUTCOME_HORIZON_BARS):
+        self.entry_bars = entry_bars
+        self.horizon_bars = horizon_bars
+        self._up: Dict[str, _Side] = {}
+        self._down: Dict[str, _Side] = {}
+        self._signals: Dict[int, _Signal] = {}
+        self._by_key: Dict[Tuple[str, int], int] = {}
+        self._deadlines: List[Tuple[int, int, str]] = []   # heap (ms, sid, phase)
+        self._last_price: Dict[str, float] = {}
+        self._seq = itertools.count()
+        self.events: List[dict] = []
+        self.stats = {"tracked": 0, "frames": 0, "hits": 0}
+
+    def __len__(self):
+        return len(self._signals)
+
+    # ---------- level ----------
+
+    def _add_level(self, sig: _Signal, side: str, name: str, price: float):
+        book = self._up if side == "up" else self._down
+        key = price if side == "up" else -price
+        book.setdefault(sig.symbol, _Side()).add(key, (sig.id, name))
+        sig.levels.append((side, name, key))
+
+    def _clear_levels(self, sig: _Signal):
+        for side, name, key in sig.levels:
+            book = self._up if side == "up" else self._down
+            s = book.get(sig.symbol)
+            if s is not None:
+                s.remove(key, (sig.id, name))
+                if not s:
+                    del book[sig.symbol]
+        sig.levels = []
+
+    def _arm_open(self, sig: _Signal):
+        sig.phase = "open"
+        self._add_level(sig, sig.adverse, "SL", sig.sl)
+        for name, tp in zip(TP_NAMES, sig.tps):
+            self._add_level(sig, sig.favourable, name, tp)
+        heapq.heappush(self._deadlines, (sig.close_time + self.horizon_bars * BAR_MS, sig.id, "open"))
+
+    # ---------- API ----------
+
+    def add(self, cand: dict) -> bool:
+        """Mulai lacak sinyal terkirim (format close_ranker.signal_candidate)."""
+        key = (cand["symbol"], int(cand["close_time"]))
+        if key in self._by_key:
+            return False
+        sig = _Signal(next(self._seq), cand)
+        self._signals[sig.id] = sig
+        self._by_key[key] = sig.id
+        self._add_level(sig, sig.adverse, "FILL", sig.entry)
+        self._add_level(sig, sig.favourable, "NOFILL", sig.nofill_price)
+        heapq.heappush(self._deadlines, (sig.close_time + self.entry_bars * BAR_MS, sig.id, "fill"))
+        self.stats["tracked"] += 1
+        return True
+
+    def on_kline(self, k: dict):
+        """Hook frame WS (feed_closes): semua frame kline, bukan hanya close."""
+        symbol = k.get("s", "")
+        if symbol not in self._up and symbol not in self._down:
+            return
+        self.update(symbol, int(k["t"]), float(k["h"]), float(k["l"]), float(k["c"]))
+
+    def update(self, symbol: str, open_time: int, high: float, low: float, close: float):
+        if symbol not in self._up and symbol not in self._down:
+            return
+        self.stats["frames"] += 1
+        self._last_price[symbol] = close
+        while True:
+            hits = self._pop(self._down, symbol, -low) + self._pop(self._up, symbol, high)
+            if not hits:
+                return
+            by_sig: Dict[int, List[str]] = {}
+            for sid, name in hits:
+                by_sig.setdefault(sid, []).append(name)
+            filled = False
+            for sid, names in by_sig.items():
+                sig = self._signals.get(sid)
+                if sig is None:
+                    continue
+                if open_time <= sig.close_time:
+                    # frame dari bar sinyal itu sendiri (terlambat) → level dipasang lagi
+                    for name in names:
+                        side, _, key = next(l for l in sig.levels if l[1] == name)
+                        (self._up if side == "up" else self._down).setdefault(symbol, _Side()).add(key, (sid, name))
+                    continue
+                for name in names:
+                    sig.levels = [l for l in sig.levels if l[1] != name]
+                filled |= self._on_hits(sig, names, open_time)
+            if not filled:
+                return
+            # entry baru terisi → SL/TP dicek dengan high/low yang sama
+
+    @staticmethod
+    def _pop(book: Dict[str, _Side], symbol: str, bound: float) -> List[Tuple[int, str]]:
+        side = book.get(symbol)
+        if side is None:
+            return []
+        hits = side.pop_upto(bound)
+        if not side:
+            del book[symbol]
+        return hits
+
+    def _on_hits(self, sig: _Signal, names: List[str], at: int) -> bool:
+        if sig.phase == "fill":
+            if "FILL" in names:
+                self._clear_levels(sig)
+                self._emit(sig, "FILL", sig.entry, at)
+                self._arm_open(sig)
+                return True
+            self._finish(sig, "NOFILL", sig.nofill_price, at)
+            return False
+        if "SL" in names:
+            self._finish(sig, "SL", sig.sl, at)
+            return False
+        for name, tp in zip(TP_NAMES, sig.tps):
+            if name in names:
+                if name == "TP3":
+                    self._finish(sig, name, tp, at)
+                    return False
+                self._emit(sig, name, tp, at)
+        return False
+
+    def expire(self, now_ms: int):
+        """Deadline fill (NOFILL) & horizon (EXPIRED, harga terakhir); panggil periodik."""
+        while self._deadlines and self._deadlines[0][0] <= now_ms:
+            _, sid, phase = heapq.heappop(self._deadlines)
+            sig = self._signals.get(sid)
+            if sig is None or sig.phase != phase:
+                continue
+            if phase == "fill":
+                self._finish(sig, "NOFILL", self._last_price.get(sig.symbol, sig.entry), now_ms)
+            else:
+                self._finish(sig, "EXPIRED", self._last_price.get(sig.symbol, sig.entry), now_ms)
+
+    def drop_symbols(self, keep) -> int:
+        """Berhenti melacak sinyal simbol di luar `keep` (re-shard). Return jumlah sinyal."""
+        gone = [s for s in self._signals.values() if s.symbol not in keep]
+        for sig in gone:
+            self._clear_levels(sig)
+            self._forget(sig)
+        return len(gone)
+
+    def drain(self) -> List[dict]:
+        out, self.events = self.events, []
+        return out
+
+    # ---------- internal ----------
+
+    def _emit(self, sig: _Signal, level: str, price: float, at: int):
+        self.stats["hits"] += 1
+        move = sig.entry - price if sig.short else price - sig.entry
+        r = 0.0 if level == "NOFILL" else move / sig.risk
+        self.events.append({
+            "symbol": sig.symbol, "close_time": sig.close_time, "level": level,
+            "price": price, "at": at, "r": round(r, 3), "tier": sig.tier, "score": sig.score,
+            "entry": sig.entry, "final": level in ("SL", "TP3", "NOFILL", "EXPIRED"),
+            "strategy": sig.strategy,
+        })
+
+    def _finish(self, sig: _Signal, level: str, price: float, at: int):
+        self._clear_levels(sig)
+        self._emit(sig, level, price, at)
+        self._forget(sig)
+
+    def _forget(self, sig: _Signal):
+        sig.phase = "done"
+        self._signals.pop(sig.id, None)
+        self._by_key.pop((sig.symbol, sig.close_time), None)
+        if sig.symbol not in self._up and sig.symbol not in self._down:
+            self._last_price.pop(sig.symbol, None)
+
+
+tracker = OutcomeTracker()
@@ -0,0 +1,130 @@
+# core/signal_journal.py
+# Jurnal append-only semua kandidat sinyal yang lolos scoring (tabel `signals`
+# di BOT_DB_FILE, core/storage.py): symbol, close time, bitmask kondisi, score,
+# tier, level harga, status, jumlah penerima & strategi (smc/smc_strategies.py).
+#   status: sent = terkirim, rest = di luar top-K (diringkas / di-drop),
+#           skip = tidak terkirim (cooldown / duplikat / basi)
+# Hasil sinyal terkirim (core/outcome_tracker.py) dicatat di `signal_events`:
+#   FILL, TP1, TP2, TP3, SL, NOFILL, EXPIRED + R multiple.
+# Tulis lewat write-behind storage (hot path hanya menambah antrian).
+# Query: /stats [hari] dari agregat harian, /history <symbol> dari index
+# (symbol, close_time) — ms walau data setahun.
+
+import time
+from typing import Dict, List
+
+from core.bot_state import storage
+
+STATUS_LABEL = {"sent": "terkirim", "rest": "di luar top-K", "skip": "skip"}
+OUTCOME_LEVELS = ("FILL", "TP1", "TP2", "TP3", "SL", "NOFILL", "EXPIRED")
+
+
+def record(cand: dict, status: str):
+    """Catat satu kandidat (format close_ranker.signal_candidate)."""
+    try:
+        lv = cand["levels"]
+        storage().append_signal((
+            cand["close_time"], cand["symbol"], cand["mask"], cand["score"], cand["tier"], status,
+            lv[0], lv[1], lv[2], lv[3], lv[4], lv[5], int(cand.get("recipients", 0)),
+            cand.get("strategy", "smc_long"),
+        ))
+    except Exception as e:
+        print(f"[{cand.get('symbol')}] Gagal catat jurnal sinyal:", e)
+
+
+def record_outcome(ev: dict):
+    """Catat satu event hasil (format OutcomeTracker._emit)."""
+    try:
+        storage().append_event((
+            ev["symbol"], int(ev["close_time"]), ev["level"], ev["tier"],
+            int(ev["at"]), ev["price"], ev["r"],
+        ))
+    except Exception as e:
+        print(f"[{ev.get('symbol')}] Gagal catat hasil sinyal:", e)
+
+
+def stats(days: int) -> Dict:
+    now = time.time()
+    since_day = time.strftime("%Y-%m-%d", time.localtime(now - (days - 1) * 86400))
+    today = time.strftime("%Y-%m-%d", time.localtime(now))
+    tiers: Dict[str, Dict] = {}
+    for tier, status, n, score_sum, recipients in storage().signal_daily(since_day):
+        t = tiers.setdefault(tier, {"sent": 0, "rest": 0, "skip": 0, "score_sum": 0, "recipients": 0})
+        t[status] = t.get(status, 0) + n
+        t["score_sum"] += score_sum
+        t["recipients"] += recipients
+    outcomes: Dict[str, Dict] = {}
+    for tier, level, n, r_sum in storage().outcome_daily(since_day):
+        o = outcomes.setdefault(tier, {})
+        o[level] = n
+        o[level + "_r"] = r_sum
+    return {
+        "days": days,
+        "since": since_day,
+        "tiers": tiers,
+        "outcomes": outcomes,
+        "top": storage().signal_top_symbols(since_day, today),
+    }
+
+
+def format_stats(days: int) -> str:
+    t0 = time.perf_counter()
+    st = stats(days)
+    lines = [f"📈 *STATISTIK SINYAL* — {days} hari (sejak {st['since']})", ""]
+    if not st["tiers"]:
+        lines.append("Belum ada sinyal tercatat.")
+    for tier in ("A+", "A", "B"):
+        t = st["tiers"].get(tier)
+        if not t:
+            continue
+        total = t["sent"] + t["rest"] + t["skip"]
+        lines.append(
+            f"Tier {tier}: {t['sent']} terkirim, {t['rest']} di luar top-K, {t['skip']} skip "
+            f"— avg score {t['score_sum'] / total:.0f}, {t['recipients']} penerima"
+        )
+        o = st["outcomes"].get(tier)
+        if o:
+            lines.append("   " + format_outcome(o))
+    if st["top"]:
+        lines += ["", "Pair terbanyak (terkirim):"]
+        for symbol, n, best in st["top"]:
+            lines.append(f"• {symbol}: {n} sinyal (score max {best})")
+    lines += ["", f"_query {(time.perf_counter() - t0) * 1000:.1f} ms_"]
+    return "\n".join(lines)
+
+
+def format_outcome(o: Dict) -> str:
+    """Ringkasan hasil satu tier: hit rate per level terhadap sinyal yang terisi."""
+    fill = o.get("FILL", 0)
+    parts = [f"hasil: {fill} terisi, {o.get('NOFILL', 0)} batal"]
+    if fill:
+        parts.append(" · ".join(
+            f"{lv} {o.get(lv, 0) / fill * 100:.0f}%" for lv in ("TP1", "TP2", "TP3", "SL")))
+        closed = o.get("SL", 0) + o.get("TP3", 0) + o.get("EXPIRED", 0)
+        if closed:
+            r = o.get("SL_r", 0) + o.get("TP3_r", 0) + o.get("EXPIRED_r", 0)
+            parts.append(f"avg R tutup {r / closed:+.2f}")
+    return " — ".join(parts)
+
+
+def history(symbol: str, limit: int = 10) -> List[tuple]:
+    return storage().signal_history(symbol.upper(), limit)
+
+
+def format_history(symbol: str, limit: int = 10) -> str:
+    t0 = time.perf_counter()
+    rows = history(symbol, limit)
+    symbol = symbol.upper()
+    if not rows:
+        return f"Belum ada sinyal tercatat untuk {symbol}."
+    lines = [f"🗂 *HISTORY {symbol}* — {len(rows)} terakhir", ""]
+    for close_time, tier, score, status, entry, sl, recipients, strategy, outcome in rows:
+        at = time.strftime("%Y-%m-%d %H:%M", time.localtime((close_time + 1) / 1000))
+        lines.append(
+            f"{at} — `{strategy or 'smc_long'}` — Tier {tier} ({score}) — {STATUS_LABEL.get(status, status)}"
+            f" — entry `{entry:.6f}` SL `{sl:.6f}`"
+            + (f" — {recipients} penerima" if recipients else "")
+            + (f" — {outcome}" if outcome else "")
+        )
+    lines += ["", f"_query {(time.perf_counter() - t0) * 1000:.1f} ms_"]
+    return "\n".join(lines)
@@ -0,0 +1,58 @@
+# core/single_flight.py
+# Single-flight per key (mis. (symbol, close_time)): satu komputasi per key.
+# - pemanggil duplikat SELAMA komputasi berjalan menunggu hasil yang sama (join)
+# - pemanggil duplikat SETELAH selesai langsung dapat hasil tersimpan
+#   (frame close dobel setelah reconnect / stream duplikat)
+# Hasil disimpan LRU (max `keep` key); exception tidak disimpan.
+
+import asyncio
+import inspect
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    def __init__(self, keep: int = 4096):
+        self.keep = keep
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._done: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.stats = {"run": 0, "joined": 0, "cached": 0}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight or key in self._done
+
+    async def run(self, key: Hashable, fn: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Return (hasil, duplikat). duplikat=True → hasil milik pemanggil pertama;
+        pemanggil sebaiknya tidak memproses ulang (mis. tidak kirim sinyal lagi).
+        fn boleh fungsi biasa atau coroutine function.
+        """
+        if key in self._done:
+            self._done.move_to_end(key)
+            self.stats["cached"] += 1
+            return self._done[key], True
+
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.stats["joined"] += 1
+            return await asyncio.shield(fut), True
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        self.stats["run"] += 1
+        try:
+            result = fn(*args, **kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()   # tandai sudah dibaca (tidak ada joiner → tanpa warning)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        fut.set_result(result)
+        self._done[key] = result
+        while len(self._done) > self.keep:
+            self._done.popitem(last=False)
+        return result, False
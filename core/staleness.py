@@ -0,0 +1,127 @@
+# core/staleness.py
+# Guard umur sinyal: tiap unit kerja membawa close time kline (k.T, ms) dari WS
+# sampai kirim Telegram. Tiap stage punya budget umur (detik sejak close):
+#   analyse : sebelum analyse_symbol (hemat CPU/REST saat overload)
+#   score   : setelah analisa, sebelum scoring & build pesan
+#   queue   : saat sinyal keluar dari antrian antar proses/node
+#             (result queue shard → broadcaster, outbox cluster → leader)
+#   send    : tepat sebelum broadcast_signal
+# Mode "drop": kerja yang lewat budget dibuang. Mode "mark": tetap jalan,
+# dihitung, dan pesan sinyal diberi banner terlambat.
+#
+# Umur = now - k.T - clock_offset. clock_offset = selisih jam lokal vs jam
+# exchange, dipelajari dari frame close (sampel terkecil now - k.T per close),
+# jadi jam server yang melenceng tidak membuat semua sinyal dianggap basi.
+# Konsekuensi: umur dihitung dari frame close tercepat; kalau SEMUA frame satu
+# close terlambat (koneksi macet), keterlambatan itu tidak ikut terhitung.
+# Offset ikut dibawa bersama close_time kalau kerja pindah proses/node.
+
+import time
+from typing import Dict, Optional
+
+from config import (
+    STALE_MODE,
+    STALE_ANALYSE_SECONDS,
+    STALE_SCORE_SECONDS,
+    STALE_QUEUE_SECONDS,
+    STALE_SEND_SECONDS,
+)
+
+STAGES = ("analyse", "score", "queue", "send")
+
+
+class StaleGuard:
+    def __init__(self, budgets: Dict[str, float], mode: str = "drop"):
+        self.budgets = dict(budgets)
+        self.mode = mode if mode in ("drop", "mark") else "drop"
+        self.counters = {s: {"ok": 0, "dropped": 0, "marked": 0} for s in STAGES}
+        self.remote: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self.clock_offset = 0.0
+        self._offset_close: Optional[int] = None
+
+    # ---------- jam ----------
+
+    def observe(self, close_time: int, now: Optional[float] = None):
+        """Panggil saat frame close diterima: update estimasi clock_offset."""
+        now = time.time() if now is None else now
+        sample = now - close_time / 1000.0
+        if self._offset_close is None or close_time > self._offset_close:
+            self._offset_close = close_time
+            self.clock_offset = sample
+        elif close_time == self._offset_close:
+            self.clock_offset = min(self.clock_offset, sample)
+
+    def age(self, close_time: int, offset: Optional[float] = None,
+            now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        off = self.clock_offset if offset is None else offset
+        return now - close_time / 1000.0 - off
+
+    # ---------- stage ----------
+
+    def check(self, stage: str, close_time: int, offset: Optional[float] = None,
+              label: str = "") -> bool:
+        """
+        True = lanjutkan kerja. False = basi & mode drop (kerja dibuang).
+        Budget 0 / close_time 0 → stage tidak dicek.
+        """
+        budget = self.budgets.get(stage, 0)
+        c = self.counters[stage]
+        if not budget or not close_time:
+            c["ok"] += 1
+            return True
+        age = self.age(close_time, offset)
+        if age <= budget:
+            c["ok"] += 1
+            return True
+        if self.mode == "mark":
+            c["marked"] += 1
+            return True
+        c["dropped"] += 1
+        if label:
+            print(f"[{label}] Basi di stage {stage}: {age:.1f}s > {budget:.0f}s, drop.")
+        return False
+
+    def is_stale(self, stage: str, close_time: int, offset: Optional[float] = None) -> bool:
+        budget = self.budgets.get(stage, 0)
+        return bool(budget and close_time and self.age(close_time, offset) > budget)
+
+    # ---------- laporan ----------
+
+    def merge_remote(self, source: str, counters: Dict[str, Dict[str, int]]):
+        """Counter kumulatif dari proses lain (mis. worker shard)."""
+        self.remote[source] = counters
+
+    def totals(self) -> Dict[str, Dict[str, int]]:
+        out = {s: dict(c) for s, c in self.counters.items()}
+        for counters in self.remote.values():
+            for s, c in counters.items():
+                for k, v in c.items():
+                    out.setdefault(s, {}).setdefault(k, 0)
+                    out[s][k] += v
+        return out
+
+    def summary(self) -> str:
+        parts = []
+        for s, c in self.totals().items():
+            if c.get("dropped") or c.get("marked"):
+                parts.append(f"{s} {c['dropped']} drop/{c['marked']} mark")
+        return ", ".join(parts) if parts else "tidak ada"
+
+
+def stale_banner(age: float) -> str:
+    return (
+        f"⏱ *TERLAMBAT {age:.0f} detik* dari close 5m — cek harga terhadap "
+        f"validation rules sebelum entry.\n\n"
+    )
+
+
+guard = StaleGuard(
+    {
+        "analyse": STALE_ANALYSE_SECONDS,
+        "score": STALE_SCORE_SECONDS,
+        "queue": STALE_QUEUE_SECONDS,
+        "send": STALE_SEND_SECONDS,
+    },
+    STALE_MODE,
+)
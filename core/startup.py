@@ -0,0 +1,47 @@
+# core/startup.py
+# Milestone cold start: waktu sejak modul ini di-import (baris pertama main.py)
+# sampai tiap tahap siap. Dicetak "[startup] +N ms <tahap>" (diparse
+# tools/bench_startup.py) dan diringkas di /status.
+#
+# Tahap (urutan wajar, sebagian berjalan paralel):
+#   imports    modul entry point ter-import (tanpa pandas: analisa di-import lazy)
+#   state      subscribers / VIP / setting dari DB
+#   telegram   sync awal getUpdates selesai → command sudah dijawab
+#   pairs      daftar pair (exchangeInfo + ticker, paralel)
+#   ws         WebSocket kline terhubung (semua worker di mode shard)
+#   analysis   modul analisa ter-import + warm-up (analisa / seed kline) selesai
+#   scan_ready pairs + ws + analysis → close berikutnya langsung dianalisa
+
+import threading
+import time
+from typing import Dict
+
+T0 = time.perf_counter()
+
+
+class Startup:
+    def __init__(self, t0: float = T0):
+        self.t0 = t0
+        self.marks: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, name: str, detail: str = "") -> bool:
+        """Catat tahap (hanya kejadian pertama). Return False kalau sudah pernah."""
+        with self._lock:
+            if name in self.marks:
+                return False
+            self.marks[name] = time.perf_counter() - self.t0
+            dt = self.marks[name]
+        print(f"[startup] +{dt * 1000:.0f} ms {name}" + (f" ({detail})" if detail else ""), flush=True)
+        return True
+
+    def summary(self) -> str:
+        with self._lock:
+            marks = dict(self.marks)
+        parts = ", ".join(f"{k} {v:.1f}s" for k, v in marks.items() if k != "scan_ready")
+        if "scan_ready" in marks:
+            return f"scan siap {marks['scan_ready']:.1f}s ({parts})"
+        return f"belum siap ({parts or '-'})"
+
+
+startup = Startup()
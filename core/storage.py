@@ -0,0 +1,387 @@
+# core/storage.py
+# Penyimpanan persistent bot di SQLite (WAL), menggantikan file JSON yang
+# ditulis ulang utuh tiap /activate, /addvip, dst.
+#   subscribers   : satu baris per chat_id
+#   vip_users     : user_id → expiry
+#   daily_counts  : kuota FREE per (chat_id, hari) — selamat dari restart
+#   cooldowns     : symbol → waktu & close time sinyal terakhir
+#   settings      : scanning/min_tier/cooldown/... (key → JSON)
+#   user_filters  : filter sinyal per user (/filter, core/user_filters.py)
+#   signals       : jurnal append-only kandidat sinyal (core/signal_journal.py)
+#   signal_daily  : agregat per (hari, tier, status), diisi trigger saat insert
+#                   → /stats setahun cukup baca ≤ 365×3×3 baris
+#   signal_symbol_day / _month : jumlah sinyal terkirim per pair per hari / bulan
+#                   → top pair setahun = ≤ 11 bulan + ≤ 62 hari bucket, bukan scan jurnal
+#   signal_events : hasil sinyal terkirim (FILL/TP1/TP2/TP3/SL/NOFILL/EXPIRED, core/outcome_tracker.py)
+#   outcome_daily : agregat hasil per (hari close sinyal, tier, level), diisi trigger
+# Update per baris (upsert/delete), bukan rewrite seluruh daftar → biaya tulis
+# tetap walau subscriber 100k. Tiap flush = satu transaksi atomik (crash di
+# tengah tulis tidak merusak data).
+#
+# Write-behind: method tulis hanya mencatat perubahan (dirty) per key di
+# memori — update berulang ke key yang sama digabung (yang terakhir menang).
+# Thread flusher (start_flusher) menulis semua perubahan dalam satu transaksi
+# setelah `interval` detik tanpa perubahan baru, paling lambat `max_delay` detik
+# sejak perubahan pertama. Command Telegram tidak pernah menunggu disk.
+# Flush terakhir: stop() (atexit / shutdown main.py / hard restart). Tanpa
+# flusher, tiap perubahan langsung di-flush (sinkron). Method load_* flush dulu.
+#
+# Migrasi sekali: kalau DB baru dan file JSON lama ada, isinya diimpor lalu
+# file di-rename jadi *.migrated.
+
+import json
+import os
+import sqlite3
+import atexit
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)",
+    "CREATE TABLE IF NOT EXISTS subscribers (chat_id INTEGER PRIMARY KEY)",
+    "CREATE TABLE IF NOT EXISTS vip_users (user_id INTEGER PRIMARY KEY, expires REAL)",
+    "CREATE TABLE IF NOT EXISTS daily_counts (chat_id INTEGER PRIMARY KEY, day TEXT, n INTEGER)",
+    "CREATE TABLE IF NOT EXISTS cooldowns (symbol TEXT PRIMARY KEY, ts REAL, close_time INTEGER)",
+    "CREATE TABLE IF NOT EXISTS settings (k TEXT PRIMARY KEY, v TEXT)",
+    "CREATE TABLE IF NOT EXISTS user_filters ("
+    " chat_id INTEGER PRIMARY KEY, min_tier TEXT, allow TEXT, deny TEXT, quiet TEXT)",
+    "CREATE TABLE IF NOT EXISTS signals ("
+    " close_time INTEGER, symbol TEXT, mask INTEGER, score INTEGER, tier TEXT, status TEXT,"
+    " entry REAL, sl REAL, tp1 REAL, tp2 REAL, tp3 REAL, risk REAL, recipients INTEGER,"
+    " strategy TEXT)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS signals_symbol ON signals (symbol, close_time)",
+    "CREATE INDEX IF NOT EXISTS signals_close ON signals (close_time)",
+    "CREATE TABLE IF NOT EXISTS signal_daily ("
+    " day TEXT, tier TEXT, status TEXT, n INTEGER, score_sum INTEGER, recipients INTEGER,"
+    " PRIMARY KEY (day, tier, status)) WITHOUT ROWID",
+    "CREATE TRIGGER IF NOT EXISTS signals_to_daily AFTER INSERT ON signals BEGIN"
+    " INSERT INTO signal_daily VALUES ("
+    "  date(NEW.close_time / 1000, 'unixepoch', 'localtime'), NEW.tier, NEW.status, 1, NEW.score, NEW.recipients)"
+    " ON CONFLICT (day, tier, status) DO UPDATE SET n = n + 1,"
+    "  score_sum = score_sum + excluded.score_sum, recipients = recipients + excluded.recipients;"
+    " END",
+    "CREATE TABLE IF NOT EXISTS signal_symbol_day ("
+    " day TEXT, symbol TEXT, n INTEGER, best INTEGER, PRIMARY KEY (day, symbol)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS signal_symbol_month ("
+    " month TEXT, symbol TEXT, n INTEGER, best INTEGER, PRIMARY KEY (month, symbol)) WITHOUT ROWID",
+    "CREATE TRIGGER IF NOT EXISTS signals_to_symbol AFTER INSERT ON signals WHEN NEW.status = 'sent' BEGIN"
+    " INSERT INTO signal_symbol_day VALUES ("
+    "  date(NEW.close_time / 1000, 'unixepoch', 'localtime'), NEW.symbol, 1, NEW.score)"
+    " ON CONFLICT (day, symbol) DO UPDATE SET n = n + 1, best = max(best, excluded.best);"
+    " INSERT INTO signal_symbol_month VALUES ("
+    "  strftime('%Y-%m', NEW.close_time / 1000, 'unixepoch', 'localtime'), NEW.symbol, 1, NEW.score)"
+    " ON CONFLICT (month, symbol) DO UPDATE SET n = n + 1, best = max(best, excluded.best);"
+    " END",
+    "CREATE TABLE IF NOT EXISTS signal_events ("
+    " symbol TEXT, close_time INTEGER, level TEXT, tier TEXT, at INTEGER, price REAL, r REAL,"
+    " PRIMARY KEY (symbol, close_time, level)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS outcome_daily ("
+    " day TEXT, tier TEXT, level TEXT, n INTEGER, r_sum REAL, PRIMARY KEY (day, tier, level)) WITHOUT ROWID",
+    "CREATE TRIGGER IF NOT EXISTS events_to_daily AFTER INSERT ON signal_events BEGIN"
+    " INSERT INTO outcome_daily VALUES ("
+    "  date(NEW.close_time / 1000, 'unixepoch', 'localtime'), NEW.tier, NEW.level, 1, NEW.r)"
+    " ON CONFLICT (day, tier, level) DO UPDATE SET n = n + 1, r_sum = r_sum + excluded.r_sum;"
+    " END",
+)
+
+
+class Storage:
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        for sql in SCHEMA:
+            self._db.execute(sql)
+        # DB lama (sebelum strategi plugin): kolom strategy ditambah, baris lama = smc_long
+        cols = {row[1] for row in self._db.execute("PRAGMA table_info(signals)")}
+        if "strategy" not in cols:
+            self._db.execute("ALTER TABLE signals ADD COLUMN strategy TEXT DEFAULT 'smc_long'")
+
+        # write-behind
+        self._pending: "OrderedDict[Hashable, Tuple[str, tuple]]" = OrderedDict()
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Condition(self._pending_lock)
+        self._first_dirty = 0.0
+        self._last_dirty = 0.0
+        self._flusher: Optional[threading.Thread] = None
+        self._stopping = False
+        self.interval = 0.0
+        self.max_delay = 0.0
+        self.stats = {"changes": 0, "flushes": 0, "rows": 0}
+        self._seq = itertools.count()
+
+    # ---------- write-behind ----------
+
+    def _queue(self, ops: List[Tuple[Hashable, str, tuple]], drop_prefix: Optional[str] = None):
+        """
+        Catat perubahan. Key sama → digabung (dipindah ke akhir supaya urutan
+        tulis = urutan perubahan terakhir). drop_prefix: buang perubahan pending
+        dengan key[0] tsb (mis. clear semua cooldown menimpa set cooldown lama).
+        """
+        with self._wake:
+            if drop_prefix is not None:
+                for key in [k for k in self._pending if k[0] == drop_prefix]:
+                    del self._pending[key]
+            now = time.time()
+            if not self._pending:
+                self._first_dirty = now
+            self._last_dirty = now
+            for key, sql, args in ops:
+                self._pending.pop(key, None)
+                self._pending[key] = (sql, args)
+            self.stats["changes"] += len(ops)
+            self._wake.notify()
+        if self._flusher is None:
+            self.flush()
+
+    def flush(self) -> int:
+        """Tulis semua perubahan pending dalam satu transaksi. Return jumlah baris."""
+        with self._lock:   # satu flush sekaligus → urutan commit = urutan perubahan
+            with self._wake:
+                if not self._pending:
+                    return 0
+                ops = list(self._pending.items())
+                self._pending.clear()
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for _, (sql, args) in ops:
+                    self._db.execute(sql, args)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                # kembalikan ke depan antrian; key yang sudah berubah lagi tetap versi baru
+                with self._wake:
+                    for key, op in reversed(ops):
+                        if key not in self._pending:
+                            self._pending[key] = op
+                            self._pending.move_to_end(key, last=False)
+                raise
+            self._db.execute("COMMIT")
+        self.stats["flushes"] += 1
+        self.stats["rows"] += len(ops)
+        return len(ops)
+
+    def pending(self) -> int:
+        with self._wake:
+            return len(self._pending)
+
+    def start_flusher(self, interval: float, max_delay: float):
+        """Thread flusher: flush setelah `interval` detik hening, maks `max_delay` sejak dirty."""
+        if self._flusher is not None:
+            return
+        self.interval = interval
+        self.max_delay = max(max_delay, interval)
+        self._flusher = threading.Thread(target=self._flush_loop, name="storage-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.stop)
+
+    def _flush_loop(self):
+        while True:
+            with self._wake:
+                while not self._pending and not self._stopping:
+                    self._wake.wait()
+                if self._stopping:
+                    return
+                now = time.time()
+                due = min(self._last_dirty + self.interval, self._first_dirty + self.max_delay)
+                if now < due:
+                    self._wake.wait(due - now)
+                    continue
+            try:
+                self.flush()
+            except Exception as e:
+                print("Gagal flush storage:", e)
+                time.sleep(self.interval or 1.0)
+
+    def stop(self):
+        """Hentikan flusher & flush terakhir (dijamin sebelum proses keluar)."""
+        with self._wake:
+            self._stopping = True
+            self._wake.notify_all()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join(timeout=5)
+        self._flusher = None   # perubahan setelah stop → flush sinkron
+        try:
+            n = self.flush()
+            if n:
+                print(f"Storage: flush terakhir {n} perubahan.")
+        except Exception as e:
+            print("Gagal flush terakhir storage:", e)
+
+    def _read(self, sql: str, args: tuple = ()):
+        self.flush()
+        with self._lock:
+            return self._db.execute(sql, args).fetchall()
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            self._db.close()
+
+    # ---------- subscribers / VIP ----------
+
+    def load_subscribers(self) -> Set[int]:
+        return {r[0] for r in self._read("SELECT chat_id FROM subscribers")}
+
+    def add_subscriber(self, chat_id: int):
+        self._queue([(("sub", chat_id), "INSERT OR IGNORE INTO subscribers VALUES (?)", (chat_id,))])
+
+    def remove_subscriber(self, chat_id: int):
+        self._queue([(("sub", chat_id), "DELETE FROM subscribers WHERE chat_id = ?", (chat_id,))])
+
+    def load_vip_users(self) -> Dict[int, float]:
+        return {uid: exp for uid, exp in self._read("SELECT user_id, expires FROM vip_users")}
+
+    def set_vip(self, user_id: int, expires: float):
+        self._queue([(("vip", user_id), "INSERT OR REPLACE INTO vip_users VALUES (?, ?)", (user_id, expires))])
+
+    def remove_vips(self, user_ids: Iterable[int]):
+        self._queue([(("vip", u), "DELETE FROM vip_users WHERE user_id = ?", (u,)) for u in user_ids])
+
+    # ---------- kuota harian ----------
+
+    def load_daily_counts(self, day: str) -> Dict[int, int]:
+        return {cid: n for cid, n in self._read("SELECT chat_id, n FROM daily_counts WHERE day = ?", (day,))}
+
+    def save_daily_counts(self, day: str, counts: Iterable[Tuple[int, int]]):
+        self._queue([(("daily", cid), "INSERT OR REPLACE INTO daily_counts VALUES (?, ?, ?)", (cid, day, n))
+                     for cid, n in counts])
+
+    def prune_daily_counts(self, day: str):
+        self._queue([(("daily_prune",), "DELETE FROM daily_counts WHERE day <> ?", (day,))])
+
+    # ---------- cooldown ----------
+
+    def load_cooldowns(self, since: float) -> Dict[str, Tuple[float, int]]:
+        rows = self._read("SELECT symbol, ts, close_time FROM cooldowns WHERE ts >= ?", (since,))
+        return {sym: (ts, ct) for sym, ts, ct in rows}
+
+    def set_cooldown(self, symbol: str, ts: float, close_time: int):
+        self._queue([(("cooldown", symbol), "INSERT OR REPLACE INTO cooldowns VALUES (?, ?, ?)",
+                      (symbol, ts, close_time))])
+
+    def remove_cooldown(self, symbol: str, ts: float):
+        self._queue([(("cooldown", symbol), "DELETE FROM cooldowns WHERE symbol = ? AND ts = ?", (symbol, ts))])
+
+    def clear_cooldowns(self):
+        self._queue([(("cooldown_clear",), "DELETE FROM cooldowns", ())], drop_prefix="cooldown")
+
+    # ---------- settings ----------
+
+    def load_settings(self) -> dict:
+        return {k: json.loads(v) for k, v in self._read("SELECT k, v FROM settings")}
+
+    def save_settings(self, data: dict):
+        self._queue([(("setting", k), "INSERT OR REPLACE INTO settings VALUES (?, ?)", (k, json.dumps(v)))
+                     for k, v in data.items()])
+
+    # ---------- filter user ----------
+
+    def load_user_filters(self) -> List[tuple]:
+        return self._read("SELECT chat_id, min_tier, allow, deny, quiet FROM user_filters")
+
+    def set_user_filter(self, row: tuple):
+        """row = (chat_id, min_tier, allow, deny, quiet); allow/deny dipisah koma."""
+        self._queue([(("filter", row[0]), "INSERT OR REPLACE INTO user_filters VALUES (?, ?, ?, ?, ?)", row)])
+
+    def remove_user_filter(self, chat_id: int):
+        self._queue([(("filter", chat_id), "DELETE FROM user_filters WHERE chat_id = ?", (chat_id,))])
+
+    # ---------- jurnal sinyal ----------
+
+    def append_signal(self, row: tuple):
+        """row = kolom tabel signals. (symbol, close_time) yang sudah ada diabaikan (append-only)."""
+        self._queue([(("signal", next(self._seq)),
+                      "INSERT OR IGNORE INTO signals VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)])
+
+    def signal_daily(self, since_day: str):
+        return self._read(
+            "SELECT tier, status, SUM(n), SUM(score_sum), SUM(recipients) FROM signal_daily "
+            "WHERE day >= ? GROUP BY tier, status", (since_day,))
+
+    def signal_top_symbols(self, since_day: str, today: str, limit: int = 5):
+        """Pair terbanyak terkirim sejak since_day: bulan penuh di tengah + hari di bulan awal & bulan ini."""
+        first_month, this_month = since_day[:7], today[:7]
+        if first_month == this_month:
+            sql = "SELECT symbol, n, best FROM signal_symbol_day WHERE day >= ?"
+            args: tuple = (since_day,)
+        else:
+            sql = (
+                "SELECT symbol, n, best FROM signal_symbol_month WHERE month > ? AND month < ?"
+                " UNION ALL SELECT symbol, n, best FROM signal_symbol_day WHERE day >= ? AND day < ?"
+                " UNION ALL SELECT symbol, n, best FROM signal_symbol_day WHERE day >= ?"
+            )
+            args = (first_month, this_month, since_day, first_month + "-32", this_month + "-01")
+        return self._read(
+            f"SELECT symbol, SUM(n), MAX(best) FROM ({sql}) GROUP BY symbol "
+            "ORDER BY SUM(n) DESC, MAX(best) DESC LIMIT ?", args + (limit,))
+
+    def signal_history(self, symbol: str, limit: int = 10):
+        """Sinyal terakhir + urutan hasil (level dipisah '→', urut waktu kena)."""
+        return self._read(
+            "SELECT s.close_time, s.tier, s.score, s.status, s.entry, s.sl, s.recipients, s.strategy,"
+            " (SELECT group_concat(level, '→') FROM (SELECT level FROM signal_events e"
+            "   WHERE e.symbol = s.symbol AND e.close_time = s.close_time ORDER BY e.at, e.r))"
+            " FROM signals s WHERE s.symbol = ? ORDER BY s.close_time DESC LIMIT ?", (symbol, limit))
+
+    def append_event(self, row: tuple):
+        """row = (symbol, close_time, level, tier, at, price, r); level yang sama diabaikan."""
+        self._queue([(("event", next(self._seq)),
+                      "INSERT OR IGNORE INTO signal_events VALUES (?, ?, ?, ?, ?, ?, ?)", row)])
+
+    def outcome_daily(self, since_day: str):
+        return self._read(
+            "SELECT tier, level, SUM(n), SUM(r_sum) FROM outcome_daily WHERE day >= ? "
+            "GROUP BY tier, level", (since_day,))
+
+    # ---------- migrasi JSON ----------
+
+    def migrate_json(self, subscribers_file: str, vip_file: str, state_file: str):
+        """Import file JSON lama sekali (meta json_migrated), lalu rename *.migrated."""
+        if self._read("SELECT v FROM meta WHERE k = 'json_migrated'"):
+            return
+
+        def read(path, default):
+            if not os.path.exists(path):
+                return default
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Gagal baca {path} untuk migrasi:", e)
+                return default
+
+        subs = read(subscribers_file, [])
+        vips = read(vip_file, {})
+        settings = read(state_file, {})
+
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany("INSERT OR IGNORE INTO subscribers VALUES (?)",
+                                     [(int(x),) for x in subs])
+                self._db.executemany("INSERT OR REPLACE INTO vip_users VALUES (?, ?)",
+                                     [(int(k), float(v)) for k, v in vips.items()])
+                self._db.executemany("INSERT OR REPLACE INTO settings VALUES (?, ?)",
+                                     [(k, json.dumps(v)) for k, v in settings.items()])
+                self._db.execute("INSERT OR REPLACE INTO meta VALUES ('json_migrated', ?)",
+                                 (str(time.time()),))
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+        moved = []
+        for path in (subscribers_file, vip_file, state_file):
+            if os.path.exists(path):
+                os.replace(path, path + ".migrated")
+                moved.append(path)
+        if moved:
+            print(f"Migrasi JSON → {self.path}: {len(subs)} subscribers, {len(vips)} VIP, "
+                  f"{len(settings)} setting ({', '.join(moved)} → *.migrated)")
@@ -0,0 +1,122 @@
+# core/strategy_costs.py
+# Akuntansi biaya per strategi (smc/smc_strategies.py), tanpa pandas supaya
+# broadcaster / Telegram bisa membacanya tanpa memuat modul analisa.
+#
+#   pass     : satu simbol × satu close (data & FeatureFrame dipakai bersama)
+#   fitur    : tiap key fitur dihitung sekali per pass; waktunya dibagi rata ke
+#              strategi yang mendeklarasikannya ("fitur ms" per strategi)
+#   sendiri  : waktu evaluate() strategi (baca fitur dari memo + level)
+#   kandidat : evaluate menghasilkan conditions/levels; sinyal = lolos min tier
+#
+# Counter kumulatif; worker shard mengirim snapshot-nya di pesan burst
+# (merge_remote), /strategies menampilkan total semua proses.
+
+import threading
+from typing import Dict, List
+
+# nama → [side, evaluasi, kandidat, sinyal, detik sendiri, detik fitur]
+_SIDE, _EVALS, _HITS, _SIGNALS, _OWN, _FEAT = range(6)
+
+
+class StrategyCosts:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.passes = 0
+        self.strategies: Dict[str, list] = {}
+        self.features: Dict[str, List[float]] = {}   # nama fitur → [n, detik]
+        self.remote: Dict[str, dict] = {}
+
+    def register(self, name: str, side: str):
+        with self._lock:
+            self.strategies.setdefault(name, [side, 0, 0, 0, 0.0, 0.0])
+
+    def record_pass(self, strategies: Dict[str, tuple], features: Dict[str, tuple]):
+        """
+        Satu pass engine. strategies[nama] = (kandidat 0/1, detik sendiri, detik fitur),
+        features[nama] = (jumlah dihitung, detik).
+        """
+        with self._lock:
+            self.passes += 1
+            for name, (hit, own, feat) in strategies.items():
+                s = self.strategies[name]
+                s[_EVALS] += 1
+                s[_HITS] += hit
+                s[_OWN] += own
+                s[_FEAT] += feat
+            for name, (n, dt) in features.items():
+                f = self.features.setdefault(name, [0, 0.0])
+                f[0] += n
+                f[1] += dt
+
+    def signal(self, name: str):
+        """Kandidat strategi `name` lolos min tier (dipanggil loop scan setelah scoring)."""
+        with self._lock:
+            s = self.strategies.get(name)
+            if s is not None:
+                s[_SIGNALS] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "passes": self.passes,
+                "strategies": {k: list(v) for k, v in self.strategies.items()},
+                "features": {k: list(v) for k, v in self.features.items()},
+            }
+
+    def merge_remote(self, source: str, snapshot: dict):
+        """Snapshot kumulatif dari proses lain (mis. worker shard)."""
+        with self._lock:
+            self.remote[source] = snapshot
+
+    def totals(self) -> dict:
+        out = self.snapshot()
+        with self._lock:
+            remote = list(self.remote.values())
+        for snap in remote:
+            out["passes"] += snap.get("passes", 0)
+            for name, row in snap.get("strategies", {}).items():
+                cur = out["strategies"].setdefault(name, [row[_SIDE], 0, 0, 0, 0.0, 0.0])
+                for i in range(_EVALS, _FEAT + 1):
+                    cur[i] += row[i]
+            for name, (n, dt) in snap.get("features", {}).items():
+                cur = out["features"].setdefault(name, [0, 0.0])
+                cur[0] += n
+                cur[1] += dt
+        return out
+
+    # ---------- laporan ----------
+
+    def summary(self) -> str:
+        t = self.totals()
+        rows = t["strategies"]
+        if not rows:
+            return "-"
+        if not t["passes"]:
+            return ", ".join(f"`{name}`" for name in rows)
+        return ", ".join(f"`{name}` {row[_SIGNALS]} sinyal" for name, row in rows.items())
+
+    def format_stats(self) -> str:
+        t = self.totals()
+        if not t["strategies"]:
+            return "Belum ada strategi terdaftar (modul analisa belum dimuat)."
+        passes = t["passes"]
+        lines = [
+            f"🧩 *STRATEGI* — {passes} pass (simbol × close)", "",
+            "`strategi       side   kand  sinyal  sendiri  fitur  µs/pass`",
+        ]
+        for name, row in t["strategies"].items():
+            evals = row[_EVALS] or 1
+            own_us = row[_OWN] / evals * 1e6
+            feat_us = row[_FEAT] / evals * 1e6
+            lines.append(
+                f"`{name[:14]:<14} {row[_SIDE]:<5} {row[_HITS]:>5} {row[_SIGNALS]:>7} "
+                f"{own_us:>8.0f} {feat_us:>6.0f} {own_us + feat_us:>8.0f}`"
+            )
+        if t["features"]:
+            lines += ["", "Fitur bersama (dihitung sekali per pass):"]
+            for name, (n, dt) in sorted(t["features"].items(), key=lambda kv: -kv[1][1]):
+                lines.append(f"• `{name}`: {n}×, avg {dt / max(n, 1) * 1e6:.0f} µs")
+        return "\n".join(lines)
+
+
+costs = StrategyCosts()
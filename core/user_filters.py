@@ -0,0 +1,178 @@
+# core/user_filters.py
+# Filter sinyal per user (/filter): min tier, allowlist / denylist simbol,
+# jam tenang (quiet hours, jam lokal bot). User tanpa filter menerima semua.
+#
+# Filter dikompilasi jadi index terbalik — yang disimpan adalah siapa yang
+# MENOLAK, supaya user tanpa filter (mayoritas) tidak pernah disentuh:
+#   tier_block[tier]  : user dengan min tier di atas tier itu
+#   allow_any         : user yang punya allowlist
+#   allow[symbol]     : user yang allowlist-nya memuat simbol
+#   deny[symbol]      : user yang denylist-nya memuat simbol
+#   quiet[jam]        : user yang sedang jam tenang di jam itu (24 bucket)
+# Penerima satu sinyal = subscriber − blocked(symbol, tier, jam); blocked =
+# gabungan beberapa set di atas, bukan loop subscriber × aturan.
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+TIER_RANK = {"B": 0, "A": 1, "A+": 2}
+MAX_SYMBOLS = 50   # per allowlist / denylist
+
+
+@dataclass
+class UserFilter:
+    min_tier: Optional[str] = None
+    allow: Set[str] = field(default_factory=set)
+    deny: Set[str] = field(default_factory=set)
+    quiet: Optional[Tuple[int, int]] = None   # (jam mulai, jam selesai), boleh lewat tengah malam
+
+    def copy(self) -> "UserFilter":
+        return UserFilter(self.min_tier, set(self.allow), set(self.deny), self.quiet)
+
+    def is_empty(self) -> bool:
+        return not (self.min_tier or self.allow or self.deny or self.quiet)
+
+    def quiet_hours(self) -> List[int]:
+        if self.quiet is None:
+            return []
+        start, end = self.quiet
+        return [h % 24 for h in range(start, start + (end - start) % 24)]
+
+    def accepts(self, symbol: str, tier: str, hour: int) -> bool:
+        """Cek satu user langsung (referensi untuk index / benchmark)."""
+        if self.min_tier and TIER_RANK.get(tier, 0) < TIER_RANK[self.min_tier]:
+            return False
+        if self.allow and symbol not in self.allow:
+            return False
+        if symbol in self.deny:
+            return False
+        return hour not in self.quiet_hours()
+
+    def describe(self) -> str:
+        lines = [
+            f"Min tier : *{self.min_tier or 'semua'}*",
+            f"Allow    : {', '.join(sorted(self.allow)) if self.allow else 'semua pair'}",
+            f"Deny     : {', '.join(sorted(self.deny)) if self.deny else '-'}",
+            f"Jam tenang: {f'{self.quiet[0]:02d}:00–{self.quiet[1]:02d}:00' if self.quiet else '-'}",
+        ]
+        return "\n".join(lines)
+
+    def to_row(self, chat_id: int) -> tuple:
+        return (
+            chat_id, self.min_tier, ",".join(sorted(self.allow)), ",".join(sorted(self.deny)),
+            f"{self.quiet[0]}-{self.quiet[1]}" if self.quiet else None,
+        )
+
+    @classmethod
+    def from_row(cls, min_tier, allow, deny, quiet) -> "UserFilter":
+        q = None
+        if quiet:
+            a, b = quiet.split("-")
+            q = (int(a), int(b))
+        return cls(
+            min_tier=min_tier or None,
+            allow=set(filter(None, (allow or "").split(","))),
+            deny=set(filter(None, (deny or "").split(","))),
+            quiet=q,
+        )
+
+
+class FilterIndex:
+    def __init__(self):
+        self.prefs: Dict[int, UserFilter] = {}
+        self._tier_block: Dict[str, Set[int]] = {t: set() for t in TIER_RANK}
+        self._allow_any: Set[int] = set()
+        self._allow: Dict[str, Set[int]] = {}
+        self._deny: Dict[str, Set[int]] = {}
+        self._quiet: List[Set[int]] = [set() for _ in range(24)]
+
+    def __len__(self):
+        return len(self.prefs)
+
+    def get(self, chat_id: int) -> UserFilter:
+        return self.prefs.get(chat_id) or UserFilter()
+
+    def set(self, chat_id: int, f: UserFilter):
+        self.remove(chat_id)
+        if f.is_empty():
+            return
+        self.prefs[chat_id] = f
+        if f.min_tier:
+            for tier, rank in TIER_RANK.items():
+                if rank < TIER_RANK[f.min_tier]:
+                    self._tier_block[tier].add(chat_id)
+        if f.allow:
+            self._allow_any.add(chat_id)
+            for s in f.allow:
+                self._allow.setdefault(s, set()).add(chat_id)
+        for s in f.deny:
+            self._deny.setdefault(s, set()).add(chat_id)
+        for h in f.quiet_hours():
+            self._quiet[h].add(chat_id)
+
+    def remove(self, chat_id: int):
+        f = self.prefs.pop(chat_id, None)
+        if f is None:
+            return
+        for users in self._tier_block.values():
+            users.discard(chat_id)
+        self._allow_any.discard(chat_id)
+        for book, symbols in ((self._allow, f.allow), (self._deny, f.deny)):
+            for s in symbols:
+                users = book.get(s)
+                if users is not None:
+                    users.discard(chat_id)
+                    if not users:
+                        del book[s]
+        for h in f.quiet_hours():
+            self._quiet[h].discard(chat_id)
+
+    def load(self, items: Iterable[Tuple[int, UserFilter]]):
+        for chat_id, f in items:
+            self.set(chat_id, f)
+
+    def blocked(self, symbol: str, tier: str, hour: Optional[int] = None) -> Set[int]:
+        """User yang TIDAK menerima sinyal (symbol, tier) di jam `hour` (default jam sekarang)."""
+        if not self.prefs:
+            return set()
+        if hour is None:
+            hour = time.localtime().tm_hour
+        out = self._tier_block.get(tier, set()) | self._quiet[hour]
+        deny = self._deny.get(symbol)
+        if deny:
+            out |= deny
+        if self._allow_any:
+            allow = self._allow.get(symbol)
+            out |= (self._allow_any - allow) if allow else self._allow_any
+        return out
+
+    def recipients(self, subscribers: Set[int], symbol: str, tier: str,
+                   hour: Optional[int] = None) -> Set[int]:
+        return subscribers - self.blocked(symbol, tier, hour)
+
+
+def parse_tier(text: str) -> Optional[str]:
+    t = text.strip().upper().replace("PLUS", "+")
+    return t if t in TIER_RANK else None
+
+
+def parse_symbols(args: Iterable[str]) -> List[str]:
+    """BTC / btcusdt / BTCUSDT → BTCUSDT (pair USDT)."""
+    out = []
+    for a in args:
+        for s in a.upper().replace(",", " ").split():
+            out.append(s if s.endswith("USDT") else s + "USDT")
+    return out
+
+
+def parse_quiet(text: str) -> Optional[Tuple[int, int]]:
+    """'22-6' → (22, 6); None kalau format salah."""
+    try:
+        a, b = text.replace(":00", "").split("-")
+        start, end = int(a), int(b)
+    except ValueError:
+        return None
+    if not (0 <= start < 24 and 0 <= end < 24) or start == end:
+        return None
+    return start, end
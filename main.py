@@ -1,21 +1,59 @@
 # main.py
 # Entry point: start Telegram loop + Binance scan loop.
+# Cold start bertahap (core/startup.py): pandas & modul analisa tidak di-import di
+# sini, tapi paralel dengan fetch pair / connect WS di run_bot.
+
+from core.startup import startup
 
 import asyncio
+import signal
 import threading
 
-from core.bot_state import state
+from config import SCAN_WORKERS, CLUSTER_BACKEND, NODE_ID, CLUSTER_LEASE_SECONDS
+from core.bot_state import state, flush_storage
+from core.hot_config import start_hot_reload
+from telegram.telegram_common import send_telegram
 from telegram.telegram_core import telegram_command_loop
 from binance.binance_scan import run_bot
 
 
-if __name__ == "__main__":
-    # Jalankan loop command Telegram di thread terpisah
-    cmd_thread = threading.Thread(target=telegram_command_loop, daemon=True)
-    cmd_thread.start()
+def _on_sigterm(signum, frame):
+    # docker stop / systemd: keluar lewat SystemExit supaya finally & flush jalan
+    raise SystemExit(0)
+
 
+if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, _on_sigterm)
+    startup.mark("imports")
     try:
-        asyncio.run(run_bot())
+        if CLUSTER_BACKEND:
+            # Mode multi-node: loop Telegram dijalankan oleh node leader saja
+            from core.cluster import Cluster, backend_from_url
+            from binance.binance_cluster import run_cluster_node
+
+            cluster = Cluster(
+                backend_from_url(CLUSTER_BACKEND),
+                node_id=NODE_ID or None,
+                lease_ttl=CLUSTER_LEASE_SECONDS,
+            )
+            asyncio.run(run_cluster_node(cluster, heartbeat_seconds=CLUSTER_LEASE_SECONDS / 3))
+        else:
+            # .env / STRATEGY_FILE diterapkan live (core/hot_config.py)
+            start_hot_reload(notify=send_telegram)
+
+            # Jalankan loop command Telegram di thread terpisah
+            cmd_thread = threading.Thread(target=telegram_command_loop, daemon=True)
+            cmd_thread.start()
+
+            if SCAN_WORKERS > 1:
+                from binance.binance_shards import run_sharded
+
+                asyncio.run(run_sharded(SCAN_WORKERS))
+            else:
+                asyncio.run(run_bot())
     except KeyboardInterrupt:
         state.running = False
         print("Bot dihentikan oleh user (CTRL+C).")
+    finally:
+        state.running = False
+        flush_storage()
@@ -3,10 +3,15 @@
 # SMC AGGRESSIVE SCALPING (PREMIUM)
 # =========================
 
-import requests
+from typing import Optional
+
 import pandas as pd
 import numpy as np
 from config import BINANCE_REST_URL
+from core.http_transport import klines_weight, transport
+from smc.smc_params import SmcParams, DEFAULT_SMC_PARAMS
+from smc.smc_scoring import COND_BIT, SETUP_SHIFT
+from smc.smc_types import SmcConditions, SmcLevels
 
 
 # ================== DATA FETCHING & UTIL ==================
@@ -16,7 +21,7 @@ def get_klines(symbol: str, interval: str, limit: int = 200) -> pd.DataFrame:
     url = f"{BINANCE_REST_URL}/fapi/v1/klines"
     params = {"symbol": symbol.upper(), "interval": interval, "limit": limit}
 
-    r = requests.get(url, params=params, timeout=10)
+    r = transport.get(url, "binance:klines", params=params, timeout=10, weight=klines_weight(limit))
     r.raise_for_status()
     data = r.json()
 
@@ -65,30 +70,117 @@ def atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
     return tr.rolling(window=period, min_periods=1).mean()
 
 
+# ================== FEATURE FRAME ==================
+
+class FeatureFrame:
+    """
+    Bungkus DataFrame satu timeframe untuk SATU kali analisa.
+    Series turunan (EMA, RSI, ATR, body, range) dihitung saat pertama
+    diminta detector lalu di-memo, jadi tidak dihitung ulang per detector.
+    Nilai identik dengan memanggil ema()/rsi()/atr() langsung.
+    df boleh DataFrame atau dict kolom → pd.Series (view KlineShm).
+    """
+
+    __slots__ = ("df", "_cache")
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._cache = {}
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def _memo(self, key, fn):
+        val = self._cache.get(key)
+        if val is None:
+            val = fn()
+            self._cache[key] = val
+        return val
+
+    # ---------- kolom mentah (numpy) ----------
+
+    @property
+    def open(self) -> np.ndarray:
+        return self._memo("open", lambda: self.df["open"].values)
+
+    @property
+    def high(self) -> np.ndarray:
+        return self._memo("high", lambda: self.df["high"].values)
+
+    @property
+    def low(self) -> np.ndarray:
+        return self._memo("low", lambda: self.df["low"].values)
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._memo("close", lambda: self.df["close"].values)
+
+    # ---------- turunan ----------
+
+    def ema(self, period: int) -> np.ndarray:
+        return self._memo(("ema", period), lambda: ema(self.df["close"], period).values)
+
+    def rsi(self, period: int = 14) -> np.ndarray:
+        return self._memo(("rsi", period), lambda: rsi(self.df["close"], period).values)
+
+    def atr(self, period: int = 14) -> np.ndarray:
+        return self._memo(("atr", period), lambda: atr(self.df, period).values)
+
+    @property
+    def ema20(self) -> np.ndarray:
+        return self.ema(20)
+
+    @property
+    def ema50(self) -> np.ndarray:
+        return self.ema(50)
+
+    @property
+    def rsi14(self) -> np.ndarray:
+        return self.rsi(14)
+
+    @property
+    def atr14(self) -> np.ndarray:
+        return self.atr(14)
+
+    @property
+    def bodies(self) -> np.ndarray:
+        return self._memo("bodies", lambda: np.abs(self.close - self.open))
+
+    @property
+    def ranges(self) -> np.ndarray:
+        return self._memo("ranges", lambda: self.high - self.low)
+
+
+def feature_frame(df) -> FeatureFrame:
+    """DataFrame → FeatureFrame baru; FeatureFrame dikembalikan apa adanya."""
+    return df if isinstance(df, FeatureFrame) else FeatureFrame(df)
+
+
 # ============================================================
 #               LOGIC SMC AGGRESSIVE SCALPING
 # ============================================================
 
-def detect_bias_generic(df: pd.DataFrame) -> bool:
+def detect_bias_generic(df) -> bool:
     """
     Bias generik:
     - close > EMA20 > EMA50
     - EMA20 & EMA50 benar-benar naik (cek slope 5 candle ke belakang).
     Bisa dipakai untuk 5m, 15m, 1H.
+    df: DataFrame atau FeatureFrame.
     """
-    close = df["close"]
-    ema20 = ema(close, 20)
-    ema50 = ema(close, 50)
+    f = feature_frame(df)
+    ema20 = f.ema20
+    ema50 = f.ema50
 
-    last = close.iloc[-1]
-    e20 = ema20.iloc[-1]
-    e50 = ema50.iloc[-1]
+    last = f.close[-1]
+    e20 = ema20[-1]
+    e50 = ema50[-1]
 
     bias_stack = last > e20 > e50
 
     if len(ema20) > 5 and len(ema50) > 5:
-        e20_prev = ema20.iloc[-5]
-        e50_prev = ema50.iloc[-5]
+        e20_prev = ema20[-5]
+        e50_prev = ema50[-5]
 
         base20 = max(abs(e20_prev), 1e-9)
         base50 = max(abs(e50_prev), 1e-9)
@@ -103,24 +195,25 @@ def detect_bias_generic(df: pd.DataFrame) -> bool:
     return bool(bias_stack and ema_slope_ok)
 
 
-def detect_bias_5m(df_5m: pd.DataFrame) -> bool:
+def detect_bias_5m(df_5m) -> bool:
     """Alias khusus 5m, pakai rule generik."""
     return detect_bias_generic(df_5m)
 
 
-def detect_micro_choch(df_5m: pd.DataFrame):
+def detect_micro_choch(df_5m, params: SmcParams = DEFAULT_SMC_PARAMS):
     """
     Micro CHoCH:
     - high & low terakhir lebih tinggi dari swing kecil sebelumnya.
     Premium:
     - candle terakhir bullish
-    - body > 1.3x rata-rata body 8 candle sebelumnya
-    - upper wick <= 25% dari total range
+    - body > 1.3x rata-rata body 8 candle sebelumnya (params.body_mult)
+    - upper wick <= 25% dari total range (params.max_upper_wick)
     """
-    highs = df_5m["high"].values
-    lows = df_5m["low"].values
-    opens = df_5m["open"].values
-    closes = df_5m["close"].values
+    f = feature_frame(df_5m)
+    highs = f.high
+    lows = f.low
+    opens = f.open
+    closes = f.close
 
     n = len(highs)
     if n < 10:
@@ -138,8 +231,9 @@ def detect_micro_choch(df_5m: pd.DataFrame):
     if last_close <= last_open:
         return micro_choch, False
 
-    body = abs(last_close - last_open)
-    past_bodies = np.abs(closes[-9:-1] - opens[-9:-1])
+    bodies = f.bodies
+    body = bodies[-1]
+    past_bodies = bodies[-9:-1]
     avg_body = past_bodies.mean() if past_bodies.size > 0 else 0.0
 
     total_range = last_high - last_low
@@ -148,8 +242,8 @@ def detect_micro_choch(df_5m: pd.DataFrame):
 
     upper_wick = last_high - max(last_close, last_open)
 
-    body_big_enough = body >= avg_body * 1.3
-    wick_small_enough = (upper_wick / total_range) <= 0.25
+    body_big_enough = body >= avg_body * params.body_mult
+    wick_small_enough = (upper_wick / total_range) <= params.max_upper_wick
 
     micro_choch_premium = bool(
         micro_choch and body_big_enough and wick_small_enough
@@ -158,15 +252,16 @@ def detect_micro_choch(df_5m: pd.DataFrame):
     return micro_choch, micro_choch_premium
 
 
-def detect_micro_fvg(df_5m: pd.DataFrame):
+def detect_micro_fvg(df_5m):
     """
     Micro FVG bullish (imbalance kecil):
     - low candle n > high candle n-1 di beberapa candle terakhir.
     - ambil FVG yang paling dekat dengan harga sekarang.
     """
-    highs = df_5m["high"].values
-    lows = df_5m["low"].values
-    closes = df_5m["close"].values
+    f = feature_frame(df_5m)
+    highs = f.high
+    lows = f.low
+    closes = f.close
 
     n = len(highs)
     if n < 4:
@@ -196,32 +291,34 @@ def detect_micro_fvg(df_5m: pd.DataFrame):
     return True, float(best_low), float(best_high)
 
 
-def detect_momentum(df_5m: pd.DataFrame):
+def detect_momentum(df_5m, params: SmcParams = DEFAULT_SMC_PARAMS):
     """
     Momentum (LONG):
     - OK: RSI 50–72 (RSI < 50 → skip, market lemah)
     - Premium: RSI 52–65 (sweet spot tren sehat)
     """
-    closes = df_5m["close"]
-    if len(closes) < 30:
+    f = feature_frame(df_5m)
+    if len(f) < 30:
         return True, False
 
-    rsi_val = rsi(closes, 14).iloc[-1]
+    rsi_val = f.rsi14[-1]
 
-    momentum_ok = bool(48 <= rsi_val < 74)
-    momentum_premium = bool(52 <= rsi_val <= 68)
+    momentum_ok = bool(params.rsi_ok_min <= rsi_val < params.rsi_ok_max)
+    momentum_premium = bool(params.rsi_premium_min <= rsi_val <= params.rsi_premium_max)
 
     return momentum_ok, momentum_premium
 
 
-def detect_not_choppy(df_5m: pd.DataFrame, window: int = 20) -> bool:
+def detect_not_choppy(df_5m, window: int = 20,
+                      params: SmcParams = DEFAULT_SMC_PARAMS) -> bool:
     """
     Filter choppy agresif tapi ketat:
     - range total > 1.8x rata-rata range candle.
     - ATR relatif terhadap harga tidak terlalu kecil (market tidak 'tidur').
     """
-    highs = df_5m["high"].values
-    lows = df_5m["low"].values
+    f = feature_frame(df_5m)
+    highs = f.high
+    lows = f.low
 
     if len(highs) < window + 2:
         return True
@@ -229,7 +326,7 @@ def detect_not_choppy(df_5m: pd.DataFrame, window: int = 20) -> bool:
     seg_high = highs[-window:]
     seg_low = lows[-window:]
 
-    ranges = seg_high - seg_low
+    ranges = f.ranges[-window:]
     full_range = seg_high.max() - seg_low.min()
     avg_range = ranges.mean()
 
@@ -239,9 +336,9 @@ def detect_not_choppy(df_5m: pd.DataFrame, window: int = 20) -> bool:
     trendiness_ok = full_range > avg_range * 1.6
 
     # ATR check
-    atr_series = atr(df_5m, period=14)
-    atr_val = float(atr_series.iloc[-1]) if not np.isnan(atr_series.iloc[-1]) else 0.0
-    last_price = float(df_5m["close"].iloc[-1])
+    atr_last = f.atr14[-1]
+    atr_val = float(atr_last) if not np.isnan(atr_last) else 0.0
+    last_price = float(f.close[-1])
 
     if last_price > 0:
         atr_pct = atr_val / last_price
@@ -249,26 +346,24 @@ def detect_not_choppy(df_5m: pd.DataFrame, window: int = 20) -> bool:
         atr_pct = 0.0
 
     # kalau ATR < 0.3% harga → dianggap terlalu kalem/choppy
-    if atr_pct < 0.003:
+    if atr_pct < params.min_atr_pct:
         return False
 
     return bool(trendiness_ok)
 
 
-def detect_not_overextended(df_5m: pd.DataFrame,
+def detect_not_overextended(df_5m,
                             ema_period: int = 20,
-                            max_distance_pct: float = 0.015) -> bool:
+                            max_distance_pct: float = DEFAULT_SMC_PARAMS.max_ema_distance_pct) -> bool:
     """
     TRUE kalau harga TIDAK terlalu jauh dari EMA (tidak over-extended).
     Untuk long:
     - close tidak lebih dari max_distance_pct di atas EMA20.
     (lebih ketat: default 1.2%)
     """
-    close = df_5m["close"]
-    ema20 = ema(close, ema_period)
-
-    last_close = close.iloc[-1]
-    last_ema = ema20.iloc[-1]
+    f = feature_frame(df_5m)
+    last_close = f.close[-1]
+    last_ema = f.ema(ema_period)[-1]
 
     if last_ema <= 0:
         return True
@@ -280,13 +375,154 @@ def detect_not_overextended(df_5m: pd.DataFrame,
     return True
 
 
+# ============================================================
+#            SHORT (CERMIN DETECTOR LONG, smc_strategies)
+# ============================================================
+# Aturan sama dengan versi long, arah dibalik. Flag hasilnya memakai bit
+# COND_KEYS yang sama (bias_ok = bias searah sinyal), jadi scoring / LUT sama.
+
+def detect_bias_generic_short(df) -> bool:
+    """close < EMA20 < EMA50 dan EMA20 & EMA50 benar-benar turun (5 candle)."""
+    f = feature_frame(df)
+    ema20 = f.ema20
+    ema50 = f.ema50
+
+    last = f.close[-1]
+    e20 = ema20[-1]
+    e50 = ema50[-1]
+
+    bias_stack = last < e20 < e50
+
+    if len(ema20) > 5 and len(ema50) > 5:
+        e20_prev = ema20[-5]
+        e50_prev = ema50[-5]
+
+        base20 = max(abs(e20_prev), 1e-9)
+        base50 = max(abs(e50_prev), 1e-9)
+        slope20 = (e20 - e20_prev) / base20
+        slope50 = (e50 - e50_prev) / base50
+
+        ema_slope_ok = (slope20 < -0.001) and (slope50 < -0.0005)
+    else:
+        ema_slope_ok = True
+
+    return bool(bias_stack and ema_slope_ok)
+
+
+def detect_micro_choch_short(df_5m, params: SmcParams = DEFAULT_SMC_PARAMS):
+    """
+    Micro CHoCH bearish: high & low terakhir lebih rendah dari swing kecil.
+    Premium: candle bearish, body >= body_mult x rata-rata, lower wick <= max_upper_wick.
+    """
+    f = feature_frame(df_5m)
+    highs = f.high
+    lows = f.low
+    opens = f.open
+    closes = f.close
+
+    n = len(highs)
+    if n < 10:
+        return False, False
+
+    micro_choch = bool(highs[-1] < highs[-3] and lows[-1] < lows[-3])
+
+    last_open = opens[-1]
+    last_close = closes[-1]
+    last_high = highs[-1]
+    last_low = lows[-1]
+
+    if last_close >= last_open:
+        return micro_choch, False
+
+    bodies = f.bodies
+    body = bodies[-1]
+    past_bodies = bodies[-9:-1]
+    avg_body = past_bodies.mean() if past_bodies.size > 0 else 0.0
+
+    total_range = last_high - last_low
+    if total_range <= 0 or avg_body <= 0:
+        return micro_choch, False
+
+    lower_wick = min(last_close, last_open) - last_low
+
+    body_big_enough = body >= avg_body * params.body_mult
+    wick_small_enough = (lower_wick / total_range) <= params.max_upper_wick
+
+    return micro_choch, bool(micro_choch and body_big_enough and wick_small_enough)
+
+
+def detect_micro_fvg_short(df_5m):
+    """Micro FVG bearish: high candle n+1 < low candle n; ambil yang paling dekat harga."""
+    f = feature_frame(df_5m)
+    highs = f.high
+    lows = f.low
+    closes = f.close
+
+    n = len(highs)
+    if n < 4:
+        return False, 0.0, 0.0
+
+    last_close = closes[-1]
+    start = max(0, n - 12)
+    best_diff = None
+    best_low = 0.0
+    best_high = 0.0
+
+    for i in range(start, n - 1):
+        if highs[i + 1] < lows[i]:
+            fvg_low = highs[i + 1]
+            fvg_high = lows[i]
+
+            mid = (fvg_low + fvg_high) / 2.0
+            diff = abs(last_close - mid)
+            if (best_diff is None) or (diff < best_diff):
+                best_diff = diff
+                best_low = fvg_low
+                best_high = fvg_high
+
+    if best_diff is None:
+        return False, 0.0, 0.0
+
+    return True, float(best_low), float(best_high)
+
+
+def detect_momentum_short(df_5m, params: SmcParams = DEFAULT_SMC_PARAMS):
+    """Momentum short: band RSI long dicerminkan (100 - RSI), mis. OK = RSI 26–52."""
+    f = feature_frame(df_5m)
+    if len(f) < 30:
+        return True, False
+
+    rsi_val = 100.0 - f.rsi14[-1]
+
+    momentum_ok = bool(params.rsi_ok_min <= rsi_val < params.rsi_ok_max)
+    momentum_premium = bool(params.rsi_premium_min <= rsi_val <= params.rsi_premium_max)
+
+    return momentum_ok, momentum_premium
+
+
+def detect_not_overextended_short(df_5m,
+                                  ema_period: int = 20,
+                                  max_distance_pct: float = DEFAULT_SMC_PARAMS.max_ema_distance_pct) -> bool:
+    """TRUE kalau close tidak lebih dari max_distance_pct di BAWAH EMA20."""
+    f = feature_frame(df_5m)
+    last_close = f.close[-1]
+    last_ema = f.ema(ema_period)[-1]
+
+    if last_ema <= 0:
+        return True
+
+    dist_pct = (last_ema - last_close) / last_ema
+    return not dist_pct > max_distance_pct
+
+
 # ============================================================
 #                  ENTRY / SL / TP GENERATION
 # ============================================================
 
-def build_entry_sl_tp_aggressive(df_5m: pd.DataFrame,
+def build_entry_sl_tp_aggressive(df_5m,
                                  fvg_low: float,
-                                 fvg_high: float) -> dict:
+                                 fvg_high: float,
+                                 atr_buffer: float = DEFAULT_SMC_PARAMS.sl_atr_buffer) -> SmcLevels:
     """
     Entry:
     - kalau ada micro FVG → pakai mid FVG
@@ -297,8 +533,9 @@ def build_entry_sl_tp_aggressive(df_5m: pd.DataFrame,
     TP:
     - kelipatan jarak entry–SL (scalping RR 1:1.2 / 1:2 / 1:3)
     """
-    closes = df_5m["close"].values
-    lows = df_5m["low"].values
+    f = feature_frame(df_5m)
+    closes = f.close
+    lows = f.low
 
     last_close = closes[-1]
 
@@ -312,11 +549,11 @@ def build_entry_sl_tp_aggressive(df_5m: pd.DataFrame,
 
     recent_low = lows[-5:].min()
 
-    atr_series = atr(df_5m, period=14)
-    atr_val = float(atr_series.iloc[-1]) if not np.isnan(atr_series.iloc[-1]) else 0.0
+    atr_last = f.atr14[-1]
+    atr_val = float(atr_last) if not np.isnan(atr_last) else 0.0
 
     if atr_val > 0:
-        buffer = atr_val * 0.3
+        buffer = atr_val * atr_buffer
     else:
         buffer = abs(last_close) * 0.002
 
@@ -330,21 +567,69 @@ def build_entry_sl_tp_aggressive(df_5m: pd.DataFrame,
     tp2 = entry + risk * 2.0
     tp3 = entry + risk * 3.0
 
-    return {
-        "entry": float(entry),
-        "sl": float(sl),
-        "tp1": float(tp1),
-        "tp2": float(tp2),
-        "tp3": float(tp3),
-        "risk_per_unit": float(risk),
-    }
+    return SmcLevels(
+        entry=float(entry),
+        sl=float(sl),
+        tp1=float(tp1),
+        tp2=float(tp2),
+        tp3=float(tp3),
+        risk_per_unit=float(risk),
+    )
+
+
+def build_entry_sl_tp_short(df_5m,
+                            fvg_low: float,
+                            fvg_high: float,
+                            atr_buffer: float = DEFAULT_SMC_PARAMS.sl_atr_buffer) -> SmcLevels:
+    """
+    Cermin build_entry_sl_tp_aggressive: entry = mid FVG bearish (sell on rally,
+    tidak di bawah close), SL di atas swing high pendek + buffer ATR, TP di bawah.
+    """
+    f = feature_frame(df_5m)
+    closes = f.close
+    highs = f.high
+
+    last_close = closes[-1]
+
+    if fvg_low and fvg_high and fvg_high > fvg_low:
+        raw_entry = (fvg_low + fvg_high) / 2.0
+    else:
+        raw_entry = last_close
+
+    entry = max(raw_entry, last_close)
+
+    recent_high = highs[-5:].max()
+
+    atr_last = f.atr14[-1]
+    atr_val = float(atr_last) if not np.isnan(atr_last) else 0.0
+
+    if atr_val > 0:
+        buffer = atr_val * atr_buffer
+    else:
+        buffer = abs(last_close) * 0.002
+
+    sl = recent_high + buffer
+
+    risk = abs(entry - sl)
+    if risk <= 0:
+        risk = max(abs(entry) * 0.003, 1e-8)
+
+    return SmcLevels(
+        entry=float(entry),
+        sl=float(sl),
+        tp1=float(entry - risk * 1.2),
+        tp2=float(entry - risk * 2.0),
+        tp3=float(entry - risk * 3.0),
+        risk_per_unit=float(risk),
+    )
 
 
 # ============================================================
 #                    ANALYZE SYMBOL (AGGRESSIVE)
 # ============================================================
 
-def analyse_symbol(symbol: str):
+def analyse_symbol(symbol: str, params: SmcParams = DEFAULT_SMC_PARAMS,
+                   hints: Optional[dict] = None):
     """
     Versi SMC Aggressive Scalping (LONG only, FUTURES):
     - Timeframe entry: 5m
@@ -367,15 +652,41 @@ def analyse_symbol(symbol: str):
         print(f"[{symbol}] Empty dataframe on one of TF (5m/15m/1h)")
         return None, None
 
-    bias_5m = detect_bias_5m(df_5m)
+    return analyse_frames(symbol, df_5m, df_15m, df_1h, params, hints)
+
+
+def analyse_frames(symbol: str,
+                   df_5m: pd.DataFrame,
+                   df_15m: pd.DataFrame,
+                   df_1h: pd.DataFrame,
+                   params: SmcParams = DEFAULT_SMC_PARAMS,
+                   hints: Optional[dict] = None):
+    """
+    Inti analyse_symbol tanpa fetch: jalankan semua detector di atas
+    DataFrame yang sudah ada (dipakai juga oleh backtest untuk verifikasi).
+    Satu FeatureFrame per timeframe dipakai bersama oleh semua detector.
+
+    hints (opsional): diisi bias 5m/15m/1H & RSI 5m terakhir, juga kalau syarat
+    inti gagal — dipakai close_scheduler untuk prioritas close berikutnya.
+    """
+    f5 = feature_frame(df_5m)
+    bias_5m = detect_bias_5m(f5)
     bias_15m = detect_bias_generic(df_15m)
     bias_1h = detect_bias_generic(df_1h)
 
-    micro_choch, micro_choch_premium = detect_micro_choch(df_5m)
-    micro_fvg, fvg_low, fvg_high = detect_micro_fvg(df_5m)
-    momentum_ok, momentum_premium = detect_momentum(df_5m)
-    not_choppy = detect_not_choppy(df_5m)
-    not_overextended = detect_not_overextended(df_5m)
+    micro_choch, micro_choch_premium = detect_micro_choch(f5, params)
+    micro_fvg, fvg_low, fvg_high = detect_micro_fvg(f5)
+    momentum_ok, momentum_premium = detect_momentum(f5, params)
+    not_choppy = detect_not_choppy(f5, params=params)
+    not_overextended = detect_not_overextended(
+        f5, max_distance_pct=params.max_ema_distance_pct
+    )
+
+    if hints is not None:
+        hints["bias_5m"] = bias_5m
+        hints["bias_15m"] = bias_15m
+        hints["bias_1h"] = bias_1h
+        hints["rsi"] = float(f5.rsi14[-1]) if len(f5) >= 30 else None
 
     # Syarat inti agresif (DILONGGARKAN):
     # Wajib:
@@ -402,17 +713,31 @@ def analyse_symbol(symbol: str):
     htf_15m_trend_ok = bias_15m
     htf_1h_trend_ok = bias_1h
 
-    last_high = df_5m["high"].iloc[-1]
-    last_low = df_5m["low"].iloc[-1]
+    last_high = f5.high[-1]
+    last_low = f5.low[-1]
     last_range = last_high - last_low
 
-    levels = build_entry_sl_tp_aggressive(df_5m, fvg_low, fvg_high)
-    entry = levels["entry"]
+    levels = build_entry_sl_tp_aggressive(f5, fvg_low, fvg_high, params.sl_atr_buffer)
+    entry = levels.entry
 
     # Anti entry di pucuk: kalau entry terlalu dekat high candle terakhir, skip
     if last_range > 0 and (last_high - entry) < (0.25 * last_range):
         return None, None
 
+    mask = conditions_mask(
+        bias_5m, htf_15m_trend_ok, htf_1h_trend_ok,
+        micro_choch, micro_choch_premium, micro_fvg,
+        momentum_ok, momentum_premium, not_choppy, not_overextended,
+    )
+    conditions = SmcConditions(symbol.upper(), mask, "5m")
+
+    return conditions, levels
+
+
+def conditions_mask(bias_5m, htf_15m_trend_ok, htf_1h_trend_ok,
+                    micro_choch, micro_choch_premium, micro_fvg,
+                    momentum_ok, momentum_premium, not_choppy, not_overextended) -> int:
+    """Flag detector → bitmask; setup_score (0–3) ikut di dalam mask, lihat smc_scoring.pack_conditions."""
     setup_score = 0
     if micro_choch_premium:
         setup_score += 1
@@ -421,20 +746,19 @@ def analyse_symbol(symbol: str):
     if momentum_premium:
         setup_score += 1
 
-    conditions = {
-        "symbol": symbol.upper(),
-        "timeframe": "5m",
-        "bias_ok": bias_5m,
-        "htf_15m_trend_ok": htf_15m_trend_ok,
-        "htf_1h_trend_ok": htf_1h_trend_ok,
-        "micro_choch": micro_choch,
-        "micro_choch_premium": micro_choch_premium,
-        "micro_fvg": micro_fvg,
-        "momentum_ok": momentum_ok,
-        "momentum_premium": momentum_premium,
-        "not_choppy": not_choppy,
-        "not_overextended": not_overextended,
-        "setup_score": setup_score,  # 0–3
-    }
-
-    return conditions, levels
+    mask = setup_score << SETUP_SHIFT
+    for flag, bit in (
+        (bias_5m, COND_BIT["bias_ok"]),
+        (htf_15m_trend_ok, COND_BIT["htf_15m_trend_ok"]),
+        (htf_1h_trend_ok, COND_BIT["htf_1h_trend_ok"]),
+        (micro_choch, COND_BIT["micro_choch"]),
+        (micro_choch_premium, COND_BIT["micro_choch_premium"]),
+        (micro_fvg, COND_BIT["micro_fvg"]),
+        (momentum_ok, COND_BIT["momentum_ok"]),
+        (momentum_premium, COND_BIT["momentum_premium"]),
+        (not_choppy, COND_BIT["not_choppy"]),
+        (not_overextended, COND_BIT["not_overextended"]),
+    ):
+        if flag:
+            mask |= bit
+    return mask
@@ -0,0 +1,103 @@
+# smc/smc_params.py
+# Threshold strategi & bobot scoring dalam satu tempat.
+# Default = nilai live yang sebelumnya hard-coded di smc_logic / smc_scoring.
+# Dipakai live (analyse_symbol, score_smc_signal) dan backtest/sweep.
+
+from dataclasses import dataclass, fields, replace
+
+
+@dataclass(frozen=True)
+class SmcParams:
+    """Threshold detector 5m (smc_logic)."""
+
+    # momentum (RSI 14)
+    rsi_ok_min: float = 48.0          # momentum_ok: rsi_ok_min <= RSI < rsi_ok_max
+    rsi_ok_max: float = 74.0
+    rsi_premium_min: float = 52.0     # momentum_premium: min <= RSI <= max
+    rsi_premium_max: float = 68.0
+
+    # micro CHoCH premium
+    body_mult: float = 1.3            # body >= body_mult x rata-rata body 8 candle
+    max_upper_wick: float = 0.25      # upper wick <= 25% range
+
+    # filter market
+    min_atr_pct: float = 0.003        # ATR < 0.3% harga → choppy
+    max_ema_distance_pct: float = 0.015  # close > EMA20 + 1.5% → overextended
+
+    # SL
+    sl_atr_buffer: float = 0.3        # SL = swing low - 0.3 x ATR
+
+
+@dataclass(frozen=True)
+class ScoreParams:
+    """Bobot scoring & batas tier (smc_scoring)."""
+
+    w_bias: int = 20
+    w_htf_15m: int = 15
+    w_htf_1h: int = 15
+    w_micro_choch: int = 20
+    w_micro_choch_premium: int = 20
+    w_micro_fvg: int = 10
+    w_momentum: int = 20
+    w_momentum_premium: int = 15
+    w_not_choppy: int = 10
+    w_not_overextended: int = 10
+    synergy_base: int = 10
+    synergy_per_setup: int = 2
+    max_score: int = 150
+
+    tier_aplus: int = 125
+    tier_a: int = 100
+    tier_b: int = 80
+
+
+DEFAULT_SMC_PARAMS = SmcParams()
+DEFAULT_SCORE_PARAMS = ScoreParams()
+
+SMC_FIELDS = {f.name: f.type for f in fields(SmcParams)}
+SCORE_FIELDS = {f.name: f.type for f in fields(ScoreParams)}
+
+
+@dataclass(frozen=True)
+class Strategy:
+    """
+    Parameter strategi live (threshold + scoring) sebagai satu objek immutable.
+    Hot reload mengganti referensinya sekaligus: satu analisa selalu memakai
+    SmcParams & ScoreParams dari versi yang sama.
+    """
+
+    smc: SmcParams = DEFAULT_SMC_PARAMS
+    score: ScoreParams = DEFAULT_SCORE_PARAMS
+    version: int = 0
+
+    def overrides(self) -> dict:
+        """Field yang berbeda dari default (format sama dengan STRATEGY_FILE / --grid sweep)."""
+        out = {}
+        for obj, default, names in ((self.smc, DEFAULT_SMC_PARAMS, SMC_FIELDS),
+                                    (self.score, DEFAULT_SCORE_PARAMS, SCORE_FIELDS)):
+            for name in names:
+                v = getattr(obj, name)
+                if v != getattr(default, name):
+                    out[name] = v
+        return out
+
+
+def strategy_from_overrides(overrides: dict, version: int = 0) -> Strategy:
+    """{'rsi_ok_min': 50, 'tier_a': 95} → Strategy. ValueError kalau nama / nilai salah."""
+    smc, score = {}, {}
+    for name, value in overrides.items():
+        if name in SMC_FIELDS:
+            smc[name] = float(value)
+        elif name in SCORE_FIELDS:
+            if float(value) != int(value):
+                raise ValueError(f"{name} harus bilangan bulat: {value}")
+            score[name] = int(value)
+        else:
+            raise ValueError(f"Parameter strategi tidak dikenal: {name}")
+    s = replace(DEFAULT_SMC_PARAMS, **smc)
+    w = replace(DEFAULT_SCORE_PARAMS, **score)
+    if not (s.rsi_ok_min < s.rsi_ok_max and s.rsi_premium_min <= s.rsi_premium_max):
+        raise ValueError("rentang RSI tidak valid (min harus < max)")
+    if not (w.tier_b <= w.tier_a <= w.tier_aplus):
+        raise ValueError("batas tier harus tier_b <= tier_a <= tier_aplus")
+    return Strategy(s, w, version)
@@ -3,10 +3,52 @@
 # SMC AGGRESSIVE SCALPING SCORING (PREMIUM)
 # =========================
 
+from functools import lru_cache
 from typing import Dict
 
-
-def score_smc_signal(c: Dict) -> int:
+import numpy as np
+
+from smc.smc_params import ScoreParams, DEFAULT_SCORE_PARAMS
+
+# ================== BITMASK KONDISI ==================
+# Urutan bit TETAP (dipakai juga oleh data yang disimpan) — hanya boleh ditambah di belakang.
+COND_KEYS = (
+    "bias_ok",
+    "htf_15m_trend_ok",
+    "htf_1h_trend_ok",
+    "micro_choch",
+    "micro_choch_premium",
+    "micro_fvg",
+    "momentum_ok",
+    "momentum_premium",
+    "not_choppy",
+    "not_overextended",
+)
+COND_BIT = {k: 1 << i for i, k in enumerate(COND_KEYS)}
+SETUP_SHIFT = len(COND_KEYS)          # setup_score (0–3) di bit 10–11
+MASK_SPACE = 1 << (SETUP_SHIFT + 2)   # 4096 kombinasi
+
+TIERS = ("NONE", "B", "A", "A+")
+TIER_RANK = {t: i for i, t in enumerate(TIERS)}
+
+
+def pack_conditions(c: Dict) -> int:
+    """dict conditions → int (10 bit flag + 2 bit setup_score)."""
+    mask = 0
+    for k, bit in COND_BIT.items():
+        if c.get(k):
+            mask |= bit
+    setup = max(0, min(int(c.get("setup_score") or 0), 3))
+    return mask | (setup << SETUP_SHIFT)
+
+
+def unpack_conditions(mask: int) -> Dict:
+    out = {k: bool(mask & bit) for k, bit in COND_BIT.items()}
+    out["setup_score"] = (mask >> SETUP_SHIFT) & 0b11
+    return out
+
+
+def _score_reference(c: Dict, weights: ScoreParams = DEFAULT_SCORE_PARAMS) -> int:
     """
     Scoring untuk setup Aggressive Scalping (0–150-an).
     Lebih sensitif ke:
@@ -34,37 +76,37 @@ def score_smc_signal(c: Dict) -> int:
 
     # 1) Bias + HTF
     if bias_ok:
-        score += 20
+        score += weights.w_bias
 
     if htf_15m_trend_ok:
-        score += 15
+        score += weights.w_htf_15m
 
     if htf_1h_trend_ok:
-        score += 15
+        score += weights.w_htf_1h
 
     # 2) Micro structure
     if micro_choch:
-        score += 20
+        score += weights.w_micro_choch
 
     if micro_choch_premium:
-        score += 20   # candle impuls premium lebih dihargai
+        score += weights.w_micro_choch_premium   # candle impuls premium lebih dihargai
 
     if micro_fvg:
-        score += 10
+        score += weights.w_micro_fvg
 
     # 3) Momentum (RSI)
     if momentum_ok:
-        score += 20
+        score += weights.w_momentum
 
     if momentum_premium:
-        score += 15
+        score += weights.w_momentum_premium
 
     # 4) Market quality
     if not_choppy:
-        score += 10
+        score += weights.w_not_choppy
 
     if not_overextended:
-        score += 10
+        score += weights.w_not_overextended
 
     # 5) Synergy bonus
     if (
@@ -74,12 +116,49 @@ def score_smc_signal(c: Dict) -> int:
         and micro_choch_premium
         and momentum_premium
     ):
-        score += 10 + setup_score_internal * 2  # max +16
+        # default: 10 + setup * 2 → max +16
+        score += weights.synergy_base + setup_score_internal * weights.synergy_per_setup
+
+    return int(min(score, weights.max_score))
+
+
+# ================== LOOKUP TABLE ==================
+
+# Live cukup beberapa LUT (strategi aktif + versi sebelum hot reload); dibatasi supaya
+# pemakai banyak bobot tidak menumpuk tabel. Sweep memakai score_masks(cache=False).
+LUT_CACHE_SIZE = 16
+
+
+@lru_cache(maxsize=LUT_CACHE_SIZE)
+def _lut(weights: ScoreParams):
+    """(score_list, tier_rank_list, score_np, tier_rank_np) untuk semua 4096 mask."""
+    scores = [_score_reference(unpack_conditions(m), weights) for m in range(MASK_SPACE)]
+    ranks = [TIER_RANK[tier_from_score(sc, weights)] for sc in scores]
+    return scores, ranks, np.array(scores, dtype=np.int16), np.array(ranks, dtype=np.int8)
+
+
+def warm_lut(weights: ScoreParams):
+    """Bangun LUT bobot baru di luar hot path (dipanggil sebelum strategi di-swap)."""
+    _lut(weights)
+
+
+def score_from_mask(mask: int, weights: ScoreParams = DEFAULT_SCORE_PARAMS) -> int:
+    return _lut(weights)[0][mask]
+
+
+def tier_from_mask(mask: int, weights: ScoreParams = DEFAULT_SCORE_PARAMS) -> str:
+    return TIERS[_lut(weights)[1][mask]]
+
 
-    return int(min(score, 150))
+def score_smc_signal(c: Dict, weights: ScoreParams = DEFAULT_SCORE_PARAMS) -> int:
+    """Skor via lookup table (hasil identik dengan _score_reference)."""
+    mask = c.get("mask")
+    if mask is None:
+        mask = pack_conditions(c)
+    return _lut(weights)[0][mask]
 
 
-def tier_from_score(score: int) -> str:
+def tier_from_score(score: int, weights: ScoreParams = DEFAULT_SCORE_PARAMS) -> str:
     """
     Tier:
     - A+ : >= 125
@@ -87,11 +166,11 @@ def tier_from_score(score: int) -> str:
     - B  : 80–99
     - NONE : < 80
     """
-    if score >= 125:
+    if score >= weights.tier_aplus:
         return "A+"
-    elif score >= 100:
+    elif score >= weights.tier_a:
         return "A"
-    elif score >= 80:
+    elif score >= weights.tier_b:
         return "B"
     else:
         return "NONE"
@@ -101,26 +180,76 @@ def should_send_tier(tier: str, min_tier: str) -> bool:
     """
     Urutan: NONE < B < A < A+
     """
-    order = {"NONE": 0, "B": 1, "A": 2, "A+": 3}
-    return order.get(tier, 0) >= order.get(min_tier, 2)
+    return TIER_RANK.get(tier, 0) >= TIER_RANK.get(min_tier, 2)
 
 
-def evaluate_smc_signal(conditions: Dict, min_tier: str = "A") -> Dict:
+class SignalEval:
+    """Hasil evaluate_smc_signal (bisa dibaca seperti dict: res["score"])."""
+
+    __slots__ = ("score", "tier", "should_send")
+
+    def __init__(self, score: int, tier: str, should_send: bool):
+        self.score = score
+        self.tier = tier
+        self.should_send = should_send
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __repr__(self) -> str:
+        return f"SignalEval(score={self.score}, tier={self.tier}, should_send={self.should_send})"
+
+
+def evaluate_smc_signal(conditions, min_tier: str = "A",
+                        weights: ScoreParams = DEFAULT_SCORE_PARAMS) -> SignalEval:
     """
     Helper kecil supaya enak dipakai di kode lain.
+    conditions: SmcConditions (smc_types) atau dict lama.
 
-    Return dict:
-    {
-        "score": int,
-        "tier": str,
-        "should_send": bool
-    }
+    Return SignalEval(score, tier, should_send).
+    """
+    mask = conditions.get("mask")
+    if mask is None:
+        mask = pack_conditions(conditions)
+    scores, ranks, _, _ = _lut(weights)
+    rank = ranks[mask]
+    return SignalEval(scores[mask], TIERS[rank], rank >= TIER_RANK.get(min_tier, 2))
+
+
+# ================== BATCH (NUMPY) ==================
+
+def pack_condition_arrays(flags: Dict[str, np.ndarray], setup_score: np.ndarray) -> np.ndarray:
+    """Versi array pack_conditions: flags[k] bool array, setup_score int array."""
+    mask = np.zeros(len(setup_score), dtype=np.int64)
+    for k, bit in COND_BIT.items():
+        mask |= np.asarray(flags[k], dtype=bool).astype(np.int64) * bit
+    setup = np.clip(np.asarray(setup_score, dtype=np.int64), 0, 3)
+    return mask | (setup << SETUP_SHIFT)
+
+
+def score_masks(masks: np.ndarray, weights: ScoreParams = DEFAULT_SCORE_PARAMS,
+                cache: bool = True):
+    """
+    Skor + tier_rank untuk banyak mask sekaligus (mis. semua simbol dari satu close).
+    cache=False: bobot sekali pakai (sweep) — hanya mask yang muncul yang dihitung,
+    tanpa membangun / menyimpan LUT.
     """
-    score = score_smc_signal(conditions)
-    tier = tier_from_score(score)
-    send = should_send_tier(tier, min_tier)
-    return {
-        "score": score,
-        "tier": tier,
-        "should_send": send,
-    }
+    masks = np.asarray(masks, dtype=np.int64)
+    if cache:
+        _, _, score_np, rank_np = _lut(weights)
+        return score_np[masks], rank_np[masks]
+    uniq, inv = np.unique(masks, return_inverse=True)
+    inv = inv.reshape(masks.shape)
+    scores = [_score_reference(unpack_conditions(int(m)), weights) for m in uniq]
+    ranks = [TIER_RANK[tier_from_score(sc, weights)] for sc in scores]
+    return np.array(scores, dtype=np.int16)[inv], np.array(ranks, dtype=np.int8)[inv]
+
+
+def evaluate_masks(masks: np.ndarray, min_tier: str = "A",
+                   weights: ScoreParams = DEFAULT_SCORE_PARAMS):
+    """Batch evaluate_smc_signal. Return (score, tier_rank, should_send) array."""
+    scores, ranks = score_masks(masks, weights)
+    return scores, ranks, ranks >= TIER_RANK.get(min_tier, 2)
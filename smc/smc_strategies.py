@@ -0,0 +1,358 @@
+# smc/smc_strategies.py
+# Engine strategi plugin: beberapa strategi dievaluasi di atas SATU pass data per
+# simbol per close (satu fetch / view KlineShm, satu FeatureFrame per timeframe).
+#
+#   FeatureStore   : satu pass. FeatureFrame 5m/15m/1H (EMA/RSI/ATR/body dimemo) +
+#                    memo fitur per key (nama, side, field parameter yang dipakai fitur
+#                    itu). Strategi lain yang butuh fitur dengan key sama → hit memo.
+#   SignalStrategy : plugin. `features` = fitur wajib (dihitung engine di depan, biayanya
+#                    dibagi rata ke strategi yang mendeklarasikannya); evaluate(store, params)
+#                    → (SmcConditions, SmcLevels) atau (None, None).
+#   SmcStrategy    : SMC aggressive scalping; side "long" = analyse_frames (hasil identik),
+#                    side "short" = detector cermin (smc_logic, bagian SHORT).
+#   StrategyEngine : analyse(...) → list StrategySignal, ditag nama & side strategi.
+#
+# Daftar strategi dari config.STRATEGIES: "jenis" atau "nama=jenis", diikuti override
+# ":field=nilai" di atas Strategy live (hot reload), mis.
+#   STRATEGIES=smc_long,smc_short,ketat=smc_long:rsi_ok_min=55:tier_a=105
+# Jenis baru: register_strategy("nama_jenis", factory(nama, overrides)).
+# Biaya per strategi dicatat di core/strategy_costs.py (/strategies).
+
+import time
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import STRATEGIES
+from core.strategy_costs import costs
+from smc import smc_logic
+from smc.smc_params import SMC_FIELDS, Strategy, strategy_from_overrides
+from smc.smc_types import SmcConditions, SmcLevels
+
+LONG = "long"
+SHORT = "short"
+DEFAULT_STRATEGY = "smc_long"   # tag kandidat / jurnal lama tanpa field strategy
+
+_MISSING = object()
+
+
+# ================== FITUR ==================
+
+class Feature:
+    """fn(store, side, SmcParams) → nilai; key memo = nama (+ side) + nilai `fields`."""
+    __slots__ = ("fn", "fields", "sided")
+
+    def __init__(self, fn: Callable, fields: Tuple[str, ...] = (), sided: bool = True):
+        self.fn = fn
+        self.fields = fields
+        self.sided = sided
+
+
+def _bias(tf: str):
+    def fn(store, side, p):
+        detect = smc_logic.detect_bias_generic if side == LONG else smc_logic.detect_bias_generic_short
+        return detect(store.frame(tf))
+    return fn
+
+
+def _choch(store, side, p):
+    detect = smc_logic.detect_micro_choch if side == LONG else smc_logic.detect_micro_choch_short
+    return detect(store.f5, p)
+
+
+def _fvg(store, side, p):
+    detect = smc_logic.detect_micro_fvg if side == LONG else smc_logic.detect_micro_fvg_short
+    return detect(store.f5)
+
+
+def _momentum(store, side, p):
+    detect = smc_logic.detect_momentum if side == LONG else smc_logic.detect_momentum_short
+    return detect(store.f5, p)
+
+
+def _not_choppy(store, side, p):
+    return smc_logic.detect_not_choppy(store.f5, params=p)
+
+
+def _not_overextended(store, side, p):
+    detect = smc_logic.detect_not_overextended if side == LONG else smc_logic.detect_not_overextended_short
+    return detect(store.f5, max_distance_pct=p.max_ema_distance_pct)
+
+
+def _levels(store, side, p):
+    _, fvg_low, fvg_high = store.get("fvg", side, p)
+    build = smc_logic.build_entry_sl_tp_aggressive if side == LONG else smc_logic.build_entry_sl_tp_short
+    return build(store.f5, fvg_low, fvg_high, p.sl_atr_buffer)
+
+
+def _rsi(store, side, p):
+    return float(store.f5.rsi14[-1]) if len(store.f5) >= 30 else None
+
+
+FEATURES: Dict[str, Feature] = {
+    "bias_5m": Feature(_bias("5m")),
+    "bias_15m": Feature(_bias("15m")),
+    "bias_1h": Feature(_bias("1h")),
+    "choch": Feature(_choch, ("body_mult", "max_upper_wick")),
+    "fvg": Feature(_fvg),
+    "momentum": Feature(_momentum, ("rsi_ok_min", "rsi_ok_max", "rsi_premium_min", "rsi_premium_max")),
+    "not_choppy": Feature(_not_choppy, ("min_atr_pct",), sided=False),
+    "not_overextended": Feature(_not_overextended, ("max_ema_distance_pct",)),
+    "levels": Feature(_levels, ("sl_atr_buffer",)),
+    "rsi": Feature(_rsi, sided=False),
+}
+
+
+class FeatureStore:
+    """Fitur satu simbol untuk satu close; dibuang setelah semua strategi dievaluasi."""
+
+    __slots__ = ("symbol", "f5", "f15", "f1h", "_memo", "timings")
+
+    def __init__(self, symbol: str, df_5m, df_15m, df_1h):
+        self.symbol = symbol.upper()
+        self.f5 = smc_logic.feature_frame(df_5m)
+        self.f15 = smc_logic.feature_frame(df_15m)
+        self.f1h = smc_logic.feature_frame(df_1h)
+        self._memo: Dict[tuple, object] = {}
+        self.timings: Dict[str, list] = {}   # fitur → [dihitung, detik]
+
+    def frame(self, tf: str):
+        return self.f5 if tf == "5m" else self.f15 if tf == "15m" else self.f1h
+
+    @staticmethod
+    def key(name: str, side: str, params) -> tuple:
+        feat = FEATURES[name]
+        return (name, side if feat.sided else None) + tuple(getattr(params, f) for f in feat.fields)
+
+    def get(self, name: str, side: str, params):
+        k = self.key(name, side, params)
+        val = self._memo.get(k, _MISSING)
+        if val is _MISSING:
+            t0 = time.perf_counter()
+            val = FEATURES[name].fn(self, side, params)
+            dt = time.perf_counter() - t0
+            self._memo[k] = val
+            t = self.timings.setdefault(name, [0, 0.0])
+            t[0] += 1
+            t[1] += dt
+        return val
+
+
+# ================== STRATEGI ==================
+
+class SignalStrategy:
+    """Basis plugin. Subclass mengisi `features` dan evaluate()."""
+
+    features: Tuple[str, ...] = ()
+
+    def __init__(self, name: str, side: str, overrides: Optional[dict] = None):
+        self.name = name
+        self.side = side
+        self.overrides = dict(overrides or {})
+        self._smc = {k: v for k, v in self.overrides.items() if k in SMC_FIELDS}
+        self._score = {k: v for k, v in self.overrides.items() if k not in SMC_FIELDS}
+        self._base: Optional[Strategy] = None
+        self._params: Optional[Strategy] = None
+
+    def params(self, base: Strategy) -> Strategy:
+        """Strategy live + override strategi ini (di-cache per versi Strategy live)."""
+        if not self.overrides:
+            return base
+        if base is not self._base:
+            self._params = Strategy(replace(base.smc, **self._smc), replace(base.score, **self._score),
+                                    base.version)
+            self._base = base
+        return self._params
+
+    def evaluate(self, store: FeatureStore, params) -> Tuple[Optional[SmcConditions], Optional[SmcLevels]]:
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        extra = "".join(f":{k}={v}" for k, v in self.overrides.items())
+        return f"{self.name}({self.side}{extra})"
+
+
+class SmcStrategy(SignalStrategy):
+    """SMC aggressive scalping; aturan sama dengan smc_logic.analyse_frames per side."""
+
+    features = ("bias_5m", "bias_15m", "bias_1h", "choch", "fvg", "momentum",
+                "not_choppy", "not_overextended")
+
+    def evaluate(self, store: FeatureStore, params):
+        side = self.side
+        bias_5m = store.get("bias_5m", side, params)
+        bias_15m = store.get("bias_15m", side, params)
+        bias_1h = store.get("bias_1h", side, params)
+        micro_choch, micro_choch_premium = store.get("choch", side, params)
+        micro_fvg = store.get("fvg", side, params)[0]
+        momentum_ok, momentum_premium = store.get("momentum", side, params)
+        not_choppy = store.get("not_choppy", side, params)
+        not_overextended = store.get("not_overextended", side, params)
+
+        if not (bias_5m and bias_15m and bias_1h and momentum_ok and micro_choch and not_overextended):
+            return None, None
+
+        levels = store.get("levels", side, params)
+        last_high = store.f5.high[-1]
+        last_low = store.f5.low[-1]
+        last_range = last_high - last_low
+        # anti entry di pucuk (long) / di dasar (short) candle terakhir
+        room = (last_high - levels.entry) if side == LONG else (levels.entry - last_low)
+        if last_range > 0 and room < (0.25 * last_range):
+            return None, None
+
+        mask = smc_logic.conditions_mask(
+            bias_5m, bias_15m, bias_1h,
+            micro_choch, micro_choch_premium, micro_fvg,
+            momentum_ok, momentum_premium, not_choppy, not_overextended,
+        )
+        return SmcConditions(store.symbol, mask, "5m"), levels
+
+
+# jenis → factory(nama, overrides)
+KINDS: Dict[str, Callable[[str, dict], SignalStrategy]] = {
+    "smc_long": lambda name, o: SmcStrategy(name, LONG, o),
+    "smc_short": lambda name, o: SmcStrategy(name, SHORT, o),
+}
+
+
+def register_strategy(kind: str, factory: Callable[[str, dict], SignalStrategy]):
+    """Daftarkan jenis strategi baru (dipakai di STRATEGIES sebagai `nama=kind`)."""
+    KINDS[kind] = factory
+
+
+def parse_strategies(spec: str) -> List[SignalStrategy]:
+    """'smc_long,ketat=smc_long:rsi_ok_min=55' → list strategi. ValueError kalau spec salah."""
+    out: List[SignalStrategy] = []
+    for entry in (e.strip() for e in spec.split(",")):
+        if not entry:
+            continue
+        head, *pairs = entry.split(":")
+        name, _, kind = head.partition("=")
+        name, kind = name.strip(), (kind or name).strip()
+        if kind not in KINDS:
+            raise ValueError(f"jenis strategi tidak dikenal: {kind} (ada: {', '.join(KINDS)})")
+        overrides = {}
+        for pair in pairs:
+            k, sep, v = pair.partition("=")
+            if not sep:
+                raise ValueError(f"override harus field=nilai: {pair!r} di {name}")
+            overrides[k.strip()] = v.strip()
+        # validasi nama / tipe / rentang sama dengan STRATEGY_FILE
+        checked = strategy_from_overrides(overrides)
+        overrides = {k: getattr(checked.smc if k in SMC_FIELDS else checked.score, k) for k in overrides}
+        if any(s.name == name for s in out):
+            raise ValueError(f"nama strategi dobel: {name}")
+        out.append(KINDS[kind](name, overrides))
+    if not out:
+        raise ValueError("STRATEGIES kosong")
+    return out
+
+
+# ================== ENGINE ==================
+
+class StrategySignal:
+    """Hasil satu strategi untuk satu simbol / close (belum di-scoring)."""
+
+    __slots__ = ("strategy", "side", "conditions", "levels", "weights")
+
+    def __init__(self, strategy: str, side: str, conditions: SmcConditions, levels: SmcLevels, weights):
+        self.strategy = strategy
+        self.side = side
+        self.conditions = conditions
+        self.levels = levels
+        self.weights = weights   # ScoreParams strategi ini (LUT scoring)
+
+    def __repr__(self) -> str:
+        return f"StrategySignal({self.strategy}, {self.conditions!r})"
+
+
+class StrategyEngine:
+    def __init__(self, strategies: List[SignalStrategy]):
+        self.strategies = list(strategies)
+        for s in self.strategies:
+            costs.register(s.name, s.side)
+
+    def analyse(self, symbol: str, df_5m, df_15m, df_1h, base: Strategy,
+                hints: Optional[dict] = None) -> List[StrategySignal]:
+        """
+        Satu pass: fitur wajib semua strategi dihitung sekali (union key), lalu tiap
+        strategi dievaluasi dari memo. hints: per side strategi aktif,
+        hints[side] = bias 5m/15m/1H & RSI 5m seperti analyse_frames (close_scheduler).
+        """
+        store = FeatureStore(symbol, df_5m, df_15m, df_1h)
+        plans = [(s, s.params(base)) for s in self.strategies]
+
+        owners: Dict[tuple, List[str]] = {}
+        order = []
+        for s, p in plans:
+            for name in s.features:
+                k = store.key(name, s.side, p.smc)
+                if k not in owners:
+                    owners[k] = []
+                    order.append((k, name, s.side, p.smc))
+                owners[k].append(s.name)
+        shared = {s.name: 0.0 for s in self.strategies}
+        for k, name, side, smc in order:
+            t0 = time.perf_counter()
+            store.get(name, side, smc)
+            share = (time.perf_counter() - t0) / len(owners[k])
+            for owner in owners[k]:
+                shared[owner] += share
+
+        out: List[StrategySignal] = []
+        per: Dict[str, tuple] = {}
+        for s, p in plans:
+            t0 = time.perf_counter()
+            conditions, levels = s.evaluate(store, p.smc)
+            own = time.perf_counter() - t0
+            hit = conditions is not None and levels is not None
+            per[s.name] = (int(hit), own, shared[s.name])
+            if hit:
+                out.append(StrategySignal(s.name, s.side, conditions, levels, p.score))
+
+        if hints is not None:
+            self._hints(store, plans, hints)
+        costs.record_pass(per, store.timings)
+        return out
+
+    @staticmethod
+    def _hints(store: FeatureStore, plans, hints: dict):
+        for side in dict.fromkeys(s.side for s, _ in plans):
+            p = next(p.smc for s, p in plans if s.side == side)
+            rsi = store.get("rsi", side, p)
+            hints[side] = {
+                "bias_5m": store.get("bias_5m", side, p),
+                "bias_15m": store.get("bias_15m", side, p),
+                "bias_1h": store.get("bias_1h", side, p),
+                # short: RSI dicerminkan supaya band momentum close_scheduler tetap berlaku
+                "rsi": rsi if rsi is None or side == LONG else 100.0 - rsi,
+            }
+
+
+def build_engine(spec: str = STRATEGIES) -> StrategyEngine:
+    try:
+        strategies = parse_strategies(spec)
+    except ValueError as e:
+        print(f"STRATEGIES={spec!r} tidak valid ({e}), pakai {DEFAULT_STRATEGY}.")
+        strategies = parse_strategies(DEFAULT_STRATEGY)
+    return StrategyEngine(strategies)
+
+
+engine = build_engine()
+
+
+def analyse_symbol(symbol: str, base: Strategy, hints: Optional[dict] = None) -> List[StrategySignal]:
+    """Fetch 5m/15m/1H sekali (REST), evaluasi semua strategi terdaftar."""
+    try:
+        df_5m = smc_logic.get_klines(symbol, "5m", 220)
+        df_15m = smc_logic.get_klines(symbol, "15m", 220)
+        df_1h = smc_logic.get_klines(symbol, "1h", 220)
+    except Exception as e:
+        print(f"[{symbol}] ERROR fetching data:", e)
+        return []
+
+    if any(df is None or df.empty for df in (df_5m, df_15m, df_1h)):
+        print(f"[{symbol}] Empty dataframe on one of TF (5m/15m/1h)")
+        return []
+
+    return engine.analyse(symbol, df_5m, df_15m, df_1h, base, hints)
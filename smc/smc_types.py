@@ -0,0 +1,169 @@
+# smc/smc_types.py
+# Record ringkas untuk hasil analisa (pengganti dict conditions/levels).
+#
+# - SmcConditions: flag kondisi disimpan sebagai SATU int bitmask (lihat
+#   smc_scoring.COND_KEYS) + symbol/timeframe. Flag dibaca lewat property.
+# - SmcLevels: entry/SL/TP dalam __slots__ (float).
+# - SignalBatch: bentuk kolom untuk semua hasil dari satu close
+#   (mask int16 + matriks level float64), dievaluasi sekaligus via LUT.
+#
+# SmcConditions & SmcLevels tetap bisa dibaca seperti dict (c["bias_ok"],
+# c.get(...), to_dict()) supaya kode lama / log tidak rusak.
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from smc.smc_params import ScoreParams, DEFAULT_SCORE_PARAMS
+from smc.smc_scoring import (
+    COND_BIT,
+    COND_KEYS,
+    SETUP_SHIFT,
+    evaluate_masks,
+    pack_conditions,
+)
+
+LEVEL_KEYS = ("entry", "sl", "tp1", "tp2", "tp3", "risk_per_unit")
+
+
+class SmcConditions:
+    __slots__ = ("symbol", "timeframe", "mask")
+
+    def __init__(self, symbol: str, mask: int, timeframe: str = "5m"):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.mask = mask
+
+    @classmethod
+    def from_flags(cls, symbol: str, timeframe: str = "5m", **flags) -> "SmcConditions":
+        return cls(symbol, pack_conditions(flags), timeframe)
+
+    @property
+    def setup_score(self) -> int:
+        return (self.mask >> SETUP_SHIFT) & 0b11
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def to_dict(self) -> Dict:
+        out = {"symbol": self.symbol, "timeframe": self.timeframe}
+        for k in COND_KEYS:
+            out[k] = getattr(self, k)
+        out["setup_score"] = self.setup_score
+        out["mask"] = self.mask
+        return out
+
+    def __repr__(self) -> str:
+        on = [k for k in COND_KEYS if getattr(self, k)]
+        return f"SmcConditions({self.symbol}, setup={self.setup_score}, {'+'.join(on) or '-'})"
+
+
+def _flag(bit: int):
+    return property(lambda self: bool(self.mask & bit))
+
+
+for _key, _bit in COND_BIT.items():
+    setattr(SmcConditions, _key, _flag(_bit))
+
+
+class SmcLevels:
+    __slots__ = LEVEL_KEYS
+
+    def __init__(self, entry: float, sl: float, tp1: float, tp2: float, tp3: float,
+                 risk_per_unit: float):
+        self.entry = entry
+        self.sl = sl
+        self.tp1 = tp1
+        self.tp2 = tp2
+        self.tp3 = tp3
+        self.risk_per_unit = risk_per_unit
+
+    def as_tuple(self) -> Tuple[float, ...]:
+        return (self.entry, self.sl, self.tp1, self.tp2, self.tp3, self.risk_per_unit)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def items(self):
+        return zip(LEVEL_KEYS, self.as_tuple())
+
+    def to_dict(self) -> Dict[str, float]:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"SmcLevels(entry={self.entry:.6g}, sl={self.sl:.6g}, tp1={self.tp1:.6g})"
+
+
+class SignalBatch:
+    """
+    Hasil analisa satu close (semua simbol) dalam bentuk kolom.
+    Kapasitas tumbuh x2 kalau penuh; reset() dipakai ulang di close berikutnya.
+    """
+
+    __slots__ = ("symbols", "masks", "levels", "n")
+
+    def __init__(self, capacity: int = 256):
+        self.symbols: List[str] = []
+        self.masks = np.zeros(capacity, dtype=np.int16)
+        self.levels = np.zeros((capacity, len(LEVEL_KEYS)), dtype=np.float64)
+        self.n = 0
+
+    def __len__(self) -> int:
+        return self.n
+
+    def reset(self):
+        self.symbols.clear()
+        self.n = 0
+
+    def _grow(self):
+        cap = max(1, len(self.masks)) * 2
+        masks = np.zeros(cap, dtype=np.int16)
+        masks[: self.n] = self.masks[: self.n]
+        levels = np.zeros((cap, len(LEVEL_KEYS)), dtype=np.float64)
+        levels[: self.n] = self.levels[: self.n]
+        self.masks, self.levels = masks, levels
+
+    def add(self, conditions: SmcConditions, levels: SmcLevels) -> int:
+        if self.n == len(self.masks):
+            self._grow()
+        i = self.n
+        self.symbols.append(conditions.symbol)
+        self.masks[i] = conditions.mask
+        self.levels[i] = levels.as_tuple()
+        self.n = i + 1
+        return i
+
+    def evaluate(self, min_tier: str = "A", weights: ScoreParams = DEFAULT_SCORE_PARAMS):
+        """(score, tier_rank, should_send) array untuk semua baris."""
+        return evaluate_masks(self.masks[: self.n], min_tier, weights)
+
+    def row(self, i: int, timeframe: str = "5m") -> Tuple[SmcConditions, SmcLevels]:
+        return (
+            SmcConditions(self.symbols[i], int(self.masks[i]), timeframe),
+            SmcLevels(*self.levels[i].tolist()),
+        )
+
+    def memory_bytes(self) -> int:
+        return int(self.masks.nbytes + self.levels.nbytes)
+
+
+def as_conditions(c) -> Optional[SmcConditions]:
+    """Terima SmcConditions atau dict lama → SmcConditions."""
+    if c is None or isinstance(c, SmcConditions):
+        return c
+    mask = c.get("mask")
+    if mask is None:
+        mask = pack_conditions(c)
+    return SmcConditions(c.get("symbol", ""), mask, c.get("timeframe", "5m"))
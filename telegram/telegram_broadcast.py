@@ -2,28 +2,57 @@
 # broadcast_signal + build_signal_message
 
 import time
+from typing import Dict, Optional
 
 from config import TELEGRAM_ADMIN_ID
-from core.bot_state import state, is_vip, cleanup_expired_vip
+from core.bot_state import state, is_vip, cleanup_expired_vip, prune_daily_counts, save_daily_counts
+from smc.smc_types import SmcConditions, SmcLevels
 from telegram.telegram_common import send_telegram
 
 
-def broadcast_signal(text: str):
-    """Kirim sinyal:
-    - SELALU ke admin (unlimited)
-    - Juga ke semua subscribers (FREE:max 2 sinyal per hari / VIP: unlimited)
-    """
+FREE_DAILY_LIMIT = 2   # sinyal per hari untuk user FREE
+
+
+def roll_daily_counts():
+    """Hari baru → reset kuota harian FREE & bersihkan VIP expired."""
     today = time.strftime("%Y-%m-%d")
     if state.daily_date != today:
         state.daily_date = today
         state.daily_counts = {}
+        prune_daily_counts()
         cleanup_expired_vip()
         print("Reset daily_counts & cleanup VIP untuk hari baru:", today)
 
+
+def broadcast_signal(text: str, vip_only: bool = False, sent_ids: Optional[Dict[int, int]] = None,
+                     symbol: Optional[str] = None, tier: Optional[str] = None):
+    """Kirim sinyal:
+    - SELALU ke admin (unlimited)
+    - Juga ke semua subscribers (FREE:max 2 sinyal per hari / VIP: unlimited)
+    vip_only=True → hanya admin & VIP (mis. ringkasan top-K, tidak memakan kuota FREE).
+    sent_ids (opsional) diisi chat_id → message_id (reply hasil TP/SL).
+    symbol & tier (sinyal) → filter per user (/filter); yang tersaring tidak memakan kuota.
+    Kuota & penerima hanya dihitung kalau sendMessage benar-benar terkirim (ada message_id).
+    Return jumlah penerima.
+    """
+    blocked = state.filters.blocked(symbol, tier) if symbol and tier else set()
+
+    def send(cid: int) -> bool:
+        mid = send_telegram(text, chat_id=cid)
+        if mid is None:
+            return False
+        if sent_ids is not None:
+            sent_ids[cid] = mid
+        return True
+
+    roll_daily_counts()
+    recipients = 0
+
     # admin
     if TELEGRAM_ADMIN_ID:
         try:
-            send_telegram(text, chat_id=int(TELEGRAM_ADMIN_ID))
+            if send(int(TELEGRAM_ADMIN_ID)):
+                recipients += 1
         except Exception as e:
             print("Gagal kirim ke admin:", e)
     else:
@@ -32,66 +61,116 @@ def broadcast_signal(text: str):
     # user
     if not state.subscribers:
         print("Belum ada subscriber. Hanya admin yang menerima sinyal.")
-        return
+        return recipients
 
+    counted = []
     for cid in list(state.subscribers):
         if TELEGRAM_ADMIN_ID and str(cid) == str(TELEGRAM_ADMIN_ID):
             continue
+        if cid in blocked:
+            continue
 
         if is_vip(cid):
-            send_telegram(text, chat_id=cid)
+            if send(cid):
+                recipients += 1
+            continue
+
+        if vip_only:
             continue
 
         count = state.daily_counts.get(cid, 0)
-        if count >= 2:
+        if count >= FREE_DAILY_LIMIT:
             continue
 
-        send_telegram(text, chat_id=cid)
+        if not send(cid):
+            continue
         state.daily_counts[cid] = count + 1
+        counted.append(cid)
+        recipients += 1
+
+    # kuota FREE yang berubah: satu transaksi per broadcast
+    save_daily_counts(counted)
+    return recipients
+
+
+def build_rest_summary(close_time: int, cands: list) -> str:
+    """Ringkasan kandidat di luar top-K satu close (close_ranker, TOPK_REST=summary)."""
+    close_at = time.strftime("%H:%M", time.localtime((close_time + 1) / 1000))
+    lines = [f"📋 Sinyal lain close 5m {close_at} (di luar top pilihan)", ""]
+    for c in cands:
+        entry = c["levels"][0]
+        lines.append(f"• {c['symbol']} — Tier {c['tier']} ({c['score']}) — {c.get('side', 'long').upper()}"
+                     f" — entry `{entry:.6f}`")
+    return "\n".join(lines)
+
+
+OUTCOME_ICON = {"TP1": "✅", "TP2": "✅", "TP3": "🏁", "SL": "🛑"}
+
+
+def build_outcome_message(ev: dict) -> str:
+    """Balasan hasil sinyal (core/outcome_tracker.py event) ke pesan sinyal aslinya."""
+    icon = OUTCOME_ICON.get(ev["level"], "ℹ️")
+    # at = open time bar yang menyentuh level → tercapai paling lambat di akhir bar itu
+    mins = max(0, (ev["at"] - ev["close_time"] - 1) // 60_000) + 5
+    return (f"{icon} *{ev['symbol']}* {ev['level']} tercapai `{ev['price']:.6f}` "
+            f"({ev['r']:+.2f}R, ≤ {mins} menit setelah sinyal)")
 
 
 def build_signal_message(
     symbol: str,
-    levels: dict,
-    conditions: dict,
+    levels: SmcLevels,
+    conditions: SmcConditions,
     score: int,
     tier: str,
-    side: str = "long"
+    side: str = "long",
+    strategy: Optional[str] = None,
 ) -> str:
-    entry = levels["entry"]
-    sl = levels["sl"]
-    tp1 = levels["tp1"]
-    tp2 = levels["tp2"]
-    tp3 = levels["tp3"]
+    entry = levels.entry
+    sl = levels.sl
+    tp1 = levels.tp1
+    tp2 = levels.tp2
+    tp3 = levels.tp3
 
     # risk dari SL–entry (untuk hitung toleransi validasi)
     risk = abs(entry - sl)
     
-    tol_up = entry + (0.30 * risk) # agresif tapi cukup ketat
-    tol_down = entry - (0.15 * risk)
+    # long: batal kalau lari naik 0.30R / retrace 0.15R; short: cermin
+    if side == "long":
+        tol_up = entry + (0.30 * risk) # agresif tapi cukup ketat
+        tol_down = entry - (0.15 * risk)
+        up_rule, down_rule = "entry + 0.30 × risk", "entry - 0.15 × risk"
+        up_why, down_why = "lewat/FOMO, jangan kejar", "retracement terlalu dalam, momentum lemah"
+        bias_rule, rsi_ok, rsi_premium = "Close > EMA20 > EMA50 & naik", "RSI ≥ 50", "RSI 52–65"
+    else:
+        tol_up = entry + (0.15 * risk)
+        tol_down = entry - (0.30 * risk)
+        up_rule, down_rule = "entry + 0.15 × risk", "entry - 0.30 × risk"
+        up_why, down_why = "retracement terlalu dalam, momentum lemah", "lewat/FOMO, jangan kejar"
+        bias_rule, rsi_ok, rsi_premium = "Close < EMA20 < EMA50 & turun", "RSI ≤ 50", "RSI 35–48"
 
     def mark(flag: bool) -> str:
         return "✅" if flag else "❌"
 
     side_label = "LONG" if side == "long" else "SHORT"
-
-    bias_ok             = conditions.get("bias_ok")
-    htf_15m_trend_ok    = conditions.get("htf_15m_trend_ok")
-    htf_1h_trend_ok     = conditions.get("htf_1h_trend_ok")
-    micro_choch         = conditions.get("micro_choch")
-    micro_choch_premium = conditions.get("micro_choch_premium")
-    micro_fvg           = conditions.get("micro_fvg")
-    momentum_ok         = conditions.get("momentum_ok")
-    momentum_premium    = conditions.get("momentum_premium")
-    not_choppy          = conditions.get("not_choppy")
-    not_overextended    = conditions.get("not_overextended")
-    setup_score         = conditions.get("setup_score", 0)
+    strategy_line = f"Strategi: `{strategy}`\n" if strategy else ""
+
+    bias_ok             = conditions.bias_ok
+    htf_15m_trend_ok    = conditions.htf_15m_trend_ok
+    htf_1h_trend_ok     = conditions.htf_1h_trend_ok
+    micro_choch         = conditions.micro_choch
+    micro_choch_premium = conditions.micro_choch_premium
+    micro_fvg           = conditions.micro_fvg
+    momentum_ok         = conditions.momentum_ok
+    momentum_premium    = conditions.momentum_premium
+    not_choppy          = conditions.not_choppy
+    not_overextended    = conditions.not_overextended
+    setup_score         = conditions.setup_score
 
     text = f"""🟦 SMC AGGRESSIVE SCALPING — {symbol}
 
 Score: {score}/150 — Tier {tier} — {side_label}
 Setup internal (5m): {setup_score}/3
-
+{strategy_line}
 💰 Harga
 
 • Entry : `{entry:.6f}`
@@ -107,19 +186,19 @@ Setup internal (5m): {setup_score}/3
 📌 VALIDATION RULES (penting)
 
 Harga dianggap *VALID* untuk entry jika:
-• Harga TIDAK naik lebih dari `entry + 0.30 × risk`
+• Harga TIDAK naik lebih dari `{up_rule}`
   → Batas atas ≈ `{tol_up:.6f}`
 
-• Harga TIDAK turun lebih dari `entry - 0.15 × risk`
+• Harga TIDAK turun lebih dari `{down_rule}`
   → Batas bawah ≈ `{tol_down:.6f}`
 
 Jika harga:
-• Naik di atas batas atas → *entry batal* (lewat/FOMO, jangan kejar)
-• Turun di bawah batas bawah → *entry batal* (retracement terlalu dalam, momentum lemah)
+• Naik di atas batas atas → *entry batal* ({up_why})
+• Turun di bawah batas bawah → *entry batal* ({down_why})
 
 📌 Checklist Multi-Timeframe
 
-• Bias 5m (Close > EMA20 > EMA50 & naik)  : {mark(bias_ok)}
+• Bias 5m ({bias_rule})  : {mark(bias_ok)}
 • Bias 15m searah                         : {mark(htf_15m_trend_ok)}
 • Bias 1H searah                          : {mark(htf_1h_trend_ok)}
 
@@ -128,8 +207,8 @@ Jika harga:
 • Micro CHoCH (trigger)                   : {mark(micro_choch)}
 • Micro CHoCH premium candle              : {mark(micro_choch_premium)}
 • Micro FVG (imbalance)                   : {mark(micro_fvg)}
-• Momentum OK (RSI ≥ 50)                  : {mark(momentum_ok)}
-• Momentum premium (RSI 52–65)            : {mark(momentum_premium)}
+• Momentum OK ({rsi_ok})                  : {mark(momentum_ok)}
+• Momentum premium ({rsi_premium})            : {mark(momentum_premium)}
 • Market tidak choppy (ATR & range)       : {mark(not_choppy)}
 • Tidak over-extended dari EMA            : {mark(not_overextended)}
 
@@ -137,10 +216,10 @@ Jika harga:
 
 Strategi:
 • Entry di 5m, tetapi wajib searah 15m dan 1H.
-• Momentum minimal RSI 50 untuk long (hindari market lemah).
+• Momentum minimal RSI 50 untuk long / maksimal RSI 50 untuk short (hindari market lemah).
 • Micro CHoCH premium: body kuat, wick bersih → mengurangi fake breakout.
 • Filter tambahan: ATR & range untuk hindari market choppy/ terlalu tenang.
-• Hindari entry di pucuk (over-extended dari EMA).
+• Hindari entry di pucuk / dasar (over-extended dari EMA).
 • Validation rules mencegah FOMO & deep retrace yang merusak R:R.
 • Tier A+ diset ketat — hanya muncul saat confluence multi-timeframe & momentum kuat.
 
@@ -1,18 +1,32 @@
 # telegram/telegram_commands.py
-# /start, /help, /mode, /cooldown, VIP, dll + callback.
+# Handler command & tombol menu (/start, /help, /mode, /cooldown, VIP, /filter, dll)
+# + callback. Routing lewat tabel COMMANDS / BUTTONS (telegram/telegram_dispatch.py).
 
 import time
 
-from config import TELEGRAM_ADMIN_USERNAME
+from config import TELEGRAM_ADMIN_USERNAME, DIGEST_MODE, TELEGRAM_HANDLER_WORKERS
 from core.bot_state import (
     state,
     is_admin,
     is_vip,
     save_bot_state,
-    save_subscribers,
-    save_vip_users,
+    add_subscriber,
+    remove_subscriber,
+    set_vip,
+    remove_vip,
+    clear_cooldowns,
+    set_user_filter,
 )
+from core import signal_journal
+from core import hot_config
+from core.http_transport import transport
+from core.staleness import guard
+from core.startup import startup
+from core.strategy_costs import costs
+from core.user_filters import MAX_SYMBOLS, UserFilter, parse_quiet, parse_symbols, parse_tier
+from telegram.telegram_digest import digest_summary
 from telegram.telegram_common import send_telegram, hard_restart
+from telegram.telegram_dispatch import ADMIN, ANY, USER, Dispatcher
 from telegram.telegram_keyboards import get_user_reply_keyboard, get_admin_reply_keyboard
 
 
@@ -42,294 +56,482 @@ def handle_admin_start(chat_id: int):
     )
 
 
-def handle_command(cmd: str, args: list, chat_id: int):
-    cmd = cmd.lower()
-
-    # /start
-    if cmd == "/start":
-        if is_admin(chat_id):
-            handle_admin_start(chat_id)
-        else:
-            handle_user_start(chat_id)
-        return
+FILTER_HELP = (
+    "`/filter` — lihat filter kamu\n"
+    "`/filter tier aplus|a|b|off` — minimal tier sinyal\n"
+    "`/filter allow BTC ETH` — hanya pair ini (`off` = semua pair)\n"
+    "`/filter deny DOGE PEPE` — jangan kirim pair ini (`off` = hapus)\n"
+    "`/filter quiet 22-6` — jam tenang, tanpa sinyal (`off` = hapus)\n"
+    "`/filter reset` — hapus semua filter"
+)
 
-    # /help
-    if cmd == "/help":
-        if is_admin(chat_id):
-            send_telegram(
-                "📖 Bantuan admin tersedia lewat tombol *❓ Help Admin* pada menu bawah.",
-                chat_id,
-                reply_markup=get_admin_reply_keyboard(),
-            )
-        else:
-            send_telegram(
-                "📖 Bantuan user tersedia lewat tombol *❓ Bantuan* pada menu bawah.",
-                chat_id,
-                reply_markup=get_user_reply_keyboard(),
-            )
+
+def handle_filter(args: list, chat_id: int):
+    """/filter: atur filter sinyal user (core/user_filters.py)."""
+    current = state.filters.get(chat_id)
+    if not args:
+        send_telegram(f"🎯 *FILTER SINYAL*\n\n{current.describe()}\n\n{FILTER_HELP}", chat_id)
         return
 
-    # ---------- USER COMMANDS ----------
-    if not is_admin(chat_id):
-        if cmd == "/activate":
-            if chat_id in state.subscribers:
-                send_telegram("ℹ️ Pencarian sinyal sudah *AKTIF*.", chat_id)
-            else:
-                state.subscribers.add(chat_id)
-                save_subscribers()
-                send_telegram("🔔 Pencarian sinyal *diaktifkan!*", chat_id)
+    sub, rest = args[0].lower(), args[1:]
+    off = bool(rest) and rest[0].lower() in ("off", "clear")
+    f = current.copy()
+    if sub == "reset":
+        f = UserFilter()
+    elif sub == "tier" and rest:
+        tier = None if off else parse_tier(rest[0])
+        if tier is None and not off:
+            send_telegram("Tier tidak dikenali. Gunakan: `/filter tier aplus | a | b | off`", chat_id)
             return
-
-        if cmd == "/deactivate":
-            if chat_id in state.subscribers:
-                state.subscribers.remove(chat_id)
-                save_subscribers()
-                send_telegram("🔕 Pencarian sinyal *dinonaktifkan.*", chat_id)
-            else:
-                send_telegram("ℹ️ Pencarian sinyal sudah *tidak aktif*.", chat_id)
+        f.min_tier = tier
+    elif sub in ("allow", "deny") and rest:
+        symbols = set() if off else set(parse_symbols(rest))
+        if len(symbols) > MAX_SYMBOLS:
+            send_telegram(f"Maksimal {MAX_SYMBOLS} pair per daftar.", chat_id)
             return
-
-        if cmd == "/mystatus":
-            now = time.time()
-            exp = state.vip_users.get(chat_id)
-            if exp and exp > now:
-                days_left = int((exp - now) / 86400)
-                pkg = f"VIP (sisa ~{days_left} hari)"
-                limit = "Unlimited"
-            else:
-                pkg = "FREE"
-                limit = "2 sinyal per hari"
-
-            active = "AKTIF ✅" if chat_id in state.subscribers else "TIDAK AKTIF ❌"
-            send_telegram(
-                "📊 *STATUS KAMU*\n\n"
-                f"Paket  : *{pkg}*\n"
-                f"Limit  : *{limit}*\n"
-                f"Sinyal : *{active}*\n"
-                f"User ID: `{chat_id}`",
-                chat_id,
-            )
+        setattr(f, sub, symbols)
+    elif sub == "quiet" and rest:
+        quiet = None if off else parse_quiet(rest[0])
+        if quiet is None and not off:
+            send_telegram("Format salah. Contoh: `/filter quiet 22-6` (jam 22:00–06:00)", chat_id)
             return
-
-        send_telegram("Perintah tidak dikenali. Gunakan menu bawah atau /start.", chat_id)
+        f.quiet = quiet
+    else:
+        send_telegram(f"Perintah filter tidak dikenali.\n\n{FILTER_HELP}", chat_id)
         return
 
-    # ---------- ADMIN COMMANDS ----------
-    if cmd == "/startscan":
-        if state.scanning:
-            send_telegram("ℹ️ Scan sudah *AKTIF*.", chat_id)
-        else:
-            state.scanning = True
-            save_bot_state()
-            send_telegram("▶️ Scan market *dimulai*.", chat_id)
-        return
+    set_user_filter(chat_id, f)
+    send_telegram(f"🎯 Filter disimpan.\n\n{f.describe()}", chat_id)
 
-    if cmd == "/pausescan":
-        if not state.scanning:
-            send_telegram("ℹ️ Scan sudah *PAUSE*.", chat_id)
-        else:
-            state.scanning = False
-            save_bot_state()
-            send_telegram("⏸️ Scan market *dijeda* (sementara).", chat_id)
-        return
 
-    if cmd == "/stopscan":
-        if not state.scanning and not state.last_signal_time:
-            send_telegram("ℹ️ Scan sudah *NON-AKTIF* total.", chat_id)
-        else:
-            state.scanning = False
-            state.last_signal_time.clear()
-            save_bot_state()
-            send_telegram(
-                "⛔ Scan market *dihentikan total.*\n"
-                "Gunakan /startscan untuk mulai lagi dari awal.",
-                chat_id,
-            )
-        return
+def cmd_start(args: list, chat_id: int):
+    if is_admin(chat_id):
+        handle_admin_start(chat_id)
+    else:
+        handle_user_start(chat_id)
+
 
-    if cmd == "/status":
+def cmd_help(args: list, chat_id: int):
+    if is_admin(chat_id):
         send_telegram(
-            "📊 *STATUS BOT*\n\n"
-            f"Scan       : {'AKTIF' if state.scanning else 'STANDBY'}\n"
-            f"Min Tier   : {state.min_tier}\n"
-            f"Cooldown   : {state.cooldown_seconds} detik\n"
-            f"Min Volume : {state.min_volume_usdt:,.0f} USDT\n"
-            f"Max Pairs  : {state.max_pairs} pair\n"
-            f"Subscribers: {len(state.subscribers)} user\n"
-            f"VIP Users  : {len(state.vip_users)} user\n",
+            "📖 Bantuan admin tersedia lewat tombol *❓ Help Admin* pada menu bawah.",
             chat_id,
+            reply_markup=get_admin_reply_keyboard(),
+        )
+    else:
+        send_telegram(
+            "📖 Bantuan user tersedia lewat tombol *❓ Bantuan* pada menu bawah.",
+            chat_id,
+            reply_markup=get_user_reply_keyboard(),
         )
-        return
 
-    if cmd == "/mode":
-        if not args:
-            send_telegram(
-                "Mode sekarang:\n"
-                f"- Min Tier: {state.min_tier}\n"
-                "Gunakan: /mode aplus | a | b",
-                chat_id,
-            )
-            return
-        mode = args[0].lower()
-        if mode == "aplus":
-            state.min_tier = "A+"
-        elif mode == "a":
-            state.min_tier = "A"
-        elif mode == "b":
-            state.min_tier = "B"
-        else:
-            send_telegram("Mode tidak dikenali. Gunakan: aplus | a | b", chat_id)
-            return
+
+def cmd_activate(args: list, chat_id: int):
+    if chat_id in state.subscribers:
+        send_telegram("ℹ️ Pencarian sinyal sudah *AKTIF*.", chat_id)
+    else:
+        add_subscriber(chat_id)
+        send_telegram("🔔 Pencarian sinyal *diaktifkan!*", chat_id)
+
+
+def cmd_deactivate(args: list, chat_id: int):
+    if chat_id in state.subscribers:
+        remove_subscriber(chat_id)
+        send_telegram("🔕 Pencarian sinyal *dinonaktifkan.*", chat_id)
+    else:
+        send_telegram("ℹ️ Pencarian sinyal sudah *tidak aktif*.", chat_id)
+
+
+def cmd_mystatus(args: list, chat_id: int):
+    now = time.time()
+    exp = state.vip_users.get(chat_id)
+    if exp and exp > now:
+        days_left = int((exp - now) / 86400)
+        pkg = f"VIP (sisa ~{days_left} hari)"
+        limit = "Unlimited"
+    else:
+        pkg = "FREE"
+        limit = "2 sinyal per hari"
+
+    active = "AKTIF ✅" if chat_id in state.subscribers else "TIDAK AKTIF ❌"
+    send_telegram(
+        "📊 *STATUS KAMU*\n\n"
+        f"Paket  : *{pkg}*\n"
+        f"Limit  : *{limit}*\n"
+        f"Sinyal : *{active}*\n"
+        f"Filter : *{'ada (/filter)' if chat_id in state.filters.prefs else 'tidak ada'}*\n"
+        f"User ID: `{chat_id}`",
+        chat_id,
+    )
+
+
+def cmd_startscan(args: list, chat_id: int):
+    if state.scanning:
+        send_telegram("ℹ️ Scan sudah *AKTIF*.", chat_id)
+    else:
+        state.scanning = True
         save_bot_state()
-        send_telegram(f"⚙️ Mode tier di-set ke: *{state.min_tier}*.", chat_id)
-        return
+        send_telegram("▶️ Scan market *dimulai*.", chat_id)
 
-    if cmd == "/cooldown":
-        if not args:
-            send_telegram(
-                f"Cooldown sekarang: {state.cooldown_seconds} detik.\n"
-                "Contoh: /cooldown 300  (5 menit)",
-                chat_id,
-            )
-            return
-        try:
-            cd = int(args[0])
-            if cd < 0:
-                raise ValueError
-            state.cooldown_seconds = cd
-            save_bot_state()
-            send_telegram(f"⏲️ Cooldown di-set ke {cd} detik.", chat_id)
-        except ValueError:
-            send_telegram("Format salah. Gunakan: /cooldown 300", chat_id)
+
+def cmd_pausescan(args: list, chat_id: int):
+    if not state.scanning:
+        send_telegram("ℹ️ Scan sudah *PAUSE*.", chat_id)
+    else:
+        state.scanning = False
+        save_bot_state()
+        send_telegram("⏸️ Scan market *dijeda* (sementara).", chat_id)
+
+
+def cmd_stopscan(args: list, chat_id: int):
+    if not state.scanning and not state.last_signal_time:
+        send_telegram("ℹ️ Scan sudah *NON-AKTIF* total.", chat_id)
+    else:
+        state.scanning = False
+        clear_cooldowns()
+        save_bot_state()
+        send_telegram(
+            "⛔ Scan market *dihentikan total.*\n"
+            "Gunakan /startscan untuk mulai lagi dari awal.",
+            chat_id,
+        )
+
+
+def cmd_status(args: list, chat_id: int):
+    send_telegram(
+        "📊 *STATUS BOT*\n\n"
+        f"Scan       : {'AKTIF' if state.scanning else 'STANDBY'}\n"
+        f"Min Tier   : {state.min_tier}\n"
+        f"Cooldown   : {state.cooldown_seconds} detik\n"
+        f"Min Volume : {state.min_volume_usdt:,.0f} USDT\n"
+        f"Max Pairs  : {state.max_pairs} pair\n"
+        f"Subscribers: {len(state.subscribers)} user\n"
+        f"VIP Users  : {len(state.vip_users)} user\n"
+        f"Sinyal basi: {guard.summary()} ({guard.mode})\n"
+        f"Digest     : {digest_summary() if DIGEST_MODE else 'OFF'}\n"
+        f"Command    : {dispatcher.summary()}\n"
+        f"HTTP       : {transport.summary()}\n"
+        f"Strategi   : {hot_config.summary()} — {costs.summary()}\n"
+        f"Startup    : {startup.summary()}\n",
+        chat_id,
+    )
+
+
+def cmd_mode(args: list, chat_id: int):
+    if not args:
+        send_telegram(
+            "Mode sekarang:\n"
+            f"- Min Tier: {state.min_tier}\n"
+            "Gunakan: /mode aplus | a | b",
+            chat_id,
+        )
         return
+    mode = args[0].lower()
+    if mode == "aplus":
+        state.min_tier = "A+"
+    elif mode == "a":
+        state.min_tier = "A"
+    elif mode == "b":
+        state.min_tier = "B"
+    else:
+        send_telegram("Mode tidak dikenali. Gunakan: aplus | a | b", chat_id)
+        return
+    save_bot_state()
+    send_telegram(f"⚙️ Mode tier di-set ke: *{state.min_tier}*.", chat_id)
 
-    if cmd == "/minvol":
-        if not args:
-            send_telegram(
-                "📈 *SET MINIMUM VOLUME USDT*\n\n"
-                f"Sekarang: `{state.min_volume_usdt:,.0f}` USDT\n\n"
-                "Contoh:\n"
-                "`/minvol 50000000`  (50 juta USDT)\n"
-                "`/minvol 100000000` (100 juta USDT)",
-                chat_id,
-            )
-            return
-        try:
-            val = float(args[0])
-            if val < 0:
-                raise ValueError
-            state.min_volume_usdt = val
-            state.force_pairs_refresh = True
-            save_bot_state()
-            send_telegram(
-                f"📈 Min volume di-set ke `{val:,.0f}` USDT.\n"
-                "Daftar pair akan di-refresh pada scan berikutnya.",
-                chat_id,
-            )
-        except ValueError:
-            send_telegram("Format salah. Contoh: `/minvol 100000000`", chat_id)
+
+def cmd_cooldown(args: list, chat_id: int):
+    if not args:
+        send_telegram(
+            f"Cooldown sekarang: {state.cooldown_seconds} detik.\n"
+            "Contoh: /cooldown 300  (5 menit)",
+            chat_id,
+        )
         return
+    try:
+        cd = int(args[0])
+        if cd < 0:
+            raise ValueError
+        state.cooldown_seconds = cd
+        save_bot_state()
+        send_telegram(f"⏲️ Cooldown di-set ke {cd} detik.", chat_id)
+    except ValueError:
+        send_telegram("Format salah. Gunakan: /cooldown 300", chat_id)
 
-    if cmd == "/maxpairs":
-        if not args:
-            send_telegram(
-                "📌 *SET MAXIMUM PAIR YANG DI-SCAN*\n\n"
-                f"Sekarang: `{state.max_pairs}` pair\n\n"
-                "Contoh:\n"
-                "`/maxpairs 20`\n"
-                "`/maxpairs 40`",
-                chat_id,
-            )
-            return
-        try:
-            val = int(args[0])
-            if val < 1:
-                raise ValueError
-            state.max_pairs = val
-            state.force_pairs_refresh = True
-            save_bot_state()
-            send_telegram(
-                f"📌 Max pairs di-set ke *{val}*.\n"
-                "Daftar pair akan di-refresh pada scan berikutnya.",
-                chat_id,
-            )
-        except ValueError:
-            send_telegram("Format salah. Contoh: `/maxpairs 30`", chat_id)
+
+def cmd_minvol(args: list, chat_id: int):
+    if not args:
+        send_telegram(
+            "📈 *SET MINIMUM VOLUME USDT*\n\n"
+            f"Sekarang: `{state.min_volume_usdt:,.0f}` USDT\n\n"
+            "Contoh:\n"
+            "`/minvol 50000000`  (50 juta USDT)\n"
+            "`/minvol 100000000` (100 juta USDT)",
+            chat_id,
+        )
         return
+    try:
+        val = float(args[0])
+        if val < 0:
+            raise ValueError
+        state.min_volume_usdt = val
+        state.force_pairs_refresh = True
+        save_bot_state()
+        send_telegram(
+            f"📈 Min volume di-set ke `{val:,.0f}` USDT.\n"
+            "Daftar pair di-refresh sekarang (subscribe selisihnya, tanpa reconnect).",
+            chat_id,
+        )
+    except ValueError:
+        send_telegram("Format salah. Contoh: `/minvol 100000000`", chat_id)
 
-    if cmd == "/addvip":
-        if not args:
-            send_telegram("Gunakan: /addvip <user_id> [hari]", chat_id)
-            return
-        try:
-            target_id = int(args[0])
-            days = int(args[1]) if len(args) > 1 else 30
-        except ValueError:
-            send_telegram("Format salah. Contoh: /addvip 123456789 30", chat_id)
-            return
-        now = time.time()
-        new_exp = now + days * 86400
-        state.vip_users[target_id] = new_exp
-        save_vip_users()
-        send_telegram(f"⭐ VIP aktif untuk `{target_id}` selama {days} hari.", chat_id)
+
+def cmd_maxpairs(args: list, chat_id: int):
+    if not args:
         send_telegram(
-            f"🎉 VIP kamu diaktifkan selama {days} hari.\n"
-            "Sinyal kamu sekarang *unlimited* per hari.",
-            target_id,
+            "📌 *SET MAXIMUM PAIR YANG DI-SCAN*\n\n"
+            f"Sekarang: `{state.max_pairs}` pair\n\n"
+            "Contoh:\n"
+            "`/maxpairs 20`\n"
+            "`/maxpairs 40`",
+            chat_id,
         )
         return
+    try:
+        val = int(args[0])
+        if val < 1:
+            raise ValueError
+        state.max_pairs = val
+        state.force_pairs_refresh = True
+        save_bot_state()
+        send_telegram(
+            f"📌 Max pairs di-set ke *{val}*.\n"
+            "Daftar pair di-refresh sekarang (subscribe selisihnya, tanpa reconnect).",
+            chat_id,
+        )
+    except ValueError:
+        send_telegram("Format salah. Contoh: `/maxpairs 30`", chat_id)
 
-    if cmd == "/removevip":
-        if not args:
-            send_telegram("Gunakan: /removevip <user_id>", chat_id)
-            return
-        try:
-            target_id = int(args[0])
-        except ValueError:
-            send_telegram("Format salah. Contoh: /removevip 123456789", chat_id)
-            return
-        if target_id in state.vip_users:
-            del state.vip_users[target_id]
-            save_vip_users()
-            send_telegram(f"VIP user `{target_id}` dihapus.", chat_id)
-            send_telegram("VIP kamu telah dinonaktifkan. Kembali ke paket FREE.", target_id)
-        else:
-            send_telegram("User tersebut tidak terdaftar sebagai VIP.", chat_id)
+
+def cmd_stats(args: list, chat_id: int):
+    try:
+        days = int(args[0]) if args else 7
+    except ValueError:
+        send_telegram("Format salah. Contoh: `/stats 30`", chat_id)
         return
+    days = max(1, min(days, 3650))
+    send_telegram(signal_journal.format_stats(days), chat_id)
 
-    if cmd == "/debug":
-        if not args:
-            send_telegram(f"Debug: {'ON' if state.debug else 'OFF'}", chat_id)
-            return
-        val = args[0].lower()
-        if val == "on":
-            state.debug = True
-            send_telegram("Debug *ON*.", chat_id)
-        elif val == "off":
-            state.debug = False
-            send_telegram("Debug *OFF*.", chat_id)
-        else:
-            send_telegram("Gunakan: /debug on | off", chat_id)
+
+def cmd_history(args: list, chat_id: int):
+    if not args:
+        send_telegram("Gunakan: /history <symbol> [jumlah]. Contoh: `/history BTCUSDT 20`", chat_id)
+        return
+    try:
+        limit = int(args[1]) if len(args) > 1 else 10
+    except ValueError:
+        send_telegram("Format salah. Contoh: `/history BTCUSDT 20`", chat_id)
         return
+    limit = max(1, min(limit, 50))
+    send_telegram(signal_journal.format_history(args[0], limit), chat_id)
 
-    if cmd == "/softrestart":
-        state.request_soft_restart = True
-        state.force_pairs_refresh = True
-        state.last_signal_time.clear()
-        send_telegram("♻ Soft restart diminta. Bot akan refresh koneksi & engine.", chat_id)
+
+def cmd_addvip(args: list, chat_id: int):
+    if not args:
+        send_telegram("Gunakan: /addvip <user_id> [hari]", chat_id)
+        return
+    try:
+        target_id = int(args[0])
+        days = int(args[1]) if len(args) > 1 else 30
+    except ValueError:
+        send_telegram("Format salah. Contoh: /addvip 123456789 30", chat_id)
         return
+    now = time.time()
+    new_exp = now + days * 86400
+    set_vip(target_id, new_exp)
+    send_telegram(f"⭐ VIP aktif untuk `{target_id}` selama {days} hari.", chat_id)
+    send_telegram(
+        f"🎉 VIP kamu diaktifkan selama {days} hari.\n"
+        "Sinyal kamu sekarang *unlimited* per hari.",
+        target_id,
+    )
 
-    if cmd == "/hardrestart":
-        send_telegram("🔄 Hard restart dimulai. Bot akan hidup kembali sebentar lagi...", chat_id)
-        hard_restart()
+
+def cmd_removevip(args: list, chat_id: int):
+    if not args:
+        send_telegram("Gunakan: /removevip <user_id>", chat_id)
+        return
+    try:
+        target_id = int(args[0])
+    except ValueError:
+        send_telegram("Format salah. Contoh: /removevip 123456789", chat_id)
         return
+    if target_id in state.vip_users:
+        remove_vip(target_id)
+        send_telegram(f"VIP user `{target_id}` dihapus.", chat_id)
+        send_telegram("VIP kamu telah dinonaktifkan. Kembali ke paket FREE.", target_id)
+    else:
+        send_telegram("User tersebut tidak terdaftar sebagai VIP.", chat_id)
+
 
-    if cmd == "/stopbot":
-        state.running = False
-        send_telegram("⛔ Bot akan berhenti. Jalankan ulang main.py untuk start lagi.", chat_id)
+def cmd_debug(args: list, chat_id: int):
+    if not args:
+        send_telegram(f"Debug: {'ON' if state.debug else 'OFF'}", chat_id)
         return
+    val = args[0].lower()
+    if val == "on":
+        state.debug = True
+        send_telegram("Debug *ON*.", chat_id)
+    elif val == "off":
+        state.debug = False
+        send_telegram("Debug *OFF*.", chat_id)
+    else:
+        send_telegram("Gunakan: /debug on | off", chat_id)
+
+
+def cmd_softrestart(args: list, chat_id: int):
+    state.request_soft_restart = True
+    state.force_pairs_refresh = True
+    clear_cooldowns()
+    send_telegram("♻ Soft restart diminta. Bot akan refresh koneksi & engine.", chat_id)
+
+
+def cmd_hardrestart(args: list, chat_id: int):
+    send_telegram("🔄 Hard restart dimulai. Bot akan hidup kembali sebentar lagi...", chat_id)
+    hard_restart()
+
+
+def cmd_stopbot(args: list, chat_id: int):
+    state.running = False
+    send_telegram("⛔ Bot akan berhenti. Jalankan ulang main.py untuk start lagi.", chat_id)
+
+
+# ---------- tombol menu (tanpa command) ----------
+
+def btn_upgrade_vip(args: list, chat_id: int):
+    send_telegram(
+        "⭐ *UPGRADE KE VIP*\n\n"
+        "Paket VIP memberikan:\n"
+        "• Sinyal *unlimited* setiap hari\n"
+        "• Fokus pada Tier tinggi\n"
+        "• Masa aktif default 30 hari\n\n"
+        "Hubungi admin untuk upgrade:\n"
+        f"`{TELEGRAM_ADMIN_USERNAME}` (Forward pesan /mystatus kamu).",
+        chat_id,
+    )
+
+
+def btn_user_help(args: list, chat_id: int):
+    send_telegram(
+        "📖 *BANTUAN PENGGUNA*\n\n"
+        "🔔 Aktifkan Sinyal — hidupkan sinyal.\n"
+        "🔕 Nonaktifkan Sinyal — matikan sinyal.\n"
+        "📊 Status Saya — lihat paket & limit.\n"
+        "⭐ Upgrade VIP — info upgrade.\n\n"
+        "`/filter` — pilih tier, pair & jam tenang sinyal kamu.\n",
+        chat_id,
+    )
+
+
+def btn_mode_tier(args: list, chat_id: int):
+    send_telegram(
+        "⚙️ *Mode Tier*\n\n"
+        "Gunakan command:\n"
+        "`/mode aplus` — hanya Tier A+\n"
+        "`/mode a`     — Tier A & A+\n"
+        "`/mode b`     — Tier B, A, A+",
+        chat_id,
+    )
+
+
+def btn_cooldown(args: list, chat_id: int):
+    send_telegram(
+        "⏲️ *Cooldown Sinyal*\n\n"
+        "Atur jarak minimal antar sinyal per pair.\n"
+        "Contoh:\n"
+        "`/cooldown 300`  (5 menit)\n"
+        "`/cooldown 900`  (15 menit)\n"
+        "`/cooldown 1800` (30 menit)",
+        chat_id,
+    )
+
+
+def btn_min_volume(args: list, chat_id: int):
+    send_telegram(
+        "📈 *MINIMUM VOLUME USDT*\n\n"
+        f"Sekarang: `{state.min_volume_usdt:,.0f}` USDT\n\n"
+        "Atur dengan command:\n"
+        "`/minvol 100000000`  (contoh 100 juta USDT)\n",
+        chat_id,
+    )
+
+
+def btn_max_pair(args: list, chat_id: int):
+    send_telegram(
+        "📌 *MAXIMUM PAIR YANG DI-SCAN*\n\n"
+        f"Sekarang: `{state.max_pairs}` pair\n\n"
+        "Atur dengan command:\n"
+        "`/maxpairs 30`  (scan 30 pair teratas)\n",
+        chat_id,
+    )
+
+
+def btn_vip_control(args: list, chat_id: int):
+    send_telegram(
+        "⭐ *VIP CONTROL*\n\n"
+        "Gunakan:\n"
+        "`/addvip <user_id> [hari]` — aktifkan VIP\n"
+        "`/removevip <user_id>` — hapus VIP user\n\n"
+        "User ID bisa dilihat dari perintah 📊 Status User.",
+        chat_id,
+    )
+
 
-    send_telegram("Perintah admin tidak dikenali.", chat_id)
+def btn_restart_menu(args: list, chat_id: int):
+    send_telegram(
+        "Pilih metode restart:",
+        chat_id,
+        reply_markup={
+            "inline_keyboard": [
+                [
+                    {
+                        "text": "♻ Soft Restart",
+                        "callback_data": "admin_soft_restart",
+                    },
+                    {
+                        "text": "🔄 Hard Restart",
+                        "callback_data": "admin_hard_restart",
+                    },
+                ],
+                [
+                    {
+                        "text": "❌ Batal",
+                        "callback_data": "admin_restart_cancel",
+                    }
+                ],
+            ]
+        },
+    )
+
+
+def btn_admin_help(args: list, chat_id: int):
+    send_telegram(
+        "📖 *BANTUAN ADMIN*\n\n"
+        "▶️ Start Scan / ⏸️ Pause Scan / ⛔ Stop Scan — kontrol scanning.\n"
+        "📊 Status Bot — lihat status.\n"
+        "⚙️ Mode Tier — atur kualitas sinyal.\n"
+        "⏲️ Cooldown — atur jarak antar sinyal.\n"
+        "📈 Min Volume — filter volume minimum USDT.\n"
+        "📌 Max Pair — atur jumlah pair yang discan.\n"
+        "⭐ VIP Control — kelola VIP.\n"
+        "🔄 Restart Bot — Soft/Hard restart bot.\n\n"
+        "`/stats [hari]` — statistik sinyal (default 7 hari).\n"
+        "`/history <symbol> [jumlah]` — sinyal terakhir satu pair.\n"
+        "`/cmdstats` — latency per command Telegram.\n"
+        "`/http` — latency, error & circuit breaker call HTTP.\n"
+        "`/strategies` — kandidat, sinyal & biaya CPU per strategi.\n",
+        chat_id,
+    )
 
 
 def handle_callback(data_cb: str, from_id: int, chat_id_cq: int):
@@ -344,7 +546,7 @@ def handle_callback(data_cb: str, from_id: int, chat_id_cq: int):
         if data_cb == "admin_soft_restart":
             state.request_soft_restart = True
             state.force_pairs_refresh = True
-            state.last_signal_time.clear()
+            clear_cooldowns()
             send_telegram("♻ Soft restart dimulai. Bot akan refresh koneksi & engine.", chat_id_cq)
             return
 
@@ -360,3 +562,89 @@ def handle_callback(data_cb: str, from_id: int, chat_id_cq: int):
     if not is_admin(from_id):
         send_telegram("Tombol ini hanya untuk admin.", chat_id_cq)
         return
+
+
+def cmd_cmdstats(args: list, chat_id: int):
+    send_telegram(dispatcher.format_stats(), chat_id)
+
+
+def cmd_http(args: list, chat_id: int):
+    send_telegram(transport.format_stats(), chat_id)
+
+
+def cmd_strategies(args: list, chat_id: int):
+    send_telegram(costs.format_stats(), chat_id)
+
+
+def cmd_unknown(args: list, chat_id: int):
+    if is_admin(chat_id):
+        send_telegram("Perintah admin tidak dikenali.", chat_id)
+    else:
+        send_telegram("Perintah tidak dikenali. Gunakan menu bawah atau /start.", chat_id)
+
+
+# ============================================================
+#                        ROUTING
+# ============================================================
+
+# command → (role, handler). USER = hanya non-admin, ADMIN = hanya admin.
+COMMANDS = {
+    "/start": (ANY, cmd_start),
+    "/help": (ANY, cmd_help),
+    # user
+    "/activate": (USER, cmd_activate),
+    "/deactivate": (USER, cmd_deactivate),
+    "/mystatus": (USER, cmd_mystatus),
+    "/filter": (USER, handle_filter),
+    # admin
+    "/startscan": (ADMIN, cmd_startscan),
+    "/pausescan": (ADMIN, cmd_pausescan),
+    "/stopscan": (ADMIN, cmd_stopscan),
+    "/status": (ADMIN, cmd_status),
+    "/mode": (ADMIN, cmd_mode),
+    "/cooldown": (ADMIN, cmd_cooldown),
+    "/minvol": (ADMIN, cmd_minvol),
+    "/maxpairs": (ADMIN, cmd_maxpairs),
+    "/stats": (ADMIN, cmd_stats),
+    "/history": (ADMIN, cmd_history),
+    "/cmdstats": (ADMIN, cmd_cmdstats),
+    "/http": (ADMIN, cmd_http),
+    "/strategies": (ADMIN, cmd_strategies),
+    "/addvip": (ADMIN, cmd_addvip),
+    "/removevip": (ADMIN, cmd_removevip),
+    "/debug": (ADMIN, cmd_debug),
+    "/softrestart": (ADMIN, cmd_softrestart),
+    "/hardrestart": (ADMIN, cmd_hardrestart),
+    "/stopbot": (ADMIN, cmd_stopbot),
+}
+
+# teks tombol reply keyboard (telegram_keyboards.py) → (role, handler);
+# tombol role lain: admin dapat "Perintah admin tidak dikenali", user diabaikan
+BUTTONS = {
+    "🏠 Home": (ANY, cmd_start),
+    # user
+    "🔔 Aktifkan Sinyal": (USER, cmd_activate),
+    "🔕 Nonaktifkan Sinyal": (USER, cmd_deactivate),
+    "📊 Status Saya": (USER, cmd_mystatus),
+    "⭐ Upgrade VIP": (USER, btn_upgrade_vip),
+    "❓ Bantuan": (USER, btn_user_help),
+    # admin
+    "▶️ Start Scan": (ADMIN, cmd_startscan),
+    "⏸️ Pause Scan": (ADMIN, cmd_pausescan),
+    "⛔ Stop Scan": (ADMIN, cmd_stopscan),
+    "📊 Status Bot": (ADMIN, cmd_status),
+    "⚙️ Mode Tier": (ADMIN, btn_mode_tier),
+    "⏲️ Cooldown": (ADMIN, btn_cooldown),
+    "📈 Min Volume": (ADMIN, btn_min_volume),
+    "📌 Max Pair": (ADMIN, btn_max_pair),
+    "⭐ VIP Control": (ADMIN, btn_vip_control),
+    "🔄 Restart Bot": (ADMIN, btn_restart_menu),
+    "❓ Help Admin": (ADMIN, btn_admin_help),
+}
+
+dispatcher = Dispatcher(COMMANDS, BUTTONS, unknown=cmd_unknown, workers=TELEGRAM_HANDLER_WORKERS)
+
+
+def handle_command(cmd: str, args: list, chat_id: int):
+    """Jalankan satu command langsung (sinkron) lewat tabel COMMANDS."""
+    dispatcher.call(cmd, args, chat_id)
@@ -5,28 +5,29 @@ import json
 import os
 import sys
 
-import requests
-
-from config import TELEGRAM_TOKEN, TELEGRAM_ADMIN_ID
-from core.bot_state import state
+from config import TELEGRAM_TOKEN, TELEGRAM_ADMIN_ID, TELEGRAM_API_URL
+from core.bot_state import state, flush_storage
+from core.http_transport import CircuitOpen, transport
 
 
 def send_telegram(
     text: str,
     chat_id: int | None = None,
     reply_markup: dict | None = None,
-) -> None:
+    reply_to: int | None = None,
+) -> int | None:
+    """Kirim pesan; return message_id (None kalau gagal). reply_to = balas pesan itu."""
     if not TELEGRAM_TOKEN:
         print("Telegram token belum di-set.")
-        return
+        return None
 
     if chat_id is None:
         if not TELEGRAM_ADMIN_ID:
             print("Tidak ada TELEGRAM_ADMIN_ID.")
-            return
+            return None
         chat_id = int(TELEGRAM_ADMIN_ID)
 
-    url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
+    url = f"{TELEGRAM_API_URL}/bot{TELEGRAM_TOKEN}/sendMessage"
     data = {
         "chat_id": chat_id,
         "text": text,
@@ -34,18 +35,30 @@ def send_telegram(
     }
     if reply_markup is not None:
         data["reply_markup"] = json.dumps(reply_markup)
+    if reply_to is not None:
+        data["reply_to_message_id"] = reply_to
+        data["allow_sending_without_reply"] = True
 
     try:
-        r = requests.post(url, data=data, timeout=10)
+        # 429 sendMessage = flood limit per chat: penerima lain tetap dikirimi
+        r = transport.post(url, "telegram:sendMessage", data=data, timeout=10, hold_host=False)
         if not r.ok:
             print("Gagal kirim Telegram:", r.text)
+            return None
+        return r.json().get("result", {}).get("message_id")
+    except CircuitOpen:
+        # Telegram sedang ditahan (down / 429): sudah dicatat transport,
+        # tidak perlu satu baris log per penerima broadcast
+        return None
     except Exception as e:
         print("Error kirim Telegram:", e)
+        return None
 
 
 def hard_restart():
     """Restart penuh proses Python (hard restart)."""
     print("Hard restart dimulai...")
     state.running = False
+    flush_storage()   # execl tidak menjalankan atexit
     sys.stdout.flush()
     os.execl(sys.executable, sys.executable, *sys.argv)
@@ -0,0 +1,212 @@
+# telegram/telegram_digest.py
+# Mode digest (DIGEST_MODE=1): semua sinyal satu close 5m digabung jadi satu
+# pesan ringkas per penerima, bukan satu sendMessage per sinyal per subscriber
+# (call Telegram = penerima, bukan sinyal × penerima).
+#   - admin & VIP : semua sinyal + kandidat di luar top-K (kalau TOPK_REST=summary)
+#   - FREE        : sinyal teratas sebanyak sisa kuota harian (1 sinyal = 1 kuota)
+# Filter per user (/filter, core/user_filters.py) berlaku per sinyal di digest.
+# Pesan yang melewati batas Telegram (4096 karakter) dipecah di batas blok
+# sinyal, jadi satu sinyal tidak pernah terpotong di dua pesan.
+# Hemat call dihitung terhadap mode biasa: 1 call per sinyal per penerima
+# (+1 pesan ringkasan sisa top-K untuk admin & VIP).
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config import TELEGRAM_ADMIN_ID
+from core.bot_state import state, is_vip, save_daily_counts
+from telegram.telegram_broadcast import FREE_DAILY_LIMIT, roll_daily_counts
+from telegram.telegram_common import send_telegram
+
+MAX_CHARS = 4096
+
+stats = {"closes": 0, "signals": 0, "calls": 0, "calls_saved": 0}
+
+
+def digest_block(cand: dict) -> str:
+    """Satu sinyal versi ringkas: harga + batas validasi (lihat build_signal_message)."""
+    entry, sl, tp1, tp2, tp3 = cand["levels"][:5]
+    risk = abs(entry - sl)
+    late = cand.get("late")
+    side = cand.get("side", "long")
+    # long: batal lari naik 0.30R / retrace 0.15R; short: cermin
+    lo, hi = (0.15, 0.30) if side == "long" else (0.30, 0.15)
+    head = f"🟦 *{cand['symbol']}* — Tier {cand['tier']} ({cand['score']}/150) — {side.upper()}"
+    if cand.get("strategy"):
+        head += f" · `{cand['strategy']}`"
+    if late:
+        head += f" ⏱ +{late:.0f}s"
+    return (
+        f"{head}\n"
+        f"Entry `{entry:.6f}` · SL `{sl:.6f}`\n"
+        f"TP `{tp1:.6f}` / `{tp2:.6f}` / `{tp3:.6f}`\n"
+        f"Valid `{entry - lo * risk:.6f}` – `{entry + hi * risk:.6f}`"
+    )
+
+
+def rest_block(rest: List[dict]) -> str:
+    lines = ["📋 Di luar top pilihan:"]
+    for c in rest:
+        lines.append(f"• {c['symbol']} — Tier {c['tier']} ({c['score']}) — {c.get('side', 'long').upper()}"
+                     f" — entry `{c['levels'][0]:.6f}`")
+    return "\n".join(lines)
+
+
+def _truncate(block: str, room: int) -> str:
+    """Potong blok ≤ room karakter di batas baris (tiap baris blok Markdown-nya utuh)."""
+    cut = block[: room - 2]
+    nl = cut.rfind("\n")
+    if nl > 0:
+        return cut[:nl] + "\n…"
+    # satu baris panjang: jangan tinggalkan `kode` / *bold* yang terbuka
+    for mark in "`*":
+        if cut.count(mark) % 2:
+            cut = cut[: cut.rfind(mark)]
+    return cut + "…"
+
+
+def split_blocks(header: str, blocks: List[str], footer: str = "",
+                 limit: int = MAX_CHARS) -> List[str]:
+    """Gabung blok jadi pesan ≤ limit karakter; header di tiap bagian, footer di bagian terakhir."""
+    # ukuran dihitung dengan header bernomor terpanjang: "(k/k)", k ≤ jumlah blok + footer
+    most = len(blocks) + 1
+    head = len(header) + len(f" ({most}/{most})")
+    parts: List[List[str]] = [[]]
+    size = head
+    for block in blocks:
+        if len(block) + head + 2 > limit:
+            block = _truncate(block, limit - head - 2)
+        if parts[-1] and size + 2 + len(block) > limit:
+            parts.append([])
+            size = head
+        parts[-1].append(block)
+        size += 2 + len(block)
+    if footer and size + 2 + len(footer) > limit:
+        parts.append([])
+
+    out = []
+    for i, chunk in enumerate(parts):
+        h = header if len(parts) == 1 else f"{header} ({i + 1}/{len(parts)})"
+        body = [h] + chunk
+        if footer and i == len(parts) - 1:
+            body.append(footer)
+        out.append("\n\n".join(body))
+    return out
+
+
+def build_digest(close_time: int, cands: List[dict], rest: Optional[List[dict]] = None,
+                 footer: str = "") -> List[str]:
+    close_at = time.strftime("%H:%M", time.localtime((close_time + 1) / 1000))
+    header = f"🟦 SMC DIGEST — close 5m {close_at} — {len(cands)} sinyal"
+    blocks = [digest_block(c) for c in cands]
+    if rest:
+        blocks.append(rest_block(rest))
+    return split_blocks(header, blocks, footer)
+
+
+def _send_all(chat_id: int, parts: List[str]) -> Tuple[int, bool]:
+    """Return (jumlah call, semua bagian terkirim)."""
+    ok = True
+    for text in parts:
+        ok = send_telegram(text, chat_id=chat_id) is not None and ok
+    return len(parts), ok
+
+
+def broadcast_digest(close_time: int, cands: List[dict], rest: Optional[List[dict]] = None) -> Dict[str, int]:
+    """
+    Kirim digest satu close. cands sudah urut ranking (terbaik dulu) → user FREE
+    dengan sisa kuota < len(cands) menerima sinyal teratas saja.
+    Filter per user (/filter) menyaring sinyal per penerima; digest dibangun
+    sekali per kombinasi sinyal yang sama.
+    Jumlah penerima per sinyal diisi ke cand["recipients"] (jurnal sinyal); penerima &
+    kuota FREE hanya dihitung kalau semua bagian digest-nya terkirim.
+    Return {"calls", "baseline"} untuk close ini.
+    """
+    rest = rest or []
+    if not cands and not rest:
+        return {"calls": 0, "baseline": 0}
+    roll_daily_counts()
+
+    calls = baseline = 0
+    per_signal_rest = 1 if rest else 0   # mode biasa: ringkasan sisa = 1 pesan terpisah
+    everything = tuple(range(len(cands)))
+    blocked = [state.filters.blocked(c["symbol"], c["tier"]) for c in cands]
+    any_blocked = any(blocked)
+    full_cache: Dict[Tuple[int, ...], List[str]] = {}   # admin & VIP: sinyal + sisa top-K
+    free_cache: Dict[Tuple[int, ...], List[str]] = {}
+    received = [0] * len(cands)
+    counted = []
+
+    def visible(cid: int) -> Tuple[int, ...]:
+        if not any_blocked:
+            return everything
+        return tuple(i for i, b in enumerate(blocked) if cid not in b)
+
+    def full_parts(idx: Tuple[int, ...]) -> List[str]:
+        if idx not in full_cache:
+            full_cache[idx] = build_digest(close_time, [cands[i] for i in idx], rest)
+        return full_cache[idx]
+
+    def deliver(cid: int, idx: Tuple[int, ...], parts: List[str]) -> Tuple[int, bool]:
+        n, ok = _send_all(cid, parts)
+        if ok:
+            for i in idx:
+                received[i] += 1
+        return n, ok
+
+    if TELEGRAM_ADMIN_ID:
+        calls += deliver(int(TELEGRAM_ADMIN_ID), everything, full_parts(everything))[0]
+        baseline += len(cands) + per_signal_rest
+    else:
+        print("⚠️ TELEGRAM_ADMIN_ID belum di-set. Admin tidak menerima digest.")
+
+    for cid in list(state.subscribers):
+        if TELEGRAM_ADMIN_ID and str(cid) == str(TELEGRAM_ADMIN_ID):
+            continue
+        idx = visible(cid)
+
+        if is_vip(cid):
+            if cands and not idx:
+                continue   # semua sinyal close ini tersaring filter user
+            calls += deliver(cid, idx, full_parts(idx))[0]
+            baseline += len(idx) + per_signal_rest
+            continue
+
+        count = state.daily_counts.get(cid, 0)
+        idx = idx[:max(0, FREE_DAILY_LIMIT - count)]
+        if not idx:
+            continue
+        if idx not in free_cache:
+            free_cache[idx] = build_digest(
+                close_time, [cands[i] for i in idx],
+                footer=f"Free: maksimal {FREE_DAILY_LIMIT} sinyal/hari. VIP: Unlimited sinyal.",
+            )
+        n, ok = deliver(cid, idx, free_cache[idx])
+        calls += n
+        baseline += len(idx)
+        if not ok:
+            continue
+        state.daily_counts[cid] = count + len(idx)
+        counted.append(cid)
+
+    save_daily_counts(counted)
+    for cand, n in zip(cands, received):
+        cand["recipients"] = cand.get("recipients", 0) + n
+
+    saved = max(0, baseline - calls)
+    stats["closes"] += 1
+    stats["signals"] += len(cands)
+    stats["calls"] += calls
+    stats["calls_saved"] += saved
+
+    close_at = time.strftime("%H:%M", time.localtime((close_time + 1) / 1000))
+    print(f"[digest {close_at}] {len(cands)} sinyal (+{len(rest)} ringkas) → "
+          f"{calls} call Telegram (mode biasa {baseline}, hemat {saved})")
+    return {"calls": calls, "baseline": baseline}
+
+
+def digest_summary() -> str:
+    if not stats["closes"]:
+        return "belum ada"
+    return (f"{stats['signals']} sinyal / {stats['closes']} close, "
+            f"{stats['calls']} call (hemat {stats['calls_saved']})")
@@ -0,0 +1,153 @@
+# telegram/telegram_dispatch.py
+# Dispatcher update Telegram berbasis tabel (bukan rantai if):
+#   commands : "/cmd"      → (role, handler)
+#   buttons  : teks tombol → (role, handler)
+# role: "any" | "user" (bukan admin) | "admin". Lookup O(1) per pesan.
+# Input admin yang tidak cocok (tombol user, teks biasa) → handler unknown
+# ("Perintah admin tidak dikenali"); teks biasa / tombol admin dari user diabaikan.
+#
+# Handler (args, chat_id) jalan di thread pool (TELEGRAM_HANDLER_WORKERS):
+# satu reply lambat (sendMessage, query /stats) tidak menahan update lain di
+# batch getUpdates yang sama. Update dari chat yang sama tetap dieksekusi
+# berurutan (antrian per chat), jadi /filter lalu /filter tidak tertukar.
+#
+# Counter latency per command (n, total, max, error) → /cmdstats & /status.
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from core.bot_state import is_admin
+
+ANY = "any"
+USER = "user"
+ADMIN = "admin"
+
+Handler = Callable[[list, int], None]
+
+
+class Route:
+    __slots__ = ("name", "role", "handler")
+
+    def __init__(self, name: str, role: str, handler: Handler):
+        self.name = name
+        self.role = role
+        self.handler = handler
+
+    def allows(self, admin: bool) -> bool:
+        return self.role == ANY or (self.role == ADMIN) == admin
+
+
+class Dispatcher:
+    def __init__(self, commands: Dict[str, Tuple[str, Handler]], buttons: Dict[str, Tuple[str, Handler]],
+                 unknown: Handler, workers: int = 8):
+        self.commands = {cmd: Route(cmd, role, fn) for cmd, (role, fn) in commands.items()}
+        names = {fn: cmd for cmd, (_, fn) in commands.items()}
+        self.buttons = {text: Route(names.get(fn, fn.__name__), role, fn)
+                        for text, (role, fn) in buttons.items()}
+        self.unknown = Route("unknown", ANY, unknown)
+        self.workers = max(1, workers)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queues: Dict[int, Deque[Tuple[str, Callable, tuple]]] = {}
+        self.stats: Dict[str, List[float]] = {}   # name → [n, total_s, max_s, error]
+
+    # ---------- routing ----------
+
+    def route(self, chat_id: int, text: str) -> Optional[Tuple[Route, list]]:
+        """Teks pesan → (route, args); None = diabaikan (hanya untuk non-admin)."""
+        admin = bool(is_admin(chat_id))
+        r = self.buttons.get(text)
+        if r is not None and r.allows(admin):
+            return r, []
+        if r is not None or not text.startswith("/"):
+            return (self.unknown, []) if admin else None
+        parts = text.strip().split()
+        cmd = parts[0].lower().split("@", 1)[0]   # /status@NamaBot di grup
+        r = self.commands.get(cmd)
+        if r is None or not r.allows(admin):
+            return self.unknown, parts[1:]
+        return r, parts[1:]
+
+    def dispatch_text(self, chat_id: int, text: str) -> bool:
+        routed = self.route(chat_id, text)
+        if routed is None:
+            return False
+        r, args = routed
+        if text.startswith("/"):
+            print(f"[TELEGRAM CMD] {chat_id} {text.split()[0]} {args}")
+        self.submit(chat_id, r.name, r.handler, (args, chat_id))
+        return True
+
+    def call(self, cmd: str, args: list, chat_id: int):
+        """Jalankan command langsung (sinkron, thread pemanggil) dengan cek role yang sama."""
+        r = self.commands.get(cmd.lower())
+        if r is None or not r.allows(bool(is_admin(chat_id))):
+            r = self.unknown
+        self._run(r.name, r.handler, (args, chat_id))
+
+    # ---------- eksekusi ----------
+
+    def submit(self, chat_id: int, name: str, fn: Callable, args: tuple):
+        """Antrikan fn(*args) untuk chat_id: paralel antar chat, berurutan dalam satu chat."""
+        with self._lock:
+            q = self._queues.get(chat_id)
+            if q is not None:
+                q.append((name, fn, args))
+                return
+            self._queues[chat_id] = deque([(name, fn, args)])
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="tg-handler")
+        self._pool.submit(self._drain, chat_id)
+
+    def _drain(self, chat_id: int):
+        while True:
+            with self._lock:
+                q = self._queues[chat_id]
+                if not q:
+                    del self._queues[chat_id]
+                    return
+                name, fn, args = q.popleft()
+            self._run(name, fn, args)
+
+    def _run(self, name: str, fn: Callable, args: tuple):
+        t0 = time.perf_counter()
+        failed = 0
+        try:
+            fn(*args)
+        except Exception as e:
+            failed = 1
+            print(f"Error handler Telegram {name}:", e)
+        dt = time.perf_counter() - t0
+        with self._lock:
+            s = self.stats.setdefault(name, [0, 0.0, 0.0, 0])
+            s[0] += 1
+            s[1] += dt
+            s[2] = max(s[2], dt)
+            s[3] += failed
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(q) for q in self._queues.values())
+
+    # ---------- laporan ----------
+
+    def summary(self) -> str:
+        with self._lock:
+            n = sum(s[0] for s in self.stats.values())
+            total = sum(s[1] for s in self.stats.values())
+        if not n:
+            return "belum ada"
+        return f"{n} diproses, avg {total / n * 1000:.0f} ms"
+
+    def format_stats(self, limit: int = 20) -> str:
+        with self._lock:
+            rows = sorted(self.stats.items(), key=lambda kv: kv[1][1], reverse=True)[:limit]
+        if not rows:
+            return "Belum ada command diproses."
+        lines = ["⏱ *LATENCY COMMAND*", "", "`command          n   avg ms  max ms  err`"]
+        for name, (n, total, mx, err) in rows:
+            lines.append(f"`{name[:14]:<14} {n:>5} {total / n * 1000:>8.1f} {mx * 1000:>7.0f} {err:>4}`")
+        return "\n".join(lines)
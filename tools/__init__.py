@@ -0,0 +1,2 @@
+# tools/__init__.py
+# boleh kosong
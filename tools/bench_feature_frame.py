@@ -0,0 +1,98 @@
+# tools/bench_feature_frame.py
+# Micro-benchmark FeatureFrame: semua detector analyse_frames dijalankan
+#   terpisah : tiap detector menerima DataFrame mentah (EMA/ATR/RSI dihitung
+#              ulang per detector — perilaku sebelum FeatureFrame)
+#   bersama  : satu FeatureFrame per timeframe dipakai semua detector
+# di atas window 220 bar (sama dengan analyse_symbol). Hasil keduanya dicek identik.
+#
+#   python -m tools.bench_feature_frame --calls 2000
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from smc.smc_logic import (
+    build_entry_sl_tp_aggressive,
+    detect_bias_generic,
+    detect_micro_choch,
+    detect_micro_fvg,
+    detect_momentum,
+    detect_not_choppy,
+    detect_not_overextended,
+    feature_frame,
+)
+
+
+def synthetic_frame(n: int = 220, seed: int = 0, drift: float = 0.0004) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(drift, 0.004, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.003, n)) * close
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": rng.uniform(1e3, 1e5, n),
+    })
+
+
+def run_detectors(df_5m, df_15m, df_1h, shared: bool):
+    if shared:
+        df_5m, df_15m, df_1h = feature_frame(df_5m), feature_frame(df_15m), feature_frame(df_1h)
+    fvg, fl, fh = detect_micro_fvg(df_5m)
+    levels = build_entry_sl_tp_aggressive(df_5m, fl, fh)
+    return (
+        detect_bias_generic(df_5m),
+        detect_bias_generic(df_15m),
+        detect_bias_generic(df_1h),
+        detect_micro_choch(df_5m),
+        (fvg, fl, fh),
+        detect_momentum(df_5m),
+        detect_not_choppy(df_5m),
+        detect_not_overextended(df_5m),
+        levels.as_tuple(),
+    )
+
+
+def _time(frames, shared: bool) -> float:
+    t0 = time.perf_counter()
+    for df_5m, df_15m, df_1h in frames:
+        run_detectors(df_5m, df_15m, df_1h, shared)
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Micro-benchmark FeatureFrame per analisa.")
+    ap.add_argument("--calls", type=int, default=2000)
+    ap.add_argument("--variants", type=int, default=50, help="jumlah set data berbeda")
+    args = ap.parse_args()
+
+    frames = [
+        (synthetic_frame(seed=3 * i), synthetic_frame(seed=3 * i + 1), synthetic_frame(seed=3 * i + 2))
+        for i in range(args.variants)
+    ]
+    for df_5m, df_15m, df_1h in frames:
+        a = run_detectors(df_5m, df_15m, df_1h, shared=False)
+        b = run_detectors(df_5m, df_15m, df_1h, shared=True)
+        if a != b:
+            raise SystemExit(f"Hasil berbeda: {a} vs {b}")
+
+    reps = max(1, args.calls // len(frames))
+    calls = reps * len(frames)
+    _time(frames, False), _time(frames, True)   # warm up
+    t_sep = min(_time(frames * reps, False) for _ in range(3))
+    t_shared = min(_time(frames * reps, True) for _ in range(3))
+
+    us_sep = t_sep / calls * 1e6
+    us_shared = t_shared / calls * 1e6
+    print(f"{calls} analisa (hasil identik)")
+    print(f"terpisah : {us_sep:8.1f} us/analisa")
+    print(f"bersama  : {us_shared:8.1f} us/analisa")
+    print(f"hemat    : {us_sep - us_shared:8.1f} us/analisa ({(1 - t_shared / t_sep) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# tools/bench_filters.py
+# Benchmark resolusi penerima satu sinyal dengan filter per user (/filter):
+#   naive : loop semua subscriber, cek aturan filter masing-masing
+#   index : core/user_filters.FilterIndex — subscriber − gabungan set penolak
+# Hasil kedua cara dicek sama untuk setiap sinyal.
+#
+#   python -m tools.bench_filters --subs 10000 100000 --filtered 0.3
+
+import argparse
+import random
+import time
+
+from core.user_filters import TIER_RANK, FilterIndex, UserFilter
+
+TIERS = tuple(TIER_RANK)
+
+
+def _random_filter(rng: random.Random, symbols) -> UserFilter:
+    f = UserFilter()
+    if rng.random() < 0.6:
+        f.min_tier = rng.choice(("A", "A+"))
+    if rng.random() < 0.3:
+        f.allow = set(rng.sample(symbols, rng.randint(1, 10)))
+    if rng.random() < 0.3:
+        f.deny = set(rng.sample(symbols, rng.randint(1, 5)))
+    if rng.random() < 0.3:
+        start = rng.randrange(24)
+        f.quiet = (start, (start + rng.randint(4, 10)) % 24)
+    return f
+
+
+def _naive(subs, prefs, symbol, tier, hour):
+    out = set()
+    for cid in subs:
+        f = prefs.get(cid)
+        if f is None or f.accepts(symbol, tier, hour):
+            out.add(cid)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark filter sinyal per user (naive vs index).")
+    ap.add_argument("--subs", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--filtered", type=float, default=0.3, help="porsi subscriber yang punya filter")
+    ap.add_argument("--symbols", type=int, default=300)
+    ap.add_argument("--signals", type=int, default=50)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    symbols = [f"FK{i:04d}USDT" for i in range(args.symbols)]
+    print(f"{'subs':>8} {'filter':>7} {'build ms':>9} {'naive ms':>9} {'index ms':>9} "
+          f"{'blocked ms':>10} {'penerima':>9}")
+    for n in args.subs:
+        subs = set(range(1, n + 1))
+        prefs = {cid: _random_filter(rng, symbols) for cid in subs if rng.random() < args.filtered}
+        t0 = time.perf_counter()
+        index = FilterIndex()
+        index.load(prefs.items())
+        t_build = time.perf_counter() - t0
+
+        sigs = [(rng.choice(symbols), rng.choice(TIERS), rng.randrange(24)) for _ in range(args.signals)]
+        t_naive = t_index = t_blocked = 0.0
+        total = 0
+        for symbol, tier, hour in sigs:
+            t0 = time.perf_counter()
+            want = _naive(subs, prefs, symbol, tier, hour)
+            t_naive += time.perf_counter() - t0
+            t0 = time.perf_counter()
+            blocked = index.blocked(symbol, tier, hour)
+            t_blocked += time.perf_counter() - t0
+            got = subs - blocked
+            t_index += time.perf_counter() - t0
+            assert got == want, (symbol, tier, hour)
+            total += len(got)
+
+        k = len(sigs)
+        print(f"{n:>8} {len(index):>7} {t_build * 1000:>9.1f} {t_naive / k * 1000:>9.2f} "
+              f"{t_index / k * 1000:>9.2f} {t_blocked / k * 1000:>10.3f} {total // k:>9}")
+
+
+if __name__ == "__main__":
+    main()
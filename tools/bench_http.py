@@ -0,0 +1,182 @@
+# tools/bench_http.py
+# Benchmark transport HTTP (core/http_transport.py) terhadap server lokal
+# tools/fake_binance.py:
+#   latency : requests.get polos (koneksi baru per call) vs transport.get
+#             (session + pool keep-alive), serial dan paralel N thread
+#   weight  : spam klines ke server dengan limit kecil — transport menahan diri
+#             di budget, server tidak pernah balas 429
+#   breaker : host mati — call pertama menunggu error koneksi, setelah circuit
+#             open call ditolak langsung
+#   cek     : regresi breaker (exit 1 kalau gagal): probe half-open yang ditolak
+#             weight budget tidak boleh mengunci host; 429 dengan hold_host=False
+#             (sendMessage Telegram, limit per chat) tidak membuka breaker host
+# Server lokal tanpa TLS: di produksi (TLS ke fapi / api.telegram.org) selisih
+# per call koneksi baru jauh lebih besar dari angka di sini.
+#
+#   python -m tools.bench_http --calls 300 --threads 1 8
+#   python -m tools.bench_http --check        # hanya cek regresi
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from core.http_transport import CircuitOpen, Transport, WeightBudgetExceeded, klines_weight
+from tools.fake_binance import FakeMarket, start_rest_server
+
+
+def _run(fn, calls: int, threads: int) -> float:
+    t0 = time.perf_counter()
+    if threads <= 1:
+        for i in range(calls):
+            fn(i)
+    else:
+        with ThreadPoolExecutor(threads) as ex:
+            list(ex.map(fn, range(calls)))
+    return time.perf_counter() - t0
+
+
+def bench_latency(base: str, symbols, calls: int, threads_list, limit: int):
+    url = f"{base}/fapi/v1/klines"
+    tr = Transport(weight_budget=0)
+
+    def plain(i):
+        params = {"symbol": symbols[i % len(symbols)], "interval": "5m", "limit": limit}
+        requests.get(url, params=params, timeout=10).raise_for_status()
+
+    def pooled(i):
+        params = {"symbol": symbols[i % len(symbols)], "interval": "5m", "limit": limit}
+        tr.get(url, "binance:klines", params=params, timeout=10).raise_for_status()
+
+    print(f"{'threads':>7} {'polos ms/call':>14} {'pool ms/call':>13} {'speedup':>8}")
+    for threads in threads_list:
+        t_plain = _run(plain, calls, threads)
+        t_pool = _run(pooled, calls, threads)
+        print(f"{threads:>7} {t_plain / calls * 1000:>14.2f} {t_pool / calls * 1000:>13.2f} "
+              f"{t_plain / t_pool:>7.1f}×")
+    print()
+    print(tr.format_stats())
+
+
+def bench_weight(base: str, symbols, server, budget: int):
+    url = f"{base}/fapi/v1/klines"
+    tr = Transport(weight_budget=budget)
+    sent = shed = 0
+    for i in range(10_000):
+        try:
+            tr.get(url, "binance:klines", weight=klines_weight(200), timeout=10,
+                   params={"symbol": symbols[i % len(symbols)], "interval": "5m", "limit": 200})
+            sent += 1
+        except WeightBudgetExceeded:
+            shed += 1
+            if shed >= 20:
+                break
+    host = url.split("/")[2]
+    print(f"\nweight: limit server {server.limiter.limit}, budget {budget} → {sent} call terkirim, "
+          f"{shed} ditolak lokal, weight 1m {tr.used_weight(host)}, "
+          f"server 429: {server.stats.get(429, 0)}")
+
+
+def bench_breaker(failures: int):
+    # port 9 (discard) di localhost: koneksi ditolak
+    url = "http://127.0.0.1:9/fapi/v1/klines"
+    tr = Transport(retries=0, breaker_failures=failures, breaker_cooldown=30)
+    rows = []
+    for _ in range(failures + 5):
+        t0 = time.perf_counter()
+        try:
+            tr.get(url, "binance:klines", timeout=2)
+            kind = "ok"
+        except CircuitOpen:
+            kind = "circuit open"
+        except requests.RequestException as e:
+            kind = type(e).__name__
+        rows.append((kind, (time.perf_counter() - t0) * 1000))
+    print(f"\nbreaker (host mati, {failures} gagal → open):")
+    for kind, ms in rows:
+        print(f"  {kind:<16} {ms:>8.3f} ms")
+
+
+def check_breaker(base: str, server_429: str, symbol: str):
+    """Skenario regresi breaker; SystemExit kalau perilaku salah."""
+    url = f"{base}/fapi/v1/klines"
+    host = url.split("/")[2]
+    params = {"symbol": symbol, "interval": "5m", "limit": 5}
+
+    # 429 membuka breaker, cooldown lewat, tapi weight menit ini masih di atas budget
+    tr = Transport(retries=0, weight_budget=100)
+    b = tr._breaker(host)
+    b.failure(time.time(), hold=30)
+    b.open_until = time.time() - 1
+    tr.weight[host] = (100, int(time.time() // 60))
+    try:
+        tr.get(url, "binance:klines", weight=1, params=params)
+        raise SystemExit("cek probe: call di atas budget tidak ditolak")
+    except WeightBudgetExceeded:
+        pass
+    tr.weight[host] = (0, int(time.time() // 60))   # menit baru
+    try:
+        tr.get(url, "binance:klines", weight=1, params=params).raise_for_status()
+    except CircuitOpen:
+        raise SystemExit(f"cek probe: host terkunci half-open setelah budget reset ({b.state})")
+    if b.state != "closed":
+        raise SystemExit(f"cek probe: breaker {b.state} setelah probe sukses")
+    print("cek probe half-open vs weight budget: OK")
+
+    # server dengan limit weight kecil → 429; hold_host=False tidak membuka breaker
+    url = f"{server_429}/fapi/v1/klines"
+    tr = Transport(retries=0, weight_budget=0, breaker_failures=1)
+    codes = [tr.get(url, "telegram:sendMessage", params=params, hold_host=False).status_code
+             for _ in range(5)]
+    state = tr._breaker(url.split("/")[2]).state
+    if 429 not in codes or state != "closed":
+        raise SystemExit(f"cek 429 per chat: status {codes}, breaker {state}")
+    print("cek 429 tanpa hold host: OK")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark transport HTTP (pool, weight budget, breaker).")
+    ap.add_argument("--calls", type=int, default=300)
+    ap.add_argument("--threads", type=int, nargs="+", default=[1, 8])
+    ap.add_argument("--limit", type=int, default=200, help="limit klines per call")
+    ap.add_argument("--port", type=int, default=18090)
+    ap.add_argument("--weight-limit", type=int, default=300, help="limit weight/menit server lokal")
+    ap.add_argument("--check", action="store_true", help="hanya cek regresi breaker")
+    args = ap.parse_args()
+
+    market = FakeMarket(n_symbols=50, history_bars=600)
+    server = start_rest_server(market, port=args.port, weight_limit=10 ** 9)
+    server_429 = start_rest_server(market, port=args.port + 2, weight_limit=2)
+    try:
+        check_breaker(base=f"http://127.0.0.1:{args.port}", server_429=f"http://127.0.0.1:{args.port + 2}",
+                      symbol=market.symbols[0])
+    finally:
+        for srv in (server, server_429):
+            srv.shutdown()
+            srv.server_close()
+    if args.check:
+        return
+
+    base = f"http://127.0.0.1:{args.port}"
+    server = start_rest_server(market, port=args.port, weight_limit=10 ** 9)
+    try:
+        bench_latency(base, market.symbols, args.calls, args.threads, args.limit)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # server kedua dengan limit kecil (menit baru tidak dijamin, budget < limit)
+    server = start_rest_server(market, port=args.port + 1, weight_limit=args.weight_limit)
+    try:
+        bench_weight(f"http://127.0.0.1:{args.port + 1}", market.symbols, server,
+                     budget=int(args.weight_limit * 0.8))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    bench_breaker(failures=3)
+
+
+if __name__ == "__main__":
+    main()
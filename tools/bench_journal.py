@@ -0,0 +1,85 @@
+# tools/bench_journal.py
+# Benchmark query jurnal sinyal (core/signal_journal.py) di atas data sintetis
+# N hari × M kandidat/hari: waktu /stats [hari] dan /history <symbol>.
+#
+#   python -m tools.bench_journal --days 365 --per-day 2000
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+
+def _fill(path: str, days: int, per_day: int, symbols: int, seed: int = 0):
+    rng = random.Random(seed)
+    now_ms = int(time.time() * 1000)
+    start = now_ms - days * 86_400_000
+    step = 86_400_000 // per_day
+    db = sqlite3.connect(path)
+    with db:
+        rows = []
+        for i in range(days * per_day):
+            ct = start + i * step
+            ct -= ct % 300_000
+            ct += 299_999
+            tier = rng.choice(("A+", "A", "A", "B", "B", "B"))
+            score = {"A+": 130, "A": 110, "B": 90}[tier] + rng.randint(0, 15)
+            status = rng.choice(("sent", "rest", "rest", "skip"))
+            entry = rng.uniform(0.01, 50_000.0)
+            risk = entry * 0.005
+            rows.append((ct, f"FK{rng.randrange(symbols):04d}USDT", rng.randrange(1 << 13), score, tier,
+                         status, entry, entry - risk, entry + risk, entry + 2 * risk, entry + 3 * risk,
+                         risk, rng.randint(0, 50) if status == "sent" else 0))
+        db.executemany("INSERT OR IGNORE INTO signals VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    n = db.execute("SELECT COUNT(*) FROM signals").fetchone()[0]
+    db.close()
+    return n
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark query jurnal sinyal.")
+    ap.add_argument("--days", type=int, default=365)
+    ap.add_argument("--per-day", type=int, default=2000)
+    ap.add_argument("--symbols", type=int, default=500)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["BOT_DB_FILE"] = os.path.join(tmp, "journal.db")
+        os.environ["PERSIST_FLUSH_SECONDS"] = "0"
+        from core import signal_journal
+        from core.bot_state import storage
+
+        storage()   # buat schema
+        t0 = time.perf_counter()
+        n = _fill(os.environ["BOT_DB_FILE"], args.days, args.per_day, args.symbols)
+        print(f"{n} baris jurnal ({args.days} hari × {args.per_day}/hari) diisi "
+              f"dalam {time.perf_counter() - t0:.1f}s, {os.path.getsize(os.environ['BOT_DB_FILE']) / 1e6:.1f} MB\n")
+
+        print(f"{'query':<22} {'ms':>8}")
+        for days in (1, 7, 30, args.days):
+            ms = _best_ms(lambda: signal_journal.format_stats(days), args.repeat)
+            print(f"{f'/stats {days}':<22} {ms:>8.2f}")
+        for limit in (10, 50):
+            ms = _best_ms(lambda: signal_journal.format_history("FK0007USDT", limit), args.repeat)
+            print(f"{f'/history FK0007USDT {limit}':<22} {ms:>8.2f}")
+
+        cand = {"symbol": "FKNEWUSDT", "close_time": int(time.time() * 1000), "mask": 1,
+                "score": 140, "tier": "A+", "levels": (1.0, 0.99, 1.01, 1.02, 1.03, 0.01)}
+        ms = _best_ms(lambda: signal_journal.record(cand, "sent"), 1)
+        print(f"{'record (sync flush)':<22} {ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
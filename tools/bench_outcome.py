@@ -0,0 +1,100 @@
+# tools/bench_outcome.py
+# Benchmark biaya tracker hasil sinyal (core/outcome_tracker.py) per frame WS,
+# dibanding biaya json.loads frame itu sendiri (yang memang sudah dibayar bot):
+#   index  : OutcomeTracker.on_kline (bisect level per simbol)
+#   linear : cek semua sinyal terbuka simbol itu satu per satu (cara naif)
+# N sinyal terbuka tersebar di S simbol; frame sintetis random walk.
+#
+#   python -m tools.bench_outcome --open 100 1000 5000 --symbols 300
+
+import argparse
+import json
+import random
+import time
+
+from core.outcome_tracker import BAR_MS, OutcomeTracker
+
+
+def _cands(n: int, symbols: int, t0: int, rng: random.Random):
+    out = []
+    for i in range(n):
+        entry = 100.0 * (1 + rng.uniform(-0.01, 0.01))
+        risk = entry * 0.004
+        out.append({
+            "symbol": f"FK{i % symbols:04d}USDT", "close_time": t0 - 1 - (i // symbols) * BAR_MS,
+            "tier": "A", "score": 110,
+            "levels": (entry, entry - risk, entry + risk, entry + 2 * risk, entry + 3 * risk, risk),
+        })
+    return out
+
+
+def _frames(n: int, symbols: int, t0: int, rng: random.Random):
+    price = [100.0] * symbols
+    out = []
+    for i in range(n):
+        s = rng.randrange(symbols)
+        price[s] *= 1 + rng.gauss(0, 0.0005)
+        c = price[s]
+        k = {"t": t0 + BAR_MS, "T": t0 + 2 * BAR_MS - 1, "s": f"FK{s:04d}USDT", "i": "5m",
+             "o": f"{c:.6f}", "c": f"{c:.6f}", "h": f"{c * 1.0003:.6f}", "l": f"{c * 0.9997:.6f}",
+             "v": "1234.5", "x": False}
+        out.append(json.dumps({"stream": f"fk{s:04d}usdt@kline_5m", "data": {"e": "kline", "k": k}}))
+    return out
+
+
+class _Linear:
+    """Baseline naif: list sinyal per simbol, semua level dicek tiap frame."""
+
+    def __init__(self, cands):
+        self.by_symbol = {}
+        for c in cands:
+            self.by_symbol.setdefault(c["symbol"], []).append(list(c["levels"][:5]) + [False])
+
+    def on_kline(self, k):
+        sigs = self.by_symbol.get(k["s"])
+        if not sigs:
+            return
+        h, l = float(k["h"]), float(k["l"])
+        for sig in sigs:
+            entry, sl, tp1, tp2, tp3, filled = sig
+            if not filled:
+                sig[5] = l <= entry
+            elif l <= sl or h >= tp1 or h >= tp2 or h >= tp3:
+                pass
+
+
+def _per_frame_us(fn, frames) -> float:
+    t0 = time.perf_counter()
+    for f in frames:
+        fn(f)
+    return (time.perf_counter() - t0) / len(frames) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark tracker hasil sinyal per frame WS.")
+    ap.add_argument("--open", type=int, nargs="+", default=[100, 1000, 5000], help="sinyal terbuka")
+    ap.add_argument("--symbols", type=int, default=300)
+    ap.add_argument("--frames", type=int, default=200_000)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    t0 = (int(time.time() * 1000) // BAR_MS) * BAR_MS
+    frames = _frames(args.frames, args.symbols, t0, rng)
+    parsed = [json.loads(f)["data"]["k"] for f in frames]
+    t_json = _per_frame_us(json.loads, frames)
+
+    print(f"{args.frames} frame, {args.symbols} simbol — json.loads {t_json:.2f} µs/frame\n")
+    print(f"{'open':>6} {'index µs':>9} {'linear µs':>10} {'index/json':>11} {'event':>7}")
+    for n in args.open:
+        cands = _cands(n, args.symbols, t0, random.Random(1))
+        tr = OutcomeTracker()
+        for c in cands:
+            tr.add(c)
+        t_idx = _per_frame_us(tr.on_kline, parsed)
+        lin = _Linear(cands)
+        t_lin = _per_frame_us(lin.on_kline, parsed)
+        print(f"{n:>6} {t_idx:>9.2f} {t_lin:>10.2f} {t_idx / t_json:>10.0%} {len(tr.drain()):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# tools/bench_signal_objects.py
+# Benchmark alokasi & memori hasil analisa per close (N simbol):
+#   dict    : conditions dict 13 key + levels dict + hasil evaluate dict (format lama)
+#   slots   : SmcConditions + SmcLevels + SignalEval (smc_types)
+#   batch   : SignalBatch (kolom) + evaluate_masks sekali untuk satu close
+#
+# Angka dari tracemalloc: jumlah blok & byte yang masih hidup setelah satu
+# close (hasil disimpan seperti di scanner), plus waktu bangun + evaluate.
+#
+#   python -m tools.bench_signal_objects --symbols 1000 --repeat 20
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from smc.smc_scoring import (
+    COND_KEYS,
+    MASK_SPACE,
+    _score_reference,
+    evaluate_smc_signal,
+    should_send_tier,
+    tier_from_score,
+    unpack_conditions,
+)
+from smc.smc_types import SignalBatch, SmcConditions, SmcLevels
+
+
+def _inputs(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        mask = rng.randrange(MASK_SPACE)
+        entry = rng.uniform(0.01, 50_000.0)
+        risk = entry * rng.uniform(0.002, 0.01)
+        rows.append((f"FK{i:04d}USDT", mask, entry, risk))
+    return rows
+
+
+def build_dict(rows):
+    out = []
+    for symbol, mask, entry, risk in rows:
+        flags = unpack_conditions(mask)
+        conditions = {"symbol": symbol, "timeframe": "5m"}
+        for k in COND_KEYS:
+            conditions[k] = flags[k]
+        conditions["setup_score"] = flags["setup_score"]
+        levels = {
+            "entry": entry,
+            "sl": entry - risk,
+            "tp1": entry + risk * 1.2,
+            "tp2": entry + risk * 2.0,
+            "tp3": entry + risk * 3.0,
+            "risk_per_unit": risk,
+        }
+        score = _score_reference(conditions)
+        tier = tier_from_score(score)
+        res = {"score": score, "tier": tier, "should_send": should_send_tier(tier, "A")}
+        out.append((conditions, levels, res))
+    return out
+
+
+def build_slots(rows):
+    out = []
+    for symbol, mask, entry, risk in rows:
+        conditions = SmcConditions(symbol, mask)
+        levels = SmcLevels(entry, entry - risk, entry + risk * 1.2, entry + risk * 2.0,
+                           entry + risk * 3.0, risk)
+        out.append((conditions, levels, evaluate_smc_signal(conditions)))
+    return out
+
+
+def build_batch(rows, batch: SignalBatch):
+    batch.reset()
+    for symbol, mask, entry, risk in rows:
+        batch.add(
+            SmcConditions(symbol, mask),
+            SmcLevels(entry, entry - risk, entry + risk * 1.2, entry + risk * 2.0,
+                      entry + risk * 3.0, risk),
+        )
+    return batch.evaluate("A")
+
+
+def _measure(fn, *args):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    t0 = time.perf_counter()
+    result = fn(*args)
+    dt = time.perf_counter() - t0
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(s.count_diff for s in stats)
+    size = sum(s.size_diff for s in stats)
+    del result
+    return blocks, size, dt
+
+
+def _best_time(fn, args, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark objek sinyal per close.")
+    ap.add_argument("--symbols", type=int, default=1000)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    rows = _inputs(args.symbols)
+    batch = SignalBatch(capacity=args.symbols)
+    evaluate_smc_signal(SmcConditions("WARM", 0))   # bangun LUT di luar pengukuran
+    build_batch(rows, batch)
+
+    cases = [
+        ("dict", build_dict, (rows,)),
+        ("slots", build_slots, (rows,)),
+        ("batch", build_batch, (rows, batch)),
+    ]
+    print(f"{args.symbols} simbol per close\n")
+    print(f"{'mode':<6} {'blok':>8} {'KiB hidup':>10} {'B/simbol':>9} {'ms/close':>9}")
+    for name, fn, fn_args in cases:
+        blocks, size, _ = _measure(fn, *fn_args)
+        if name == "batch":
+            size += batch.memory_bytes()    # buffer dipakai ulang, tetap dihitung
+        ms = _best_time(fn, fn_args, args.repeat) * 1000
+        print(f"{name:<6} {blocks:>8} {size / 1024:>10.1f} {size / args.symbols:>9.0f} {ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# tools/bench_startup.py
+# Benchmark cold start: `python main.py` sungguhan terhadap server lokal
+# (tools/fake_binance.py sebagai subprocess + fake Telegram di proses ini), dengan
+# latency buatan supaya urutan serial vs paralel terlihat seperti di jaringan asli.
+#
+# Tiap run: proses bot distart, baris "[startup] +N ms <tahap>" (core/startup.py)
+# dibaca dari stdout, lalu proses dihentikan (SIGTERM) begitu "scan_ready" muncul.
+# "proses" = waktu diukur dari sisi bench (termasuk start interpreter), kolom
+# lain = angka yang dicetak bot (sejak baris pertama main.py).
+#
+#   python -m tools.bench_startup --runs 5 --pairs 100 --latency-ms 50
+#   python -m tools.bench_startup --workers 2 --max-first-scan 3   # exit 1 kalau lebih lambat
+#   python -m tools.bench_startup --imports                        # modul termahal saat import main
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGES = ["imports", "state", "telegram", "pairs", "ws", "analysis", "scan_ready"]
+MARK_RE = re.compile(r"^\[startup\] \+(\d+) ms (\w+)")
+
+
+class _TelegramHandler(BaseHTTPRequestHandler):
+    """getUpdates → kosong, method lain (sendMessage, ...) → ok."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        body = json.dumps({"ok": True, "result": []}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _reply
+    do_POST = _reply
+
+
+def start_fake_telegram(port: int, latency_ms: float) -> ThreadingHTTPServer:
+    httpd = ThreadingHTTPServer(("127.0.0.1", port), _TelegramHandler)
+    httpd.daemon_threads = True
+    httpd.latency = latency_ms / 1000
+    httpd.handle_error = lambda request, client_address: None   # bot di-terminate di tengah poll
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def start_fake_binance(args) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-u", "-m", "tools.fake_binance", "--symbols", str(args.pairs),
+         "--history-bars", "600", "--rest-port", str(args.rest_port), "--ws-port", str(args.ws_port),
+         "--latency-ms", str(args.latency_ms), "--weight-limit", str(10 ** 9)],
+        cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    for line in proc.stdout:
+        if line.startswith("Fake Binance siap"):
+            break
+    else:
+        raise RuntimeError("fake_binance gagal start")
+    threading.Thread(target=lambda: [None for _ in proc.stdout], daemon=True).start()
+    return proc
+
+
+def bot_env(args, db_file: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "PYTHONUNBUFFERED": "1",
+        "TELEGRAM_TOKEN": "bench",
+        "TELEGRAM_ADMIN_ID": "1",
+        "TELEGRAM_API_URL": f"http://127.0.0.1:{args.tg_port}",
+        "BINANCE_REST_URL": f"http://127.0.0.1:{args.rest_port}",
+        "BINANCE_STREAM_URL": f"ws://127.0.0.1:{args.ws_port}/stream",
+        "BOT_DB_FILE": db_file,
+        "MAX_USDT_PAIRS": str(args.pairs),
+        "MIN_VOLUME_USDT": "0",
+        "SCAN_WORKERS": str(args.workers),
+        "HOT_RELOAD_SECONDS": "0",
+        "HOT_RELOAD_ENV_FILE": os.path.join(os.path.dirname(db_file), "none.env"),
+        "STRATEGY_FILE": os.path.join(os.path.dirname(db_file), "none.json"),
+        "CLUSTER_BACKEND": "",
+        "WEBSOCKETS_MAX_LINE_LENGTH": "65536",
+    })
+    return env
+
+
+def run_once(args, tmp: str, i: int) -> Optional[Dict[str, float]]:
+    """Satu cold start. Return {tahap: detik} (+ "proses"), None kalau timeout."""
+    db_file = os.path.join(tmp, f"bench_{i}.db")
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-u", "main.py"], cwd=ROOT, env=bot_env(args, db_file),
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    marks: Dict[str, float] = {}
+    timer = threading.Timer(args.timeout, proc.terminate)
+    timer.start()
+    try:
+        for line in proc.stdout:
+            if args.verbose:
+                print("  | " + line.rstrip())
+            m = MARK_RE.match(line)
+            if not m:
+                continue
+            marks[m.group(2)] = int(m.group(1)) / 1000
+            if m.group(2) == "scan_ready":
+                marks["proses"] = time.perf_counter() - t0
+                break
+    finally:
+        timer.cancel()
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return marks if "scan_ready" in marks else None
+
+
+def import_profile(top: int):
+    """python -X importtime: modul dengan waktu kumulatif terbesar saat `import main`."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=ROOT,
+                         capture_output=True, text=True).stderr
+    rows = []
+    total = 0
+    for line in out.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            us, name = int(parts[1]), parts[2].rstrip()
+            rows.append((us, name.strip()))
+            if len(name) - len(name.lstrip()) == 1:   # modul level atas
+                total += us
+    print(f"import main: {total / 1000:.0f} ms (kumulatif, top {top})")
+    for us, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {us / 1000:>7.1f} ms {name}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark cold start bot (time-to-first-scan).")
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--pairs", type=int, default=50)
+    ap.add_argument("--workers", type=int, default=1, help="SCAN_WORKERS bot")
+    ap.add_argument("--latency-ms", type=float, default=50.0, help="RTT buatan REST Binance")
+    ap.add_argument("--tg-latency-ms", type=float, default=50.0, help="RTT buatan Telegram")
+    ap.add_argument("--rest-port", type=int, default=18180)
+    ap.add_argument("--ws-port", type=int, default=18181)
+    ap.add_argument("--tg-port", type=int, default=18182)
+    ap.add_argument("--timeout", type=float, default=60.0, help="batas per run (detik)")
+    ap.add_argument("--max-first-scan", type=float, default=0.0,
+                    help="exit 1 kalau median scan_ready (proses) melewati N detik")
+    ap.add_argument("--imports", action="store_true", help="hanya profil import main")
+    ap.add_argument("--verbose", action="store_true", help="tampilkan output bot")
+    args = ap.parse_args()
+
+    if args.imports:
+        import_profile(15)
+        return
+
+    tg = start_fake_telegram(args.tg_port, args.tg_latency_ms)
+    binance = start_fake_binance(args)
+    runs: List[Dict[str, float]] = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(args.runs):
+                marks = run_once(args, tmp, i)
+                if marks is None:
+                    print(f"run {i + 1}: scan_ready tidak tercapai dalam {args.timeout:g}s")
+                    continue
+                runs.append(marks)
+                print(f"run {i + 1}: scan siap {marks['proses']:.2f}s")
+    finally:
+        binance.terminate()
+        binance.wait(5)
+        tg.shutdown()
+        tg.server_close()
+
+    if not runs:
+        sys.exit(1)
+    print(f"\n{args.pairs} pair, {args.workers} worker, latency REST {args.latency_ms:g} ms / "
+          f"Telegram {args.tg_latency_ms:g} ms, {len(runs)} run")
+    print(f"{'tahap':<12} {'median s':>9} {'min s':>7}")
+    for stage in STAGES + ["proses"]:
+        vals = [r[stage] for r in runs if stage in r]
+        if vals:
+            print(f"{stage:<12} {statistics.median(vals):>9.2f} {min(vals):>7.2f}")
+
+    if args.max_first_scan > 0:
+        med = statistics.median(r["proses"] for r in runs)
+        if med > args.max_first_scan:
+            print(f"REGRESI: scan siap {med:.2f}s > batas {args.max_first_scan:g}s")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# tools/bench_storage.py
+# Benchmark biaya tulis state bot per jumlah subscriber:
+#   json   : format lama — /activate = rewrite seluruh subscribers.json
+#   sqlite : core/storage.py — /activate = satu upsert baris (WAL), flush per op
+#   burst  : write-behind — N /activate dicatat, satu flush (biaya per command)
+# Plus simpan kuota harian FREE setelah satu broadcast (satu transaksi).
+#
+#   python -m tools.bench_storage --subs 1000 10000 100000
+
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+from core.storage import Storage
+
+
+def bench_json(path: str, subs: set, ops: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(ops):
+        subs.add(10_000_000 + i)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(list(subs), f)
+    return (time.perf_counter() - t0) / ops
+
+
+def _seed(path: str, subs: set):
+    db = sqlite3.connect(path)
+    with db:
+        db.executemany("INSERT OR IGNORE INTO subscribers VALUES (?)", [(c,) for c in subs])
+    db.close()
+
+
+def bench_sqlite(store: Storage, ops: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(ops):
+        store.add_subscriber(10_000_000 + i)   # tanpa flusher → flush sinkron
+    return (time.perf_counter() - t0) / ops
+
+
+def bench_burst(store: Storage, ops: int) -> float:
+    store.start_flusher(interval=3600, max_delay=3600)   # flush manual di bawah
+    t0 = time.perf_counter()
+    for i in range(ops):
+        store.add_subscriber(20_000_000 + i)
+    t_cmd = (time.perf_counter() - t0) / ops
+    store.stop()
+    return t_cmd
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark storage subscriber (JSON vs SQLite WAL).")
+    ap.add_argument("--subs", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    ap.add_argument("--ops", type=int, default=50, help="jumlah /activate per ukuran")
+    ap.add_argument("--free", type=int, default=1000, help="user FREE per broadcast (kuota harian)")
+    args = ap.parse_args()
+
+    print(f"{'subs':>8} {'json ms/op':>11} {'sqlite ms/op':>13} {'burst ms/cmd':>12} {'kuota ms/bcast':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.subs:
+            subs = set(range(1, n + 1))
+            t_json = bench_json(os.path.join(tmp, f"subs_{n}.json"), set(subs), args.ops)
+
+            store = Storage(os.path.join(tmp, f"bot_{n}.db"))
+            _seed(store.path, subs)
+            t_sql = bench_sqlite(store, args.ops)
+
+            day = time.strftime("%Y-%m-%d")
+            t0 = time.perf_counter()
+            store.save_daily_counts(day, [(c, 1) for c in range(1, min(n, args.free) + 1)])
+            t_daily = time.perf_counter() - t0
+            t_burst = bench_burst(store, args.ops)
+            store.close()
+
+            print(f"{n:>8} {t_json * 1000:>11.2f} {t_sql * 1000:>13.3f} "
+                  f"{t_burst * 1000:>12.4f} {t_daily * 1000:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
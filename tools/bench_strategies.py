@@ -0,0 +1,96 @@
+# tools/bench_strategies.py
+# Benchmark engine strategi plugin (smc/smc_strategies.py): N strategi per close
+#   terpisah : tiap strategi = analyse_frames sendiri (FeatureFrame & detector
+#              dihitung ulang per strategi)
+#   engine   : StrategyEngine, satu FeatureStore per simbol; fitur dengan key sama
+#              dihitung sekali untuk semua strategi
+# di atas window 220 bar. Strategi long tanpa override dicek identik dengan
+# analyse_frames; biaya per strategi dicetak seperti /strategies.
+#
+#   python -m tools.bench_strategies --calls 1000
+#   python -m tools.bench_strategies --spec "smc_long,smc_short,ketat=smc_long:rsi_ok_min=55"
+
+import argparse
+import time
+
+from core.strategy_costs import StrategyCosts
+from smc import smc_strategies
+from smc.smc_logic import analyse_frames
+from smc.smc_params import Strategy
+from smc.smc_strategies import LONG, StrategyEngine, parse_strategies
+from tools.bench_feature_frame import synthetic_frame
+
+
+def _frames(variants: int):
+    out = []
+    for i in range(variants):
+        # drift bergantian naik / turun supaya long & short sama-sama punya kandidat
+        drift = 0.001 if i % 2 == 0 else -0.001
+        out.append(tuple(synthetic_frame(seed=3 * i + j, drift=drift * (j + 1)) for j in range(3)))
+    return out
+
+
+def _time_separate(frames, plans) -> float:
+    t0 = time.perf_counter()
+    for df_5m, df_15m, df_1h in frames:
+        for _, p in plans:
+            analyse_frames("BENCH", df_5m, df_15m, df_1h, p.smc, {})
+    return time.perf_counter() - t0
+
+
+def _time_engine(frames, engine: StrategyEngine, base: Strategy) -> float:
+    t0 = time.perf_counter()
+    for df_5m, df_15m, df_1h in frames:
+        engine.analyse("BENCH", df_5m, df_15m, df_1h, base, {})
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark N strategi per close: terpisah vs engine.")
+    ap.add_argument("--calls", type=int, default=1000, help="jumlah pass (simbol × close)")
+    ap.add_argument("--variants", type=int, default=50, help="jumlah set data berbeda")
+    ap.add_argument("--spec", default="smc_long,smc_short,ketat=smc_long:rsi_ok_min=55:tier_a=105",
+                    help="format sama dengan STRATEGIES")
+    args = ap.parse_args()
+
+    # biaya dihitung di instance sendiri, bukan counter global proses
+    smc_strategies.costs = costs = StrategyCosts()
+    base = Strategy()
+    engine = StrategyEngine(parse_strategies(args.spec))
+    plans = [(s, s.params(base)) for s in engine.strategies]
+
+    frames = _frames(args.variants)
+    checked = 0
+    for df_5m, df_15m, df_1h in frames:
+        got = {s.strategy: s for s in engine.analyse("BENCH", df_5m, df_15m, df_1h, base, {})}
+        for s, p in plans:
+            if s.side != LONG or s.overrides:
+                continue
+            conditions, levels = analyse_frames("BENCH", df_5m, df_15m, df_1h, p.smc, {})
+            sig = got.get(s.name)
+            want = None if conditions is None else (conditions.mask, levels.as_tuple())
+            have = None if sig is None else (sig.conditions.mask, sig.levels.as_tuple())
+            if want != have:
+                raise SystemExit(f"Hasil {s.name} berbeda dari analyse_frames: {have} vs {want}")
+            checked += 1
+
+    reps = max(1, args.calls // len(frames))
+    passes = reps * len(frames)
+    _time_separate(frames, plans), _time_engine(frames, engine, base)   # warm up
+    t_sep = min(_time_separate(frames * reps, plans) for _ in range(3))
+    smc_strategies.costs = costs = StrategyCosts()
+    engine = StrategyEngine(engine.strategies)
+    t_eng = min(_time_engine(frames * reps, engine, base) for _ in range(3))
+
+    us_sep = t_sep / passes * 1e6
+    us_eng = t_eng / passes * 1e6
+    print(f"{len(plans)} strategi × {passes} pass ({checked} hasil long dicek identik)")
+    print(f"terpisah : {us_sep:8.1f} us/pass")
+    print(f"engine   : {us_eng:8.1f} us/pass")
+    print(f"hemat    : {us_sep - us_eng:8.1f} us/pass ({(1 - t_eng / t_sep) * 100:.1f}%)")
+    print()
+    print(costs.format_stats().replace("*", "").replace("`", ""))
+
+
+if __name__ == "__main__":
+    main()
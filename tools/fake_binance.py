@@ -0,0 +1,597 @@
+# tools/fake_binance.py
+# Server lokal pengganti fapi.binance.com + fstream.binance.com untuk load test offline.
+#
+# REST : /fapi/v1/exchangeInfo, /fapi/v1/ticker/24hr, /fapi/v1/klines, /fapi/v1/time (jam virtual)
+# WS   : /stream?streams=<sym>@kline_5m/... (combined stream)
+#
+# Market sintetis (random walk dengan regime trend) untuk N simbol.
+# Jam virtual dipercepat: 1 candle 5m = --bar-seconds detik wall clock.
+#
+# Contoh:
+#   python -m tools.fake_binance --symbols 500 --bar-seconds 20
+#   BINANCE_REST_URL=http://127.0.0.1:18080 \
+#   BINANCE_STREAM_URL=ws://127.0.0.1:18081/stream python main.py
+
+import os
+
+# URL combined stream untuk 1000 pair ~20KB, default websockets cuma 8KB.
+os.environ.setdefault("WEBSOCKETS_MAX_LINE_LENGTH", "65536")
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import websockets
+
+BAR_MS = 5 * 60 * 1000
+HOUR_MS = 60 * 60 * 1000
+
+# interval → jumlah candle 5m per candle interval tsb
+INTERVAL_BARS = {"5m": 1, "15m": 3, "1h": 12}
+
+DEFAULT_WEIGHT_LIMIT = 2400
+
+
+def klines_weight(limit: int) -> int:
+    """Weight /fapi/v1/klines sesuai tabel Binance Futures."""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+class FakeMarket:
+    """
+    Generator OHLCV sintetis per simbol (dasar 5m).
+    Bar terakhir di array selalu candle yang sedang berjalan (forming).
+    """
+
+    def __init__(
+        self,
+        n_symbols: int = 100,
+        bar_seconds: float = 300.0,
+        history_bars: int = 3000,
+        seed: int = 7,
+    ):
+        # bar 0 harus jatuh di awal jam supaya agregasi 15m/1h rapi
+        history_bars = max(history_bars - history_bars % 12, 12)
+
+        self.rng = np.random.default_rng(seed)
+        self.symbols: List[str] = [f"FK{i:04d}USDT" for i in range(n_symbols)]
+        self.index: Dict[str, int] = {s: i for i, s in enumerate(self.symbols)}
+        self.bar_seconds = float(bar_seconds)
+        self.history_bars = history_bars
+
+        now_ms = int(time.time() * 1000)
+        self.origin_ms = (now_ms // HOUR_MS) * HOUR_MS - history_bars * BAR_MS
+        self.start_wall = time.time()
+
+        n = n_symbols
+        self.sigma = self.rng.uniform(0.0015, 0.004, n)
+        self.drift = np.zeros(n)
+        self.base_volume = 10 ** self.rng.uniform(3.0, 6.0, n)
+        # quote volume 24h menurun per peringkat → filter MIN_VOLUME bermakna
+        self.quote_volume_24h = np.sort(10 ** self.rng.uniform(5.5, 10.0, n))[::-1]
+        self.last_close = 10 ** self.rng.uniform(-2.0, 4.5, n)
+
+        cap = history_bars + 1024
+        self._o = np.empty((n, cap))
+        self._h = np.empty((n, cap))
+        self._l = np.empty((n, cap))
+        self._c = np.empty((n, cap))
+        self._v = np.empty((n, cap))
+        self.count = 0
+        self.lock = threading.Lock()
+
+        self._generate(history_bars + 1)
+
+    # ---------- generator ----------
+
+    def _grow(self, need: int):
+        cap = self._o.shape[1]
+        if need <= cap:
+            return
+        new_cap = max(need, cap * 2)
+        for name in ("_o", "_h", "_l", "_c", "_v"):
+            old = getattr(self, name)
+            arr = np.empty((old.shape[0], new_cap))
+            arr[:, : self.count] = old[:, : self.count]
+            setattr(self, name, arr)
+
+    def _generate(self, k: int):
+        self._grow(self.count + k)
+        rng = self.rng
+        n = len(self.symbols)
+        for _ in range(k):
+            # ganti regime trend sesekali (rata-rata tiap ~150 bar)
+            switch = rng.random(n) < (1.0 / 150.0)
+            if switch.any():
+                self.drift[switch] = rng.normal(0.0, 0.6, switch.sum()) * self.sigma[switch]
+
+            o = self.last_close
+            r = self.drift + self.sigma * rng.standard_normal(n)
+            c = o * np.exp(r)
+            wick_up = np.abs(rng.standard_normal(n)) * self.sigma * 0.5
+            wick_dn = np.abs(rng.standard_normal(n)) * self.sigma * 0.5
+            h = np.maximum(o, c) * (1.0 + wick_up)
+            lo = np.minimum(o, c) * (1.0 - wick_dn)
+            v = self.base_volume * rng.lognormal(0.0, 0.5, n)
+
+            i = self.count
+            self._o[:, i] = o
+            self._h[:, i] = h
+            self._l[:, i] = lo
+            self._c[:, i] = c
+            self._v[:, i] = v
+            self.count += 1
+            self.last_close = c
+
+    def closed_bars(self) -> int:
+        """Jumlah candle 5m yang sudah close menurut jam virtual."""
+        elapsed = time.time() - self.start_wall
+        return self.history_bars + int(elapsed / self.bar_seconds)
+
+    def server_time_ms(self) -> int:
+        """Jam virtual (ms): candle forming = yang close_time-nya belum lewat jam ini."""
+        elapsed = time.time() - self.start_wall
+        return self.origin_ms + self.history_bars * BAR_MS + int(elapsed / self.bar_seconds * BAR_MS)
+
+    def sync(self):
+        """Pastikan array sudah berisi semua bar closed + 1 bar forming."""
+        with self.lock:
+            need = self.closed_bars() + 1
+            if self.count < need:
+                self._generate(need - self.count)
+
+    def _forming_fraction(self) -> float:
+        elapsed = time.time() - self.start_wall
+        return (elapsed / self.bar_seconds) % 1.0
+
+    def bar_open_time(self, i: int) -> int:
+        return self.origin_ms + i * BAR_MS
+
+    # ---------- akses data ----------
+
+    def bar_5m(self, sym_idx: int, i: int, forming: bool = False) -> tuple:
+        o = float(self._o[sym_idx, i])
+        h = float(self._h[sym_idx, i])
+        lo = float(self._l[sym_idx, i])
+        c = float(self._c[sym_idx, i])
+        v = float(self._v[sym_idx, i])
+        if forming:
+            frac = self._forming_fraction()
+            c = o + (c - o) * frac
+            h = max(o, c)
+            lo = min(o, c)
+            v = v * frac
+        return o, h, lo, c, v
+
+    def klines(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int = 500,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> list:
+        """Baris kline format Binance (list of list, angka harga sebagai string)."""
+        self.sync()
+        m = INTERVAL_BARS[interval]
+        interval_ms = m * BAR_MS
+        sym_idx = self.index[symbol]
+
+        with self.lock:
+            n5 = self.closed_bars() + 1
+            n5 = min(n5, self.count)
+            total = -(-n5 // m)
+
+            if start_time is not None:
+                j0 = max(0, -(-(start_time - self.origin_ms) // interval_ms))
+                j1 = min(total - 1, j0 + limit - 1)
+                if end_time is not None:
+                    j1 = min(j1, (end_time - self.origin_ms) // interval_ms)
+            elif end_time is not None:
+                j1 = min(total - 1, (end_time - self.origin_ms) // interval_ms)
+                j0 = max(0, j1 - limit + 1)
+            else:
+                j1 = total - 1
+                j0 = max(0, j1 - limit + 1)
+
+            if j1 < j0:
+                return []
+
+            a = j0 * m
+            b = min((j1 + 1) * m, n5)
+            o = self._o[sym_idx, a:b].copy()
+            h = self._h[sym_idx, a:b].copy()
+            lo = self._l[sym_idx, a:b].copy()
+            c = self._c[sym_idx, a:b].copy()
+            v = self._v[sym_idx, a:b].copy()
+
+            if b == n5:
+                po, ph, pl, pc, pv = self.bar_5m(sym_idx, n5 - 1, forming=True)
+                h[-1], lo[-1], c[-1], v[-1] = ph, pl, pc, pv
+
+        starts = np.arange(0, b - a, m)
+        ends = np.minimum(starts + m, b - a) - 1
+        agg_o = o[starts]
+        agg_h = np.maximum.reduceat(h, starts)
+        agg_l = np.minimum.reduceat(lo, starts)
+        agg_c = c[ends]
+        agg_v = np.add.reduceat(v, starts)
+
+        rows = []
+        for k in range(len(starts)):
+            ot = self.origin_ms + (j0 + k) * interval_ms
+            qv = agg_v[k] * agg_c[k]
+            rows.append([
+                ot,
+                f"{agg_o[k]:.8f}",
+                f"{agg_h[k]:.8f}",
+                f"{agg_l[k]:.8f}",
+                f"{agg_c[k]:.8f}",
+                f"{agg_v[k]:.3f}",
+                ot + interval_ms - 1,
+                f"{qv:.4f}",
+                int(agg_v[k] // 10) + 1,
+                f"{agg_v[k] * 0.5:.3f}",
+                f"{qv * 0.5:.4f}",
+                "0",
+            ])
+        return rows
+
+    def exchange_info(self) -> dict:
+        return {
+            "timezone": "UTC",
+            "serverTime": int(time.time() * 1000),
+            "rateLimits": [
+                {"rateLimitType": "REQUEST_WEIGHT", "interval": "MINUTE",
+                 "intervalNum": 1, "limit": DEFAULT_WEIGHT_LIMIT},
+            ],
+            "symbols": [
+                {
+                    "symbol": s,
+                    "pair": s,
+                    "contractType": "PERPETUAL",
+                    "status": "TRADING",
+                    "baseAsset": s[:-4],
+                    "quoteAsset": "USDT",
+                }
+                for s in self.symbols
+            ],
+        }
+
+    def ticker_24hr(self) -> list:
+        self.sync()
+        out = []
+        with self.lock:
+            for i, s in enumerate(self.symbols):
+                out.append({
+                    "symbol": s,
+                    "lastPrice": f"{self._c[i, self.count - 1]:.8f}",
+                    "quoteVolume": f"{self.quote_volume_24h[i]:.2f}",
+                })
+        return out
+
+    def kline_event(self, sym_idx: int, i: int, closed: bool) -> dict:
+        """Payload event kline WS (format stream Binance)."""
+        o, h, lo, c, v = self.bar_5m(sym_idx, i, forming=not closed)
+        ot = self.bar_open_time(i)
+        s = self.symbols[sym_idx]
+        return {
+            "e": "kline",
+            "E": ot + BAR_MS if closed else ot + int(self._forming_fraction() * BAR_MS),
+            "s": s,
+            "k": {
+                "t": ot,
+                "T": ot + BAR_MS - 1,
+                "s": s,
+                "i": "5m",
+                "f": 0,
+                "L": 0,
+                "o": f"{o:.8f}",
+                "c": f"{c:.8f}",
+                "h": f"{h:.8f}",
+                "l": f"{lo:.8f}",
+                "v": f"{v:.3f}",
+                "n": int(v // 10) + 1,
+                "x": closed,
+                "q": f"{v * c:.4f}",
+                "V": f"{v * 0.5:.3f}",
+                "Q": f"{v * c * 0.5:.4f}",
+                "B": "0",
+            },
+        }
+
+
+# ================== REST ==================
+
+class WeightLimiter:
+    """Akumulasi weight per menit (jendela kalender) seperti X-MBX-USED-WEIGHT-1M."""
+
+    def __init__(self, limit: int = DEFAULT_WEIGHT_LIMIT, ban_after: int = 0, ban_seconds: float = 120.0):
+        self.limit = limit
+        self.ban_after = ban_after
+        self.ban_seconds = ban_seconds
+        self.minute = 0
+        self.used = 0
+        self.violations = 0
+        self.banned_until = 0.0
+        self.lock = threading.Lock()
+
+    def charge(self, weight: int):
+        """Return (status, used_weight, retry_after)."""
+        now = time.time()
+        with self.lock:
+            if now < self.banned_until:
+                return 418, self.used, int(self.banned_until - now) + 1
+
+            minute = int(now // 60)
+            if minute != self.minute:
+                self.minute = minute
+                self.used = 0
+
+            retry_after = 60 - int(now % 60)
+            if self.used + weight > self.limit:
+                self.violations += 1
+                if self.ban_after and self.violations >= self.ban_after:
+                    self.banned_until = now + self.ban_seconds
+                    return 418, self.used, int(self.ban_seconds)
+                return 429, self.used, retry_after
+
+            self.used += weight
+            return 200, self.used, 0
+
+
+class _RestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeBinance/1.0"
+    # keep-alive: header & body ditulis terpisah → tanpa TCP_NODELAY kena
+    # Nagle + delayed ACK (~40 ms per response)
+    disable_nagle_algorithm = True
+
+    def log_message(self, fmt, *args):  # noqa: D401 - hening, load test berisik
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send_json(self, status: int, payload, used_weight: int, retry_after: int = 0):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-MBX-USED-WEIGHT-1M", str(used_weight))
+        if retry_after:
+            self.send_header("Retry-After", str(retry_after))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)   # simulasi RTT jaringan ke fapi
+        market: FakeMarket = self.server.market
+        limiter: WeightLimiter = self.server.limiter
+        url = urlparse(self.path)
+        q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        if url.path in ("/fapi/v1/exchangeInfo", "/fapi/v1/time"):
+            weight = 1
+        elif url.path == "/fapi/v1/ticker/24hr":
+            weight = 1 if q.get("symbol") else 40
+        elif url.path == "/fapi/v1/klines":
+            try:
+                limit = min(int(q.get("limit", 500)), 1500)
+            except ValueError:
+                self._send_json(400, {"code": -1100, "msg": "Illegal characters in parameter 'limit'."}, limiter.used)
+                return
+            weight = klines_weight(limit)
+        else:
+            self._send_json(404, {"code": -1, "msg": "Not found."}, limiter.used)
+            return
+
+        status, used, retry_after = limiter.charge(weight)
+        self.server.stats[status] = self.server.stats.get(status, 0) + 1
+        if status == 429:
+            self._send_json(429, {"code": -1003, "msg": "Too many requests; current limit is "
+                                  f"{limiter.limit} request weight per 1 MINUTE."}, used, retry_after)
+            return
+        if status == 418:
+            self._send_json(418, {"code": -1003, "msg": "Way too many requests; IP banned."}, used, retry_after)
+            return
+
+        if url.path == "/fapi/v1/exchangeInfo":
+            self._send_json(200, market.exchange_info(), used)
+            return
+
+        if url.path == "/fapi/v1/time":
+            self._send_json(200, {"serverTime": market.server_time_ms()}, used)
+            return
+
+        if url.path == "/fapi/v1/ticker/24hr":
+            tickers = market.ticker_24hr()
+            if q.get("symbol"):
+                tickers = [t for t in tickers if t["symbol"] == q["symbol"].upper()]
+                payload = tickers[0] if tickers else {"code": -1121, "msg": "Invalid symbol."}
+                self._send_json(200 if tickers else 400, payload, used)
+                return
+            self._send_json(200, tickers, used)
+            return
+
+        symbol = q.get("symbol", "").upper()
+        interval = q.get("interval", "")
+        if symbol not in market.index:
+            self._send_json(400, {"code": -1121, "msg": "Invalid symbol."}, used)
+            return
+        if interval not in INTERVAL_BARS:
+            self._send_json(400, {"code": -1120, "msg": "Invalid interval."}, used)
+            return
+        start_time = int(q["startTime"]) if "startTime" in q else None
+        end_time = int(q["endTime"]) if "endTime" in q else None
+        rows = market.klines(symbol, interval, limit, start_time, end_time)
+        self._send_json(200, rows, used)
+
+
+def start_rest_server(
+    market: FakeMarket,
+    host: str = "127.0.0.1",
+    port: int = 18080,
+    weight_limit: int = DEFAULT_WEIGHT_LIMIT,
+    ban_after: int = 0,
+    verbose: bool = False,
+    latency_ms: float = 0.0,
+) -> ThreadingHTTPServer:
+    """Jalankan REST server di thread daemon, return objek server (panggil .shutdown())."""
+    httpd = ThreadingHTTPServer((host, port), _RestHandler)
+    httpd.daemon_threads = True
+    httpd.market = market
+    httpd.limiter = WeightLimiter(weight_limit, ban_after=ban_after)
+    httpd.stats = {}
+    httpd.verbose = verbose
+    httpd.latency = latency_ms / 1000
+    t = threading.Thread(target=httpd.serve_forever, daemon=True)
+    t.start()
+    return httpd
+
+
+# ================== WEBSOCKET ==================
+
+class FakeStreamServer:
+    """
+    Combined stream <sym>@kline_5m.
+    - update intrabar (x=false) sebanyak updates_per_bar kali per candle
+    - burst close (x=true) untuk semua simbol yang disubscribe saat candle 5m close
+    - mendukung pesan SUBSCRIBE / UNSUBSCRIBE / LIST_SUBSCRIPTIONS
+    """
+
+    def __init__(self, market: FakeMarket, updates_per_bar: int = 2):
+        self.market = market
+        self.updates_per_bar = max(0, updates_per_bar)
+        self.connections = 0
+        self.frames_sent = 0
+
+    def _parse_streams(self, names) -> Set[int]:
+        out = set()
+        for name in names:
+            name = name.strip().lower()
+            if not name.endswith("@kline_5m"):
+                continue
+            sym = name.split("@", 1)[0].upper()
+            idx = self.market.index.get(sym)
+            if idx is not None:
+                out.add(idx)
+        return out
+
+    async def _reader(self, ws, subs: Set[int]):
+        async for raw in ws:
+            try:
+                msg = json.loads(raw)
+            except ValueError:
+                continue
+            method = msg.get("method")
+            params = msg.get("params") or []
+            if method == "SUBSCRIBE":
+                subs |= self._parse_streams(params)
+                await ws.send(json.dumps({"result": None, "id": msg.get("id")}))
+            elif method == "UNSUBSCRIBE":
+                subs -= self._parse_streams(params)
+                await ws.send(json.dumps({"result": None, "id": msg.get("id")}))
+            elif method == "LIST_SUBSCRIPTIONS":
+                names = [f"{self.market.symbols[i].lower()}@kline_5m" for i in sorted(subs)]
+                await ws.send(json.dumps({"result": names, "id": msg.get("id")}))
+
+    async def _send_frames(self, ws, subs: Set[int], bar_idx: int, closed: bool):
+        order = list(subs)
+        random.shuffle(order)
+        for idx in order:
+            payload = {
+                "stream": f"{self.market.symbols[idx].lower()}@kline_5m",
+                "data": self.market.kline_event(idx, bar_idx, closed),
+            }
+            await ws.send(json.dumps(payload))
+            self.frames_sent += 1
+
+    async def handler(self, ws, path: Optional[str] = None):
+        if path is None:
+            request = getattr(ws, "request", None)
+            path = request.path if request is not None else getattr(ws, "path", "/")
+        url = urlparse(path)
+        streams = parse_qs(url.query).get("streams", [""])[-1]
+        subs = self._parse_streams(streams.split("/")) if streams else set()
+
+        self.connections += 1
+        reader = asyncio.ensure_future(self._reader(ws, subs))
+        market = self.market
+        tick = market.bar_seconds / (self.updates_per_bar + 1)
+        try:
+            last_closed = market.closed_bars()
+            next_update = time.time() + tick
+            while not reader.done():
+                await asyncio.sleep(min(tick, 0.25))
+                market.sync()
+                closed = market.closed_bars()
+                if closed > last_closed:
+                    for bar_idx in range(last_closed, closed):
+                        await self._send_frames(ws, subs, bar_idx, closed=True)
+                    last_closed = closed
+                    next_update = time.time() + tick
+                    continue
+                if self.updates_per_bar and time.time() >= next_update:
+                    await self._send_frames(ws, subs, closed, closed=False)
+                    next_update = time.time() + tick
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            reader.cancel()
+            self.connections -= 1
+
+
+async def serve_streams(market: FakeMarket, host: str = "127.0.0.1", port: int = 18081,
+                        updates_per_bar: int = 2):
+    server = FakeStreamServer(market, updates_per_bar=updates_per_bar)
+    async with websockets.serve(server.handler, host, port, max_size=None):
+        await asyncio.Future()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Fake Binance Futures REST + WS untuk load test.")
+    ap.add_argument("--symbols", type=int, default=100)
+    ap.add_argument("--bar-seconds", type=float, default=300.0,
+                    help="durasi wall clock 1 candle 5m (default real-time 300s)")
+    ap.add_argument("--history-bars", type=int, default=3000)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--rest-port", type=int, default=18080)
+    ap.add_argument("--ws-port", type=int, default=18081)
+    ap.add_argument("--weight-limit", type=int, default=DEFAULT_WEIGHT_LIMIT)
+    ap.add_argument("--ban-after", type=int, default=0, help="jumlah 429 sebelum 418 (0 = tidak pernah)")
+    ap.add_argument("--updates-per-bar", type=int, default=2)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="delay tiap response REST (simulasi RTT)")
+    ap.add_argument("--verbose", action="store_true")
+    args = ap.parse_args()
+
+    market = FakeMarket(args.symbols, args.bar_seconds, args.history_bars, args.seed)
+    start_rest_server(market, args.host, args.rest_port, args.weight_limit, args.ban_after, args.verbose,
+                      args.latency_ms)
+    print(
+        f"Fake Binance siap: {args.symbols} simbol, 1 bar = {args.bar_seconds}s\n"
+        f"  BINANCE_REST_URL=http://{args.host}:{args.rest_port}\n"
+        f"  BINANCE_STREAM_URL=ws://{args.host}:{args.ws_port}/stream",
+        flush=True,
+    )
+    try:
+        asyncio.run(serve_streams(market, args.host, args.ws_port, args.updates_per_bar))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
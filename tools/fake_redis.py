@@ -0,0 +1,200 @@
+# tools/fake_redis.py
+# Stand-in Redis lokal (protokol RESP2, in-memory) untuk testing mode cluster
+# tanpa server Redis sungguhan. Hanya perintah yang dipakai core/cluster.py:
+#   PING, AUTH, SELECT, GET, SET [NX] [PX ms | EX s], DEL, EXISTS, PEXPIRE, PTTL,
+#   KEYS pattern, RPUSH, LPOP, LLEN, FLUSHALL
+#
+# Contoh:
+#   python -m tools.fake_redis --port 16379
+#   CLUSTER_BACKEND=redis://127.0.0.1:16379 NODE_ID=node-a python main.py
+
+import argparse
+import fnmatch
+import socketserver
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+
+class FakeRedisStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.kv: Dict[bytes, bytes] = {}
+        self.exp: Dict[bytes, float] = {}
+        self.lists: Dict[bytes, deque] = {}
+
+    def _alive(self, key: bytes) -> bool:
+        exp = self.exp.get(key)
+        if exp is not None and exp <= time.time():
+            self.kv.pop(key, None)
+            self.exp.pop(key, None)
+            return False
+        return key in self.kv or key in self.lists
+
+    def execute(self, args):
+        cmd = args[0].upper().decode()
+        fn = getattr(self, f"cmd_{cmd.lower()}", None)
+        if fn is None:
+            return RuntimeError(f"ERR unknown command '{cmd}'")
+        with self.lock:
+            try:
+                return fn(*args[1:])
+            except (TypeError, ValueError, IndexError):
+                return RuntimeError(f"ERR wrong arguments for '{cmd}'")
+
+    # ---------- perintah ----------
+
+    def cmd_ping(self, *args):
+        return args[0] if args else "PONG"
+
+    def cmd_auth(self, *args):
+        return "OK"
+
+    def cmd_select(self, db):
+        return "OK"
+
+    def cmd_flushall(self):
+        self.kv.clear()
+        self.exp.clear()
+        self.lists.clear()
+        return "OK"
+
+    def cmd_get(self, key):
+        return self.kv.get(key) if self._alive(key) else None
+
+    def cmd_set(self, key, value, *opts):
+        nx = False
+        ttl: Optional[float] = None
+        it = iter(opts)
+        for o in it:
+            o = o.upper()
+            if o == b"NX":
+                nx = True
+            elif o == b"PX":
+                ttl = int(next(it)) / 1000.0
+            elif o == b"EX":
+                ttl = float(int(next(it)))
+            else:
+                raise ValueError(o)
+        if nx and self._alive(key):
+            return None
+        self.kv[key] = value
+        if ttl is None:
+            self.exp.pop(key, None)
+        else:
+            self.exp[key] = time.time() + ttl
+        return "OK"
+
+    def cmd_del(self, *keys):
+        n = 0
+        for k in keys:
+            if self._alive(k):
+                n += 1
+            self.kv.pop(k, None)
+            self.exp.pop(k, None)
+            self.lists.pop(k, None)
+        return n
+
+    def cmd_exists(self, *keys):
+        return sum(1 for k in keys if self._alive(k))
+
+    def cmd_pexpire(self, key, ms):
+        if not self._alive(key) or key not in self.kv:
+            return 0
+        self.exp[key] = time.time() + int(ms) / 1000.0
+        return 1
+
+    def cmd_pttl(self, key):
+        if not self._alive(key):
+            return -2
+        exp = self.exp.get(key)
+        return -1 if exp is None else int((exp - time.time()) * 1000)
+
+    def cmd_keys(self, pattern):
+        pat = pattern.decode()
+        keys = list(self.kv) + list(self.lists)
+        return [k for k in keys if self._alive(k) and fnmatch.fnmatchcase(k.decode(), pat)]
+
+    def cmd_rpush(self, key, *values):
+        lst = self.lists.setdefault(key, deque())
+        lst.extend(values)
+        return len(lst)
+
+    def cmd_lpop(self, key):
+        lst = self.lists.get(key)
+        if not lst:
+            return None
+        v = lst.popleft()
+        if not lst:
+            del self.lists[key]
+        return v
+
+    def cmd_llen(self, key):
+        return len(self.lists.get(key, ()))
+
+
+def _encode(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RuntimeError):
+        return b"-" + str(value).encode() + b"\r\n"
+    if isinstance(value, str):
+        return b"+" + value.encode() + b"\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode(v) for v in value)
+    raise TypeError(type(value))
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        store: FakeRedisStore = self.server.store
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if not line.startswith(b"*"):
+                continue
+            n = int(line[1:-2])
+            args = []
+            for _ in range(n):
+                size = int(self.rfile.readline()[1:-2])
+                args.append(self.rfile.read(size + 2)[:-2])
+            self.wfile.write(_encode(store.execute(args)))
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 16379):
+        super().__init__((host, port), _Handler)
+        self.store = FakeRedisStore()
+
+
+def start_fake_redis(host: str = "127.0.0.1", port: int = 16379) -> FakeRedisServer:
+    """Jalankan di thread background (untuk test dalam satu proses)."""
+    srv = FakeRedisServer(host, port)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Stand-in Redis lokal (RESP2, in-memory).")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=16379)
+    args = ap.parse_args()
+    srv = FakeRedisServer(args.host, args.port)
+    print(f"Fake Redis siap: redis://{args.host}:{args.port}", flush=True)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+# tools/loadtest_bot.py
+# Load test end-to-end run_bot (asli) terhadap tools/fake_binance.py.
+#
+# Untuk tiap jumlah pair:
+# - start fake server (proses terpisah, supaya tidak rebutan GIL dengan bot)
+# - start run_bot di proses child (BINANCE_*_URL diarahkan ke fake server)
+# - ukur latency close-burst, analisa/detik, error REST (429/418) & peak RSS
+#
+# Contoh:
+#   python -m tools.loadtest_bot --pairs 100 500 1000 --bar-seconds 30 --closes 3
+#   python -m tools.loadtest_bot --pairs 1000 --workers 4    # mode shard (binance_shards)
+#
+# Latency close-burst = dari analyse_symbol pertama setelah close
+# sampai analyse_symbol terakhir di burst yang sama selesai.
+# A+ p50 = median waktu dari frame close pertama sampai sinyal A+ pertama
+# (close_scheduler); drop = pair yang tidak dianalisa karena lewat deadline.
+# "Sustainable" = semua burst selesai sebelum --budget detik & tanpa error REST.
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, int(round((pct / 100.0) * (len(values) - 1))))
+    return values[k]
+
+
+def _wait_port(host: str, port: int, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1.0):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Port {host}:{port} tidak siap dalam {timeout}s")
+
+
+# ================== CHILD: run_bot asli + instrumentasi ==================
+
+async def _child_main(args) -> dict:
+    import binance.binance_scan as scan
+    import smc.smc_logic as logic
+    from core.bot_state import state
+
+    calls = []          # (start, end) per analyse_symbol
+    rest_errors = {}    # nama exception → jumlah
+    sent = [0]
+
+    orig_analyse = scan.analyse_symbol
+    orig_get_klines = logic.get_klines
+
+    def timed_analyse(symbol, *a, **kw):
+        t0 = time.perf_counter()
+        try:
+            return orig_analyse(symbol, *a, **kw)
+        finally:
+            calls.append((t0, time.perf_counter()))
+
+    def counted_get_klines(*a, **kw):
+        try:
+            return orig_get_klines(*a, **kw)
+        except Exception as e:
+            key = getattr(getattr(e, "response", None), "status_code", None) or type(e).__name__
+            rest_errors[str(key)] = rest_errors.get(str(key), 0) + 1
+            raise
+
+    def fake_broadcast(text, vip_only=False, sent_ids=None):
+        sent[0] += 1
+        return 1
+
+    summaries = []      # ringkasan close_scheduler per burst
+
+    def collect_burst(burst):
+        summaries.append(dict(burst))
+
+    scan.analyse_symbol = timed_analyse
+    scan.report_burst = collect_burst
+    scan.broadcast_signal = fake_broadcast
+    logic.get_klines = counted_get_klines
+
+    # run_bot load_bot_state() dulu, baru parameter load test ditimpa
+    orig_load_state = scan.load_bot_state
+
+    def load_state_override():
+        orig_load_state()
+        state.scanning = True
+        state.min_volume_usdt = 0.0
+        state.max_pairs = args.pairs
+
+    scan.load_bot_state = load_state_override
+
+    if args.workers > 1:
+        return await _child_sharded(args, scan, state, sent, summaries)
+
+    started = time.perf_counter()
+    task = asyncio.create_task(scan.run_bot())
+    run_for = args.warmup + args.closes * args.bar_seconds
+    await asyncio.sleep(run_for)
+
+    # beri kesempatan burst terakhir selesai
+    grace_deadline = time.perf_counter() + args.bar_seconds
+    while calls and time.perf_counter() - calls[-1][1] < 1.0 and time.perf_counter() < grace_deadline:
+        await asyncio.sleep(0.5)
+
+    state.running = False
+    task.cancel()
+    try:
+        await task
+    except BaseException:
+        pass
+
+    # kelompokkan jadi burst per close
+    bursts = []
+    gap = args.bar_seconds * 0.5
+    for s, e in sorted(calls):
+        if bursts and s - bursts[-1][1] <= gap:
+            bursts[-1][1] = max(bursts[-1][1], e)
+            bursts[-1][2] += 1
+        else:
+            bursts.append([s, e, 1])
+
+    burst_lat = [b[1] - b[0] for b in bursts]
+    per_call = [e - s for s, e in calls]
+    busy = sum(per_call)
+
+    return {
+        "pairs": args.pairs,
+        "elapsed": time.perf_counter() - started,
+        "bursts": len(bursts),
+        "burst_sizes": [b[2] for b in bursts],
+        "burst_p50": _percentile(burst_lat, 50),
+        "burst_max": max(burst_lat) if burst_lat else 0.0,
+        "analyse_calls": len(calls),
+        "analyse_p50": _percentile(per_call, 50),
+        "analyse_p95": _percentile(per_call, 95),
+        "analyses_per_sec": (len(calls) / busy) if busy else 0.0,
+        "rest_errors": rest_errors,
+        "signals": sent[0],
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+        **_scheduler_stats(summaries),
+    }
+
+
+def _scheduler_stats(summaries) -> dict:
+    """Time-to-first-A+ & drop dari ringkasan close_scheduler (gabung per close_time)."""
+    per_close = {}
+    for b in summaries:
+        row = per_close.setdefault(b["close_time"], {"start": b["start"], "aplus_at": None, "dropped": 0})
+        row["start"] = min(row["start"], b["start"])
+        row["dropped"] += b["dropped"]
+        if b["first_aplus"] is not None:
+            at = b["start"] + b["first_aplus"]
+            row["aplus_at"] = at if row["aplus_at"] is None else min(row["aplus_at"], at)
+    ttfa = [r["aplus_at"] - r["start"] for r in per_close.values() if r["aplus_at"] is not None]
+    return {
+        "dropped": sum(r["dropped"] for r in per_close.values()),
+        "aplus_bursts": len(ttfa),
+        "first_aplus_p50": _percentile(ttfa, 50) if ttfa else None,
+        "first_aplus_max": max(ttfa) if ttfa else None,
+    }
+
+
+async def _child_sharded(args, scan, state, sent, summaries) -> dict:
+    """Mode shard: analisa terjadi di proses worker, data burst dari pesan worker."""
+    from binance.binance_shards import run_sharded
+
+    bursts = {}   # close_time → [start, end, analysed]
+
+    def on_message(msg):
+        if msg.get("type") != "burst":
+            return
+        summaries.append(msg)
+        b = bursts.setdefault(msg["close_time"], [msg["start"], msg["end"], 0])
+        b[0] = min(b[0], msg["start"])
+        b[1] = max(b[1], msg["end"])
+        b[2] += msg["analysed"]
+
+    started = time.perf_counter()
+    task = asyncio.create_task(run_sharded(args.workers, on_message=on_message))
+    await asyncio.sleep(args.warmup + args.closes * args.bar_seconds + 3.0)
+    state.running = False
+    try:
+        await asyncio.wait_for(task, timeout=15)
+    except BaseException:
+        pass
+
+    rows = [bursts[k] for k in sorted(bursts)]
+    burst_lat = [e - s for s, e, _ in rows]
+    analysed = sum(n for _, _, n in rows)
+    wall = sum(burst_lat)
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    child_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {
+        "pairs": args.pairs,
+        "workers": args.workers,
+        "elapsed": time.perf_counter() - started,
+        "bursts": len(rows),
+        "burst_sizes": [n for _, _, n in rows],
+        "burst_p50": _percentile(burst_lat, 50),
+        "burst_max": max(burst_lat) if burst_lat else 0.0,
+        "analyse_calls": analysed,
+        "analyse_p50": 0.0,
+        "analyse_p95": 0.0,
+        # throughput wall-clock: total analisa / durasi burst (semua worker paralel)
+        "analyses_per_sec": (analysed / wall) if wall else 0.0,
+        "rest_errors": {},
+        "signals": sent[0],
+        # perkiraan: RUSAGE_CHILDREN = peak worker terbesar
+        "peak_rss_mb": (self_rss + args.workers * child_rss) / 1024.0,
+        **_scheduler_stats(summaries),
+    }
+
+
+def _run_child(args):
+    result = asyncio.run(_child_main(args))
+    with open(args.result_file, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+# ================== PARENT: orkestrasi ==================
+
+def _run_one(pairs: int, args) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+    env["BINANCE_REST_URL"] = f"http://{args.host}:{args.rest_port}"
+    env["BINANCE_STREAM_URL"] = f"ws://{args.host}:{args.ws_port}/stream"
+    env["TELEGRAM_TOKEN"] = ""
+
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "tools.fake_binance",
+            "--symbols", str(pairs),
+            "--bar-seconds", str(args.bar_seconds),
+            "--host", args.host,
+            "--rest-port", str(args.rest_port),
+            "--ws-port", str(args.ws_port),
+            "--weight-limit", str(args.weight_limit),
+        ],
+        cwd=str(ROOT),
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    workdir = tempfile.mkdtemp(prefix="smc_loadtest_")
+    result_file = os.path.join(workdir, "result.json")
+    try:
+        _wait_port(args.host, args.rest_port)
+        _wait_port(args.host, args.ws_port)
+        log = open(os.path.join(workdir, "bot.log"), "w", encoding="utf-8")
+        child = subprocess.run(
+            [
+                sys.executable, "-m", "tools.loadtest_bot", "--child",
+                "--pairs", str(pairs),
+                "--bar-seconds", str(args.bar_seconds),
+                "--closes", str(args.closes),
+                "--warmup", str(args.warmup),
+                "--workers", str(args.workers),
+                "--result-file", result_file,
+            ],
+            cwd=workdir,  # DB state bot (bot_data.db) tidak menyentuh repo
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+        log.close()
+        if child.returncode != 0 or not os.path.exists(result_file):
+            raise RuntimeError(f"Child load test gagal (lihat {workdir}/bot.log)")
+        with open(result_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Load test run_bot terhadap fake Binance lokal.")
+    ap.add_argument("--pairs", type=int, nargs="+", default=[100, 500, 1000])
+    ap.add_argument("--bar-seconds", type=float, default=30.0)
+    ap.add_argument("--closes", type=int, default=3)
+    ap.add_argument("--warmup", type=float, default=10.0,
+                    help="detik untuk get_usdt_pairs + connect WS sebelum close pertama")
+    ap.add_argument("--budget", type=float, default=None,
+                    help="batas latency burst (default = --bar-seconds)")
+    ap.add_argument("--weight-limit", type=int, default=2400)
+    ap.add_argument("--workers", type=int, default=1,
+                    help="> 1 = mode shard multi-proses (binance/binance_shards.py)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--rest-port", type=int, default=18080)
+    ap.add_argument("--ws-port", type=int, default=18081)
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        args.pairs = args.pairs[0]
+        _run_child(args)
+        return
+
+    budget = args.budget or args.bar_seconds
+    rows = []
+    for pairs in args.pairs:
+        print(f"== {pairs} pair ==", flush=True)
+        res = _run_one(pairs, args)
+        errors = sum(res["rest_errors"].values())
+        res["sustainable"] = bool(res["bursts"]) and res["burst_max"] <= budget and errors == 0
+        rows.append(res)
+        print(json.dumps(res, indent=2), flush=True)
+
+    print()
+    print(f"{'pairs':>6} {'burst p50':>10} {'burst max':>10} {'an/s':>7} "
+          f"{'an p95':>8} {'A+ p50':>8} {'drop':>6} {'rest err':>9} {'RSS MB':>8}  ok")
+    for r in rows:
+        aplus = f"{r['first_aplus_p50']:>7.2f}s" if r["first_aplus_p50"] is not None else f"{'-':>8}"
+        print(
+            f"{r['pairs']:>6} {r['burst_p50']:>9.2f}s {r['burst_max']:>9.2f}s "
+            f"{r['analyses_per_sec']:>7.1f} {r['analyse_p95']:>7.3f}s {aplus} {r['dropped']:>6} "
+            f"{sum(r['rest_errors'].values()):>9} {r['peak_rss_mb']:>8.1f}  "
+            f"{'YA' if r['sustainable'] else 'TIDAK'}"
+        )
+    ok = [r["pairs"] for r in rows if r["sustainable"]]
+    print(f"\nMax sustainable pairs (budget {budget:.0f}s): {max(ok) if ok else 'tidak ada'}")
+
+
+if __name__ == "__main__":
+    main()